@@ -48,7 +48,6 @@
 package org.knime.python2.nodes.script1in2out;
 
 import java.util.Arrays;
-import java.util.Collection;
 import java.util.LinkedList;
 
 import org.knime.core.data.DataTableSpec;
@@ -56,9 +55,8 @@
 import org.knime.core.node.ExecutionContext;
 import org.knime.core.node.InvalidSettingsException;
 import org.knime.core.node.port.PortType;
-import org.knime.core.node.workflow.FlowVariable;
-import org.knime.python2.kernel.PythonExecutionMonitorCancelable;
 import org.knime.python2.kernel.PythonKernel;
+import org.knime.python2.kernel.PythonKernel.ExecuteAndCollectResult;
 import org.knime.python2.nodes.PythonNodeModel;
 
 /**
@@ -81,26 +79,22 @@ protected PythonScript1In2OutNodeModel() {
      */
     @Override
     protected BufferedDataTable[] execute(final BufferedDataTable[] inData, final ExecutionContext exec) throws Exception {
-        BufferedDataTable table1 = null;
-        BufferedDataTable table2 = null;
+        BufferedDataTable[] tables = null;
         try(final PythonKernel kernel = new PythonKernel(getKernelOptions())) {
         kernel.putFlowVariables(PythonScript1In2OutNodeConfig.getVariableNames().getFlowVariables(),
                 getAvailableFlowVariables().values());
             kernel.putDataTable(PythonScript1In2OutNodeConfig.getVariableNames().getInputTables()[0], inData[0],
                 exec.createSubProgress(0.3));
-            final String[] output = kernel.execute(getConfig().getSourceCode(), new PythonExecutionMonitorCancelable(exec));
+            final ExecuteAndCollectResult result = kernel.executeAndCollect(getConfig().getSourceCode(),
+                PythonScript1In2OutNodeConfig.getVariableNames().getFlowVariables(),
+                PythonScript1In2OutNodeConfig.getVariableNames().getOutputTables(), exec, exec.createSubProgress(0.7));
+            final String[] output = result.getOutput();
             setExternalOutput(new LinkedList<String>(Arrays.asList(output[0].split("\n"))));
             setExternalErrorOutput(new LinkedList<String>(Arrays.asList(output[1].split("\n"))));
-            exec.createSubProgress(0.4).setProgress(1);
-            final Collection<FlowVariable> variables =
-                    kernel.getFlowVariables(PythonScript1In2OutNodeConfig.getVariableNames().getFlowVariables());
-            table1 = kernel.getDataTable(PythonScript1In2OutNodeConfig.getVariableNames().getOutputTables()[0], exec,
-                exec.createSubProgress(0.15));
-            table2 = kernel.getDataTable(PythonScript1In2OutNodeConfig.getVariableNames().getOutputTables()[1], exec,
-                exec.createSubProgress(0.15));
-            addNewVariables(variables);
+            tables = result.getTables();
+            addNewVariables(result.getFlowVariables());
         }
-        return new BufferedDataTable[]{table1, table2};
+        return tables;
     }
 
     /**
@@ -48,7 +48,6 @@
 package org.knime.python2.nodes.script2in1out;
 
 import java.util.Arrays;
-import java.util.Collection;
 import java.util.LinkedList;
 
 import org.knime.core.data.DataTableSpec;
@@ -56,9 +55,8 @@
 import org.knime.core.node.ExecutionContext;
 import org.knime.core.node.InvalidSettingsException;
 import org.knime.core.node.port.PortType;
-import org.knime.core.node.workflow.FlowVariable;
-import org.knime.python2.kernel.PythonExecutionMonitorCancelable;
 import org.knime.python2.kernel.PythonKernel;
+import org.knime.python2.kernel.PythonKernel.ExecuteAndCollectResult;
 import org.knime.python2.nodes.PythonNodeModel;
 
 /**
@@ -86,19 +84,16 @@ protected BufferedDataTable[] execute(final BufferedDataTable[] inData, final Ex
         try (final PythonKernel kernel = new PythonKernel(getKernelOptions())) {
             kernel.putFlowVariables(PythonScript2In1OutNodeConfig.getVariableNames().getFlowVariables(),
                 getAvailableFlowVariables().values());
-            kernel.putDataTable(PythonScript2In1OutNodeConfig.getVariableNames().getInputTables()[0], inData[0],
-                exec.createSubProgress(0.15));
-            kernel.putDataTable(PythonScript2In1OutNodeConfig.getVariableNames().getInputTables()[1], inData[1],
-                exec.createSubProgress(0.15));
-            final String[] output = kernel.execute(getConfig().getSourceCode(), new PythonExecutionMonitorCancelable(exec));
+            kernel.putDataTables(PythonScript2In1OutNodeConfig.getVariableNames().getInputTables(), inData,
+                exec.createSubProgress(0.3));
+            final ExecuteAndCollectResult result = kernel.executeAndCollect(getConfig().getSourceCode(),
+                PythonScript2In1OutNodeConfig.getVariableNames().getFlowVariables(),
+                PythonScript2In1OutNodeConfig.getVariableNames().getOutputTables(), exec, exec.createSubProgress(0.7));
+            final String[] output = result.getOutput();
             setExternalOutput(new LinkedList<String>(Arrays.asList(output[0].split("\n"))));
             setExternalErrorOutput(new LinkedList<String>(Arrays.asList(output[1].split("\n"))));
-            exec.createSubProgress(0.4).setProgress(1);
-            final Collection<FlowVariable> variables =
-                kernel.getFlowVariables(PythonScript2In1OutNodeConfig.getVariableNames().getFlowVariables());
-            table = kernel.getDataTable(PythonScript2In1OutNodeConfig.getVariableNames().getOutputTables()[0], exec,
-                exec.createSubProgress(0.3));
-            addNewVariables(variables);
+            table = result.getTables()[0];
+            addNewVariables(result.getFlowVariables());
         }
         return new BufferedDataTable[]{table};
     }
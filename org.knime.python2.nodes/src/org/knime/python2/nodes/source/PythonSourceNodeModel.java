@@ -48,7 +48,6 @@
 package org.knime.python2.nodes.source;
 
 import java.util.Arrays;
-import java.util.Collection;
 import java.util.LinkedList;
 
 import org.knime.core.data.DataTableSpec;
@@ -56,9 +55,8 @@
 import org.knime.core.node.ExecutionContext;
 import org.knime.core.node.InvalidSettingsException;
 import org.knime.core.node.port.PortType;
-import org.knime.core.node.workflow.FlowVariable;
-import org.knime.python2.kernel.PythonExecutionMonitorCancelable;
 import org.knime.python2.kernel.PythonKernel;
+import org.knime.python2.kernel.PythonKernel.ExecuteAndCollectResult;
 import org.knime.python2.nodes.PythonNodeModel;
 
 /**
@@ -86,15 +84,14 @@ protected BufferedDataTable[] execute(final BufferedDataTable[] inData, final Ex
         try (final PythonKernel kernel = new PythonKernel(getKernelOptions())) {
             kernel.putFlowVariables(PythonSourceNodeConfig.getVariableNames().getFlowVariables(),
                 getAvailableFlowVariables().values());
-            final String[] output = kernel.execute(getConfig().getSourceCode(), new PythonExecutionMonitorCancelable(exec));
+            final ExecuteAndCollectResult result = kernel.executeAndCollect(getConfig().getSourceCode(),
+                PythonSourceNodeConfig.getVariableNames().getFlowVariables(),
+                PythonSourceNodeConfig.getVariableNames().getOutputTables(), exec, exec);
+            final String[] output = result.getOutput();
             setExternalOutput(new LinkedList<String>(Arrays.asList(output[0].split("\n"))));
             setExternalErrorOutput(new LinkedList<String>(Arrays.asList(output[1].split("\n"))));
-            exec.createSubProgress(0.7).setProgress(1);
-            final Collection<FlowVariable> variables =
-                kernel.getFlowVariables(PythonSourceNodeConfig.getVariableNames().getFlowVariables());
-            table = kernel.getDataTable(PythonSourceNodeConfig.getVariableNames().getOutputTables()[0], exec,
-                exec.createSubProgress(0.3));
-            addNewVariables(variables);
+            table = result.getTables()[0];
+            addNewVariables(result.getFlowVariables());
         }
         return new BufferedDataTable[]{table};
     }
@@ -53,6 +53,7 @@ import numpy as np
 import pandas
 import pyarrow
 
+import CancellationToken
 import PythonUtils
 
 try:
@@ -89,7 +90,7 @@ def init(types):
 # @param data_bytes    the serialized path to the temporary CSV file
 def column_names_from_bytes(data_bytes):
     global read_data_frame, read_types
-    path = data_bytes.decode('utf-8')
+    path = bytes(data_bytes).decode('utf-8')
     if read_data_frame is None:
         deserialize_data_frame(path)
     return read_data_frame.columns.tolist()
@@ -99,7 +100,7 @@ def column_names_from_bytes(data_bytes):
 # @param data_bytes    the serialized path to the temporary CSV file
 def column_types_from_bytes(data_bytes):
     global read_data_frame, read_types
-    path = data_bytes.decode('utf-8')
+    path = bytes(data_bytes).decode('utf-8')
     if read_data_frame is None:
         deserialize_data_frame(path)
     return read_types
@@ -110,7 +111,7 @@ def column_types_from_bytes(data_bytes):
 # @param data_bytes    the serialized path to the temporary CSV file
 def column_serializers_from_bytes(data_bytes):
     global read_data_frame, read_types, read_serializers
-    path = data_bytes.decode('utf-8')
+    path = bytes(data_bytes).decode('utf-8')
     if read_data_frame is None:
         deserialize_data_frame(path)
     return read_serializers
@@ -123,7 +124,7 @@ def column_serializers_from_bytes(data_bytes):
 # @param data_bytes   the serialized path to the temporary CSV file
 def bytes_into_table(table, data_bytes):
     global read_data_frame, read_types, read_serializers
-    path = data_bytes.decode('utf-8')
+    path = bytes(data_bytes).decode('utf-8')
     try:
         if read_data_frame is None:
             deserialize_data_frame(path)
@@ -651,6 +652,7 @@ def table_to_bytes(table):
 
         # Serialize the dataframe into a list of pyarrow.Array column by column
         for i in range(len(table._data_frame.columns)):
+            CancellationToken.check_cancelled()
             # missing column ? -> save name and don't send any buffer for column
             if (table._data_frame.iloc[:, i].isnull().all()):
                 missing_names.append(table.get_name(i))
@@ -761,6 +763,12 @@ def table_to_bytes(table):
         raise
 
 
+# Delete the temporary file created by table_to_bytes if Java will not read it (and hence not delete it).
+# @param data_bytes    the path to the file as bytearray, as returned by table_to_bytes
+def discard_bytes(data_bytes):
+    PythonUtils.invoke_safely(None, os.remove, [data_bytes.decode('utf-8')])
+
+
 def close():
     global _temp_dir
     # Remove entire temporary directory.
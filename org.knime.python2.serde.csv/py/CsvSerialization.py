@@ -78,7 +78,7 @@ def init(types):
 # Get the column names of the table to create from the serialized data.
 # @param data_bytes    the serialized path to the temporary CSV file
 def column_names_from_bytes(data_bytes):
-    path = data_bytes.decode('utf-8')
+    path = bytes(data_bytes).decode('utf-8')
     in_file = open(path, 'r')
     try:
         data_frame = pandas.read_csv(in_file, index_col=0, nrows=0, skiprows=2)
@@ -92,7 +92,7 @@ def column_names_from_bytes(data_bytes):
 # Get the column types of the table to create from the serialized data.
 # @param data_bytes    the serialized path to the temporary CSV file
 def column_types_from_bytes(data_bytes):
-    path = data_bytes.decode('utf-8')
+    path = bytes(data_bytes).decode('utf-8')
     in_file = open(path, 'r')
     try:
         types = in_file.readline().strip()[2:].split(',')
@@ -111,7 +111,7 @@ def column_types_from_bytes(data_bytes):
 # of the table to create from the serialized data.
 # @param data_bytes    the serialized path to the temporary CSV file
 def column_serializers_from_bytes(data_bytes):
-    path = data_bytes.decode('utf-8')
+    path = bytes(data_bytes).decode('utf-8')
     in_file = open(path, 'r')
     try:
         types = in_file.readline().strip()[2:].split(',')
@@ -132,7 +132,7 @@ def column_serializers_from_bytes(data_bytes):
 #                     managing the deserialization of extension types
 # @param data_bytes   the serialized path to the temporary CSV file
 def bytes_into_table(table, data_bytes):
-    path = data_bytes.decode('utf-8')
+    path = bytes(data_bytes).decode('utf-8')
     try:
         with open(path, 'rb') as in_file:
             types = in_file.readline().decode('utf-8').strip()[2:].split(',')
@@ -292,6 +292,12 @@ def table_to_bytes(table):
         raise
 
 
+# Delete the temporary file created by table_to_bytes if Java will not read it (and hence not delete it).
+# @param data_bytes    the path to the file as bytearray, as returned by table_to_bytes
+def discard_bytes(data_bytes):
+    PythonUtils.invoke_safely(None, os.remove, [data_bytes.decode('utf-8')])
+
+
 def close():
     global _temp_dir
     # Remove entire temporary directory.
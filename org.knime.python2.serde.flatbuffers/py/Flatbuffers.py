@@ -44,6 +44,7 @@
 import numpy as np
 from pandas import DataFrame
 
+import CancellationToken
 import flatbuffers
 from knimetable import BooleanCollectionCell
 from knimetable import BooleanCollectionColumn
@@ -247,6 +248,7 @@ def table_to_bytes(table):
         serializers = table._column_serializers
 
         for colIdx in range(0, table.get_number_columns()):
+            CancellationToken.check_cancelled()
             col = table._data_frame.iloc[:, colIdx]
             if table.get_type(colIdx) == _types_.INTEGER:
                 valVec = builder.CreateByteArray(np.array(col.values, dtype='i4').tobytes())
@@ -58,7 +58,26 @@
 import org.junit.Assert;
 import org.junit.Before;
 import org.junit.Test;
+import org.knime.core.data.DataColumnSpecCreator;
+import org.knime.core.data.DataRow;
+import org.knime.core.data.DataTableSpec;
+import org.knime.core.data.container.CloseableRowIterator;
+import org.knime.core.data.container.ContainerTable;
+import org.knime.core.data.def.DefaultRow;
+import org.knime.core.data.def.IntCell;
+import org.knime.core.data.def.StringCell;
+import org.knime.core.node.BufferedDataContainer;
+import org.knime.core.node.BufferedDataTable;
 import org.knime.core.node.CanceledExecutionException;
+import org.knime.core.node.DefaultNodeProgressMonitor;
+import org.knime.core.node.ExecutionContext;
+import org.knime.core.node.Node;
+import org.knime.core.node.NodeFactory;
+import org.knime.core.node.port.PortType;
+import org.knime.core.node.workflow.FlowVariable;
+import org.knime.core.node.workflow.SingleNodeContainer;
+import org.knime.core.node.workflow.virtual.parchunk.VirtualParallelizedChunkPortObjectInNodeFactory;
+import org.knime.python2.kernel.PythonKernel.ExecuteAndCollectResult;
 import org.knime.python2.kernel.PythonKernelOptions.PythonVersionOption;
 import org.knime.python2.kernel.messaging.AbstractRequestHandler;
 import org.knime.python2.kernel.messaging.AbstractTaskHandler;
@@ -66,6 +85,7 @@
 import org.knime.python2.kernel.messaging.DefaultMessage.PayloadDecoder;
 import org.knime.python2.kernel.messaging.DefaultMessage.PayloadEncoder;
 import org.knime.python2.kernel.messaging.Message;
+import org.knime.python2.kernel.messaging.MessagingOptions;
 
 /**
  * @author Marcel Wiedenmann, KNIME GmbH, Konstanz, Germany
@@ -87,6 +107,58 @@ public void cleanup() throws IOException {
 		m_kernel.close();
 	}
 
+	/**
+	 * Calls each function of the given Python module whose name starts with "test_" with the workspace of the kernel.
+	 * A failing function makes the execution throw a {@link PythonIOException} that contains its traceback.
+	 */
+	private void executePythonTestFunctions(final String module) throws IOException, CanceledExecutionException {
+		final String sourceCode = "import importlib\n" //
+				+ "test_module = importlib.import_module('" + module + "')\n" //
+				+ "for test_function in sorted(name for name in dir(test_module) if name.startswith('test_')):\n" //
+				+ "    getattr(test_module, test_function)(globals()['workspace'])";
+		m_kernel.execute(sourceCode, PythonCancelable.NOT_CANCELABLE);
+	}
+
+	private static PythonKernel createKernel(final int chunkSize) throws IOException {
+		final PythonKernelOptions kernelOptions = new PythonKernelOptions();
+		kernelOptions.setPythonVersionOption(PythonVersionOption.PYTHON3);
+		kernelOptions.setChunkSize(chunkSize);
+		return new PythonKernel(kernelOptions);
+	}
+
+	@SuppressWarnings({"rawtypes", "unchecked", "deprecation"})
+	private static ExecutionContext createExecutionContext() {
+		return new ExecutionContext(new DefaultNodeProgressMonitor(),
+				new Node((NodeFactory)new VirtualParallelizedChunkPortObjectInNodeFactory(new PortType[0])),
+				SingleNodeContainer.MemoryPolicy.CacheSmallInMemory, new HashMap<Integer, ContainerTable>());
+	}
+
+	/**
+	 * Creates a table whose i-th row has the key "Row" + i and the cells i and "value" + i.
+	 */
+	private static BufferedDataTable createTable(final ExecutionContext exec, final int numRows) {
+		final DataTableSpec spec = new DataTableSpec(new DataColumnSpecCreator("int", IntCell.TYPE).createSpec(),
+				new DataColumnSpecCreator("string", StringCell.TYPE).createSpec());
+		final BufferedDataContainer container = exec.createDataContainer(spec);
+		for (int i = 0; i < numRows; i++) {
+			container.addRowToTable(new DefaultRow("Row" + i, new IntCell(i), new StringCell("value" + i)));
+		}
+		container.close();
+		return container.getTable();
+	}
+
+	private static void assertTableContent(final int numRows, final BufferedDataTable table) {
+		Assert.assertEquals(numRows, table.size());
+		try (final CloseableRowIterator rows = table.iterator()) {
+			for (int i = 0; i < numRows; i++) {
+				final DataRow row = rows.next();
+				Assert.assertEquals("Row" + i, row.getKey().getString());
+				Assert.assertEquals(i, ((IntCell)row.getCell(0)).getIntValue());
+				Assert.assertEquals("value" + i, ((StringCell)row.getCell(1)).getStringValue());
+			}
+		}
+	}
+
 	@Test
 	public void testRequestFromJavaToPython()
 			throws IOException, CanceledExecutionException, InterruptedException, ExecutionException {
@@ -206,4 +278,153 @@ protected String handleSuccessMessage(final Message message) throws Exception {
 			m_kernel.unregisterTaskHandler("caused-request-from-python");
 		}
 	}
+
+	@Test(timeout = 60000)
+	public void testCancelledExecutionIsInterruptedOnPythonSide() throws IOException, CanceledExecutionException {
+		final long cancelTime = System.currentTimeMillis() + 500;
+		try {
+			m_kernel.execute("while True:\n    pass", () -> {
+				if (System.currentTimeMillis() >= cancelTime) {
+					throw new PythonCanceledExecutionException();
+				}
+			});
+			Assert.fail("Execution was not cancelled.");
+		} catch (final CanceledExecutionException ex) {
+			// Expected.
+		}
+		// Python executes source code sequentially, so this only completes if the loop above was interrupted.
+		final String[] output =
+				m_kernel.execute("print('executed after cancellation')", PythonCancelable.NOT_CANCELABLE);
+		Assert.assertTrue(output[0].contains("executed after cancellation"));
+	}
+
+	@Test
+	public void testAppendToTable() throws IOException, CanceledExecutionException {
+		executePythonTestFunctions("python3.testing.PythonKernelTest");
+	}
+
+	@Test
+	public void testTableChunkPrefetcher() throws IOException, CanceledExecutionException {
+		executePythonTestFunctions("python3.testing.TableChunkPrefetcherTest");
+	}
+
+	@Test
+	public void testCancellationToken() throws IOException, CanceledExecutionException {
+		executePythonTestFunctions("python3.testing.CancellationTokenTest");
+	}
+
+	@Test
+	public void testMessagingStatistics() throws IOException, CanceledExecutionException {
+		executePythonTestFunctions("python3.messaging.testing.MessagingStatisticsTest");
+	}
+
+	@Test
+	public void testSharedMemorySegments() throws IOException, CanceledExecutionException {
+		executePythonTestFunctions("python3.messaging.testing.SharedMemorySegmentsTest");
+	}
+
+	@Test
+	public void testMessageHeaderCodec() throws IOException, CanceledExecutionException {
+		executePythonTestFunctions("python3.messaging.testing.MessageHeaderCodecTest");
+	}
+
+	@Test
+	public void testMessagePriorities() throws IOException, CanceledExecutionException {
+		executePythonTestFunctions("python3.messaging.testing.MessagePriorityTest");
+	}
+
+	@Test
+	public void testPayloadCompression() throws IOException, CanceledExecutionException {
+		executePythonTestFunctions("python3.messaging.testing.PayloadCompressionTest");
+	}
+
+	@Test
+	public void testMessagingStatisticsAreOnlyRecordedIfEnabled() throws IOException, CanceledExecutionException {
+		m_kernel.execute("pass", PythonCancelable.NOT_CANCELABLE);
+		Assert.assertTrue(m_kernel.getMessagingStatistics().isEmpty());
+
+		final PythonKernelOptions kernelOptions = new PythonKernelOptions();
+		kernelOptions.setPythonVersionOption(PythonVersionOption.PYTHON3);
+		final MessagingOptions messagingOptions = new MessagingOptions();
+		messagingOptions.setStatisticsEnabled(true);
+		kernelOptions.setMessagingOptions(messagingOptions);
+		try (final PythonKernel kernel = new PythonKernel(kernelOptions)) {
+			kernel.execute("pass", PythonCancelable.NOT_CANCELABLE);
+			Assert.assertTrue(kernel.getMessagingStatistics().stream()
+					.anyMatch(entry -> "execute".equals(entry.get("category"))));
+		}
+	}
+
+	@Test
+	public void testPutAndGetTablesOfDifferentSizes() throws IOException, CanceledExecutionException {
+		final ExecutionContext exec = createExecutionContext();
+		// The chunks of the tables are interleaved, one chunk of each table with rows left per request. The last chunk
+		// of the first and the only chunk of the last table are partial, so Python clips their ends to the table sizes.
+		final String[] names = {"medium_table", "large_table", "small_table"};
+		final int[] sizes = {23, 50, 5};
+		final BufferedDataTable[] tables = new BufferedDataTable[names.length];
+		for (int t = 0; t < names.length; t++) {
+			tables[t] = createTable(exec, sizes[t]);
+		}
+		try (final PythonKernel kernel = createKernel(10)) {
+			kernel.putDataTables(names, tables, exec);
+			final String[] output = kernel.execute("tables = (medium_table, large_table, small_table)\n"
+					+ "print([len(table) for table in tables])\n"
+					+ "print([list(table['int']) == list(range(len(table))) for table in tables])",
+					PythonCancelable.NOT_CANCELABLE);
+			Assert.assertTrue(output[0].contains("[23, 50, 5]"));
+			Assert.assertTrue(output[0].contains("[True, True, True]"));
+
+			final BufferedDataTable[] received = kernel.getDataTables(names, exec, exec);
+			for (int t = 0; t < names.length; t++) {
+				assertTableContent(sizes[t], received[t]);
+			}
+		}
+	}
+
+	@Test
+	public void testExecuteAndCollectTablesAroundTheChunkSize() throws IOException, CanceledExecutionException {
+		final ExecutionContext exec = createExecutionContext();
+		// The first chunk of each table is sent along with the output of the execution. Python ends it at
+		// min(chunk size - 1, table size), which must match the inclusive end that Java uses for all further chunks:
+		// a table of exactly one chunk must not need another request, and the rows of larger tables must neither be
+		// duplicated nor skipped at the boundary to the second chunk.
+		final String[] names = {"empty_table", "small_table", "one_chunk_table", "large_table"};
+		final int[] sizes = {0, 5, 10, 25};
+		final String sourceCode = "import pandas\n" //
+				+ "def create_table(num_rows):\n" //
+				+ "    index = ['Row%d' % i for i in range(num_rows)]\n" //
+				+ "    return pandas.DataFrame({'int': pandas.Series(range(num_rows), index=index, dtype='int32'),\n" //
+				+ "                             'string': ['value%d' % i for i in range(num_rows)]},\n" //
+				+ "                            index=index, columns=['int', 'string'])\n" //
+				+ "empty_table = create_table(25).iloc[0:0]\n" //
+				+ "small_table = create_table(5)\n" //
+				+ "one_chunk_table = create_table(10)\n" //
+				+ "large_table = create_table(25)\n" //
+				+ "flow_variables = {'answer': 42}\n" //
+				+ "print('executed')";
+		try (final PythonKernel kernel = createKernel(10)) {
+			final ExecuteAndCollectResult result =
+					kernel.executeAndCollect(sourceCode, "flow_variables", names, exec, exec);
+			Assert.assertTrue(result.getOutput()[0].contains("executed"));
+			final FlowVariable answer = result.getFlowVariables().stream()
+					.filter(variable -> variable.getName().equals("answer")).findFirst().get();
+			Assert.assertEquals(42, answer.getIntValue());
+			final BufferedDataTable[] tables = result.getTables();
+			Assert.assertEquals(names.length, tables.length);
+			for (int t = 0; t < names.length; t++) {
+				assertTableContent(sizes[t], tables[t]);
+			}
+		}
+	}
+
+	@Test
+	public void testSerializerTypeExtensionConversion() throws IOException, CanceledExecutionException {
+		executePythonTestFunctions("python3.testing.SerializerTest");
+	}
+
+	@Test
+	public void testParallelConversion() throws IOException, CanceledExecutionException {
+		executePythonTestFunctions("python3.testing.ParallelConversionTest");
+	}
 }
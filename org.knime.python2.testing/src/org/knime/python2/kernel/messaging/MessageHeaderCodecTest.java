@@ -0,0 +1,137 @@
+/*
+ * ------------------------------------------------------------------------
+ *
+ *  Copyright by KNIME AG, Zurich, Switzerland
+ *  Website: http://www.knime.com; Email: contact@knime.com
+ *
+ *  This program is free software; you can redistribute it and/or modify
+ *  it under the terms of the GNU General Public License, Version 3, as
+ *  published by the Free Software Foundation.
+ *
+ *  This program is distributed in the hope that it will be useful, but
+ *  WITHOUT ANY WARRANTY; without even the implied warranty of
+ *  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+ *  GNU General Public License for more details.
+ *
+ *  You should have received a copy of the GNU General Public License
+ *  along with this program; if not, see <http://www.gnu.org/licenses>.
+ *
+ *  Additional permission under GNU GPL version 3 section 7:
+ *
+ *  KNIME interoperates with ECLIPSE solely via ECLIPSE's plug-in APIs.
+ *  Hence, KNIME and ECLIPSE are both independent programs and are not
+ *  derived from each other. Should, however, the interpretation of the
+ *  GNU GPL Version 3 ("License") under any applicable laws result in
+ *  KNIME and ECLIPSE being a combined program, KNIME AG herewith grants
+ *  you the additional permission to use and propagate KNIME together with
+ *  ECLIPSE with only the license terms in place for ECLIPSE applying to
+ *  ECLIPSE and the GNU GPL Version 3 applying for KNIME, provided the
+ *  license terms of ECLIPSE themselves allow for the respective use and
+ *  propagation of ECLIPSE together with KNIME.
+ *
+ *  Additional permission relating to nodes for KNIME that extend the Node
+ *  Extension (and in particular that are based on subclasses of NodeModel,
+ *  NodeDialog, and NodeView) and that only interoperate with KNIME through
+ *  standard APIs ("Nodes"):
+ *  Nodes are deemed to be separate and independent programs and to not be
+ *  covered works.  Notwithstanding anything to the contrary in the
+ *  License, the License does not apply to Nodes, you are not required to
+ *  license Nodes under the License, and you are granted a license to
+ *  prepare and propagate Nodes, in each case even if such Nodes are
+ *  propagated with or for interoperation with KNIME.  The owner of a Node
+ *  may freely choose the license terms applicable to such Node, including
+ *  when such Node is propagated with or for interoperation with KNIME.
+ * ---------------------------------------------------------------------
+ *
+ */
+package org.knime.python2.kernel.messaging;
+
+import java.util.HashMap;
+import java.util.Map;
+
+import org.junit.Assert;
+import org.junit.Test;
+import org.knime.python2.kernel.messaging.MessageHeaderCodec.BinaryMessageHeaderCodec;
+import org.knime.python2.kernel.messaging.MessagingOptions.HeaderFormat;
+
+/**
+ * Tests {@link MessageHeaderCodec}.
+ */
+public final class MessageHeaderCodecTest {
+
+	@Test
+	public void testBinaryHeaderLayout() {
+		final Map<String, String> fields = new HashMap<>();
+		fields.put("k", "v");
+		final byte[] header =
+			MessageHeaderCodec.create(HeaderFormat.BINARY).encode(new DefaultMessage(5, "ab", null, fields));
+		// Must match the layout that the Python side expects.
+		final byte[] expected = {1, 0, 0, 0, 5, 0, 2, 0, 0, 0, 3, 'a', 'b', 'k', 0, 'v'};
+		Assert.assertArrayEquals(expected, header);
+	}
+
+	@Test
+	public void testBinaryRoundTrip() {
+		final Map<String, String> fields = new HashMap<>();
+		fields.put("type", "success");
+		fields.put("uncompressed_size", "42");
+		fields.put("non-ascii", "\u00e4\u00f6\u00fc");
+		assertRoundTrip(HeaderFormat.BINARY, new DefaultMessage(-7, "r\u00e9ponse", new byte[]{1, 2, 3}, fields));
+	}
+
+	@Test
+	public void testBinaryRoundTripWithoutFields() {
+		assertRoundTrip(HeaderFormat.BINARY, new DefaultMessage(Integer.MAX_VALUE, "execute", null, null));
+	}
+
+	@Test
+	public void testTextRoundTrip() {
+		final Map<String, String> fields = new HashMap<>();
+		fields.put("type", "success");
+		assertRoundTrip(HeaderFormat.TEXT, new DefaultMessage(3, "execute", new byte[]{1}, fields));
+	}
+
+	@Test(expected = IllegalArgumentException.class)
+	public void testUnsupportedBinaryVersionIsRejected() {
+		final MessageHeaderCodec codec = MessageHeaderCodec.create(HeaderFormat.BINARY);
+		final byte[] header = codec.encode(new DefaultMessage(1, "execute", null, null));
+		header[0] = 2;
+		codec.decode(header, null);
+	}
+
+	@Test
+	public void testRepeatedHeadersAreDecodedFromCache() {
+		final MessageHeaderCodec codec = MessageHeaderCodec.create(HeaderFormat.BINARY);
+		final Map<String, String> fields = new HashMap<>();
+		fields.put("type", "success");
+		final byte[] header = codec.encode(new DefaultMessage(1, "execute", null, fields));
+		final DefaultMessage first = codec.decode(header.clone(), null);
+		final DefaultMessage second = codec.decode(header.clone(), null);
+		Assert.assertSame(first.getCategory(), second.getCategory());
+		Assert.assertEquals("success", second.getHeaderField("type"));
+	}
+
+	@Test
+	public void testCachesAreBounded() {
+		final BinaryMessageHeaderCodec codec = (BinaryMessageHeaderCodec)MessageHeaderCodec.create(HeaderFormat.BINARY);
+		final Map<String, String> fields = new HashMap<>();
+		for (int i = 0; i < 3 * BinaryMessageHeaderCodec.MAX_CACHE_SIZE; i++) {
+			// Replies carry unique categories and field values.
+			fields.put("type", Integer.toString(i));
+			final DefaultMessage message = new DefaultMessage(i, Integer.toString(i), null, fields);
+			final DefaultMessage decoded = codec.decode(codec.encode(message), null);
+			Assert.assertEquals(message.getCategory(), decoded.getCategory());
+			Assert.assertEquals(Integer.toString(i), decoded.getHeaderField("type"));
+			Assert.assertTrue(codec.getLargestCacheSize() <= BinaryMessageHeaderCodec.MAX_CACHE_SIZE);
+		}
+	}
+
+	private static void assertRoundTrip(final HeaderFormat format, final DefaultMessage message) {
+		final MessageHeaderCodec codec = MessageHeaderCodec.create(format);
+		final DefaultMessage decoded = codec.decode(codec.encode(message), message.getPayload());
+		Assert.assertEquals(message.getId(), decoded.getId());
+		Assert.assertEquals(message.getCategory(), decoded.getCategory());
+		Assert.assertEquals(message.getAdditionalHeaderFields(), decoded.getAdditionalHeaderFields());
+		Assert.assertSame(message.getPayload(), decoded.getPayload());
+	}
+}
@@ -0,0 +1,152 @@
+/*
+ * ------------------------------------------------------------------------
+ *
+ *  Copyright by KNIME AG, Zurich, Switzerland
+ *  Website: http://www.knime.com; Email: contact@knime.com
+ *
+ *  This program is free software; you can redistribute it and/or modify
+ *  it under the terms of the GNU General Public License, Version 3, as
+ *  published by the Free Software Foundation.
+ *
+ *  This program is distributed in the hope that it will be useful, but
+ *  WITHOUT ANY WARRANTY; without even the implied warranty of
+ *  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+ *  GNU General Public License for more details.
+ *
+ *  You should have received a copy of the GNU General Public License
+ *  along with this program; if not, see <http://www.gnu.org/licenses>.
+ *
+ *  Additional permission under GNU GPL version 3 section 7:
+ *
+ *  KNIME interoperates with ECLIPSE solely via ECLIPSE's plug-in APIs.
+ *  Hence, KNIME and ECLIPSE are both independent programs and are not
+ *  derived from each other. Should, however, the interpretation of the
+ *  GNU GPL Version 3 ("License") under any applicable laws result in
+ *  KNIME and ECLIPSE being a combined program, KNIME AG herewith grants
+ *  you the additional permission to use and propagate KNIME together with
+ *  ECLIPSE with only the license terms in place for ECLIPSE applying to
+ *  ECLIPSE and the GNU GPL Version 3 applying for KNIME, provided the
+ *  license terms of ECLIPSE themselves allow for the respective use and
+ *  propagation of ECLIPSE together with KNIME.
+ *
+ *  Additional permission relating to nodes for KNIME that extend the Node
+ *  Extension (and in particular that are based on subclasses of NodeModel,
+ *  NodeDialog, and NodeView) and that only interoperate with KNIME through
+ *  standard APIs ("Nodes"):
+ *  Nodes are deemed to be separate and independent programs and to not be
+ *  covered works.  Notwithstanding anything to the contrary in the
+ *  License, the License does not apply to Nodes, you are not required to
+ *  license Nodes under the License, and you are granted a license to
+ *  prepare and propagate Nodes, in each case even if such Nodes are
+ *  propagated with or for interoperation with KNIME.  The owner of a Node
+ *  may freely choose the license terms applicable to such Node, including
+ *  when such Node is propagated with or for interoperation with KNIME.
+ * ---------------------------------------------------------------------
+ *
+ */
+package org.knime.python2.kernel.messaging;
+
+import java.io.IOException;
+import java.nio.charset.StandardCharsets;
+import java.util.Arrays;
+import java.util.Random;
+
+import org.junit.Assert;
+import org.junit.Before;
+import org.junit.Test;
+import org.knime.python2.kernel.messaging.MessagingOptions.Compression;
+
+/**
+ * Tests {@link PayloadCompression}.
+ */
+public final class PayloadCompressionTest {
+
+	private static final byte[] COMPRESSIBLE_PAYLOAD = repeat("knime", 20000);
+
+	private static final byte[] INCOMPRESSIBLE_PAYLOAD = randomBytes(100000);
+
+	private PayloadCompression m_compression;
+
+	@Before
+	public void setup() {
+		m_compression = new PayloadCompression(Compression.ZLIB, 1024);
+	}
+
+	@Test
+	public void testCompressiblePayloadIsCompressed() throws IOException {
+		final byte[] compressed = m_compression.compress(COMPRESSIBLE_PAYLOAD);
+		Assert.assertNotNull(compressed);
+		Assert.assertTrue(compressed.length < COMPRESSIBLE_PAYLOAD.length);
+		Assert.assertArrayEquals(COMPRESSIBLE_PAYLOAD,
+			m_compression.decompress(Compression.ZLIB.getId(), compressed, COMPRESSIBLE_PAYLOAD.length));
+		Assert.assertEquals(1, m_compression.getNumCompressedPayloads());
+		Assert.assertEquals(COMPRESSIBLE_PAYLOAD.length, m_compression.getUncompressedBytes());
+		Assert.assertEquals(compressed.length, m_compression.getCompressedBytes());
+		Assert.assertTrue(m_compression.getCompressionRatio() > 1);
+		Assert.assertEquals(1, m_compression.getNumDecompressedPayloads());
+	}
+
+	@Test
+	public void testIncompressiblePayloadIsSkipped() {
+		Assert.assertNull(m_compression.compress(INCOMPRESSIBLE_PAYLOAD));
+		Assert.assertEquals(0, m_compression.getNumCompressedPayloads());
+		Assert.assertEquals(1, m_compression.getNumUncompressedPayloads());
+		Assert.assertTrue(Double.isNaN(m_compression.getCompressionRatio()));
+	}
+
+	@Test
+	public void testRatioCheckOnlyCompressesSample() {
+		// An incompressible head decides for the entire payload, even if the rest would compress well.
+		final byte[] payload = Arrays.copyOf(INCOMPRESSIBLE_PAYLOAD, 16 * 1024 + COMPRESSIBLE_PAYLOAD.length);
+		System.arraycopy(COMPRESSIBLE_PAYLOAD, 0, payload, 16 * 1024, COMPRESSIBLE_PAYLOAD.length);
+		Assert.assertNull(m_compression.compress(payload));
+	}
+
+	@Test
+	public void testPayloadBelowThresholdIsNotCompressed() {
+		Assert.assertNull(m_compression.compress(Arrays.copyOf(COMPRESSIBLE_PAYLOAD, 1023)));
+		Assert.assertEquals(0, m_compression.getNumUncompressedPayloads());
+	}
+
+	@Test
+	public void testDisabledCompressionDoesNotCompress() {
+		Assert.assertNull(new PayloadCompression(Compression.NONE, 0).compress(COMPRESSIBLE_PAYLOAD));
+	}
+
+	@Test
+	public void testPayloadCompressedByPythonIsDecompressed() throws IOException {
+		// zlib.compress(b'knime' * 20, 1) in Python.
+		final byte[] compressed = {120, 1, -53, -50, -53, -52, 77, -51, -90, 45, 1, 0, 52, -56, 41, -111};
+		Assert.assertArrayEquals(repeat("knime", 20), m_compression.decompress("zlib", compressed, 100));
+	}
+
+	@Test(expected = IOException.class)
+	public void testDecompressingReportsSizeMismatch() throws IOException {
+		final byte[] compressed = m_compression.compress(COMPRESSIBLE_PAYLOAD);
+		m_compression.decompress(Compression.ZLIB.getId(), compressed, COMPRESSIBLE_PAYLOAD.length - 1);
+	}
+
+	@Test(expected = IOException.class)
+	public void testDecompressingReportsCorruptPayload() throws IOException {
+		m_compression.decompress(Compression.ZLIB.getId(), randomBytes(100), 1000);
+	}
+
+	@Test(expected = IOException.class)
+	public void testUnsupportedCodecIsRejected() throws IOException {
+		m_compression.decompress("lz4", new byte[1], 1);
+	}
+
+	private static byte[] repeat(final String string, final int times) {
+		final StringBuilder builder = new StringBuilder(string.length() * times);
+		for (int i = 0; i < times; i++) {
+			builder.append(string);
+		}
+		return builder.toString().getBytes(StandardCharsets.UTF_8);
+	}
+
+	private static byte[] randomBytes(final int size) {
+		final byte[] bytes = new byte[size];
+		new Random(42).nextBytes(bytes);
+		return bytes;
+	}
+}
@@ -0,0 +1,172 @@
+/*
+ * ------------------------------------------------------------------------
+ *
+ *  Copyright by KNIME AG, Zurich, Switzerland
+ *  Website: http://www.knime.com; Email: contact@knime.com
+ *
+ *  This program is free software; you can redistribute it and/or modify
+ *  it under the terms of the GNU General Public License, Version 3, as
+ *  published by the Free Software Foundation.
+ *
+ *  This program is distributed in the hope that it will be useful, but
+ *  WITHOUT ANY WARRANTY; without even the implied warranty of
+ *  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+ *  GNU General Public License for more details.
+ *
+ *  You should have received a copy of the GNU General Public License
+ *  along with this program; if not, see <http://www.gnu.org/licenses>.
+ *
+ *  Additional permission under GNU GPL version 3 section 7:
+ *
+ *  KNIME interoperates with ECLIPSE solely via ECLIPSE's plug-in APIs.
+ *  Hence, KNIME and ECLIPSE are both independent programs and are not
+ *  derived from each other. Should, however, the interpretation of the
+ *  GNU GPL Version 3 ("License") under any applicable laws result in
+ *  KNIME and ECLIPSE being a combined program, KNIME AG herewith grants
+ *  you the additional permission to use and propagate KNIME together with
+ *  ECLIPSE with only the license terms in place for ECLIPSE applying to
+ *  ECLIPSE and the GNU GPL Version 3 applying for KNIME, provided the
+ *  license terms of ECLIPSE themselves allow for the respective use and
+ *  propagation of ECLIPSE together with KNIME.
+ *
+ *  Additional permission relating to nodes for KNIME that extend the Node
+ *  Extension (and in particular that are based on subclasses of NodeModel,
+ *  NodeDialog, and NodeView) and that only interoperate with KNIME through
+ *  standard APIs ("Nodes"):
+ *  Nodes are deemed to be separate and independent programs and to not be
+ *  covered works.  Notwithstanding anything to the contrary in the
+ *  License, the License does not apply to Nodes, you are not required to
+ *  license Nodes under the License, and you are granted a license to
+ *  prepare and propagate Nodes, in each case even if such Nodes are
+ *  propagated with or for interoperation with KNIME.  The owner of a Node
+ *  may freely choose the license terms applicable to such Node, including
+ *  when such Node is propagated with or for interoperation with KNIME.
+ * ---------------------------------------------------------------------
+ *
+ */
+package org.knime.python2.kernel.messaging;
+
+import java.util.ArrayList;
+import java.util.Arrays;
+import java.util.Collections;
+import java.util.List;
+import java.util.concurrent.CountDownLatch;
+import java.util.concurrent.TimeUnit;
+
+import org.junit.Assert;
+import org.junit.Before;
+import org.junit.Test;
+
+/**
+ * Tests {@link PrioritizedMessageQueue}.
+ */
+public final class PrioritizedMessageQueueTest {
+
+	private static final int LANE_CAPACITY = 2;
+
+	private PrioritizedMessageQueue m_queue;
+
+	@Before
+	public void setup() {
+		m_queue = new PrioritizedMessageQueue(LANE_CAPACITY);
+	}
+
+	@Test
+	public void testLanesAreServedInOrderOfPriority() throws InterruptedException {
+		final Message bulk1 = createMessage(1, MessagePriority.BULK);
+		final Message normal1 = createMessage(2, MessagePriority.NORMAL);
+		final Message bulk2 = createMessage(3, MessagePriority.BULK);
+		final Message control = createMessage(4, MessagePriority.CONTROL);
+		final Message normal2 = createMessage(5, MessagePriority.NORMAL);
+		for (final Message message : Arrays.asList(bulk1, normal1, bulk2, control, normal2)) {
+			m_queue.put(message);
+		}
+		Assert.assertEquals(5, m_queue.size());
+		Assert.assertSame(control, m_queue.peek());
+		// FIFO within each lane.
+		final List<Message> expected = Arrays.asList(control, normal1, normal2, bulk1, bulk2);
+		Assert.assertEquals(expected, new ArrayList<>(m_queue));
+		final List<Message> taken = new ArrayList<>();
+		while (!m_queue.isEmpty()) {
+			taken.add(m_queue.take());
+		}
+		Assert.assertEquals(expected, taken);
+	}
+
+	@Test
+	public void testCapacityBoundsEachLaneSeparately() {
+		Assert.assertTrue(m_queue.offer(createMessage(1, MessagePriority.BULK)));
+		Assert.assertTrue(m_queue.offer(createMessage(2, MessagePriority.BULK)));
+		Assert.assertFalse(m_queue.offer(createMessage(3, MessagePriority.BULK)));
+		// Control messages can still be enqueued while the bulk lane is full.
+		Assert.assertTrue(m_queue.offer(createMessage(4, MessagePriority.CONTROL)));
+		Assert.assertEquals(3 * LANE_CAPACITY - 3, m_queue.remainingCapacity());
+	}
+
+	@Test
+	public void testPutWaitsForSpaceInItsLane() throws InterruptedException {
+		m_queue.put(createMessage(1, MessagePriority.BULK));
+		m_queue.put(createMessage(2, MessagePriority.BULK));
+		final Message blocked = createMessage(3, MessagePriority.BULK);
+		final CountDownLatch enqueued = new CountDownLatch(1);
+		final Thread producer = new Thread(() -> {
+			try {
+				m_queue.put(blocked);
+				enqueued.countDown();
+			} catch (final InterruptedException ex) {
+				Thread.currentThread().interrupt();
+			}
+		});
+		producer.start();
+		Assert.assertFalse(enqueued.await(100, TimeUnit.MILLISECONDS));
+		Assert.assertEquals(1, m_queue.take().getId());
+		Assert.assertTrue(enqueued.await(5, TimeUnit.SECONDS));
+		producer.join();
+		Assert.assertEquals(2, m_queue.take().getId());
+		Assert.assertSame(blocked, m_queue.take());
+	}
+
+	@Test
+	public void testOfferWithTimeoutFailsOnFullLane() throws InterruptedException {
+		m_queue.put(createMessage(1, MessagePriority.NORMAL));
+		m_queue.put(createMessage(2, MessagePriority.NORMAL));
+		Assert.assertFalse(m_queue.offer(createMessage(3, MessagePriority.NORMAL), 10, TimeUnit.MILLISECONDS));
+	}
+
+	@Test
+	public void testPollOnEmptyQueue() throws InterruptedException {
+		Assert.assertNull(m_queue.poll());
+		Assert.assertNull(m_queue.poll(10, TimeUnit.MILLISECONDS));
+		Assert.assertNull(m_queue.peek());
+	}
+
+	@Test
+	public void testDrainToRespectsPriorityAndLimit() throws InterruptedException {
+		final Message normal = createMessage(1, MessagePriority.NORMAL);
+		final Message bulk = createMessage(2, MessagePriority.BULK);
+		final Message control = createMessage(3, MessagePriority.CONTROL);
+		m_queue.put(normal);
+		m_queue.put(bulk);
+		m_queue.put(control);
+		final List<Message> drained = new ArrayList<>();
+		Assert.assertEquals(2, m_queue.drainTo(drained, 2));
+		Assert.assertEquals(Arrays.asList(control, normal), drained);
+		Assert.assertEquals(1, m_queue.drainTo(drained));
+		Assert.assertSame(bulk, drained.get(2));
+		Assert.assertTrue(m_queue.isEmpty());
+	}
+
+	@Test
+	public void testClearFreesAllLanes() throws InterruptedException {
+		m_queue.put(createMessage(1, MessagePriority.BULK));
+		m_queue.put(createMessage(2, MessagePriority.BULK));
+		m_queue.clear();
+		Assert.assertEquals(0, m_queue.size());
+		Assert.assertTrue(m_queue.offer(createMessage(3, MessagePriority.BULK)));
+	}
+
+	private static Message createMessage(final int id, final MessagePriority priority) {
+		return new DefaultMessage(id, "test", null,
+			Collections.singletonMap(MessagePriority.HEADER_FIELD_KEY, priority.getId()));
+	}
+}
@@ -0,0 +1,137 @@
+/*
+ * ------------------------------------------------------------------------
+ *
+ *  Copyright by KNIME AG, Zurich, Switzerland
+ *  Website: http://www.knime.com; Email: contact@knime.com
+ *
+ *  This program is free software; you can redistribute it and/or modify
+ *  it under the terms of the GNU General Public License, Version 3, as
+ *  published by the Free Software Foundation.
+ *
+ *  This program is distributed in the hope that it will be useful, but
+ *  WITHOUT ANY WARRANTY; without even the implied warranty of
+ *  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+ *  GNU General Public License for more details.
+ *
+ *  You should have received a copy of the GNU General Public License
+ *  along with this program; if not, see <http://www.gnu.org/licenses>.
+ *
+ *  Additional permission under GNU GPL version 3 section 7:
+ *
+ *  KNIME interoperates with ECLIPSE solely via ECLIPSE's plug-in APIs.
+ *  Hence, KNIME and ECLIPSE are both independent programs and are not
+ *  derived from each other. Should, however, the interpretation of the
+ *  GNU GPL Version 3 ("License") under any applicable laws result in
+ *  KNIME and ECLIPSE being a combined program, KNIME AG herewith grants
+ *  you the additional permission to use and propagate KNIME together with
+ *  ECLIPSE with only the license terms in place for ECLIPSE applying to
+ *  ECLIPSE and the GNU GPL Version 3 applying for KNIME, provided the
+ *  license terms of ECLIPSE themselves allow for the respective use and
+ *  propagation of ECLIPSE together with KNIME.
+ *
+ *  Additional permission relating to nodes for KNIME that extend the Node
+ *  Extension (and in particular that are based on subclasses of NodeModel,
+ *  NodeDialog, and NodeView) and that only interoperate with KNIME through
+ *  standard APIs ("Nodes"):
+ *  Nodes are deemed to be separate and independent programs and to not be
+ *  covered works.  Notwithstanding anything to the contrary in the
+ *  License, the License does not apply to Nodes, you are not required to
+ *  license Nodes under the License, and you are granted a license to
+ *  prepare and propagate Nodes, in each case even if such Nodes are
+ *  propagated with or for interoperation with KNIME.  The owner of a Node
+ *  may freely choose the license terms applicable to such Node, including
+ *  when such Node is propagated with or for interoperation with KNIME.
+ * ---------------------------------------------------------------------
+ *
+ */
+package org.knime.python2.kernel.messaging;
+
+import java.io.IOException;
+import java.nio.file.Files;
+import java.nio.file.Path;
+import java.nio.file.Paths;
+import java.util.stream.Stream;
+
+import org.apache.commons.io.FileUtils;
+import org.junit.After;
+import org.junit.Assert;
+import org.junit.Before;
+import org.junit.Test;
+
+/**
+ * Tests {@link SharedMemorySegments}.
+ */
+public final class SharedMemorySegmentsTest {
+
+	private Path m_baseDirectory;
+
+	private SharedMemorySegments m_segments;
+
+	@Before
+	public void setup() throws IOException {
+		m_baseDirectory = Files.createTempDirectory("shared-memory-segments-test");
+		m_segments = new SharedMemorySegments(m_baseDirectory, 1024);
+	}
+
+	@After
+	public void cleanup() {
+		m_segments.close();
+		FileUtils.deleteQuietly(m_baseDirectory.toFile());
+	}
+
+	@Test
+	public void testShouldOffloadPayloadsFromThreshold() {
+		Assert.assertFalse(m_segments.shouldOffload(1023));
+		Assert.assertTrue(m_segments.shouldOffload(1024));
+	}
+
+	@Test
+	public void testWrittenSegmentIsReadAndReleased() throws IOException {
+		final byte[] payload = createPayload(4096);
+		final String segment = m_segments.write(payload);
+		Assert.assertTrue(Paths.get(segment).startsWith(m_baseDirectory));
+		Assert.assertEquals(1, countSegments());
+		Assert.assertArrayEquals(payload, SharedMemorySegments.readAndRelease(segment));
+		// Reading acknowledges the segment.
+		Assert.assertEquals(0, countSegments());
+	}
+
+	@Test
+	public void testSegmentsHaveDistinctPaths() throws IOException {
+		final String first = m_segments.write(new byte[]{1});
+		final String second = m_segments.write(new byte[]{2});
+		Assert.assertNotEquals(first, second);
+		Assert.assertArrayEquals(new byte[]{1}, SharedMemorySegments.readAndRelease(first));
+		Assert.assertArrayEquals(new byte[]{2}, SharedMemorySegments.readAndRelease(second));
+	}
+
+	@Test
+	public void testCloseRemovesUnacknowledgedSegments() throws IOException {
+		m_segments.write(createPayload(2048));
+		m_segments.write(createPayload(2048));
+		Assert.assertEquals(2, countSegments());
+		m_segments.close();
+		try (Stream<Path> files = Files.list(m_baseDirectory)) {
+			Assert.assertEquals(0, files.count());
+		}
+	}
+
+	@Test(expected = IOException.class)
+	public void testReadingMissingSegmentFails() throws IOException {
+		SharedMemorySegments.readAndRelease(m_baseDirectory.resolve("missing").toString());
+	}
+
+	private long countSegments() throws IOException {
+		try (Stream<Path> files = Files.walk(m_baseDirectory)) {
+			return files.filter(Files::isRegularFile).count();
+		}
+	}
+
+	private static byte[] createPayload(final int size) {
+		final byte[] payload = new byte[size];
+		for (int i = 0; i < size; i++) {
+			payload[i] = (byte)i;
+		}
+		return payload;
+	}
+}
@@ -0,0 +1,224 @@
+# -*- coding: utf-8 -*-
+# ------------------------------------------------------------------------
+#  Copyright by KNIME AG, Zurich, Switzerland
+#  Website: http://www.knime.com; Email: contact@knime.com
+#
+#  This program is free software; you can redistribute it and/or modify
+#  it under the terms of the GNU General Public License, Version 3, as
+#  published by the Free Software Foundation.
+#
+#  This program is distributed in the hope that it will be useful, but
+#  WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with this program; if not, see <http://www.gnu.org/licenses>.
+#
+#  Additional permission under GNU GPL version 3 section 7:
+#
+#  KNIME interoperates with ECLIPSE solely via ECLIPSE's plug-in APIs.
+#  Hence, KNIME and ECLIPSE are both independent programs and are not
+#  derived from each other. Should, however, the interpretation of the
+#  GNU GPL Version 3 ("License") under any applicable laws result in
+#  KNIME and ECLIPSE being a combined program, KNIME AG herewith grants
+#  you the additional permission to use and propagate KNIME together with
+#  ECLIPSE with only the license terms in place for ECLIPSE applying to
+#  ECLIPSE and the GNU GPL Version 3 applying for KNIME, provided the
+#  license terms of ECLIPSE themselves allow for the respective use and
+#  propagation of ECLIPSE together with KNIME.
+#
+#  Additional permission relating to nodes for KNIME that extend the Node
+#  Extension (and in particular that are based on subclasses of NodeModel,
+#  NodeDialog, and NodeView) and that only interoperate with KNIME through
+#  standard APIs ("Nodes"):
+#  Nodes are deemed to be separate and independent programs and to not be
+#  covered works.  Notwithstanding anything to the contrary in the
+#  License, the License does not apply to Nodes, you are not required to
+#  license Nodes under the License, and you are granted a license to
+#  prepare and propagate Nodes, in each case even if such Nodes are
+#  propagated with or for interoperation with KNIME.  The owner of a Node
+#  may freely choose the license terms applicable to such Node, including
+#  when such Node is propagated with or for interoperation with KNIME.
+# ------------------------------------------------------------------------
+
+import collections
+import ctypes
+import threading
+from contextlib import contextmanager
+
+import EnvironmentHelper
+
+# Thread ids are unsigned in Python 3 but signed in Python 2.
+_c_thread_id = ctypes.c_ulong if EnvironmentHelper.is_python3() else ctypes.c_long
+
+_current = threading.local()
+
+
+class TaskCancelledError(BaseException):
+    """
+    Raised by a task that Java cancelled. Like KeyboardInterrupt, this is no Exception, so executed user code that
+    catches Exception does not swallow it.
+    """
+
+    def __init__(self, message="The task was cancelled."):
+        super(TaskCancelledError, self).__init__(message)
+
+
+class CancellationToken(object):
+    """
+    Signals the cancellation of a task to the code that runs it. Long running code checks the token of its thread
+    periodically (see check_cancelled) and stops by raising TaskCancelledError. Raising unwinds the task, which drops
+    the references to its partial results.
+    Executed user code cannot check the token itself and is run via run_interruptibly instead, in which case the error
+    is raised asynchronously into its thread. Such an error may be raised at any point of the running code, including
+    cleanup code in finally clauses and with blocks of the libraries it calls, which may then leave their state (e.g.
+    locks or temporary files) behind. Therefore, only executed user code is run interruptibly. All other code must
+    rely on check_cancelled, and must not be called from interruptible code if it cannot cope with being interrupted.
+    The error is raised at most once per token.
+    """
+
+    def __init__(self):
+        self._is_cancelled = False
+        self._lock = threading.Lock()
+        # Id of the thread that runs interruptible code, None if there is no such code running.
+        self._interruptible_thread_id = None
+        self._cancel_callbacks = []
+
+    @property
+    def is_cancelled(self):
+        return self._is_cancelled
+
+    def cancel(self):
+        with self._lock:
+            if self._is_cancelled:
+                return
+            self._is_cancelled = True
+            if self._interruptible_thread_id is not None:
+                _set_async_exception(self._interruptible_thread_id, TaskCancelledError)
+            callbacks = self._cancel_callbacks
+            self._cancel_callbacks = None
+        for callback in callbacks:
+            callback()
+
+    def add_cancel_callback(self, callback):
+        """
+        Calls the given function once the token is cancelled, or right away if it already is. Allows releasing
+        resources that only the cancelled task would have used. Callbacks are called without arguments in the thread
+        that cancels the token and must not raise.
+        """
+        with self._lock:
+            if not self._is_cancelled:
+                self._cancel_callbacks.append(callback)
+                return
+        callback()
+
+    def check(self):
+        """
+        Raises TaskCancelledError if the token was cancelled.
+        """
+        if self._is_cancelled:
+            raise TaskCancelledError()
+
+    @contextmanager
+    def applied(self):
+        """
+        Makes this token the one that is checked by check_cancelled in the current thread while in the with block.
+        """
+        previous = getattr(_current, 'token', None)
+        _current.token = self
+        try:
+            yield self
+        finally:
+            _current.token = previous
+
+    def run_interruptibly(self, function):
+        """
+        Calls the given function, which executes user code, in the current thread and returns its result. If the token
+        is cancelled meanwhile, TaskCancelledError is raised asynchronously into the thread as soon as it executes
+        Python bytecode again, that is, not while it is blocked in native code. Callers must treat the error as being
+        raised by this method, it may still be raised shortly before or after the function runs.
+        """
+        thread_id = threading.current_thread().ident
+        with self._lock:
+            self.check()
+            self._interruptible_thread_id = thread_id
+        try:
+            return function()
+        finally:
+            with self._lock:
+                self._interruptible_thread_id = None
+                if self._is_cancelled:
+                    # Do not raise outside of this method if the error has not been raised yet.
+                    _set_async_exception(thread_id, None)
+
+
+class CancellationTokens(object):
+    """
+    The cancellation tokens of the running tasks, keyed by the id of the message that initiated the respective task.
+    Tasks that are cancelled before they acquire their token (e.g. because they are still queued) start with a
+    cancelled token.
+    """
+
+    # Number of cancellations of unknown tasks that are remembered. Bounds the memory held by cancellations of tasks
+    # that already completed.
+    _MAX_PENDING_CANCELLATIONS = 64
+
+    def __init__(self):
+        self._tokens = {}
+        self._pending_cancellations = collections.OrderedDict()
+        self._lock = threading.Lock()
+
+    def acquire(self, task_id):
+        """
+        Returns a new token for the task with the given id. The token must be released once the task is done.
+        """
+        key = str(task_id)
+        token = CancellationToken()
+        with self._lock:
+            if self._pending_cancellations.pop(key, None) is not None:
+                token.cancel()
+            self._tokens[key] = token
+        return token
+
+    def release(self, task_id):
+        with self._lock:
+            self._tokens.pop(str(task_id), None)
+
+    def cancel(self, task_id):
+        key = str(task_id)
+        with self._lock:
+            token = self._tokens.get(key)
+            if token is None:
+                self._pending_cancellations[key] = True
+                while len(self._pending_cancellations) > CancellationTokens._MAX_PENDING_CANCELLATIONS:
+                    self._pending_cancellations.popitem(last=False)
+        if token is not None:
+            token.cancel()
+
+
+def current_token():
+    """
+    Returns the cancellation token of the task that runs in the current thread, None if there is none.
+    """
+    return getattr(_current, 'token', None)
+
+
+def check_cancelled():
+    """
+    Raises TaskCancelledError if the task that runs in the current thread was cancelled.
+    """
+    token = getattr(_current, 'token', None)
+    if token is not None and token._is_cancelled:
+        raise TaskCancelledError()
+
+
+def _set_async_exception(thread_id, exception_type):
+    """
+    Raises the given exception type in the thread with the given id, or clears a pending asynchronous exception of that
+    thread if the type is None.
+    """
+    if hasattr(ctypes, 'pythonapi'):
+        ctypes.pythonapi.PyThreadState_SetAsyncExc(_c_thread_id(thread_id),
+                                                   ctypes.py_object(exception_type)
+                                                   if exception_type is not None else None)
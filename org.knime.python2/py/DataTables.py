@@ -52,6 +52,9 @@
 import numpy
 from pandas import DataFrame
 from pandas import Index
+from pandas import MultiIndex
+from pandas import RangeIndex
+from pandas.api.types import is_string_dtype
 
 from PythonUtils import Simpletype
 
@@ -69,17 +72,17 @@ class FromPandasTable:
     # @param start_row_number  the corresponding row number to the first row of the
     #                          dataframe. Differs from 0 as soon as a table chunk is
     #                          sent.
-    def __init__(self, data_frame, serializer, start_row_number=0):
+    # @param schema            the TableSchema of the dataframe. Inferred from the
+    #                          dataframe if None. Chunks of a table should share the
+    #                          schema inferred from the entire table.
+    def __init__(self, data_frame, serializer, start_row_number=0, schema=None):
         # Shallow copy because we modify columns (see below) and index (see standardize_default_indices(..)).
         self._data_frame = data_frame.copy(deep=False)
         self._data_frame.columns = self._data_frame.columns.astype(str)
-        self._column_types = []
-        self._column_serializers = {}
-        for i, column in enumerate(self._data_frame.columns):
-            column_type, serializer_id = serializer.simpletype_for_column(self._data_frame, column)
-            self._column_types.append(column_type)
-            if serializer_id is not None:
-                self._column_serializers[column] = serializer_id
+        if schema is None:
+            schema = serializer.table_schema_for_data_frame(self._data_frame)
+        self._column_types = schema.column_types
+        self._column_serializers = schema.column_serializers
         serializer.serialize_objects_to_bytes(self._data_frame, self._column_serializers)
         self.standardize_default_indices(start_row_number)
         self._row_indices = self._data_frame.index.astype(str)
@@ -91,14 +94,53 @@ class FromPandasTable:
     #                          dataframe. Differs from 0 as soon as a table chunk is
     #                          sent.
     def standardize_default_indices(self, start_row_number):
-        row_indices = []
-        for i in range(len(self._data_frame.index)):
-            if type(self._data_frame.index[i]) == int and self._data_frame.index[i] == i + start_row_number:
-                row_indices.append(u'Row' + str(i + start_row_number))
-            else:
-                row_indices.append(str(self._data_frame.index[i]))
+        index = self._data_frame.index
+        num_rows = len(index)
+        if isinstance(index, RangeIndex) and (num_rows == 0 or index[0] == start_row_number) \
+                and (num_rows < 2 or index[1] - index[0] == 1):
+            # The default index of the (chunk of the) dataframe, all indices are replaced.
+            row_indices = [u'Row' + str(row_number)
+                           for row_number in range(start_row_number, start_row_number + num_rows)]
+        else:
+            labels, label_strings, is_int = FromPandasTable._get_index_labels(index)
+            row_indices = numpy.empty(num_rows, dtype=object)
+            row_indices[:] = label_strings
+            row_numbers = numpy.arange(start_row_number, start_row_number + num_rows)
+            candidates = numpy.flatnonzero(is_int)
+            if len(candidates) > 0:
+                is_default = numpy.asarray(labels, dtype=object)[candidates] == row_numbers[candidates]
+                default_row_numbers = row_numbers[candidates[is_default.astype(bool)]]
+                row_indices[default_row_numbers - start_row_number] = [u'Row' + str(row_number)
+                                                                       for row_number in default_row_numbers]
         self._data_frame.set_index(keys=Index(row_indices), drop=True, inplace=True)
 
+    # Get the labels of the provided index as index[i] returns them, their string
+    # representations, and whether they are of type int. Iterating an index may box
+    # its labels differently (e.g. as Python scalars instead of numpy scalars).
+    # @param index  a pandas Index
+    # @return a tuple of the labels, the list or numpy array of their string
+    #         representations and a numpy bool array that is True for labels of type int
+    @staticmethod
+    def _get_index_labels(index):
+        num_rows = len(index)
+        has_numpy_dtype = isinstance(index.dtype, numpy.dtype) and not isinstance(index, MultiIndex)
+        if has_numpy_dtype and index.dtype.kind in 'biufc':
+            # All labels are numpy scalars of the index's dtype (or ints for a RangeIndex).
+            labels = index.values
+            is_int = isinstance(index, RangeIndex) or (num_rows > 0 and type(index[0]) == int)
+            return labels, labels.astype(str), numpy.full(num_rows, is_int, dtype=bool)
+        elif has_numpy_dtype and index.dtype.kind == 'O':
+            labels = index.values
+        elif not has_numpy_dtype and not isinstance(index, MultiIndex) and is_string_dtype(index.dtype):
+            # Only strings and missing values.
+            labels = list(index)
+        else:
+            # E.g. datetimes, categories or tuples of a MultiIndex, which index[i] boxes differently than index.values.
+            labels = [index[i] for i in range(num_rows)]
+        label_strings = [str(label) for label in labels]
+        is_int = numpy.fromiter((type(label) == int for label in labels), dtype=bool, count=num_rows)
+        return labels, label_strings, is_int
+
     # Get the type of the column at the provided index in the internal data_frame.
     # example: table.get_type(0)
     # @param column_index    numeric column index
@@ -137,7 +179,7 @@ class FromPandasTable:
         return self._row_indices[row_index]
 
     def get_rowkeys(self):
-        return self._data_frame.index.astype(str)
+        return self._row_indices
 
     def get_number_columns(self):
         return len(self._data_frame.columns)
@@ -153,6 +195,25 @@ class FromPandasTable:
         return self._column_serializers
 
 
+# The column types and serializers of a table that is sent to Java.
+class TableSchema:
+    # Constructor.
+    # @param column_types        list containing the Simpletype of each column
+    # @param column_serializers  dict containing the names of the columns that have an
+    #                            extension type as keys and serializer_ids as values
+    def __init__(self, column_types, column_serializers):
+        self._column_types = column_types
+        self._column_serializers = column_serializers
+
+    @property
+    def column_types(self):
+        return self._column_types
+
+    @property
+    def column_serializers(self):
+        return self._column_serializers
+
+
 # Wrapper class for data that should be deserialized using the serialization library.
 # Manages the deserialization of bytes to extension type objects after the
 # registered serialization library has been used for deserializing primitive types.
@@ -0,0 +1,158 @@
+# -*- coding: utf-8 -*-
+# ------------------------------------------------------------------------
+#  Copyright by KNIME AG, Zurich, Switzerland
+#  Website: http://www.knime.com; Email: contact@knime.com
+#
+#  This program is free software; you can redistribute it and/or modify
+#  it under the terms of the GNU General Public License, Version 3, as
+#  published by the Free Software Foundation.
+#
+#  This program is distributed in the hope that it will be useful, but
+#  WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with this program; if not, see <http://www.gnu.org/licenses>.
+#
+#  Additional permission under GNU GPL version 3 section 7:
+#
+#  KNIME interoperates with ECLIPSE solely via ECLIPSE's plug-in APIs.
+#  Hence, KNIME and ECLIPSE are both independent programs and are not
+#  derived from each other. Should, however, the interpretation of the
+#  GNU GPL Version 3 ("License") under any applicable laws result in
+#  KNIME and ECLIPSE being a combined program, KNIME AG herewith grants
+#  you the additional permission to use and propagate KNIME together with
+#  ECLIPSE with only the license terms in place for ECLIPSE applying to
+#  ECLIPSE and the GNU GPL Version 3 applying for KNIME, provided the
+#  license terms of ECLIPSE themselves allow for the respective use and
+#  propagation of ECLIPSE together with KNIME.
+#
+#  Additional permission relating to nodes for KNIME that extend the Node
+#  Extension (and in particular that are based on subclasses of NodeModel,
+#  NodeDialog, and NodeView) and that only interoperate with KNIME through
+#  standard APIs ("Nodes"):
+#  Nodes are deemed to be separate and independent programs and to not be
+#  covered works.  Notwithstanding anything to the contrary in the
+#  License, the License does not apply to Nodes, you are not required to
+#  license Nodes under the License, and you are granted a license to
+#  prepare and propagate Nodes, in each case even if such Nodes are
+#  propagated with or for interoperation with KNIME.  The owner of a Node
+#  may freely choose the license terms applicable to such Node, including
+#  when such Node is propagated with or for interoperation with KNIME.
+# ------------------------------------------------------------------------
+
+import itertools
+
+from CancellationToken import check_cancelled
+from TypeExtensionManager import TypeExtensionManager
+
+try:
+    from concurrent.futures import TimeoutError as FutureTimeoutError
+except ImportError:
+    # Python 2 without the futures backport. Parallel conversion is not available then.
+    FutureTimeoutError = None
+
+# Interval in seconds in which cancellation is checked while waiting for the slices of a column to be converted.
+_CANCELLATION_CHECK_TIMEOUT = 0.1
+
+# Type extensions loaded by the worker processes, keyed by path.
+_process_extensions = {}
+
+
+class ParallelConversion(object):
+    """
+    Converts the values of large extension-typed columns (see Serializer) in parallel. The values are split into as many
+    slices as there are workers. Each slice is converted by the batch function of the type extension, or by its
+    per-value function if it has no batch function. Results are concatenated in the order of the slices.
+    Type extension modules opt in by declaring a module-level 'parallel_execution' attribute:
+    - THREADS: values are converted on a thread pool. Suited for codecs that release the GIL (e.g. image codecs).
+    - PROCESSES: values are converted on a process pool. The module is loaded again by the worker processes, so its
+      conversion must not depend on state of the kernel process. Values and results must be picklable, and pickling
+      them must be cheap compared to converting them. This does not hold for e.g. DOM trees, whose conversion is
+      several times slower in processes than sequentially.
+    Opting in should be backed by a benchmark of the extension's conversion with and without parallel execution.
+    Columns of other extensions, or with fewer values than the minimum column size, are converted sequentially.
+    """
+
+    THREADS = 'threads'
+    PROCESSES = 'processes'
+
+    def __init__(self, num_workers, thread_executor=None, process_executor=None, min_column_size=1000):
+        """
+        @param num_workers the number of workers of each executor, which is the number of slices per column
+        @param thread_executor the executor for THREADS extensions, None to convert their values sequentially
+        @param process_executor the process pool executor for PROCESSES extensions, None to convert their values
+                                sequentially
+        @param min_column_size the minimum number of values a column must have to be converted in parallel
+        """
+        self._num_workers = num_workers
+        self._thread_executor = thread_executor
+        self._process_executor = process_executor
+        self._min_column_size = min_column_size
+
+    def parallelize(self, extension, batch_function_name, function_name, convert_batch):
+        """
+        Returns a function that converts a list of values like convert_batch, but does so in parallel for large lists
+        if the given type extension declares that it can be run in parallel.
+        @param extension the type extension module
+        @param batch_function_name the name of the extension's batch function, e.g. 'serialize_batch'
+        @param function_name the name of the extension's per-value function, e.g. 'serialize'
+        @param convert_batch function that converts a list of values sequentially using the extension
+        """
+        parallel_execution = getattr(extension, 'parallel_execution', None)
+        if parallel_execution == ParallelConversion.THREADS and self._thread_executor is not None:
+            def submit_slice(values):
+                return self._thread_executor.submit(convert_batch, values)
+        elif parallel_execution == ParallelConversion.PROCESSES and self._process_executor is not None \
+                and getattr(extension, '__file__', None) is not None:
+            def submit_slice(values):
+                return self._process_executor.submit(_convert_in_process, extension.__file__, batch_function_name,
+                                                     function_name, values)
+        else:
+            return convert_batch
+
+        def convert_in_parallel(values):
+            if self._num_workers < 2 or len(values) < self._min_column_size:
+                return convert_batch(values)
+            slice_size = -(-len(values) // self._num_workers)
+            futures = [submit_slice(values[start:start + slice_size]) for start in range(0, len(values), slice_size)]
+            try:
+                return list(itertools.chain.from_iterable(ParallelConversion._wait_for_result(future)
+                                                          for future in futures))
+            except BaseException:
+                for future in futures:
+                    future.cancel()
+                raise
+
+        return convert_in_parallel
+
+    def shutdown(self):
+        if self._thread_executor is not None:
+            self._thread_executor.shutdown(wait=False)
+        if self._process_executor is not None:
+            self._process_executor.shutdown(wait=False)
+
+    @staticmethod
+    def _wait_for_result(future):
+        while True:
+            check_cancelled()
+            try:
+                return future.result(_CANCELLATION_CHECK_TIMEOUT)
+            except FutureTimeoutError:
+                pass
+
+
+def _convert_in_process(path, batch_function_name, function_name, values):
+    """
+    Converts the given values using the type extension at the given path. Runs in the worker processes.
+    """
+    extension = _process_extensions.get(path)
+    if extension is None:
+        extension = TypeExtensionManager.load_extension(path)
+        _process_extensions[path] = extension
+    convert_batch = getattr(extension, batch_function_name, None)
+    if convert_batch is not None:
+        return list(convert_batch(values))
+    convert = getattr(extension, function_name)
+    return [convert(value) for value in values]
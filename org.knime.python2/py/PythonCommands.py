@@ -71,15 +71,21 @@ class PythonCommands(object):
     def message_handlers(self):
         return self._messaging
 
+    @property
+    def messaging_statistics(self):
+        return self._messaging.statistics
+
     def create_task(self, task_handler, message, executor=None):
         return Task(message, task_handler, self._messaging, self._messaging, self._messaging.create_receive_queue(),
                     self._messaging.create_next_message_id,
-                    self._workspace, executor if executor is not None else self._workspace.executor)
+                    self._workspace, executor if executor is not None else self._workspace.executor,
+                    self._messaging.statistics)
 
     def create_task_factory(self, task_handler, executor=None):
         return TaskFactory(task_handler, self._messaging, self._messaging, self._messaging.create_receive_queue,
                            self._messaging.create_next_message_id,
-                           self._workspace, executor if executor is not None else self._workspace.executor)
+                           self._workspace, executor if executor is not None else self._workspace.executor,
+                           self._messaging.statistics)
 
     def request_serializer(self, type_or_id):
         payload = PayloadEncoder().put_string(type_or_id).payload
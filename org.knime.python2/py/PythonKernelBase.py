@@ -62,19 +62,29 @@ import abc
 import os
 import socket
 import sys
+import threading
 import traceback
 import warnings
 
+import pandas
+
 from debug_util import debug_msg
 
 from Borg import Borg
+from CancellationToken import CancellationTokens
+from CancellationToken import TaskCancelledError
+from CancellationToken import current_token
 from messaging import RequestHandlers
+from messaging.Message import PayloadDecoder
+from messaging.MessagingOptions import MessagingOptions
+from messaging.SharedMemorySegments import SharedMemorySegments
 from PythonCommands import PythonCommands
 from PythonUtils import Simpletype
 from PythonUtils import invoke_safely
 from PythonUtils import load_module_from_path
 from PythonUtils import object_to_string
 from Serializer import Serializer
+from TableChunkPrefetcher import TableChunkPrefetcher
 from TypeExtensionManager import TypeExtensionManager
 
 if EnvironmentHelper.is_jedi_available():
@@ -90,22 +100,43 @@ class PythonKernelBase(Borg):
         self._is_running = False
         self._is_closed = False
 
+        # Cache of the table chunks that Java is expected to request next. Populated in start() but already needed when
+        # initializing the workspace.
+        self._table_chunk_prefetcher = None
+
+        # Chunks of tables that Java appended to since the tables were last accessed, keyed by variable name. The chunks
+        # are concatenated only once on access, which keeps appending linear in the size of the table.
+        self._appended_table_chunks = {}
+        # Guards appending to, concatenating and replacing tables, which may be requested concurrently.
+        self._appended_table_chunks_lock = threading.RLock()
+
+        # Cancellation tokens of the requests that are currently handled.
+        self._cancellation_tokens = CancellationTokens()
+
         # Initialize workspace.
         self._exec_env = None
         self.reset()
 
         # These will be populated in start():
-        # TCP connection.
+        # Connection to Java (TCP or Unix domain socket).
         self._connection = None
+        # Second connection to Java for bulk data, None if disabled.
+        self._data_connection = None
+        # Messaging options passed by Java.
+        self._messaging_options = None
+        # Side channel for large payloads, None if disabled.
+        self._shared_memory = None
         # Executors.
         self._execute_thread_executor = None
         self._executor = None
+        self._prefetch_executor = None
         # Commands/messaging system.
         self._commands = None
         # Serialization library module.
         self._serialization_library = None
         self._type_extension_manager = None
         self._serializer = None
+        self._parallel_conversion = None
 
         self._cleanup_object_names = set()
 
@@ -127,7 +158,23 @@ class PythonKernelBase(Borg):
         raise NotImplementedError()
 
     @abc.abstractmethod
-    def _create_messaging(self, connection):
+    def _create_prefetch_executor(self):
+        """
+        Returns the executor on which table chunks that Java is going to request are serialized in advance, None if
+        chunks cannot be serialized in parallel to handling other requests.
+        """
+        raise NotImplementedError()
+
+    @abc.abstractmethod
+    def _create_parallel_conversion(self):
+        """
+        Returns the ParallelConversion used to (de)serialize large extension-typed columns in parallel, None if they
+        cannot be (de)serialized in parallel.
+        """
+        raise NotImplementedError()
+
+    @abc.abstractmethod
+    def _create_messaging(self, connection, data_connection):
         raise NotImplementedError()
 
     @property
@@ -146,6 +193,22 @@ class PythonKernelBase(Borg):
     def serializer(self):
         return self._serializer
 
+    @property
+    def table_chunk_prefetcher(self):
+        return self._table_chunk_prefetcher
+
+    @property
+    def cancellation_tokens(self):
+        return self._cancellation_tokens
+
+    @property
+    def messaging_statistics(self):
+        """
+        The MessagingStatistics of the messaging system, None if the kernel is not started or if recording them is
+        disabled (see MessagingOptions.statistics).
+        """
+        return self._commands.messaging_statistics if self._commands is not None else None
+
     def register_task_handler(self, task_category, handler, executor=None):
         return self._commands.message_handlers.register_message_handler(task_category,
                                                                         self._commands.create_task_factory(handler,
@@ -162,29 +225,40 @@ class PythonKernelBase(Borg):
 
     # Kernel commands:
 
+    def cancel_task(self, task_id):
+        """
+        Cancels the handling of the request with the given message id. Serialization stops at its next check of the
+        cancellation token and executed source code is interrupted. Chunks prefetched for the tables that the request
+        served are invalidated (see the cancel callbacks of CancellationToken).
+        """
+        self._cancellation_tokens.cancel(task_id)
+
     def put_variable(self, name, variable):
         """
         Put the given variable into the local environment under the given name.
         """
-        self._exec_env[name] = variable
+        self._invalidate_table_chunks(name)
+        with self._appended_table_chunks_lock:
+            self._appended_table_chunks.pop(name, None)
+            self._exec_env[name] = variable
 
     def get_variable(self, name):
         """
         Get the variable with the given name.
         """
-        if name in self._exec_env:
-            return self._exec_env[name]
-        else:
-            raise NameError(name + ' is not defined.')
+        with self._appended_table_chunks_lock:
+            self._concatenate_appended_table_chunks(name)
+            if name in self._exec_env:
+                return self._exec_env[name]
+        raise NameError(name + ' is not defined.')
 
     def get_variable_or_default(self, name, default):
         """
         Get the variable with the given name if available in the workspace or the default otherwise.
         """
-        if name in self._exec_env:
-            return self._exec_env[name]
-        else:
-            return default
+        with self._appended_table_chunks_lock:
+            self._concatenate_appended_table_chunks(name)
+            return self._exec_env.get(name, default)
 
     def list_variables(self):
         """
@@ -195,6 +269,7 @@ class PythonKernelBase(Borg):
         classes = []
         functions = []
         variables = []
+        self._concatenate_appended_table_chunks()
         # iterate over dictionary to and put modules, classes, functions and variables in their respective lists
         for key, value in dict(self._exec_env).items():
             # get name of the type
@@ -228,12 +303,17 @@ class PythonKernelBase(Borg):
     def append_to_table(self, name, data_frame):
         """
         Append the given data frame to an existing one, if it does not exist put the data frame into the local
-        environment.
+        environment. Appended data frames are collected and only concatenated when the table is accessed next.
         """
-        if self._exec_env[name] is None:
-            self._exec_env[name] = data_frame
-        else:
-            self._exec_env[name] = self._exec_env[name].append(data_frame)
+        self._invalidate_table_chunks(name)
+        with self._appended_table_chunks_lock:
+            chunks = self._appended_table_chunks.get(name)
+            if chunks is not None:
+                chunks.append(data_frame)
+            elif self._exec_env[name] is None:
+                self._exec_env[name] = data_frame
+            else:
+                self._appended_table_chunks[name] = [self._exec_env[name], data_frame]
 
     @staticmethod
     def has_auto_complete():
@@ -273,10 +353,22 @@ class PythonKernelBase(Borg):
         # FIXME: This is dangerous!
         self._exec_env['python_messaging_initiating_message_id'] = initiating_message_id
 
+        # The executed code may access all variables and modify tables in place.
+        self._concatenate_appended_table_chunks()
+        self._invalidate_table_chunks()
+
+        def execute_source_code():
+            exec(source_code, self._exec_env, self._exec_env)
+
         # run execute with the provided source code
+        token = current_token()
         try:
-            exec(source_code, self._exec_env, self._exec_env)
-        except Exception:
+            if token is not None:
+                # Only the executed user code may be interrupted, everything else checks the token cooperatively.
+                token.run_interruptibly(execute_source_code)
+            else:
+                execute_source_code()
+        except (Exception, TaskCancelledError):
             # Print failing source code to simplify debugging.
             debug_msg("Source code that caused failure:\n" + source_code)
             backup_std_error = sys.stderr
@@ -292,7 +384,10 @@ class PythonKernelBase(Borg):
         """
         Reset the current workspace.
         """
-        self._exec_env = {"workspace": self}
+        self._invalidate_table_chunks()
+        with self._appended_table_chunks_lock:
+            self._appended_table_chunks = {}
+            self._exec_env = {"workspace": self}
         try:
             import knime_jupyter
             knime_jupyter.__implementation__._resolve_knime_url = (
@@ -309,19 +404,35 @@ class PythonKernelBase(Borg):
                 raise RuntimeError('Python kernel is closed and cannot be restarted.')
             self._is_running = True
             debug_msg("Connect.")
-            self._connection = self._connect(('localhost', int(sys.argv[1])))
+            self._connection = self._connect(sys.argv[1])
+            self._messaging_options = MessagingOptions.from_arguments(sys.argv[3:])
+            if self._messaging_options.data_channel:
+                # Java accepts the data connection right after the control connection.
+                self._data_connection = self._connect(sys.argv[1])
+                buffer_size = self._messaging_options.data_channel_buffer_size
+                if buffer_size > 0:
+                    self._data_connection.setsockopt(socket.SOL_SOCKET, socket.SO_SNDBUF, buffer_size)
+                    self._data_connection.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, buffer_size)
+            self._shared_memory = SharedMemorySegments.create(self._messaging_options)
             debug_msg("Create executors.")
             self._execute_thread_executor = self._create_execute_thread_executor()
             self._executor = self._create_executor()
             debug_msg("Create Python commands.")
-            self._commands = PythonCommands(self._create_messaging(self._connection), self)
+            self._commands = PythonCommands(self._create_messaging(self._connection, self._data_connection), self)
             self._setup_builtin_request_handlers()
             debug_msg("Load serialization library.")
             self._serialization_library = self._load_serialization_library(sys.argv[2])
             debug_msg("Create type extension manager.")
             self._type_extension_manager = TypeExtensionManager(self._commands)
             debug_msg("Create serialization helper.")
-            self._serializer = Serializer(self._serialization_library, self._type_extension_manager)
+            self._parallel_conversion = self._create_parallel_conversion()
+            self._serializer = Serializer(self._serialization_library, self._type_extension_manager,
+                                          self._parallel_conversion)
+            self._prefetch_executor = self._create_prefetch_executor()
+            self._table_chunk_prefetcher = TableChunkPrefetcher(
+                self._serialize_table_chunk, self._prefetch_executor,
+                infer_schema=self._serializer.table_schema_for_data_frame,
+                discard_chunk=self._serializer.discard_bytes)
             # Start commands/messaging system once everything is set up.
             debug_msg("Start Python commands.")
             self._commands.start()
@@ -334,22 +445,64 @@ class PythonKernelBase(Borg):
             invoke_safely(None, lambda s: s._cleanup(), self)
             invoke_safely(None, lambda e: e.shutdown(wait=False), self._executor)
             invoke_safely(None, lambda e: e.shutdown(wait=False), self._execute_thread_executor)
+            if self._prefetch_executor is not None:
+                invoke_safely(None, lambda k: k._invalidate_table_chunks(), self)
+                invoke_safely(None, lambda e: e.shutdown(wait=False), self._prefetch_executor)
+            if self._parallel_conversion is not None:
+                invoke_safely(None, lambda p: p.shutdown(), self._parallel_conversion)
             invoke_safely(None, lambda c: c.close(), self._commands)
             invoke_safely(None, lambda c: c.shutdown(socket.SHUT_RDWR), self._connection)
             invoke_safely(None, lambda c: c.close(), self._connection)
+            if self._data_connection is not None:
+                invoke_safely(None, lambda c: c.shutdown(socket.SHUT_RDWR), self._data_connection)
+                invoke_safely(None, lambda c: c.close(), self._data_connection)
+            invoke_safely(None, lambda s: s.close(), self._shared_memory)
 
     # Helper:
 
     @staticmethod
-    def _connect(parameters):
-        connection = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
-        connection.connect(parameters)
+    def _connect(address):
+        """
+        Connects to Java. The given address is either the port of a TCP socket on localhost or the file system path of
+        a Unix domain socket.
+        """
+        if address.isdigit():
+            connection = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+            connection.connect(('localhost', int(address)))
+        elif hasattr(socket, 'AF_UNIX'):
+            connection = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            connection.connect(address)
+        else:
+            raise RuntimeError("Unix domain sockets are not supported on this platform. Cannot connect to '"
+                               + address + "'.")
         return connection
 
+    def _serialize_table_chunk(self, data_frame, start, end, schema):
+        return self._serializer.data_frame_to_bytes(data_frame[start:end + 1], start, schema)
+
+    def _concatenate_appended_table_chunks(self, name=None):
+        """
+        Replaces the given table, or all tables if name is None, by the concatenation of the chunks appended to it.
+        """
+        with self._appended_table_chunks_lock:
+            names = [name] if name is not None else list(self._appended_table_chunks.keys())
+            for name in names:
+                chunks = self._appended_table_chunks.get(name)
+                if chunks is not None:
+                    self._exec_env[name] = pandas.concat(chunks)
+                    # Only drop the chunks once the concatenated table is stored.
+                    del self._appended_table_chunks[name]
+
+    def _invalidate_table_chunks(self, name=None):
+        if self._table_chunk_prefetcher is not None:
+            self._table_chunk_prefetcher.invalidate(name)
+
     def _setup_builtin_request_handlers(self):
         request_handlers = RequestHandlers.get_builtin_request_handlers()
         for message_category, handler in request_handlers.items():
             self.register_task_handler(message_category, handler)
+        # Cancellations are handled right away by the messaging system instead of being queued behind other requests.
+        self._commands.message_handlers.register_message_handler('cancel', PythonKernelBase._CancelMessageHandler(self))
 
     @staticmethod
     def _load_serialization_library(serializer_path):
@@ -376,6 +529,20 @@ class PythonKernelBase(Borg):
     def _cleanup_object(self, obj, obj_name):
         obj._cleanup()
 
+    class _CancelMessageHandler(object):
+        """
+        Handles messages of category 'cancel', whose payload is the id of the request to cancel. Does not respond.
+        """
+
+        def __init__(self, kernel):
+            self._kernel = kernel
+
+        def handle(self, message):
+            # Ignore the poison pill that is sent to all handlers on shutdown.
+            if message.payload is not None:
+                self._kernel.cancel_task(PayloadDecoder(message.payload).get_next_int())
+            return True
+
     # Logging:
 
     class _Logger(object):
@@ -49,11 +49,16 @@
 @author Christian Dietz, KNIME GmbH, Konstanz, Germany
 """
 
+import itertools
+
 import numpy
 from pandas import DataFrame
+from pandas import Series
 
 import debug_util
+from CancellationToken import check_cancelled
 from DataTables import FromPandasTable
+from DataTables import TableSchema
 from DataTables import ToPandasTable
 from PythonUtils import Simpletype
 from PythonUtils import get_type_string
@@ -73,11 +78,28 @@ _INT_64_MIN = -9223372036854775808
 # See https://github.com/numpy/numpy/issues/5746.
 _INT_64_MAX = numpy.uint64(9223372036854775807)
 
+# Number of leading cells of a column that are checked one after the other when inferring its type. The remaining cells
+# are verified based on their distinct types.
+_TYPE_SCAN_SAMPLE_SIZE = 1000
+
+_NONE_TYPE = type(None)
+
+# Number of cells that are converted by a type extension between two checks for cancellation.
+_CANCELLATION_CHECK_INTERVAL = 1000
+
 
 class Serializer(object):
-    def __init__(self, serialization_library, type_extension_manager):
+    def __init__(self, serialization_library, type_extension_manager, parallel_conversion=None):
+        """
+        @param serialization_library the serialization library used to (de)serialize tables
+        @param type_extension_manager the TypeExtensionManager that provides serializers and deserializers of
+                                      extension types
+        @param parallel_conversion the ParallelConversion used to (de)serialize large extension-typed columns in
+                                   parallel, None to always (de)serialize them sequentially
+        """
         self._serialization_library = serialization_library
         self._type_extension_manager = type_extension_manager
+        self._parallel_conversion = parallel_conversion
 
     def serialize_objects_to_bytes(self, data_frame, column_serializers):
         """
@@ -87,41 +109,20 @@ class Serializer(object):
                                   values.
                                   A serializer_id should be the id of the java extension point on which the serializer
                                   is registered. Each column identified by the dict keys is serialized using the
-                                  serializer provided by the TypeExtensionManager for the given serializer_id.
+                                  serializer provided by the TypeExtensionManager for the given serializer_id. All
+                                  cells of a column are serialized by a single call of the serializer's
+                                  serialize_batch(objects) method if it provides one, otherwise by calling its
+                                  serialize(object) method per cell.
         """
         for column in column_serializers:
+            check_cancelled()
             serializer = self._type_extension_manager.get_serializer_by_id(column_serializers[column])
-            col_idx = data_frame.columns.get_loc(column)
-            if data_frame[column].dtype != 'object':
-                data_frame[column] = data_frame[column].astype('object')
-            for i in range(len(data_frame)):
-                if debug_util.is_debug_enabled():
-                    lastp = -1
-                    if (i * 100 / len(data_frame)) % 5 == 0 and int(i * 100 / len(data_frame)) != lastp:
-                        debug_util.debug_msg(str(i * 100 / len(data_frame)) + ' percent done (serialize)')
-                        # lastp = int(i * 100/len(data_frame))
-                # Using bracket acessor is necessary here for ensuring that there are
-                # no unwanted type conversions
-                value = data_frame[column][data_frame.index[i]]
-                if value is not None:
-                    if isinstance(value, list):
-                        new_list = []
-                        for inner_value in value:
-                            if inner_value is None:
-                                new_list.append(None)
-                            else:
-                                new_list.append(serializer.serialize(inner_value))
-                        data_frame.iat[i, col_idx] = new_list
-                    elif isinstance(value, set):
-                        new_set = set()
-                        for inner_value in value:
-                            if inner_value is None:
-                                new_set.add(None)
-                            else:
-                                new_set.add(serializer.serialize(inner_value))
-                        data_frame.iat[i, col_idx] = new_set
-                    else:
-                        data_frame.iat[i, col_idx] = serializer.serialize(value)
+            serialize_batch = self._get_batch_function(serializer, 'serialize_batch', 'serialize')
+            cells = data_frame[column].astype('object').values
+            converted_cells = Serializer._convert_cells(cells, serialize_batch, Serializer._is_none)
+            Serializer._set_object_column(data_frame, column, converted_cells)
+            if debug_util.is_debug_enabled():
+                debug_util.debug_msg('Serialized ' + str(len(cells)) + ' cells of column ' + str(column) + '.')
 
     def deserialize_from_bytes(self, data_frame, column_serializers):
         """
@@ -131,48 +132,22 @@ class Serializer(object):
                                   values. A deserializer_id should be the id of the java extension point on which the
                                   deserializer is registered. Each column identified by the dict keys is deserialized
                                   using the deserializer provided by the TypeExtensionManager for the given
-                                  deserializer_id.
+                                  deserializer_id. All cells of a column are deserialized by a single call of the
+                                  deserializer's deserialize_batch(bytes) method if it provides one, otherwise by
+                                  calling its deserialize(bytes) method per cell.
         """
-
-        # print('Data frame: ' + str(data_frame) + '\nserializers: ' + str(column_serializers) + '\n')
         for column in column_serializers:
+            check_cancelled()
             deserializer = self._type_extension_manager.get_deserializer_by_id(column_serializers[column])
-            for i in range(len(data_frame)):
-                if debug_util.is_debug_enabled():
-                    lastp = -1
-                    if (i * 100 / len(data_frame)) % 5 == 0 and int(i * 100 / len(data_frame)) != lastp:
-                        debug_util.debug_msg(str(i * 100 / len(data_frame)) + ' percent done (deserialize)')
-                        # lastp = int(i * 100/len(data_frame))
-                col_idx = data_frame.columns.get_loc(column)
-                # Using bracket accessor is necessary here for ensuring that there are no unwanted type conversions.
-                value = data_frame[column][data_frame.index[i]]
-                if isinstance(value, numpy.float64) and numpy.isnan(value):
-                    value = None
-                if value:
-                    if isinstance(value, list):
-                        new_list = []
-                        for inner_value in value:
-                            if isinstance(inner_value, numpy.float64) and numpy.isnan(inner_value):
-                                inner_value = None
-                            if inner_value:
-                                new_list.append(deserializer.deserialize(inner_value))
-                            else:
-                                new_list.append(None)
-                        data_frame.iat[i, col_idx] = new_list
-                    elif isinstance(value, set):
-                        new_set = set()
-                        for inner_value in value:
-                            if isinstance(inner_value, numpy.float64) and numpy.isnan(inner_value):
-                                inner_value = None
-                            if inner_value:
-                                new_set.add(deserializer.deserialize(inner_value))
-                            else:
-                                new_set.add(None)
-                        data_frame.iat[i, col_idx] = new_set
-                    else:
-                        data_frame.iat[i, col_idx] = deserializer.deserialize(value)
-                else:
-                    data_frame.iat[i, col_idx] = None
+            deserialize_batch = self._get_batch_function(deserializer, 'deserialize_batch', 'deserialize')
+            cells = data_frame[column].values
+            if cells.dtype != object:
+                # Only missing values (NaN), nothing to deserialize.
+                continue
+            converted_cells = Serializer._convert_cells(cells, deserialize_batch, Serializer._is_missing_bytes)
+            Serializer._set_object_column(data_frame, column, converted_cells)
+            if debug_util.is_debug_enabled():
+                debug_util.debug_msg('Deserialized ' + str(len(cells)) + ' cells of column ' + str(column) + '.')
 
     def bytes_to_data_frame(self, data_bytes):
         """
@@ -189,15 +164,17 @@ class Serializer(object):
         self._serialization_library.bytes_into_table(table, data_bytes)
         return table.get_data_frame()
 
-    def data_frame_to_bytes(self, data_frame, start_row_number=0):
+    def data_frame_to_bytes(self, data_frame, start_row_number=0, schema=None):
         """
         Converts data_frame into a byte array using the configured serialization library.
         For extension types appropriate serializers are requested from the type extension manager.
         @param data_frame a pandas DataFrame containing the table to serializeregisterCommandHand
         @param start_row_number the corresponding row number to the first row of the dataframe.
                                 Differs from 0 as soon as a table chunk is sent.
+        @param schema the TableSchema of data_frame (see table_schema_for_data_frame), inferred if None. When sending
+                      a table in chunks, pass the schema of the entire table to all chunks.
         """
-        table = FromPandasTable(data_frame, self, start_row_number)
+        table = FromPandasTable(data_frame, self, start_row_number, schema)
         # Uncomment to profile serialization time.
         # import cProfile
         # profilepath = os.path.join(os.path.expanduser('~'), 'profileres.txt')
@@ -207,6 +184,33 @@ class Serializer(object):
         data_bytes = self._serialization_library.table_to_bytes(table)
         return data_bytes
 
+    def discard_bytes(self, data_bytes):
+        """
+        Releases the resources held by bytes returned by data_frame_to_bytes that will not be sent to Java, e.g. the
+        temporary file they point to. Does nothing if the serialization library holds no such resources.
+        """
+        discard_bytes = getattr(self._serialization_library, 'discard_bytes', None)
+        if discard_bytes is not None:
+            discard_bytes(data_bytes)
+
+    def table_schema_for_data_frame(self, data_frame):
+        """
+        Infers the Simpletype and serializer_id (if any) of each column of the passed data frame.
+        @param data_frame a pandas DataFrame
+        @return a TableSchema whose serializer_ids are keyed by the string representations of the column names
+        """
+        # Shallow copy because the column names are converted to strings, as is done when serializing the data frame.
+        data_frame = data_frame.copy(deep=False)
+        data_frame.columns = data_frame.columns.astype(str)
+        column_types = []
+        column_serializers = {}
+        for column in data_frame.columns:
+            column_type, serializer_id = self.simpletype_for_column(data_frame, column)
+            column_types.append(column_type)
+            if serializer_id is not None:
+                column_serializers[column] = serializer_id
+        return TableSchema(column_types, column_serializers)
+
     def fill_flow_variables_from_data_frame(self, flow_variables, data_frame):
         """
         Fill the flow variable dict using a pandas DataFrame. The DataFrame is expected to contain only a single row.
@@ -247,6 +251,8 @@ class Serializer(object):
         @param column_name the name of the column in data_frame to evaluate
         @return tuple containing the {@link SimpleType} and the serializer_id (or None) of the column
         """
+        # Type inference may have to scan all cells of the column.
+        check_cancelled()
         column_type = None
         simple_type = None
         column_serializer = None
@@ -356,6 +362,85 @@ class Serializer(object):
 
     # Helper methods:
 
+    def _get_batch_function(self, extension, batch_function_name, function_name):
+        """
+        Returns the batch function of the given type extension module, or a function that calls the module's per-value
+        function for each value of a batch if the module does not provide a batch function. Large batches are converted
+        in parallel if the module supports it (see ParallelConversion).
+        """
+        batch_function = getattr(extension, batch_function_name, None)
+        if batch_function is None:
+            function = getattr(extension, function_name)
+
+            def batch_function(values):
+                converted = [None] * len(values)
+                for i, value in enumerate(values):
+                    if i % _CANCELLATION_CHECK_INTERVAL == 0:
+                        check_cancelled()
+                    converted[i] = function(value)
+                return converted
+
+        if self._parallel_conversion is not None:
+            batch_function = self._parallel_conversion.parallelize(extension, batch_function_name, function_name,
+                                                                   batch_function)
+        return batch_function
+
+    @staticmethod
+    def _convert_cells(cells, convert_batch, is_missing_value):
+        """
+        Converts the values of the given cells using a single call of convert_batch. Cells may also contain lists or
+        sets of values, whose elements are converted. Missing cells and elements are not passed to convert_batch and
+        become None.
+        @return a numpy object array containing the converted cells
+        """
+        values = []
+        has_collections = False
+        for cell in cells:
+            if is_missing_value(cell):
+                continue
+            if isinstance(cell, (list, set)):
+                has_collections = True
+                values.extend(value for value in cell if not is_missing_value(value))
+            else:
+                values.append(cell)
+        converted_values = convert_batch(values)
+        if len(converted_values) != len(values):
+            raise ValueError('Type extension converted ' + str(len(values)) + ' values to '
+                             + str(len(converted_values)) + ' values.')
+        converted_cells = numpy.empty(len(cells), dtype=object)
+        if not has_collections and len(values) == len(cells):
+            # No missing cells. Assign one by one, numpy would unpack converted values that are sequences.
+            for i, converted_value in enumerate(converted_values):
+                converted_cells[i] = converted_value
+            return converted_cells
+        converted_values = iter(converted_values)
+        for i, cell in enumerate(cells):
+            if is_missing_value(cell):
+                continue
+            if isinstance(cell, list):
+                converted_cells[i] = [None if is_missing_value(value) else next(converted_values) for value in cell]
+            elif isinstance(cell, set):
+                # Iterates the unmodified set in the same order as above.
+                converted_cells[i] = set(None if is_missing_value(value) else next(converted_values) for value in cell)
+            else:
+                converted_cells[i] = next(converted_values)
+        return converted_cells
+
+    @staticmethod
+    def _set_object_column(data_frame, column, cells):
+        # Keep the object dtype. Newer versions of pandas would otherwise infer a dtype from the cells, e.g. turn a
+        # column of strings into a string column, where None becomes NaN.
+        data_frame[column] = Series(cells, index=data_frame.index, dtype=object)
+
+    @staticmethod
+    def _is_none(value):
+        return value is None
+
+    @staticmethod
+    def _is_missing_bytes(value):
+        # Missing values are represented by None or NaN, empty values are treated as missing, too.
+        return not value or (isinstance(value, numpy.float64) and numpy.isnan(value))
+
     @staticmethod
     def _is_nested(column):
         return isinstance(column, DataFrame)
@@ -388,8 +473,44 @@ class Serializer(object):
         """
         Get the type of a column (fails if multiple types are found). Numpy scalar types are converted to dtypes.
         """
-        col_type = None
-        for cell in data_frame[column_name]:
+        column = data_frame[column_name]
+        # Iterating a column of another dtype may box its values (e.g. datetime64 into Timestamp).
+        cells = column.values if column.dtype == object else list(column)
+        col_type = Serializer._scan_cells_for_type(cells, column_name)
+        col_type = Serializer._convert_to_dtype_if_numpy_type(col_type)
+        return col_type
+
+    @staticmethod
+    def _scan_cells_for_type(cells, column_name):
+        """
+        Get the type of the first non-missing cell of the given sequence, None if all cells are missing (fails if
+        multiple types are found). Gives the same result as checking all cells one after the other, but only does so for
+        a leading sample of the cells. The remaining cells are verified based on their distinct types, which only
+        requires looking at the individual cells whose types are not equivalent to the type found in the sample.
+        """
+        col_type = Serializer._check_cell_types(cells[:_TYPE_SCAN_SAMPLE_SIZE], column_name, None)
+        if len(cells) > _TYPE_SCAN_SAMPLE_SIZE:
+            remaining_cells = cells[_TYPE_SCAN_SAMPLE_SIZE:]
+            if col_type is None:
+                col_type = Serializer._check_cell_types(remaining_cells, column_name, None)
+            else:
+                conflicting_types = set(cell_type for cell_type in set(map(type, remaining_cells))
+                                        if cell_type is not _NONE_TYPE
+                                        and not types_are_equivalent(cell_type, col_type))
+                # Cells of conflicting types are fine as long as they are missing (e.g. NaN in a column of strings).
+                if conflicting_types and any(not is_missing(cell) for cell in remaining_cells
+                                             if type(cell) in conflicting_types):
+                    # Fails with the first conflicting cell.
+                    Serializer._check_cell_types(remaining_cells, column_name, col_type)
+        return col_type
+
+    @staticmethod
+    def _check_cell_types(cells, column_name, col_type):
+        """
+        Checks the given cells one after the other and returns the type of the first non-missing cell unless col_type is
+        already given (fails if multiple types are found).
+        """
+        for cell in cells:
             if not is_missing(cell):
                 if col_type is not None:
                     if not types_are_equivalent(type(cell), col_type):
@@ -397,7 +518,6 @@ class Serializer(object):
                                          + col_type.__name__ + ' and ' + type(cell).__name__)
                 else:
                     col_type = type(cell)
-        col_type = Serializer._convert_to_dtype_if_numpy_type(col_type)
         return col_type
 
     @staticmethod
@@ -425,17 +545,16 @@ class Serializer(object):
         """
         Get the type of a list column (fails if multiple types are found). Numpy scalar types are converted to dtypes.
         """
-        col_type = None
-        for list_cell in data_frame[column_name]:
-            if list_cell is not None:
-                for cell in list_cell:
-                    if not is_missing(cell):
-                        if col_type is not None:
-                            if not types_are_equivalent(type(cell), col_type):
-                                raise ValueError('More than one type in column ' + str(column_name) + '. Found '
-                                                 + col_type.__name__ + ' and ' + type(cell).__name__)
-                        else:
-                            col_type = type(cell)
+        try:
+            cells = Serializer._flatten_list_column(data_frame[column_name])
+        except TypeError:
+            # A cell is not a collection. Check the cells one after the other to fail at the right cell.
+            col_type = None
+            for list_cell in data_frame[column_name]:
+                if list_cell is not None:
+                    col_type = Serializer._check_cell_types(list_cell, column_name, col_type)
+        else:
+            col_type = Serializer._scan_cells_for_type(cells, column_name)
         if col_type == list or col_type == set:
             raise ValueError('Output table contains a nested collection. Nested collections are not yet supported.')
         col_type = Serializer._convert_to_dtype_if_numpy_type(col_type)
@@ -445,14 +564,10 @@ class Serializer(object):
     def _get_integer_list_type(column, is_set):
         simple_type = None
         is_too_big_number = False
-        minvalue = 0
-        maxvalue = 0
-        for list_cell in column:
-            if list_cell is not None:
-                for cell in list_cell:
-                    if cell is not None:
-                        minvalue = min(minvalue, cell)
-                        maxvalue = max(maxvalue, cell)
+        cells = [cell for cell in Serializer._flatten_list_column(column) if cell is not None]
+        # Like folding the cells into min(minvalue, cell) and max(maxvalue, cell) starting at 0.
+        minvalue = min(itertools.chain((0,), cells))
+        maxvalue = max(itertools.chain((0,), cells))
         if Serializer._is_in_int32_range(minvalue, maxvalue):
             simple_type = Simpletype.INTEGER_SET if is_set else Simpletype.INTEGER_LIST
         elif Serializer._is_in_int64_range(minvalue, maxvalue):
@@ -462,6 +577,13 @@ class Serializer(object):
             is_too_big_number = True
         return simple_type, is_too_big_number
 
+    @staticmethod
+    def _flatten_list_column(column):
+        """
+        Returns the elements of all non-None collections in the given column in a single list.
+        """
+        return list(itertools.chain.from_iterable(list_cell for list_cell in column if list_cell is not None))
+
     @staticmethod
     def _first_valid_object(data_frame, column_name):
         """
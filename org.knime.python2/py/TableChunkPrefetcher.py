@@ -0,0 +1,163 @@
+# -*- coding: utf-8 -*-
+# ------------------------------------------------------------------------
+#  Copyright by KNIME AG, Zurich, Switzerland
+#  Website: http://www.knime.com; Email: contact@knime.com
+#
+#  This program is free software; you can redistribute it and/or modify
+#  it under the terms of the GNU General Public License, Version 3, as
+#  published by the Free Software Foundation.
+#
+#  This program is distributed in the hope that it will be useful, but
+#  WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with this program; if not, see <http://www.gnu.org/licenses>.
+#
+#  Additional permission under GNU GPL version 3 section 7:
+#
+#  KNIME interoperates with ECLIPSE solely via ECLIPSE's plug-in APIs.
+#  Hence, KNIME and ECLIPSE are both independent programs and are not
+#  derived from each other. Should, however, the interpretation of the
+#  GNU GPL Version 3 ("License") under any applicable laws result in
+#  KNIME and ECLIPSE being a combined program, KNIME AG herewith grants
+#  you the additional permission to use and propagate KNIME together with
+#  ECLIPSE with only the license terms in place for ECLIPSE applying to
+#  ECLIPSE and the GNU GPL Version 3 applying for KNIME, provided the
+#  license terms of ECLIPSE themselves allow for the respective use and
+#  propagation of ECLIPSE together with KNIME.
+#
+#  Additional permission relating to nodes for KNIME that extend the Node
+#  Extension (and in particular that are based on subclasses of NodeModel,
+#  NodeDialog, and NodeView) and that only interoperate with KNIME through
+#  standard APIs ("Nodes"):
+#  Nodes are deemed to be separate and independent programs and to not be
+#  covered works.  Notwithstanding anything to the contrary in the
+#  License, the License does not apply to Nodes, you are not required to
+#  license Nodes under the License, and you are granted a license to
+#  prepare and propagate Nodes, in each case even if such Nodes are
+#  propagated with or for interoperation with KNIME.  The owner of a Node
+#  may freely choose the license terms applicable to such Node, including
+#  when such Node is propagated with or for interoperation with KNIME.
+# ------------------------------------------------------------------------
+
+import threading
+
+
+class TableChunkPrefetcher(object):
+    """
+    Serializes the chunks of a table that Java fetches in consecutive ranges of rows. Whenever a chunk was served, the
+    following chunks are serialized in the background while Java deserializes the current one. Prefetched chunks are
+    kept in a cache keyed by table name, start and end, and are discarded as soon as the table is modified or requested
+    out of order. Chunks of several tables may be fetched in an interleaved manner; the cache holds at most look_ahead
+    chunks per table. The schema of a table is inferred once from the entire table and shared by all of its chunks, so
+    all chunks are sent with consistent column types. Discarded chunks that were already serialized are passed to
+    discard_chunk, which e.g. deletes the temporary files that Java would have deleted after reading them.
+    """
+
+    def __init__(self, serialize_chunk, executor=None, look_ahead=1, infer_schema=None, discard_chunk=None):
+        """
+        @param serialize_chunk function that takes a data frame, the start and end (inclusive) of a range of its rows
+                               and the schema of the data frame and returns the serialized rows
+        @param executor the executor on which chunks are prefetched, None to disable prefetching. Prefetching requires
+                        that chunks can be serialized in parallel to handling other requests.
+        @param look_ahead the maximum number of chunks that are prefetched per table
+        @param infer_schema function that takes a data frame and returns its schema, None to let serialize_chunk infer
+                            the schema of each chunk (the passed schema is None then)
+        @param discard_chunk function that takes a serialized chunk that will not be served and releases its
+                             resources, None if serialized chunks hold no resources
+        """
+        self._serialize_chunk = serialize_chunk
+        self._executor = executor
+        self._look_ahead = look_ahead if executor is not None else 0
+        self._infer_schema = infer_schema
+        self._discard_chunk = discard_chunk
+        self._lock = threading.Lock()
+        # (name, start, end) -> (data frame, future of the serialized chunk)
+        self._prefetched_chunks = {}
+        # name -> (data frame, schema)
+        self._schemas = {}
+
+    def get_chunk(self, name, data_frame, start, end):
+        """
+        Returns the serialized rows from start to end (both inclusive) of the given data frame, which is the table of
+        the given name.
+        """
+        with self._lock:
+            prefetched_chunk = self._prefetched_chunks.pop((name, start, end), None)
+            if prefetched_chunk is None or prefetched_chunk[0] is not data_frame:
+                # The table was modified or Java fetches chunks in a different order than anticipated.
+                if prefetched_chunk is not None:
+                    self._discard_future(prefetched_chunk[1])
+                    prefetched_chunk = None
+                self._discard_prefetched_chunks(name)
+        schema = self._get_schema(name, data_frame)
+        chunk = None
+        if prefetched_chunk is not None:
+            try:
+                chunk = prefetched_chunk[1].result()
+            except Exception:
+                # Serialize again to report the error in the context of the request.
+                pass
+        if chunk is None:
+            chunk = self._serialize_chunk(data_frame, start, end, schema)
+        if self._look_ahead > 0:
+            self._prefetch_following_chunks(name, data_frame, schema, start, end)
+        return chunk
+
+    def invalidate(self, name=None):
+        """
+        Discards the prefetched chunks and the inferred schema of the table of the given name. Must be called whenever
+        the table may have been modified.
+        @param name the name of the modified table, None to discard the chunks and schemas of all tables
+        """
+        with self._lock:
+            self._discard_prefetched_chunks(name)
+            if name is None:
+                self._schemas.clear()
+            else:
+                self._schemas.pop(name, None)
+
+    def _get_schema(self, name, data_frame):
+        if self._infer_schema is None:
+            return None
+        with self._lock:
+            cached_schema = self._schemas.get(name)
+        if cached_schema is not None and cached_schema[0] is data_frame:
+            return cached_schema[1]
+        # Infer outside of the lock, this scans the entire table.
+        schema = self._infer_schema(data_frame)
+        with self._lock:
+            self._schemas[name] = (data_frame, schema)
+        return schema
+
+    def _prefetch_following_chunks(self, name, data_frame, schema, start, end):
+        # Java requests chunks of equal size (except for the last one) one after the other.
+        chunk_size = end - start + 1
+        num_rows = len(data_frame)
+        with self._lock:
+            for _ in range(self._look_ahead):
+                start = end + 1
+                if start >= num_rows or chunk_size <= 0:
+                    break
+                end = min(num_rows, start + chunk_size - 1)
+                key = (name, start, end)
+                if key not in self._prefetched_chunks:
+                    future = self._executor.submit(self._serialize_chunk, data_frame, start, end, schema)
+                    self._prefetched_chunks[key] = (data_frame, future)
+
+    def _discard_prefetched_chunks(self, name=None):
+        for key in list(self._prefetched_chunks.keys()):
+            if name is None or key[0] == name:
+                self._discard_future(self._prefetched_chunks.pop(key)[1])
+
+    def _discard_future(self, future):
+        # Cancelling has no effect if the chunk is being or has already been serialized. Its result is discarded once
+        # available then (immediately if it already is).
+        if not future.cancel() and self._discard_chunk is not None:
+            future.add_done_callback(self._discard_result)
+
+    def _discard_result(self, future):
+        if future.exception() is None:
+            self._discard_chunk(future.result())
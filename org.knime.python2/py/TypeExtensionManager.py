@@ -70,6 +70,10 @@ class TypeExtensionManager(Borg):
     Serializers and deserializers can be accessed using the identifier, which is the id of the java extension point or
     the type_string corresponding to the python type. This type string is set in the extension point's specification in
     plugin.xml.
+    Besides serialize(object) and deserialize(bytes), which convert a single value, serializer and deserializer modules
+    may implement serialize_batch(objects) and deserialize_batch(bytes), which convert all values of a column at once.
+    These take a list of non-missing values and return a sequence (e.g. a list or numpy array) of the converted values
+    in the same order.
     """
 
     def __init__(self, commands):
@@ -107,7 +111,8 @@ class TypeExtensionManager(Borg):
         """
         Get the serializer associated with the given id.
         @param identifier the java extension point id (string)
-        @return serializer module (implementing the serialize(object) method) or None on miss
+        @return serializer module (implementing the serialize(object) method and optionally the
+                serialize_batch(objects) method) or None on miss
         """
         if identifier not in self._serializer_id_to_index:
             return self._get_extension_by_index(self._request_serializer(identifier), self._serializers)
@@ -117,7 +122,8 @@ class TypeExtensionManager(Borg):
         """
         Get the serializer associated with the given type.
         @param type_string a python type
-        @return serializer module (implementing the serialize(object) method) or None on miss
+        @return serializer module (implementing the serialize(object) method and optionally the
+                serialize_batch(objects) method) or None on miss
         """
         if type_string not in self._serializer_type_to_id:
             return self._get_extension_by_index(self._request_serializer(type_string), self._serializers)
@@ -138,7 +144,8 @@ class TypeExtensionManager(Borg):
         """
         Get the deserializer associated with the given id
         @param identifier the java extension point id (string)
-        @return deserializer module (implementing the deserialize(bytes) method) or None on miss
+        @return deserializer module (implementing the deserialize(bytes) method and optionally the
+                deserialize_batch(bytes) method) or None on miss
         """
         if identifier not in self._deserializer_id_to_index:
             return self._get_extension_by_index(self._request_deserializer(identifier), self._deserializers)
@@ -182,16 +189,24 @@ class TypeExtensionManager(Borg):
             return None
         type_extension = extensions[index]
         if not isinstance(type_extension, types.ModuleType):
-            path = type_extension
-            last_separator = path.rfind(os.sep)
-            file_extension_start = path.rfind('.')
-            module_name = path[last_separator + 1:file_extension_start]
-            try:
-                if EnvironmentHelper.is_python3():
-                    type_extension = importlib.machinery.SourceFileLoader(module_name, path).load_module()
-                else:
-                    type_extension = imp.load_source(module_name, path)
-            except ImportError as error:
-                raise ImportError('Error while loading python type extension ' + module_name + '\nCause: ' + str(error))
+            type_extension = TypeExtensionManager.load_extension(type_extension)
             extensions[index] = type_extension
         return type_extension
+
+    @staticmethod
+    def load_extension(path):
+        """
+        Load the serializer or deserializer module at the given path.
+        @param path the path to the python module
+        @return the loaded module
+        """
+        last_separator = path.rfind(os.sep)
+        file_extension_start = path.rfind('.')
+        module_name = path[last_separator + 1:file_extension_start]
+        try:
+            if EnvironmentHelper.is_python3():
+                return importlib.machinery.SourceFileLoader(module_name, path).load_module()
+            else:
+                return imp.load_source(module_name, path)
+        except ImportError as error:
+            raise ImportError('Error while loading python type extension ' + module_name + '\nCause: ' + str(error))
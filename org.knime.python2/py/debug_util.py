@@ -69,6 +69,14 @@ def is_debug_enabled():
     return _DEBUG_ENABLED
 
 
+def is_debug_log_enabled():
+    """
+    Allows callers to skip formatting debug messages that would not be written anyway.
+    """
+    global _DEBUG_LOG_ENABLED
+    return is_debug_enabled() and _DEBUG_LOG_ENABLED
+
+
 def init_debug(enable_breakpoints=True, enable_debug_log=True, debug_log_to_stderr=False):
     if is_debug_enabled():
         return
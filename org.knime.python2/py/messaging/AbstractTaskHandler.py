@@ -50,6 +50,7 @@
 import abc
 
 from debug_util import debug_msg
+from debug_util import is_debug_log_enabled
 from messaging.Message import PayloadDecoder
 
 
@@ -62,12 +63,18 @@ class AbstractTaskHandler(object):
 
     MESSAGE_TYPE_FAILURE = "failure"
 
+    # Whether the handler completes its task with the first message it handles and does not keep state between tasks.
+    # Tasks of such handlers are run without a receive queue of their own (see TaskFactory).
+    handles_single_message = False
+
     def handle(self, message, message_handlers, message_id_supplier, result_consumer, workspace):
         message_type = message.get_header_field(AbstractTaskHandler.FIELD_KEY_MESSAGE_TYPE)
-        debug_msg("Python - Handle task, message: " + str(message))
+        if is_debug_log_enabled():
+            debug_msg("Python - Handle task, message: " + str(message))
         if message_type == AbstractTaskHandler.MESSAGE_TYPE_SUCCESS:
             result = self._handle_success_message(message)
-            debug_msg("Python - Handled task, message: " + str(message) + ", result: " + str(result))
+            if is_debug_log_enabled():
+                debug_msg("Python - Handled task, message: " + str(message) + ", result: " + str(result))
             result_consumer(result)
         elif message_type == AbstractTaskHandler.MESSAGE_TYPE_FAILURE:
             self._handle_failure_message(message)
@@ -48,8 +48,31 @@
 @author Christian Dietz, KNIME GmbH, Konstanz, Germany
 """
 
+import codecs
 import struct
 
+import EnvironmentHelper
+
+if EnvironmentHelper.is_python3():
+    _as_buffer_view = memoryview
+
+    def _as_joinable(data_bytes):
+        return data_bytes
+else:
+    # Item access on Python 2 memoryviews yields one-character strings instead of integers, which consumers of raw
+    # bytes (e.g. the serialization libraries) do not expect. Keep slicing (copying) the buffer there.
+    def _as_buffer_view(buffer):
+        return buffer
+
+    # Python 2's str.join only accepts strings.
+    def _as_joinable(data_bytes):
+        if isinstance(data_bytes, bytes):
+            return data_bytes
+        elif isinstance(data_bytes, memoryview):
+            return data_bytes.tobytes()
+        else:
+            return bytes(data_bytes)
+
 
 class Message(object):
     KEY_ID = "id"
@@ -81,9 +104,9 @@ class Message(object):
         self._id = id
         self._category = category
         self._payload = payload
-        self._header_fields = {Message.KEY_ID: str(id), Message.KEY_CATEGORY: category}
-        if additional_options is not None:
-            self._header_fields.update(additional_options)
+        self._additional_options = dict(additional_options) if additional_options else {}
+        # Textual header, built lazily.
+        self._header = None
 
     def __repr__(self):
         return self.header
@@ -98,10 +121,24 @@ class Message(object):
 
     @property
     def header(self):
-        return ''.join(['@' + k + '=' + v for k, v in self._header_fields.items()])
+        if self._header is None:
+            self._header = '@' + Message.KEY_ID + '=' + str(self._id) + '@' + Message.KEY_CATEGORY + '=' + \
+                           self._category + ''.join(['@' + k + '=' + v for k, v in self._additional_options.items()])
+        return self._header
+
+    @property
+    def additional_options(self):
+        """
+        The header fields of this message except for id and category. The returned dictionary must not be modified.
+        """
+        return self._additional_options
 
     def get_header_field(self, field_key):
-        return self._header_fields.get(field_key)  # returns None if no mapping present
+        if field_key == Message.KEY_ID:
+            return str(self._id)
+        elif field_key == Message.KEY_CATEGORY:
+            return self._category
+        return self._additional_options.get(field_key)  # returns None if no mapping present
 
     @property
     def payload(self):
@@ -113,25 +150,35 @@ class PayloadDecoder(object):
     Used for decoding the payload of a Message.
     Schema: variable size types: (length: int32)(object)
             fixed size types: (object)
+    Variable size objects are returned as views into the payload (Python 3) and are therefore not copied. They remain
+    valid as long as they are referenced, even after the message itself was dereferenced.
     """
 
     def __init__(self, buffer):
-        self._buffer = buffer
+        self._buffer = _as_buffer_view(buffer)
         self._pointer = 0
 
     def get_next_bytes(self):
-        size = struct.unpack('>L', self._read_bytes(4))[0]
+        """
+        Returns the next variable size object as a bytes-like object (a memoryview in Python 3).
+        """
+        size = self.get_next_int()
         return self._read_bytes(size)
 
     def get_next_int(self):
-        return struct.unpack('>L', self._read_bytes(4))[0]
+        return self._unpack_next('>L', 4)
 
     def get_next_long(self):
-        return struct.unpack('>Q', self._read_bytes(8))[0]
+        return self._unpack_next('>Q', 8)
 
     def get_next_string(self):
-        size = struct.unpack('>L', self._read_bytes(4))[0]
-        return self._read_bytes(size).decode('utf-8')
+        size = self.get_next_int()
+        return codecs.utf_8_decode(self._read_bytes(size), 'strict', True)[0]
+
+    def _unpack_next(self, format, size):
+        value = struct.unpack_from(format, self._buffer, self._pointer)[0]
+        self._pointer += size
+        return value
 
     def _read_bytes(self, size):
         start_pointer = self._pointer
@@ -144,30 +191,42 @@ class PayloadEncoder(object):
     Used for encoding the payload of a Message.
     Schema: variable size types: (length: int32)(object)
             fixed size types: (object)
+    The encoded parts are collected and joined only once when the payload is requested. This keeps encoding linear in
+    the size of the payload, independent of the number of parts.
     """
 
+    _INT = struct.Struct('>L')
+
+    _LONG = struct.Struct('>Q')
+
     def __init__(self):
-        self._buffer = bytes()
+        self._parts = []
+        self._payload = None
 
     @property
     def payload(self):
-        return self._buffer
+        if self._payload is None:
+            self._payload = b''.join(self._parts)
+            # Keep the joined payload as the only part in case more data is put afterwards.
+            self._parts = [self._payload]
+        return self._payload
 
     def put_bytes(self, data_bytes):
-        data_bytes_size = struct.pack('>L', len(data_bytes))
-        self._buffer += data_bytes_size + data_bytes
+        self._put(PayloadEncoder._INT.pack(len(data_bytes)))
+        self._put(_as_joinable(data_bytes))
         return self
 
     def put_int(self, integer):
-        self._buffer += struct.pack('>L', integer)
+        self._put(PayloadEncoder._INT.pack(integer))
         return self
 
     def put_long(self, long):
-        self._buffer += struct.pack('>Q', long)
+        self._put(PayloadEncoder._LONG.pack(long))
         return self
 
     def put_string(self, string):
-        string_bytes = string.encode('utf-8')
-        string_bytes_size = struct.pack('>L', len(string_bytes))
-        self._buffer += string_bytes_size + string_bytes
-        return self
+        return self.put_bytes(string.encode('utf-8'))
+
+    def _put(self, part):
+        self._parts.append(part)
+        self._payload = None
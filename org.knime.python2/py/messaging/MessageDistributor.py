@@ -48,11 +48,15 @@
 """
 
 from debug_util import debug_msg
+from debug_util import is_debug_log_enabled
 
 
 class MessageDistributor(object):
     def __init__(self):
         self._message_handlers = {}
+        # Handlers of replies keyed by the id (as string) of the message they reply to. Replies carry that id as their
+        # category.
+        self._reply_handlers = {}
 
     def register_message_handler(self, message_category, handler):
         if message_category not in self._message_handlers:
@@ -68,13 +72,36 @@ class MessageDistributor(object):
         else:
             return False
 
+    def register_reply_handler(self, message_id, handler):
+        """
+        Routes replies to the message with the given id to the given handler until it is unregistered. Unlike
+        registering a message handler, this does not need any locking: message ids are unique and single dictionary
+        operations are atomic.
+        """
+        return self._reply_handlers.setdefault(str(message_id), handler) is handler
+
+    def unregister_reply_handler(self, message_id):
+        return self._reply_handlers.pop(str(message_id), None) is not None
+
+    def get_all_handlers(self):
+        """
+        Returns a list of all registered message and reply handlers without duplicates.
+        """
+        handlers = list(self._message_handlers.values())
+        handlers.extend(self._reply_handlers.values())
+        return list({id(handler): handler for handler in handlers}.values())
+
     def can_handle(self, message_category):
-        return message_category in self._message_handlers
+        return message_category in self._reply_handlers or message_category in self._message_handlers
 
     def handle(self, message):
-        message_handler = self._message_handlers.get(message.category)
+        # Fast path: most messages are replies to waiting tasks.
+        message_handler = self._reply_handlers.get(message.category)
+        if message_handler is None:
+            message_handler = self._message_handlers.get(message.category)
         if message_handler is not None:
-            debug_msg("Python - Distribute message: " + str(message))
+            if is_debug_log_enabled():
+                debug_msg("Python - Distribute message: " + str(message))
             message_handler.handle(message)
         else:
             raise RuntimeError(
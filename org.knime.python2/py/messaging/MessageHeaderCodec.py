@@ -0,0 +1,159 @@
+# -*- coding: utf-8 -*-
+# ------------------------------------------------------------------------
+#  Copyright by KNIME AG, Zurich, Switzerland
+#  Website: http://www.knime.com; Email: contact@knime.com
+#
+#  This program is free software; you can redistribute it and/or modify
+#  it under the terms of the GNU General Public License, Version 3, as
+#  published by the Free Software Foundation.
+#
+#  This program is distributed in the hope that it will be useful, but
+#  WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with this program; if not, see <http://www.gnu.org/licenses>.
+#
+#  Additional permission under GNU GPL version 3 section 7:
+#
+#  KNIME interoperates with ECLIPSE solely via ECLIPSE's plug-in APIs.
+#  Hence, KNIME and ECLIPSE are both independent programs and are not
+#  derived from each other. Should, however, the interpretation of the
+#  GNU GPL Version 3 ("License") under any applicable laws result in
+#  KNIME and ECLIPSE being a combined program, KNIME AG herewith grants
+#  you the additional permission to use and propagate KNIME together with
+#  ECLIPSE with only the license terms in place for ECLIPSE applying to
+#  ECLIPSE and the GNU GPL Version 3 applying for KNIME, provided the
+#  license terms of ECLIPSE themselves allow for the respective use and
+#  propagation of ECLIPSE together with KNIME.
+#
+#  Additional permission relating to nodes for KNIME that extend the Node
+#  Extension (and in particular that are based on subclasses of NodeModel,
+#  NodeDialog, and NodeView) and that only interoperate with KNIME through
+#  standard APIs ("Nodes"):
+#  Nodes are deemed to be separate and independent programs and to not be
+#  covered works.  Notwithstanding anything to the contrary in the
+#  License, the License does not apply to Nodes, you are not required to
+#  license Nodes under the License, and you are granted a license to
+#  prepare and propagate Nodes, in each case even if such Nodes are
+#  propagated with or for interoperation with KNIME.  The owner of a Node
+#  may freely choose the license terms applicable to such Node, including
+#  when such Node is propagated with or for interoperation with KNIME.
+# ------------------------------------------------------------------------
+
+import struct
+
+from messaging.Message import Message
+
+
+class MessageHeaderCodec(object):
+    """
+    Encodes message headers for sending and decodes received headers into messages. The header format is determined by
+    Java on startup (see MessagingOptions). The textual format '@<key>=<value>...' is used if Java does not specify one.
+
+    Instances are not thread-safe. Sender and receiver each use their own instance.
+    """
+
+    TEXT = "text"
+
+    BINARY = "binary"
+
+    @staticmethod
+    def create(header_format):
+        if header_format is None or header_format == MessageHeaderCodec.TEXT:
+            return _TextMessageHeaderCodec()
+        elif header_format == MessageHeaderCodec.BINARY:
+            return _BinaryMessageHeaderCodec()
+        else:
+            raise ValueError("Unsupported message header format: '" + header_format + "'.")
+
+    def encode(self, message):
+        """
+        Returns the encoded header of the given message.
+        """
+        raise NotImplementedError()
+
+    def decode(self, header, payload):
+        """
+        Creates a message from the given encoded header (a bytes-like object) and payload.
+        """
+        raise NotImplementedError()
+
+
+class _TextMessageHeaderCodec(MessageHeaderCodec):
+
+    def encode(self, message):
+        return message.header.encode('utf-8')
+
+    def decode(self, header, payload):
+        return Message.create(header.decode('utf-8'), payload)
+
+
+class _BinaryMessageHeaderCodec(MessageHeaderCodec):
+    """
+    Binary header format, version 1:
+    (version: uint8)(id: int32)(category size: uint16)(fields size: uint32)(category)(fields)
+    All numbers are big-endian. Category and fields are UTF-8 encoded. The fields are the message's additional header
+    fields in the form <key>NUL<value>NUL<key>NUL<value>..., which allows decoding them using a single split.
+    """
+
+    _VERSION = 1
+
+    _PREFIX = struct.Struct('>BiHL')
+
+    _FIELD_SEPARATOR = u'\0'
+
+    # Categories and field blocks (e.g. "type=success") repeat across messages. Caching their encoded and decoded forms
+    # avoids parsing them again and makes repeated categories share a single (interned) string instance. The caches are
+    # cleared once they exceed this size since some of them (e.g. reply categories) are unique.
+    _MAX_CACHE_SIZE = 1024
+
+    def __init__(self):
+        self._encoded_categories = {}
+        self._decoded_categories = {}
+        self._decoded_fields = {}
+
+    def encode(self, message):
+        category = self._encoded_categories.get(message.category)
+        if category is None:
+            category = message.category.encode('utf-8')
+            _put_bounded(self._encoded_categories, message.category, category, self._MAX_CACHE_SIZE)
+        fields = message.additional_options
+        if fields:
+            separator = self._FIELD_SEPARATOR
+            fields = separator.join([key + separator + value for key, value in fields.items()]).encode('utf-8')
+        else:
+            fields = b''
+        return b''.join(
+            (self._PREFIX.pack(self._VERSION, int(message.id), len(category), len(fields)), category, fields))
+
+    def decode(self, header, payload):
+        version, id, category_size, fields_size = self._PREFIX.unpack_from(header, 0)
+        if version != self._VERSION:
+            raise ValueError("Unsupported message header version: " + str(version) + ".")
+        position = self._PREFIX.size
+        # Slices of bytes objects are hashable and can therefore be looked up in the caches.
+        category = bytes(header[position:position + category_size])
+        decoded_category = self._decoded_categories.get(category)
+        if decoded_category is None:
+            decoded_category = category.decode('utf-8')
+            _put_bounded(self._decoded_categories, category, decoded_category, self._MAX_CACHE_SIZE)
+        position += category_size
+        if fields_size:
+            fields = bytes(header[position:position + fields_size])
+            decoded_fields = self._decoded_fields.get(fields)
+            if decoded_fields is None:
+                items = iter(fields.decode('utf-8').split(self._FIELD_SEPARATOR))
+                decoded_fields = dict(zip(items, items))
+                _put_bounded(self._decoded_fields, fields, decoded_fields, self._MAX_CACHE_SIZE)
+        else:
+            decoded_fields = None
+        # Ids are strings in the textual format, keep it that way. Message copies the (cached) fields.
+        return Message(str(id), decoded_category, payload, decoded_fields)
+
+
+def _put_bounded(cache, key, value, max_size):
+    if len(cache) >= max_size:
+        cache.clear()
+    cache[key] = value
@@ -0,0 +1,157 @@
+# -*- coding: utf-8 -*-
+# ------------------------------------------------------------------------
+#  Copyright by KNIME AG, Zurich, Switzerland
+#  Website: http://www.knime.com; Email: contact@knime.com
+#
+#  This program is free software; you can redistribute it and/or modify
+#  it under the terms of the GNU General Public License, Version 3, as
+#  published by the Free Software Foundation.
+#
+#  This program is distributed in the hope that it will be useful, but
+#  WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with this program; if not, see <http://www.gnu.org/licenses>.
+#
+#  Additional permission under GNU GPL version 3 section 7:
+#
+#  KNIME interoperates with ECLIPSE solely via ECLIPSE's plug-in APIs.
+#  Hence, KNIME and ECLIPSE are both independent programs and are not
+#  derived from each other. Should, however, the interpretation of the
+#  GNU GPL Version 3 ("License") under any applicable laws result in
+#  KNIME and ECLIPSE being a combined program, KNIME AG herewith grants
+#  you the additional permission to use and propagate KNIME together with
+#  ECLIPSE with only the license terms in place for ECLIPSE applying to
+#  ECLIPSE and the GNU GPL Version 3 applying for KNIME, provided the
+#  license terms of ECLIPSE themselves allow for the respective use and
+#  propagation of ECLIPSE together with KNIME.
+#
+#  Additional permission relating to nodes for KNIME that extend the Node
+#  Extension (and in particular that are based on subclasses of NodeModel,
+#  NodeDialog, and NodeView) and that only interoperate with KNIME through
+#  standard APIs ("Nodes"):
+#  Nodes are deemed to be separate and independent programs and to not be
+#  covered works.  Notwithstanding anything to the contrary in the
+#  License, the License does not apply to Nodes, you are not required to
+#  license Nodes under the License, and you are granted a license to
+#  prepare and propagate Nodes, in each case even if such Nodes are
+#  propagated with or for interoperation with KNIME.  The owner of a Node
+#  may freely choose the license terms applicable to such Node, including
+#  when such Node is propagated with or for interoperation with KNIME.
+# ------------------------------------------------------------------------
+
+"""
+Priority classes of messages. Must be kept in sync with MessagePriority.java on Java side.
+"""
+
+from collections import deque
+from timeit import default_timer
+
+
+class MessagePriority(object):
+    """
+    Messages are assigned to one of three priority classes. Queues of the messaging system serve control messages
+    before normal messages and normal messages before bulk messages, so that short interactive requests (e.g. auto
+    completion in the node dialog) do not wait behind large table transfers.
+    The priority of a message is determined by, in this order: its header field 'priority' (one of 'control',
+    'normal' or 'bulk'), its category (see CONTROL_CATEGORIES and BULK_CATEGORIES) and the size of its payload (see
+    BULK_PAYLOAD_SIZE).
+    If the data channel is enabled (see MessagingOptions), bulk messages are sent via the data connection.
+    """
+
+    CONTROL = 0
+
+    NORMAL = 1
+
+    BULK = 2
+
+    HEADER_FIELD_KEY = "priority"
+
+    # Categories of requests that are control messages.
+    CONTROL_CATEGORIES = frozenset(["shutdown", "getpid", "hasAutoComplete", "autoComplete", "listVariables",
+                                    "getStats", "cancel"])
+
+    # Categories of requests that transfer tables or objects and are bulk messages regardless of their payload size.
+    BULK_CATEGORIES = frozenset(["putTable", "appendToTable", "getTableChunk", "putTables", "getTables", "putObject",
+                                 "getObject"])
+
+    # Messages whose payload is at least this large (in bytes) are bulk messages.
+    BULK_PAYLOAD_SIZE = 64 * 1024
+
+    _BY_NAME = {"control": CONTROL, "normal": NORMAL, "bulk": BULK}
+
+    @staticmethod
+    def of(message):
+        """
+        Returns the priority class of the given message.
+        """
+        priority = message.get_header_field(MessagePriority.HEADER_FIELD_KEY)
+        if priority is not None:
+            return MessagePriority._BY_NAME.get(priority, MessagePriority.NORMAL)
+        category = message.category
+        if category in MessagePriority.CONTROL_CATEGORIES:
+            return MessagePriority.CONTROL
+        if category in MessagePriority.BULK_CATEGORIES:
+            return MessagePriority.BULK
+        payload = message.payload
+        if payload is not None and len(payload) >= MessagePriority.BULK_PAYLOAD_SIZE:
+            return MessagePriority.BULK
+        return MessagePriority.NORMAL
+
+
+class MessageLanes(object):
+    """
+    Storage of a message queue that keeps one FIFO lane per priority class and serves the lanes in order of priority.
+    Provides the part of the deque interface that queue.Queue and the message loops use.
+    Lanes hold (enqueue time, message) entries, so the time a message waited in the queue can be measured without
+    keeping track of messages elsewhere (see MessagingStatistics.QUEUE_WAIT_TIME).
+    """
+
+    def __init__(self, timed=True):
+        """
+        @param timed whether the time at which a message is appended is kept along with it, otherwise its enqueue time
+                     is None
+        """
+        self._lanes = [deque() for _ in range(MessagePriority.BULK + 1)]
+        self._size = 0
+        self._timed = timed
+
+    def __len__(self):
+        return self._size
+
+    def lane_of(self, message):
+        """
+        Returns the lane of the given message. Its length is the number of messages of the same priority class.
+        """
+        return self._lanes[MessagePriority.of(message)]
+
+    def append(self, message):
+        self.append_to_lane(self.lane_of(message), message)
+
+    def append_to_lane(self, lane, message):
+        """
+        Appends the given message to the given lane, which must have been obtained via lane_of(message).
+        """
+        lane.append((default_timer() if self._timed else None, message))
+        self._size += 1
+
+    def popleft(self):
+        return self.popleft_entry()[1]
+
+    def popleft_entry(self):
+        """
+        Removes the next message and returns it along with the time (see timeit.default_timer) at which it was
+        appended, as (enqueue time, message) pair. The enqueue time is None if the lanes are not timed.
+        """
+        for lane in self._lanes:
+            if lane:
+                self._size -= 1
+                return lane.popleft()
+        raise IndexError("pop from empty message lanes")
+
+    def clear(self):
+        for lane in self._lanes:
+            lane.clear()
+        self._size = 0
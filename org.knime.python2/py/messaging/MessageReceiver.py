@@ -51,37 +51,87 @@
 import struct
 
 from debug_util import debug_msg
+from debug_util import is_debug_log_enabled
 from messaging.Message import Message
+from messaging.MessageHeaderCodec import MessageHeaderCodec
+from messaging.MessagingStatistics import MessagingStatistics
+from messaging.PayloadCompression import PayloadCompression
+from messaging.SharedMemorySegments import SharedMemorySegments
 
 
 class MessageReceiver(object):
-    def __init__(self, connection):
+    def __init__(self, connection, header_codec=None, compression=None, statistics=None):
+        """
+        @param header_codec the MessageHeaderCodec used to decode message headers, None for the textual format
+        @param compression the PayloadCompression used to decompress compressed payloads, None to decompress them
+                           with a default instance
+        @param statistics the MessagingStatistics that record the size and decoding time of received frames, None if no
+                          statistics are recorded
+        """
         self._connection = connection
+        self._header_codec = header_codec if header_codec is not None else MessageHeaderCodec.create(None)
+        self._compression = compression if compression is not None else PayloadCompression()
+        self._statistics = statistics
+        # Reused for the two size fields that precede each message.
+        self._sizes_buffer = bytearray(8)
 
     def receive(self):
-        header_size = self._read_size()
-        payload_size = self._read_size()
-        header = self._read_data(header_size).decode('utf-8')
+        header_size, payload_size = self._read_sizes()
+        header = self._read_data(header_size)
         if payload_size > 0:
             payload = self._read_data(payload_size)
         else:
             payload = None
-        message = Message.create(header, payload)
-        debug_msg("Python - Received message: " + str(message))
+        return self.decode_frame(header, payload)
+
+    def decode_frame(self, header, payload):
+        """
+        Creates the message of the frame with the given header and payload, where payload is None if the frame does
+        not have a payload. Allows reading frames via other means than the connection of this receiver.
+        """
+        statistics = self._statistics
+        if statistics is not None:
+            start = statistics.now()
+        message = self._header_codec.decode(header, payload)
+        segment = message.get_header_field(SharedMemorySegments.HEADER_FIELD_KEY)
+        if segment is not None:
+            message = Message(message.id, message.category, SharedMemorySegments.read_and_release(segment),
+                              message.additional_options)
+        codec = message.get_header_field(PayloadCompression.HEADER_FIELD_KEY)
+        if codec is not None:
+            uncompressed_size = int(message.get_header_field(PayloadCompression.UNCOMPRESSED_SIZE_HEADER_FIELD_KEY))
+            compressed_size = len(message.payload)
+            if statistics is not None:
+                decompression_start = statistics.now()
+            message = Message(message.id, message.category,
+                              self._compression.decompress(codec, message.payload, uncompressed_size),
+                              message.additional_options)
+            if statistics is not None:
+                statistics.record_time(message, MessagingStatistics.COMPRESSION_TIME, decompression_start)
+                statistics.record_value(message, MessagingStatistics.UNCOMPRESSED_BYTES_IN, uncompressed_size)
+                statistics.record_value(message, MessagingStatistics.COMPRESSED_BYTES_IN, compressed_size)
+        if statistics is not None:
+            statistics.record_frame(message, MessagingStatistics.BYTES_IN,
+                                    8 + len(header) + (len(payload) if payload is not None else 0), start)
+        if is_debug_log_enabled():
+            debug_msg("Python - Received message: " + str(message))
         return message
 
-    # reads 4 bytes from the input stream and interprets them as size
-    def _read_size(self):
-        data = bytearray()
-        while len(data) < 4:
-            data.extend(self._connection.recv(4 - len(data)))
-        return struct.unpack('>L', data)[0]
+    # reads 8 bytes from the input stream and interprets them as header size and payload size
+    def _read_sizes(self):
+        self._read_into(self._sizes_buffer)
+        return struct.unpack('>LL', self._sizes_buffer)
 
     # reads the next data from the input stream
-    def _read_data(self, size=None):
-        if size is None:
-            size = self._read_size()
-        data = bytearray()
-        while len(data) < size:
-            data.extend(self._connection.recv(size - len(data)))
+    def _read_data(self, size):
+        # Allocate the data once at its announced size and let the socket fill it in place.
+        data = bytearray(size)
+        self._read_into(data)
         return data
+
+    def _read_into(self, buffer):
+        view = memoryview(buffer)
+        size = len(buffer)
+        position = 0
+        while position < size:
+            position += self._connection.recv_into(view[position:], size - position)
@@ -48,39 +48,143 @@
 @author Christian Dietz, KNIME GmbH, Konstanz, Germany
 """
 
+import socket
 import struct
 
 from debug_util import debug_msg
+from debug_util import is_debug_log_enabled
+from messaging.Message import Message
+from messaging.MessageHeaderCodec import MessageHeaderCodec
+from messaging.MessagingStatistics import MessagingStatistics
+from messaging.PayloadCompression import PayloadCompression
+from messaging.SharedMemorySegments import SharedMemorySegments
+
+# Scatter/gather writes are not available on Windows and in Python 2.
+_SENDMSG_AVAILABLE = hasattr(socket.socket, 'sendmsg')
+
+# Buffers up to this size are copied together and written using a single call if scatter/gather writes are not
+# available.
+_MAX_COPIED_BUFFER_SIZE = 64 * 1024
+
+# Upper bound of the number of buffers per scatter/gather write (IOV_MAX is 1024 on Linux and macOS).
+_MAX_BUFFERS_PER_WRITE = 1024
 
 
 class MessageSender(object):
-    def __init__(self, connection):
+    def __init__(self, connection, header_codec=None, shared_memory=None, compression=None, statistics=None):
+        """
+        @param header_codec the MessageHeaderCodec used to encode message headers, None for the textual format
+        @param shared_memory the SharedMemorySegments via which large payloads are sent, None if all payloads are sent
+                             via the connection
+        @param compression the PayloadCompression used to compress payloads, None if payloads are not compressed
+        @param statistics the MessagingStatistics that record the size and encoding time of sent frames, None if no
+                          statistics are recorded
+        """
         self._connection = connection
+        self._header_codec = header_codec if header_codec is not None else MessageHeaderCodec.create(None)
+        self._shared_memory = shared_memory
+        self._compression = compression
+        self._statistics = statistics
 
     def send(self, message):
-        debug_msg("Python - Send message: " + str(message))
-        header = message.header.encode('utf-8')
-        self._write_size(len(header))
+        self.send_all([message])
+
+    def send_all(self, messages):
+        """
+        Sends the given messages in the given order. Their frames are written back to back using as few system calls
+        as possible.
+        """
+        self._write_buffers(self.encode_frames(messages))
+
+    def encode_frames(self, messages):
+        """
+        Returns the list of buffers that make up the frames of the given messages without writing them. Allows
+        writing them via other means than the connection of this sender.
+        """
+        buffers = []
+        for message in messages:
+            self._append_frame(message, buffers)
+        return buffers
+
+    def _append_frame(self, message, buffers):
+        if is_debug_log_enabled():
+            debug_msg("Python - Send message: " + str(message))
+        statistics = self._statistics
+        if statistics is not None:
+            start = statistics.now()
+            original_message = message
         payload = message.payload
-        if payload:
-            self._write_size(len(payload))
-        else:
-            self._write_size(0)
-        self._write_data(header)
-        if payload:
-            self._write_data(payload)
+        payload_size = len(payload) if payload else 0
+        if self._compression is not None and self._compression.should_compress(payload_size):
+            if statistics is not None:
+                compression_start = statistics.now()
+            compressed_payload = self._compression.compress(payload)
+            if statistics is not None:
+                statistics.record_time(original_message, MessagingStatistics.COMPRESSION_TIME, compression_start)
+            if compressed_payload is not None:
+                fields = dict(message.additional_options)
+                fields[PayloadCompression.HEADER_FIELD_KEY] = self._compression.codec
+                fields[PayloadCompression.UNCOMPRESSED_SIZE_HEADER_FIELD_KEY] = str(payload_size)
+                message = Message(message.id, message.category, compressed_payload, fields)
+                if statistics is not None:
+                    statistics.record_value(original_message, MessagingStatistics.UNCOMPRESSED_BYTES_OUT,
+                                            payload_size)
+                    statistics.record_value(original_message, MessagingStatistics.COMPRESSED_BYTES_OUT,
+                                            len(compressed_payload))
+                payload = compressed_payload
+                payload_size = len(payload)
+            elif statistics is not None:
+                statistics.record_value(original_message, MessagingStatistics.COMPRESSION_SKIPPED_BYTES, payload_size)
+        if self._shared_memory is not None and payload_size and self._shared_memory.should_offload(payload_size):
+            fields = dict(message.additional_options)
+            fields[SharedMemorySegments.HEADER_FIELD_KEY] = self._shared_memory.write(payload)
+            message = Message(message.id, message.category, None, fields)
+            payload_size = 0
+        header = self._header_codec.encode(message)
+        # Frame: (header size: int32)(payload size: int32)(header)(payload)
+        buffers.append(struct.pack('>LL', len(header), payload_size) + header)
+        if payload_size:
+            buffers.append(payload)
+        if statistics is not None:
+            statistics.record_frame(original_message, MessagingStatistics.BYTES_OUT, 8 + len(header) + payload_size,
+                                    start)
 
-    def _write_size(self, size):
+    def _write_buffers(self, buffers):
         """
-        Writes the given size as 4 byte integer to the output stream.
+        Writes the given buffers to the output stream, using as few system calls as possible.
         """
-        writer = self._connection.makefile('wb', 4)
-        writer.write(struct.pack('>L', size))
-        writer.flush()
-        # _connection.sendall(struct.pack('>L', size))
+        if _SENDMSG_AVAILABLE:
+            for i in range(0, len(buffers), _MAX_BUFFERS_PER_WRITE):
+                self._write_vectored([memoryview(buffer) for buffer in buffers[i:i + _MAX_BUFFERS_PER_WRITE]])
+        else:
+            pending = []
+            for buffer in buffers:
+                if len(buffer) <= _MAX_COPIED_BUFFER_SIZE:
+                    pending.append(buffer)
+                else:
+                    self._write_joined(pending)
+                    pending = []
+                    self._connection.sendall(buffer)
+            self._write_joined(pending)
+
+    def _write_joined(self, buffers):
+        if len(buffers) == 1:
+            self._connection.sendall(buffers[0])
+        elif buffers:
+            # Unlike bytes.join, bytearray.join accepts bytearrays on Python 2, too.
+            self._connection.sendall(bytearray().join(buffers))
 
-    def _write_data(self, data):
+    def _write_vectored(self, buffers):
         """
-        Writes the given data to the output stream.
+        Writes the given buffers to the output stream using scatter/gather writes. Resumes partial writes.
         """
-        self._connection.sendall(data)
+        while buffers:
+            sent = self._connection.sendmsg(buffers)
+            while sent > 0:
+                first_size = len(buffers[0])
+                if sent >= first_size:
+                    sent -= first_size
+                    del buffers[0]
+                else:
+                    buffers[0] = buffers[0][sent:]
+                    sent = 0
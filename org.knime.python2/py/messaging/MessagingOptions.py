@@ -0,0 +1,156 @@
+# -*- coding: utf-8 -*-
+# ------------------------------------------------------------------------
+#  Copyright by KNIME AG, Zurich, Switzerland
+#  Website: http://www.knime.com; Email: contact@knime.com
+#
+#  This program is free software; you can redistribute it and/or modify
+#  it under the terms of the GNU General Public License, Version 3, as
+#  published by the Free Software Foundation.
+#
+#  This program is distributed in the hope that it will be useful, but
+#  WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with this program; if not, see <http://www.gnu.org/licenses>.
+#
+#  Additional permission under GNU GPL version 3 section 7:
+#
+#  KNIME interoperates with ECLIPSE solely via ECLIPSE's plug-in APIs.
+#  Hence, KNIME and ECLIPSE are both independent programs and are not
+#  derived from each other. Should, however, the interpretation of the
+#  GNU GPL Version 3 ("License") under any applicable laws result in
+#  KNIME and ECLIPSE being a combined program, KNIME AG herewith grants
+#  you the additional permission to use and propagate KNIME together with
+#  ECLIPSE with only the license terms in place for ECLIPSE applying to
+#  ECLIPSE and the GNU GPL Version 3 applying for KNIME, provided the
+#  license terms of ECLIPSE themselves allow for the respective use and
+#  propagation of ECLIPSE together with KNIME.
+#
+#  Additional permission relating to nodes for KNIME that extend the Node
+#  Extension (and in particular that are based on subclasses of NodeModel,
+#  NodeDialog, and NodeView) and that only interoperate with KNIME through
+#  standard APIs ("Nodes"):
+#  Nodes are deemed to be separate and independent programs and to not be
+#  covered works.  Notwithstanding anything to the contrary in the
+#  License, the License does not apply to Nodes, you are not required to
+#  license Nodes under the License, and you are granted a license to
+#  prepare and propagate Nodes, in each case even if such Nodes are
+#  propagated with or for interoperation with KNIME.  The owner of a Node
+#  may freely choose the license terms applicable to such Node, including
+#  when such Node is propagated with or for interoperation with KNIME.
+# ------------------------------------------------------------------------
+
+class MessagingOptions(object):
+    """
+    Options of the messaging system. They are determined by Java and passed to the Python kernel on startup in the form
+    of '<key>=<value>' command line arguments.
+    """
+
+    _HEADER_FORMAT_KEY = "header_format"
+
+    _SHARED_MEMORY_DIRECTORY_KEY = "shm_dir"
+
+    _SHARED_MEMORY_THRESHOLD_KEY = "shm_threshold"
+
+    _COMPRESSION_KEY = "compression"
+
+    _COMPRESSION_THRESHOLD_KEY = "compression_threshold"
+
+    _ENGINE_KEY = "engine"
+
+    _DATA_CHANNEL_KEY = "data_channel"
+
+    _DATA_CHANNEL_BUFFER_SIZE_KEY = "data_channel_buffer_size"
+
+    _STATISTICS_KEY = "statistics"
+
+    # Messaging engines of the Python 3 kernel.
+
+    ENGINE_THREADS = "threads"
+
+    ENGINE_ASYNCIO = "asyncio"
+
+    @staticmethod
+    def from_arguments(arguments):
+        """
+        Creates messaging options from the given '<key>=<value>' command line arguments. Unknown keys are ignored.
+        """
+        options = dict(argument.split('=', 1) for argument in arguments if '=' in argument)
+        return MessagingOptions(
+            header_format=options.get(MessagingOptions._HEADER_FORMAT_KEY),
+            shared_memory_directory=options.get(MessagingOptions._SHARED_MEMORY_DIRECTORY_KEY),
+            shared_memory_threshold=int(options.get(MessagingOptions._SHARED_MEMORY_THRESHOLD_KEY, 0)),
+            compression=options.get(MessagingOptions._COMPRESSION_KEY),
+            compression_threshold=int(options.get(MessagingOptions._COMPRESSION_THRESHOLD_KEY, 0)),
+            engine=options.get(MessagingOptions._ENGINE_KEY),
+            data_channel=options.get(MessagingOptions._DATA_CHANNEL_KEY) == 'true',
+            data_channel_buffer_size=int(options.get(MessagingOptions._DATA_CHANNEL_BUFFER_SIZE_KEY, 0)),
+            statistics=options.get(MessagingOptions._STATISTICS_KEY) == 'true')
+
+    def __init__(self, header_format=None, shared_memory_directory=None, shared_memory_threshold=0, compression=None,
+                 compression_threshold=0, engine=None, data_channel=False, data_channel_buffer_size=0,
+                 statistics=False):
+        """
+        @param header_format the format of message headers (see MessageHeaderCodec), None for the textual format
+        @param shared_memory_directory the memory-backed directory in which shared memory segments are created, None
+                                       disables the shared memory side channel for sending
+        @param shared_memory_threshold the minimum payload size in bytes above which payloads are sent via shared
+                                       memory, a value less than or equal to zero disables the side channel for sending
+        @param compression the codec used to compress payloads that are sent (see PayloadCompression), None disables
+                           compression for sending
+        @param compression_threshold the minimum payload size in bytes above which payloads are compressed
+        @param engine the messaging engine of the Python 3 kernel, ENGINE_THREADS (the default if None) or
+                      ENGINE_ASYNCIO, ignored by the Python 2 kernel
+        @param data_channel whether bulk messages (see MessagePriority) are exchanged via a second connection to Java
+                            that is established right after the main connection
+        @param data_channel_buffer_size the size in bytes of the socket send and receive buffers of the data channel, a
+                                        value less than or equal to zero keeps the defaults of the operating system
+        @param statistics whether the messaging system records MessagingStatistics, which costs some of its throughput
+        """
+        self._header_format = header_format
+        self._shared_memory_directory = shared_memory_directory
+        self._shared_memory_threshold = shared_memory_threshold
+        self._compression = compression
+        self._compression_threshold = compression_threshold
+        self._engine = engine if engine is not None else MessagingOptions.ENGINE_THREADS
+        self._data_channel = data_channel
+        self._data_channel_buffer_size = data_channel_buffer_size
+        self._statistics = statistics
+
+    @property
+    def header_format(self):
+        return self._header_format
+
+    @property
+    def shared_memory_directory(self):
+        return self._shared_memory_directory
+
+    @property
+    def shared_memory_threshold(self):
+        return self._shared_memory_threshold
+
+    @property
+    def compression(self):
+        return self._compression
+
+    @property
+    def compression_threshold(self):
+        return self._compression_threshold
+
+    @property
+    def engine(self):
+        return self._engine
+
+    @property
+    def data_channel(self):
+        return self._data_channel
+
+    @property
+    def data_channel_buffer_size(self):
+        return self._data_channel_buffer_size
+
+    @property
+    def statistics(self):
+        return self._statistics
@@ -0,0 +1,305 @@
+# -*- coding: utf-8 -*-
+# ------------------------------------------------------------------------
+#  Copyright by KNIME AG, Zurich, Switzerland
+#  Website: http://www.knime.com; Email: contact@knime.com
+#
+#  This program is free software; you can redistribute it and/or modify
+#  it under the terms of the GNU General Public License, Version 3, as
+#  published by the Free Software Foundation.
+#
+#  This program is distributed in the hope that it will be useful, but
+#  WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with this program; if not, see <http://www.gnu.org/licenses>.
+#
+#  Additional permission under GNU GPL version 3 section 7:
+#
+#  KNIME interoperates with ECLIPSE solely via ECLIPSE's plug-in APIs.
+#  Hence, KNIME and ECLIPSE are both independent programs and are not
+#  derived from each other. Should, however, the interpretation of the
+#  GNU GPL Version 3 ("License") under any applicable laws result in
+#  KNIME and ECLIPSE being a combined program, KNIME AG herewith grants
+#  you the additional permission to use and propagate KNIME together with
+#  ECLIPSE with only the license terms in place for ECLIPSE applying to
+#  ECLIPSE and the GNU GPL Version 3 applying for KNIME, provided the
+#  license terms of ECLIPSE themselves allow for the respective use and
+#  propagation of ECLIPSE together with KNIME.
+#
+#  Additional permission relating to nodes for KNIME that extend the Node
+#  Extension (and in particular that are based on subclasses of NodeModel,
+#  NodeDialog, and NodeView) and that only interoperate with KNIME through
+#  standard APIs ("Nodes"):
+#  Nodes are deemed to be separate and independent programs and to not be
+#  covered works.  Notwithstanding anything to the contrary in the
+#  License, the License does not apply to Nodes, you are not required to
+#  license Nodes under the License, and you are granted a license to
+#  prepare and propagate Nodes, in each case even if such Nodes are
+#  propagated with or for interoperation with KNIME.  The owner of a Node
+#  may freely choose the license terms applicable to such Node, including
+#  when such Node is propagated with or for interoperation with KNIME.
+# ------------------------------------------------------------------------
+
+"""
+Per-category telemetry of the messaging system.
+"""
+
+import threading
+from collections import deque
+from timeit import default_timer
+
+
+class MessagingStatistics(object):
+    """
+    Records statistics of the messages that pass through the messaging system, grouped by message category. Each
+    statistic is kept as a fixed-size histogram (see Histogram), so memory consumption does not grow with the number of
+    messages.
+    Replies carry the id of the message they reply to as their category. They are accounted to the category of that
+    message if it is still known (see _MAX_TRACKED_MESSAGE_IDS), otherwise to REPLY_CATEGORY.
+    Recording a sample only appends it to a queue of pending samples of its category and statistic and does not need
+    any locking. Pending samples are added to the histograms in batches, either when a queue holds
+    _MAX_PENDING_SAMPLES samples or when the statistics are summarized.
+    """
+
+    # Size of sent and received message frames (in bytes).
+    BYTES_IN = "bytes_in"
+
+    BYTES_OUT = "bytes_out"
+
+    # Time (in microseconds) a message waited in a queue of the messaging system or of a task, one sample per queue.
+    # Queues keep the time at which a message was enqueued along with the message (see MessageLanes).
+    QUEUE_WAIT_TIME = "queue_wait_time_us"
+
+    # Time (in microseconds) a task handler spent handling a message.
+    HANDLER_TIME = "handler_time_us"
+
+    # Time (in microseconds) spent encoding or decoding a message frame, including compression and shared memory.
+    SERIALIZATION_TIME = "serialization_time_us"
+
+    # Size (in bytes) of compressed payloads before and after compression (see PayloadCompression), one sample each per
+    # compressed payload.
+    UNCOMPRESSED_BYTES_IN = "uncompressed_bytes_in"
+
+    COMPRESSED_BYTES_IN = "compressed_bytes_in"
+
+    UNCOMPRESSED_BYTES_OUT = "uncompressed_bytes_out"
+
+    COMPRESSED_BYTES_OUT = "compressed_bytes_out"
+
+    # Size (in bytes) of payloads that exceeded the compression threshold but were sent uncompressed because they did
+    # not compress well. The count is the number of such payloads.
+    COMPRESSION_SKIPPED_BYTES = "compression_skipped_bytes"
+
+    # Time (in microseconds) spent compressing or decompressing a payload, including payloads whose compression was
+    # skipped after compressing their sample.
+    COMPRESSION_TIME = "compression_time_us"
+
+    REPLY_CATEGORY = "<reply>"
+
+    OTHER_CATEGORY = "<other>"
+
+    # Keys of the entries of summarize, in the order in which they are meant to be displayed.
+    SUMMARY_KEYS = ['category', 'statistic', 'count', 'sum', 'mean', 'max', 'p50', 'p90', 'p99']
+
+    _MAX_PENDING_SAMPLES = 1024
+
+    # Bounds the number of message ids that are remembered to resolve the categories of replies.
+    _MAX_TRACKED_MESSAGE_IDS = 4096
+
+    # Bounds the number of distinct categories. Samples of further categories are accounted to OTHER_CATEGORY.
+    _MAX_CATEGORIES = 256
+
+    # Returns the current time in seconds for measuring durations.
+    now = staticmethod(default_timer)
+
+    @staticmethod
+    def create(options):
+        """
+        Creates messaging statistics if the given messaging options (may be None) enable recording them, returns None
+        otherwise.
+        """
+        if options is None or not options.statistics:
+            return None
+        return MessagingStatistics()
+
+    def __init__(self):
+        # (category, statistic) -> deque of pending values. Values of frame statistics (BYTES_IN, BYTES_OUT) are
+        # (frame size, serialization time) pairs.
+        self._pending_samples = {}
+        # Two generations of message category or str(message id) -> category to which samples are accounted. The
+        # older generation is dropped once the newer one holds _MAX_TRACKED_MESSAGE_IDS entries.
+        self._categories = {}
+        self._previous_categories = {}
+        # Guards the following fields.
+        self._lock = threading.Lock()
+        self._known_categories = set()
+        # (category, statistic) -> Histogram
+        self._histograms = {}
+
+    def record_time(self, message, statistic, start):
+        """
+        Records the time that passed since start (see now) in microseconds for the category of the given message.
+        """
+        elapsed = int((default_timer() - start) * 1e6)
+        category = self._categories.get(message.category)
+        if category is None:
+            category = self._category_of(message)
+        self._record((category, statistic), elapsed)
+
+    def record_value(self, message, statistic, value):
+        """
+        Records the given non-negative integer for the category of the given message.
+        """
+        category = self._categories.get(message.category)
+        if category is None:
+            category = self._category_of(message)
+        self._record((category, statistic), value)
+
+    def record_frame(self, message, statistic, frame_size, start):
+        """
+        Records the size of a sent or received message frame along with the time it took to encode or decode it.
+        """
+        serialization_time = int((default_timer() - start) * 1e6)
+        category = self._categories.get(message.category)
+        if category is None:
+            category = self._category_of(message)
+        # Each message has exactly one frame, which is recorded before any reply to the message can arrive.
+        self._track(str(message.id), category)
+        self._record((category, statistic), (frame_size, serialization_time))
+
+    def summarize(self):
+        """
+        Returns a list of dictionaries, one per category and statistic, with the keys SUMMARY_KEYS. Percentiles are
+        estimated from the histograms and therefore only accurate up to a factor of two.
+        """
+        self._aggregate()
+        with self._lock:
+            histograms = [(key, histogram.copy()) for key, histogram in self._histograms.items()]
+        summary = []
+        for (category, statistic), histogram in sorted(histograms, key=lambda h: h[0]):
+            count = histogram.count
+            summary.append({'category': category,
+                            'statistic': statistic,
+                            'count': count,
+                            'sum': histogram.sum,
+                            'mean': float(histogram.sum) / count if count else 0.0,
+                            'max': histogram.max,
+                            'p50': histogram.percentile(0.5),
+                            'p90': histogram.percentile(0.9),
+                            'p99': histogram.percentile(0.99)})
+        return summary
+
+    def _category_of(self, message):
+        category = message.category
+        resolved = self._categories.get(category)
+        if resolved is None:
+            resolved = self._previous_categories.get(category)
+            if resolved is None:
+                resolved = MessagingStatistics.REPLY_CATEGORY if _is_message_id(category) else category
+            self._track(category, resolved)
+        return resolved
+
+    def _track(self, key, category):
+        categories = self._categories
+        if len(categories) >= MessagingStatistics._MAX_TRACKED_MESSAGE_IDS:
+            # Concurrent swaps may drop a generation early, which only affects the accounting of replies.
+            self._previous_categories = categories
+            categories = self._categories = {}
+        categories[key] = category
+
+    def _record(self, key, value):
+        values = self._pending_samples.get(key)
+        if values is None:
+            values = self._create_pending_samples(key)
+        values.append(value)
+        if len(values) >= MessagingStatistics._MAX_PENDING_SAMPLES:
+            self._aggregate()
+
+    def _create_pending_samples(self, key):
+        with self._lock:
+            category, statistic = key
+            if category not in self._known_categories:
+                if len(self._known_categories) >= MessagingStatistics._MAX_CATEGORIES:
+                    category = MessagingStatistics.OTHER_CATEGORY
+                self._known_categories.add(category)
+            # Samples of categories beyond the limit share the queue of OTHER_CATEGORY.
+            values = self._pending_samples.get((category, statistic))
+            if values is None:
+                values = self._pending_samples[(category, statistic)] = deque()
+            self._pending_samples[key] = values
+            return values
+
+    def _aggregate(self):
+        with self._lock:
+            for key, values in list(self._pending_samples.items()):
+                # Samples that are recorded meanwhile are either aggregated here or remain pending.
+                batch = [values.popleft() for _ in range(len(values))]
+                if not batch:
+                    continue
+                category, statistic = key
+                if statistic == MessagingStatistics.BYTES_IN or statistic == MessagingStatistics.BYTES_OUT:
+                    frame_sizes, serialization_times = zip(*batch)
+                    self._get_histogram(category, statistic).add_all(frame_sizes)
+                    self._get_histogram(category, MessagingStatistics.SERIALIZATION_TIME).add_all(
+                        serialization_times)
+                else:
+                    self._get_histogram(category, statistic).add_all(batch)
+
+    def _get_histogram(self, category, statistic):
+        histogram = self._histograms.get((category, statistic))
+        if histogram is None:
+            histogram = self._histograms[(category, statistic)] = Histogram()
+        return histogram
+
+
+class Histogram(object):
+    """
+    Histogram of non-negative integers with logarithmic buckets: bucket i counts the values v with
+    2^(i-1) <= v < 2^i, bucket 0 counts zeros. Also keeps the exact sum and maximum of the values.
+    """
+
+    _NUM_BUCKETS = 64
+
+    def __init__(self):
+        self.buckets = [0] * Histogram._NUM_BUCKETS
+        self.sum = 0
+        self.max = 0
+
+    @property
+    def count(self):
+        return sum(self.buckets)
+
+    def add_all(self, values):
+        if min(values) < 0:
+            # Durations measured using a clock that is not monotonic (Python 2).
+            values = [max(value, 0) for value in values]
+        buckets = self.buckets
+        for value in values:
+            buckets[value.bit_length()] += 1
+        self.sum += sum(values)
+        self.max = max(self.max, max(values))
+
+    def copy(self):
+        histogram = Histogram()
+        histogram.buckets = list(self.buckets)
+        histogram.sum = self.sum
+        histogram.max = self.max
+        return histogram
+
+    def percentile(self, fraction):
+        """
+        Returns the upper bound of the bucket that contains the given fraction of the values, capped at the maximum.
+        """
+        rank = fraction * self.count
+        cumulative = 0
+        for bucket, bucket_count in enumerate(self.buckets):
+            cumulative += bucket_count
+            if cumulative >= rank and cumulative > 0:
+                return min((1 << bucket) - 1, self.max)
+        return 0
+
+
+def _is_message_id(category):
+    return category.lstrip('-').isdigit()
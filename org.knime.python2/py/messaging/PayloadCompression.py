@@ -0,0 +1,144 @@
+# -*- coding: utf-8 -*-
+# ------------------------------------------------------------------------
+#  Copyright by KNIME AG, Zurich, Switzerland
+#  Website: http://www.knime.com; Email: contact@knime.com
+#
+#  This program is free software; you can redistribute it and/or modify
+#  it under the terms of the GNU General Public License, Version 3, as
+#  published by the Free Software Foundation.
+#
+#  This program is distributed in the hope that it will be useful, but
+#  WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with this program; if not, see <http://www.gnu.org/licenses>.
+#
+#  Additional permission under GNU GPL version 3 section 7:
+#
+#  KNIME interoperates with ECLIPSE solely via ECLIPSE's plug-in APIs.
+#  Hence, KNIME and ECLIPSE are both independent programs and are not
+#  derived from each other. Should, however, the interpretation of the
+#  GNU GPL Version 3 ("License") under any applicable laws result in
+#  KNIME and ECLIPSE being a combined program, KNIME AG herewith grants
+#  you the additional permission to use and propagate KNIME together with
+#  ECLIPSE with only the license terms in place for ECLIPSE applying to
+#  ECLIPSE and the GNU GPL Version 3 applying for KNIME, provided the
+#  license terms of ECLIPSE themselves allow for the respective use and
+#  propagation of ECLIPSE together with KNIME.
+#
+#  Additional permission relating to nodes for KNIME that extend the Node
+#  Extension (and in particular that are based on subclasses of NodeModel,
+#  NodeDialog, and NodeView) and that only interoperate with KNIME through
+#  standard APIs ("Nodes"):
+#  Nodes are deemed to be separate and independent programs and to not be
+#  covered works.  Notwithstanding anything to the contrary in the
+#  License, the License does not apply to Nodes, you are not required to
+#  license Nodes under the License, and you are granted a license to
+#  prepare and propagate Nodes, in each case even if such Nodes are
+#  propagated with or for interoperation with KNIME.  The owner of a Node
+#  may freely choose the license terms applicable to such Node, including
+#  when such Node is propagated with or for interoperation with KNIME.
+# ------------------------------------------------------------------------
+
+import zlib
+
+import EnvironmentHelper
+
+if EnvironmentHelper.is_python3():
+    def _as_compressible(payload):
+        return payload
+else:
+    # Python 2's zlib only accepts strings and read-only buffers.
+    def _as_compressible(payload):
+        if isinstance(payload, bytes):
+            return payload
+        elif isinstance(payload, bytearray):
+            return bytes(payload)
+        elif isinstance(payload, memoryview):
+            return payload.tobytes()
+        else:
+            # E.g. memory-mapped shared memory segments.
+            return payload[:]
+
+
+class PayloadCompression(object):
+    """
+    Optional compression of message payloads. A compressed message carries the name of the codec and the size of the
+    uncompressed payload in its header (see HEADER_FIELD_KEY and UNCOMPRESSED_SIZE_HEADER_FIELD_KEY). Payloads are only
+    compressed if they exceed a size threshold and if compressing a sample of them indicates that the data is
+    compressible. Received payloads are decompressed regardless of whether compression is enabled for sending.
+    Sender and receiver record the compressed sizes and the time spent in their MessagingStatistics.
+    """
+
+    HEADER_FIELD_KEY = "compression"
+
+    UNCOMPRESSED_SIZE_HEADER_FIELD_KEY = "uncompressed_size"
+
+    ZLIB = "zlib"
+
+    # Fastest zlib level, the transfer is meant to get faster, not smaller at any cost.
+    _ZLIB_LEVEL = 1
+
+    _SAMPLE_SIZE = 16 * 1024
+
+    # Payloads whose sample does not shrink below this ratio are sent uncompressed.
+    _MAX_SAMPLE_RATIO = 0.9
+
+    @staticmethod
+    def create(options):
+        """
+        Creates a payload compression as configured by the given messaging options (may be None).
+        """
+        if options is None or options.compression is None:
+            return PayloadCompression()
+        return PayloadCompression(options.compression, options.compression_threshold)
+
+    def __init__(self, codec=None, threshold=0):
+        """
+        @param codec the codec used to compress payloads that are sent, None if payloads are not compressed
+        @param threshold the minimum payload size in bytes above which payloads are compressed
+        """
+        if codec is not None and codec != PayloadCompression.ZLIB:
+            raise ValueError("Unsupported compression codec: '" + codec + "'.")
+        self._codec = codec
+        self._threshold = threshold
+
+    @property
+    def codec(self):
+        return self._codec
+
+    def should_compress(self, payload_size):
+        """
+        Returns whether compressing a payload of the given size is attempted. Such a payload may still be sent
+        uncompressed if it does not compress well (see compress).
+        """
+        return self._codec is not None and payload_size > 0 and payload_size >= self._threshold
+
+    def compress(self, payload):
+        """
+        Returns the compressed payload or None if the payload should be sent uncompressed.
+        """
+        size = len(payload)
+        if not self.should_compress(size):
+            return None
+        payload = _as_compressible(payload)
+        sample = payload[:PayloadCompression._SAMPLE_SIZE]
+        sample_ratio = float(len(zlib.compress(sample, PayloadCompression._ZLIB_LEVEL))) / len(sample)
+        if sample_ratio > PayloadCompression._MAX_SAMPLE_RATIO:
+            compressed = None
+        else:
+            compressed = zlib.compress(payload, PayloadCompression._ZLIB_LEVEL)
+            if len(compressed) >= size:
+                compressed = None
+        return compressed
+
+    def decompress(self, codec, payload, uncompressed_size):
+        if codec != PayloadCompression.ZLIB:
+            raise ValueError("Unsupported compression codec: '" + codec + "'.")
+        decompressed = zlib.decompress(_as_compressible(payload))
+        if len(decompressed) != uncompressed_size:
+            raise ValueError("Decompressed payload has size " + str(len(decompressed)) + " instead of " + str(
+                uncompressed_size) + ".")
+        return decompressed
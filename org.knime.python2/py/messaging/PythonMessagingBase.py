@@ -50,15 +50,17 @@
 import abc
 
 from messaging.MessageDistributor import MessageDistributor
+from messaging.MessagingStatistics import MessagingStatistics
 
 
 class PythonMessagingBase(object):
     __metaclass__ = abc.ABCMeta
 
-    def __init__(self):
+    def __init__(self, options=None):
         self._is_running = False
         self._message_id = -1
         self._distributor = MessageDistributor()
+        self._statistics = MessagingStatistics.create(options)
 
     def __enter__(self):
         return self
@@ -90,6 +92,14 @@ class PythonMessagingBase(object):
     def is_running(self):
         return self._is_running
 
+    @property
+    def statistics(self):
+        """
+        The MessagingStatistics of this messaging system, None if recording them is disabled (see
+        MessagingOptions.statistics).
+        """
+        return self._statistics
+
     def create_next_message_id(self):
         """
         Returns the next unique message id.
@@ -104,6 +114,16 @@ class PythonMessagingBase(object):
     def unregister_message_handler(self, message_category):
         return self._distributor.unregister_message_handler(message_category)
 
+    def register_reply_handler(self, message_id, handler):
+        """
+        Routes replies to the message with the given id to the given handler (see
+        MessageDistributor.register_reply_handler).
+        """
+        return self._distributor.register_reply_handler(message_id, handler)
+
+    def unregister_reply_handler(self, message_id):
+        return self._distributor.unregister_reply_handler(message_id)
+
     def start(self):
         if not self._is_running:
             self._is_running = True
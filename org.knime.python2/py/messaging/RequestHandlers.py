@@ -64,15 +64,22 @@ import sys
 import pandas
 
 import PythonUtils
+from CancellationToken import TaskCancelledError
+from CancellationToken import current_token
 from debug_util import debug_msg
+from debug_util import is_debug_log_enabled
 from DBUtil import DBUtil
 from messaging.AbstractTaskHandler import AbstractTaskHandler
 from messaging.Message import Message
 from messaging.Message import PayloadDecoder
 from messaging.Message import PayloadEncoder
+from messaging.MessagingStatistics import MessagingStatistics
 
 
 class AbstractRequestHandler(AbstractTaskHandler):
+    # Requests are answered by a single response.
+    handles_single_message = True
+
     @staticmethod
     def _create_response(request, response_message_id, success=True, response_payload=None,
                          response_additional_options=None):
@@ -88,12 +95,18 @@ class AbstractRequestHandler(AbstractTaskHandler):
     def _handle_custom_message(self, message, response_message_id_supplier, response_consumer, result_consumer,
                                workspace):
         response_message_id = response_message_id_supplier()
+        cancellation_tokens = workspace.cancellation_tokens
         try:
-            debug_msg("Python - Respond to message: " + str(message))
-            response = self._respond(message, response_message_id, workspace)
-            debug_msg("Python - Responded to message: " + str(message) + ", response: " + str(response))
+            if is_debug_log_enabled():
+                debug_msg("Python - Respond to message: " + str(message))
+            # Java may cancel the request while it is queued or handled (see PythonKernelBase.cancel_task).
+            with cancellation_tokens.acquire(message.id).applied() as token:
+                token.check()
+                response = self._respond(message, response_message_id, workspace)
+            if is_debug_log_enabled():
+                debug_msg("Python - Responded to message: " + str(message) + ", response: " + str(response))
             response_consumer[0] = response
-        except Exception as ex:
+        except (Exception, TaskCancelledError) as ex:
             error_message = str(ex)
             debug_msg(error_message, exc_info=True)
             # Inform Java that handling the request did not work.
@@ -101,6 +114,8 @@ class AbstractRequestHandler(AbstractTaskHandler):
                                                                      response_payload=_create_string_payload(
                                                                          error_message))
             response_consumer[0] = error_response
+        finally:
+            cancellation_tokens.release(message.id)
         result_consumer(None)  # We are done after the response (either success or failure) is sent.
         return True
 
@@ -136,9 +151,7 @@ class GetFlowVariablesRequestHandler(AbstractRequestHandler):
     def _respond(self, request, response_message_id, workspace):
         name = PayloadDecoder(request.payload).get_next_string()
 
-        variables = workspace.get_variable(name)
-        data_frame = workspace.serializer.flow_variables_dict_to_data_frame(variables)
-        data_bytes = workspace.serializer.data_frame_to_bytes(data_frame)
+        data_bytes = _flow_variables_to_bytes(workspace, name)
 
         return AbstractRequestHandler._create_response(request, response_message_id,
                                                        response_payload=_create_byte_array_payload(data_bytes))
@@ -168,6 +181,29 @@ class AppendToTableRequestHandler(AbstractRequestHandler):
         return AbstractRequestHandler._create_response(request, response_message_id)
 
 
+class PutTablesRequestHandler(AbstractRequestHandler):
+    """
+    Puts or appends chunks of several tables at once. Payload: (number of chunks: int32) followed by
+    (name: string)(append: int32)(chunk: bytes) per chunk.
+    """
+
+    def _respond(self, request, response_message_id, workspace):
+        payload_decoder = PayloadDecoder(request.payload)
+        num_chunks = payload_decoder.get_next_int()
+
+        for _ in range(num_chunks):
+            name = payload_decoder.get_next_string()
+            append = payload_decoder.get_next_int() != 0
+            data_bytes = payload_decoder.get_next_bytes()
+            data_frame = workspace.serializer.bytes_to_data_frame(data_bytes)
+            if append:
+                workspace.append_to_table(name, data_frame)
+            else:
+                workspace.put_variable(name, data_frame)
+
+        return AbstractRequestHandler._create_response(request, response_message_id)
+
+
 class GetTableSizeRequestHandler(AbstractRequestHandler):
     def _respond(self, request, response_message_id, workspace):
         name = PayloadDecoder(request.payload).get_next_string()
@@ -182,10 +218,7 @@ class GetTableRequestHandler(AbstractRequestHandler):
     def _respond(self, request, response_message_id, workspace):
         name = PayloadDecoder(request.payload).get_next_string()
 
-        data_frame = workspace.get_variable(name)
-        if type(data_frame) != pandas.core.frame.DataFrame:
-            raise TypeError("Expected pandas.DataFrame, got: " + str(type(data_frame))
-                            + "\nPlease make sure your output_table is a pandas.DataFrame.")
+        data_frame = _get_data_frame(workspace, name)
         data_bytes = workspace.serializer.data_frame_to_bytes(data_frame)
 
         return AbstractRequestHandler._create_response(request, response_message_id,
@@ -199,17 +232,39 @@ class GetTableChunkRequestHandler(AbstractRequestHandler):
         start = payload_decoder.get_next_int()
         end = payload_decoder.get_next_int()
 
-        data_frame = workspace.get_variable(name)
-        if type(data_frame) != pandas.core.frame.DataFrame:
-            raise TypeError("Expected pandas.DataFrame, got: " + str(type(data_frame))
-                            + "\nPlease make sure your output_table is a pandas.DataFrame.")
-        data_frame_chunk = data_frame[start:end + 1]
-        data_bytes = workspace.serializer.data_frame_to_bytes(data_frame_chunk, start)
+        data_frame = _get_data_frame(workspace, name)
+        data_bytes = _get_table_chunk(workspace, name, data_frame, start, end)
 
         return AbstractRequestHandler._create_response(request, response_message_id,
                                                        response_payload=_create_byte_array_payload(data_bytes))
 
 
+class GetTablesRequestHandler(AbstractRequestHandler):
+    """
+    Gets chunks of several tables at once. Payload: (number of chunks: int32) followed by
+    (name: string)(start: int32)(end: int32) per chunk, where end is clipped to the size of the table. Response:
+    (number of chunks: int32) followed by (table size: int32)(chunk: bytes) per chunk. Requesting the first chunk of
+    each table therefore also yields the table sizes.
+    """
+
+    def _respond(self, request, response_message_id, workspace):
+        payload_decoder = PayloadDecoder(request.payload)
+        num_chunks = payload_decoder.get_next_int()
+
+        payload_encoder = PayloadEncoder().put_int(num_chunks)
+        for _ in range(num_chunks):
+            name = payload_decoder.get_next_string()
+            start = payload_decoder.get_next_int()
+            end = payload_decoder.get_next_int()
+            data_frame = _get_data_frame(workspace, name)
+            end = min(end, len(data_frame))
+            data_bytes = _get_table_chunk(workspace, name, data_frame, start, end)
+            payload_encoder.put_int(len(data_frame)).put_bytes(data_bytes)
+
+        return AbstractRequestHandler._create_response(request, response_message_id,
+                                                       response_payload=payload_encoder.payload)
+
+
 class PutObjectRequestHandler(AbstractRequestHandler):
     def _respond(self, request, response_message_id, workspace):
         payload_decoder = PayloadDecoder(request.payload)
@@ -293,6 +348,17 @@ class ListVariablesRequestHandler(AbstractRequestHandler):
                                                        response_payload=_create_byte_array_payload(data_bytes))
 
 
+class GetStatsRequestHandler(AbstractRequestHandler):
+    def _respond(self, request, response_message_id, workspace):
+        statistics = workspace.messaging_statistics
+        summary = statistics.summarize() if statistics is not None else []
+        data_frame = pandas.DataFrame(summary, columns=MessagingStatistics.SUMMARY_KEYS)
+        data_bytes = workspace.serializer.data_frame_to_bytes(data_frame)
+
+        return AbstractRequestHandler._create_response(request, response_message_id,
+                                                       response_payload=_create_byte_array_payload(data_bytes))
+
+
 class HasAutoCompleteRequestHandler(AbstractRequestHandler):
     def _respond(self, request, response_message_id, workspace):
         value = 1 if workspace.has_auto_complete() else 0
@@ -363,6 +429,41 @@ class ExecuteRequestHandler(AbstractRequestHandler):
         return AbstractRequestHandler._create_response(request, response_message_id, response_payload=response_payload)
 
 
+class ExecuteAndCollectRequestHandler(AbstractRequestHandler):
+    """
+    Executes source code and responds with its output along with the flow variables and the first chunk of each of the
+    given tables, saving the separate requests that usually follow an execution. Payload: (source code: string)
+    (flow variables name: string)(chunk size: int32)(number of tables: int32) followed by (table name: string) per
+    table. Response: (output: string)(error: string) and, if the execution succeeded, (flow variables: bytes) followed
+    by (table size: int32)(first chunk: bytes) per table. The remaining chunks can be fetched via getTables.
+    """
+
+    def _respond(self, request, response_message_id, workspace):
+        payload_decoder = PayloadDecoder(request.payload)
+        source_code = payload_decoder.get_next_string()
+        flow_variables_name = payload_decoder.get_next_string()
+        chunk_size = payload_decoder.get_next_int()
+        num_tables = payload_decoder.get_next_int()
+        table_names = [payload_decoder.get_next_string() for _ in range(num_tables)]
+
+        debug_msg('Executing:\n' + source_code + '\n')
+        output, error = workspace.execute(source_code, request.id)
+        payload_encoder = PayloadEncoder().put_string(output).put_string(error)
+        if error:
+            debug_msg('Error during execution. Message: \'' + error + '\'', exc_info=True)
+        else:
+            debug_msg('Execution done.')
+            payload_encoder.put_bytes(_flow_variables_to_bytes(workspace, flow_variables_name))
+            for name in table_names:
+                data_frame = _get_data_frame(workspace, name)
+                end = min(chunk_size - 1, len(data_frame))
+                data_bytes = _get_table_chunk(workspace, name, data_frame, 0, end)
+                payload_encoder.put_int(len(data_frame)).put_bytes(data_bytes)
+
+        return AbstractRequestHandler._create_response(request, response_message_id,
+                                                       response_payload=payload_encoder.payload)
+
+
 class ResetRequestHandler(AbstractRequestHandler):
     def _respond(self, request, response_message_id, workspace):
         workspace.reset()
@@ -390,12 +491,15 @@ _builtin_request_handlers = {'getpid': GetPidRequestHandler(),
                              'getTableSize': GetTableSizeRequestHandler(),
                              'getTable': GetTableRequestHandler(),
                              'getTableChunk': GetTableChunkRequestHandler(),
+                             'putTables': PutTablesRequestHandler(),
+                             'getTables': GetTablesRequestHandler(),
                              'putObject': PutObjectRequestHandler(),
                              'getObject': GetObjectRequestHandler(),
                              'putSql': PutSqlRequestHandler(),
                              'getSql': GetSqlRequestHandler(),
                              'getImage': GetImageRequestHandler(),
                              'listVariables': ListVariablesRequestHandler(),
+                             'getStats': GetStatsRequestHandler(),
                              'hasAutoComplete': HasAutoCompleteRequestHandler(),
                              'autoComplete': AutoCompleteRequestHandler(),
                              'addSerializer': AddSerializerRequestHandler(),
@@ -403,6 +507,7 @@ _builtin_request_handlers = {'getpid': GetPidRequestHandler(),
                              'setCustomModulePaths': SetCustomModulePathsRequestHandler(),
                              'execute': ExecuteRequestHandler(),
                              'execute_async': ExecuteRequestHandler(),
+                             'executeAndCollect': ExecuteAndCollectRequestHandler(),
                              'reset': ResetRequestHandler(),
                              'cleanup': CleanupRequestHandler(),
                              'shutdown': ShutdownRequestHandler()}
@@ -412,6 +517,32 @@ def get_builtin_request_handlers():
     return _builtin_request_handlers.copy()
 
 
+def _flow_variables_to_bytes(workspace, name):
+    variables = workspace.get_variable(name)
+    data_frame = workspace.serializer.flow_variables_dict_to_data_frame(variables)
+    return workspace.serializer.data_frame_to_bytes(data_frame)
+
+
+def _get_data_frame(workspace, name):
+    data_frame = workspace.get_variable(name)
+    if type(data_frame) != pandas.core.frame.DataFrame:
+        raise TypeError("Expected pandas.DataFrame, got: " + str(type(data_frame))
+                        + "\nPlease make sure your output_table is a pandas.DataFrame.")
+    return data_frame
+
+
+def _get_table_chunk(workspace, name, data_frame, start, end):
+    """
+    Gets the chunk of the given table via the kernel's TableChunkPrefetcher. Java does not fetch the remaining chunks
+    of a table if it cancels the request, so the chunks prefetched for the table are invalidated in that case.
+    """
+    token = current_token()
+    if token is not None:
+        prefetcher = workspace.table_chunk_prefetcher
+        token.add_cancel_callback(lambda: prefetcher.invalidate(name))
+    return workspace.table_chunk_prefetcher.get_chunk(name, data_frame, start, end)
+
+
 def _create_byte_array_payload(value):
     return PayloadEncoder().put_bytes(value).payload
 
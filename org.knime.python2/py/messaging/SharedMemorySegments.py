@@ -0,0 +1,104 @@
+# -*- coding: utf-8 -*-
+# ------------------------------------------------------------------------
+#  Copyright by KNIME AG, Zurich, Switzerland
+#  Website: http://www.knime.com; Email: contact@knime.com
+#
+#  This program is free software; you can redistribute it and/or modify
+#  it under the terms of the GNU General Public License, Version 3, as
+#  published by the Free Software Foundation.
+#
+#  This program is distributed in the hope that it will be useful, but
+#  WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with this program; if not, see <http://www.gnu.org/licenses>.
+#
+#  Additional permission under GNU GPL version 3 section 7:
+#
+#  KNIME interoperates with ECLIPSE solely via ECLIPSE's plug-in APIs.
+#  Hence, KNIME and ECLIPSE are both independent programs and are not
+#  derived from each other. Should, however, the interpretation of the
+#  GNU GPL Version 3 ("License") under any applicable laws result in
+#  KNIME and ECLIPSE being a combined program, KNIME AG herewith grants
+#  you the additional permission to use and propagate KNIME together with
+#  ECLIPSE with only the license terms in place for ECLIPSE applying to
+#  ECLIPSE and the GNU GPL Version 3 applying for KNIME, provided the
+#  license terms of ECLIPSE themselves allow for the respective use and
+#  propagation of ECLIPSE together with KNIME.
+#
+#  Additional permission relating to nodes for KNIME that extend the Node
+#  Extension (and in particular that are based on subclasses of NodeModel,
+#  NodeDialog, and NodeView) and that only interoperate with KNIME through
+#  standard APIs ("Nodes"):
+#  Nodes are deemed to be separate and independent programs and to not be
+#  covered works.  Notwithstanding anything to the contrary in the
+#  License, the License does not apply to Nodes, you are not required to
+#  license Nodes under the License, and you are granted a license to
+#  prepare and propagate Nodes, in each case even if such Nodes are
+#  propagated with or for interoperation with KNIME.  The owner of a Node
+#  may freely choose the license terms applicable to such Node, including
+#  when such Node is propagated with or for interoperation with KNIME.
+# ------------------------------------------------------------------------
+
+import itertools
+import mmap
+import os
+import shutil
+import tempfile
+
+
+class SharedMemorySegments(object):
+    """
+    Side channel for large message payloads. Instead of writing a payload to the socket, the sender writes it into a
+    file in a memory-backed file system (e.g. /dev/shm) and only sends the file's path in the message header (see
+    HEADER_FIELD_KEY). The receiver maps the file into memory and deletes it. Deleting the file acknowledges the message
+    and the memory is released as soon as the mapped payload is no longer referenced. Segments that were never
+    acknowledged are removed when the segments are closed.
+    """
+
+    HEADER_FIELD_KEY = "shm"
+
+    @staticmethod
+    def create(options):
+        """
+        Creates the shared memory segments as configured by the given messaging options. Returns None if the shared
+        memory side channel is disabled.
+        """
+        if options.shared_memory_directory is None or options.shared_memory_threshold <= 0:
+            return None
+        return SharedMemorySegments(options.shared_memory_directory, options.shared_memory_threshold)
+
+    @staticmethod
+    def read_and_release(segment):
+        """
+        Maps the shared memory segment at the given path into memory and releases the segment. Returns the mapped
+        payload as a read-only buffer.
+        """
+        with open(segment, 'rb') as f:
+            payload = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        # The mapping stays valid after the file is removed.
+        os.remove(segment)
+        return payload
+
+    def __init__(self, base_directory, threshold):
+        self._directory = tempfile.mkdtemp(prefix='knime-python-', dir=base_directory)
+        self._threshold = threshold
+        self._segment_counter = itertools.count()
+
+    def should_offload(self, payload_size):
+        return payload_size >= self._threshold
+
+    def write(self, payload):
+        """
+        Writes the given payload into a new segment and returns the path of the segment that needs to be sent in the
+        message header.
+        """
+        segment = os.path.join(self._directory, str(next(self._segment_counter)))
+        with open(segment, 'wb') as f:
+            f.write(payload)
+        return segment
+
+    def close(self):
+        shutil.rmtree(self._directory, ignore_errors=True)
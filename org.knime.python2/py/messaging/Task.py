@@ -51,11 +51,13 @@ from threading import Condition
 from threading import Lock
 
 from debug_util import debug_msg
+from debug_util import is_debug_log_enabled
+from messaging.MessagingStatistics import MessagingStatistics
 
 
 class TaskFactory(object):
     def __init__(self, task_handler, message_sender, message_handlers, receive_queue_factory, message_id_supplier,
-                 workspace, executor):
+                 workspace, executor, statistics=None):
         self._delegate_task_handler = task_handler
         self._message_sender = message_sender
         self._message_handlers = message_handlers
@@ -63,21 +65,49 @@ class TaskFactory(object):
         self._receive_queue_factory = receive_queue_factory
         self._workspace = workspace
         self._executor = executor
+        self._statistics = statistics
 
     def create_task(self):
         return Task(None, self._delegate_task_handler, self._message_sender, self._message_handlers,
                     self._receive_queue_factory(),
-                    self._message_id_supplier, self._workspace, self._executor)
+                    self._message_id_supplier, self._workspace, self._executor, self._statistics)
 
     def handle(self, message):
-        return self.create_task().handle(message)
+        if self._delegate_task_handler.handles_single_message:
+            # Fast path: the task would consist of handling just this message, so handle it directly on the executor
+            # instead of creating a task with its own receive queue and synchronization.
+            enqueue_time = self._statistics.now() if self._statistics is not None else None
+            self._executor.submit(self._handle_single_message, message, enqueue_time)
+            return True
+        else:
+            return self.create_task().handle(message)
+
+    def _handle_single_message(self, message, enqueue_time):
+        if is_debug_log_enabled():
+            debug_msg("Python - Run single message task, message: " + str(message))
+        statistics = self._statistics
+        try:
+            if statistics is not None:
+                statistics.record_time(message, MessagingStatistics.QUEUE_WAIT_TIME, enqueue_time)
+                start = statistics.now()
+            to_send = self._delegate_task_handler.handle(message, self._message_handlers, self._message_id_supplier,
+                                                         _ignore_result, self._workspace)
+            if statistics is not None:
+                statistics.record_time(message, MessagingStatistics.HANDLER_TIME, start)
+            if to_send is not None:
+                self._message_sender.send(to_send)
+        except BaseException as ex:
+            debug_msg("An exception occurred while running a task. Cause: " + str(ex), exc_info=True)
+            raise
 
 
 class Task(object):
     def __init__(self, message, task_handler, message_sender, message_handlers, receive_queue, message_id_supplier,
-                 workspace, executor):
+                 workspace, executor, statistics=None):
         """
         @param receive_queue  this differs from Java.
+        @param statistics the MessagingStatistics that record the time the task handler takes, None if no statistics
+                          are recorded. The time messages wait for the task is recorded by receive_queue.
         """
         self._initiating_message = message
         self._delegate_task = Task.FutureTask(self._run_internal)
@@ -87,8 +117,9 @@ class Task(object):
         self._message_id_supplier = message_id_supplier
         self._workspace = workspace
         self._executor = executor
+        self._statistics = statistics
         self._received_messages = receive_queue
-        self._registered_message_categories = []
+        self._registered_reply_ids = []
         self._is_running_or_done = False
         self._is_running_or_done_lock = Lock()
         self._task_category = None
@@ -101,7 +132,8 @@ class Task(object):
                 return
             else:
                 self._is_running_or_done = True
-        debug_msg("Python - Start running task, initiating message: " + str(self._initiating_message))
+        if is_debug_log_enabled():
+            debug_msg("Python - Start running task, initiating message: " + str(self._initiating_message))
         self._executor.submit(self._delegate_task.run)
 
     def get(self):
@@ -109,28 +141,28 @@ class Task(object):
         return self._delegate_task.get()
 
     def handle(self, message):
-        debug_msg(
-            "Python - Enqueue message for task, message: " + str(message) + ", initiating message: " + str(
-                self._initiating_message))
+        if is_debug_log_enabled():
+            debug_msg(
+                "Python - Enqueue message for task, message: " + str(message) + ", initiating message: " + str(
+                    self._initiating_message))
         self._received_messages.put(message)
         debug_msg("Python - Now calling 'run'.")
         self.run()  # Start task if not already running.
         return True
 
     def _run_internal(self):
-        debug_msg("Python - Run task, initiating message: " + str(self._initiating_message))
+        if is_debug_log_enabled():
+            debug_msg("Python - Run task, initiating message: " + str(self._initiating_message))
         to_send = self._initiating_message
         while not self._delegate_task.is_done:
             if to_send is not None:
-                message_category = str(to_send.id)
                 if self._task_category is None:
-                    self._task_category = message_category
-                # TODO: Only register for first sent message (i.e. task category) and replace subsequent
-                # registrations by reply-to pattern.
-                if not self._message_handlers.register_message_handler(message_category, self):
-                    raise RuntimeError("Message handler for category '" + message_category + "' is already registered.")
+                    self._task_category = str(to_send.id)
+                # Replies to the message are routed to this task via the id of the message.
+                if not self._message_handlers.register_reply_handler(to_send.id, self):
+                    raise RuntimeError("Reply handler for message id '" + str(to_send.id) + "' is already registered.")
                 else:
-                    self._registered_message_categories.append(message_category)
+                    self._registered_reply_ids.append(to_send.id)
                 self._message_sender.send(to_send)
             debug_msg(
                 "Python - Wait for message in task, initiating message: " + str(self._initiating_message))
@@ -138,17 +170,22 @@ class Task(object):
             debug_msg(
                 "Python - Received message in task, message: " + str(received) + ", initiating message: " + str(
                     self._initiating_message))
+            statistics = self._statistics
+            if statistics is not None:
+                start = statistics.now()
             to_send = self._delegate_task_handler.handle(
                 received, self._message_handlers, self._message_id_supplier, self._set_result, self._workspace)
+            if statistics is not None:
+                statistics.record_time(received, MessagingStatistics.HANDLER_TIME, start)
         # Send pending message if any.
         # This may happen if the act of responding to a message also marks (successful) termination of the task.
         if to_send is not None:
             self._message_sender.send(to_send)
 
-        # Unregister message handlers to remove references to this task instance.
-        for message_category in self._registered_message_categories:
-            self._message_handlers.unregister_message_handler(message_category)
-        del self._registered_message_categories[:]
+        # Unregister reply handlers to remove references to this task instance.
+        for message_id in self._registered_reply_ids:
+            self._message_handlers.unregister_reply_handler(message_id)
+        del self._registered_reply_ids[:]
 
         # Message may contain heavy payload. Dereference to obviate memory leak.
         self._initiating_message = None
@@ -209,3 +246,7 @@ class Task(object):
                     self._exception = exception
                     self._is_done = True
                     self._condition.notify()
+
+
+def _ignore_result(result):
+    pass
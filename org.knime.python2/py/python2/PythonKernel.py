@@ -69,5 +69,14 @@ class PythonKernel(PythonKernelBase):
     def _create_executor(self):
         return MainThreadExecutor()
 
-    def _create_messaging(self, connection):
-        return PythonMessaging(connection)
+    def _create_prefetch_executor(self):
+        # Serializing may involve requests to Java, which the single-threaded Python 2 messaging system cannot handle
+        # in parallel to the main loop.
+        return None
+
+    def _create_parallel_conversion(self):
+        # Python 2 lacks concurrent.futures.
+        return None
+
+    def _create_messaging(self, connection, data_connection):
+        return PythonMessaging(connection, self._messaging_options, self._shared_memory, data_connection)
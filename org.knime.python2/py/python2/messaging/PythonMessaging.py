@@ -47,10 +47,14 @@
 @author Christian Dietz, KNIME GmbH, Konstanz, Germany
 """
 
+import select
 from Queue import Empty
 
+from messaging.MessageHeaderCodec import MessageHeaderCodec
+from messaging.MessagePriority import MessagePriority
 from messaging.MessageReceiver import MessageReceiver
 from messaging.MessageSender import MessageSender
+from messaging.PayloadCompression import PayloadCompression
 from messaging.PythonMessagingBase import PythonMessagingBase
 
 
@@ -59,16 +63,36 @@ class PythonMessaging(PythonMessagingBase):
     The Python 2 messaging system.
     """
 
-    def __init__(self, connection):
-        super(PythonMessaging, self).__init__()
-        self._sender = MessageSender(connection)
-        self._receiver = MessageReceiver(connection)
+    def __init__(self, connection, options=None, shared_memory=None, data_connection=None):
+        """
+        @param data_connection the connection via which bulk messages are sent and received, None if all messages are
+                               exchanged via the given connection
+        """
+        super(PythonMessaging, self).__init__(options)
+        header_format = options.header_format if options is not None else None
+        self._compression = PayloadCompression.create(options)
+        self._sender = MessageSender(connection, MessageHeaderCodec.create(header_format), shared_memory,
+                                     self._compression, self._statistics)
+        self._receiver = MessageReceiver(connection, MessageHeaderCodec.create(header_format), self._compression,
+                                         self._statistics)
+        if data_connection is not None:
+            self._data_sender = MessageSender(data_connection, MessageHeaderCodec.create(header_format),
+                                              shared_memory, self._compression, self._statistics)
+            data_receiver = MessageReceiver(data_connection, MessageHeaderCodec.create(header_format),
+                                            self._compression, self._statistics)
+            self._receiver = PythonMessaging._SelectingReceiver([(connection, self._receiver),
+                                                                 (data_connection, data_receiver)])
+        else:
+            self._data_sender = None
 
     def create_receive_queue(self):
         return PythonMessaging._MessageFetchingQueue(self._receiver)
 
     def send(self, message):
-        self._sender.send(message)
+        if self._data_sender is not None and MessagePriority.of(message) == MessagePriority.BULK:
+            self._data_sender.send(message)
+        else:
+            self._sender.send(message)
 
     def handle(self, message):
         if self._distributor.can_handle(message.category):
@@ -88,6 +112,24 @@ class PythonMessaging(PythonMessagingBase):
     def _close(self):
         pass  # no-op
 
+    class _SelectingReceiver(object):
+        """
+        Receives messages from whichever of several connections has data available. Connections that come first are
+        served first if more than one of them is readable.
+        """
+
+        def __init__(self, connections_and_receivers):
+            self._connections_and_receivers = connections_and_receivers
+            self._connections = [connection for connection, _ in connections_and_receivers]
+
+        def receive(self):
+            readable = []
+            while not readable:
+                readable, _, _ = select.select(self._connections, [], [])
+            for connection, receiver in self._connections_and_receivers:
+                if connection in readable:
+                    return receiver.receive()
+
     class _MessageFetchingQueue(object):
         """
         Queue that mimics a part of the interface of Python 2 Queue.Queue (Python 3 queue.Queue) without all the mutex
@@ -49,19 +49,27 @@
 
 import multiprocessing
 from threading import Event
+from threading import Lock
 from threading import RLock
+from weakref import WeakSet
 from time import monotonic as time
 
+from concurrent.futures import ProcessPoolExecutor
 from concurrent.futures import ThreadPoolExecutor
 from queue import Empty
 from queue import Full
 from queue import Queue
 
 from DBUtil import DBUtil
+from ParallelConversion import ParallelConversion
 from PythonKernelBase import PythonKernelBase
 from debug_util import debug_msg
 from messaging.Message import Message
+from messaging.MessagePriority import MessageLanes
+from messaging.MessagingOptions import MessagingOptions
+from messaging.MessagingStatistics import MessagingStatistics
 from messaging.RequestHandlers import _builtin_request_handlers
+from python3.messaging.AsyncioPythonMessaging import AsyncioPythonMessaging
 from python3.messaging.PythonMessaging import PythonMessaging
 
 
@@ -112,7 +120,8 @@ class PythonKernel(PythonKernelBase):
                   'listVariables',
                   'hasAutoComplete',
                   'autoComplete',
-                  'execute']:
+                  'execute',
+                  'executeAndCollect']:
             self.unregister_task_handler(k)
             self.register_task_handler(k, _builtin_request_handlers[k], executor=self.execute_thread_executor)
 
@@ -123,8 +132,25 @@ class PythonKernel(PythonKernelBase):
         number_threads = multiprocessing.cpu_count() * 2 - 1
         return ThreadPoolExecutor(number_threads)
 
-    def _create_messaging(self, connection):
-        return PythonMessaging(connection, self._monitor)
+    def _create_prefetch_executor(self):
+        return ThreadPoolExecutor(1)
+
+    def _create_parallel_conversion(self):
+        number_workers = multiprocessing.cpu_count()
+        if number_workers < 2:
+            return None
+        # Worker processes are spawned rather than forked because the kernel process is multithreaded. They are only
+        # started once an extension that supports parallel execution in processes converts a large column.
+        process_executor = ProcessPoolExecutor(number_workers, mp_context=multiprocessing.get_context('spawn'))
+        return ParallelConversion(number_workers, ThreadPoolExecutor(number_workers), process_executor)
+
+    def _create_messaging(self, connection, data_connection):
+        if self._messaging_options.engine == MessagingOptions.ENGINE_ASYNCIO:
+            messaging_type = AsyncioPythonMessaging
+        else:
+            messaging_type = PythonMessaging
+        return messaging_type(connection, self._monitor, self._messaging_options, self._shared_memory,
+                              data_connection)
 
     def _cleanup_object(self, obj, obj_name):
         if obj_name in self._execute_thread_cleanup_object_names:
@@ -139,13 +165,22 @@ class PythonKernel(PythonKernelBase):
         def __init__(self):
             self._close = Event()
             self._exception = None
+            self._queues = WeakSet()
+            self._queues_lock = Lock()
 
         @property
         def poison_pill(self):
             return PythonKernel._ExecutionMonitor._POISON_PILL
 
-        def create_message_queue(self, length):
-            return PythonKernel._MonitoredMessageQueue(length, self)
+        def create_message_queue(self, length, statistics=None):
+            """
+            @param statistics the MessagingStatistics that record the time messages wait in the queue, None if no
+                              statistics are recorded
+            """
+            queue = PythonKernel._MonitoredMessageQueue(length, self, statistics)
+            with self._queues_lock:
+                self._queues.add(queue)
+            return queue
 
         def report_close(self):
             self._close.set()
@@ -161,6 +196,7 @@ class PythonKernel(PythonKernelBase):
                     debug_msg(error_message, exc_info=True)
                 except BaseException:
                     pass
+                self._wake_up_queue_waiters()
                 self.report_close()
 
         def check_exception(self):
@@ -171,53 +207,83 @@ class PythonKernel(PythonKernelBase):
             self._close.wait()
             self.check_exception()
 
-    class _MonitoredMessageQueue(Queue):
-
-        _TIMEOUT_STEP_IN_SEC = 0.1
+        def _wake_up_queue_waiters(self):
+            with self._queues_lock:
+                queues = list(self._queues)
+            for queue in queues:
+                queue.wake_up_waiters()
 
-        def __init__(self, length, monitor):
+    class _MonitoredMessageQueue(Queue):
+        """
+        A bounded message queue whose blocking operations raise the exception reported to the given monitor. Waiting
+        threads are woken up by the monitor as soon as an exception is reported instead of polling it periodically.
+        Messages are served in order of their priority (see MessagePriority). The length bounds each priority lane
+        separately, so control messages can still be enqueued while the queue is full of bulk messages.
+        """
+
+        def __init__(self, length, monitor, statistics=None):
+            # Set before initializing the queue, enqueue times are only kept if they are recorded (see _init).
+            self._statistics = statistics
             super(PythonKernel._MonitoredMessageQueue, self).__init__(length)
             self._monitor = monitor
 
         def put(self, item, block=True, timeout=None):
-            if not block:
-                return super(PythonKernel._MonitoredMessageQueue, self).put(item, block, timeout)
-            else:
-                timeout_step = PythonKernel._MonitoredMessageQueue._TIMEOUT_STEP_IN_SEC
-                endtime = (time() + timeout) if timeout is not None else None
-                while True:
+            lane = self.queue.lane_of(item)
+            with self.not_full:
+                if self.maxsize > 0:
+                    self._wait_while(self.not_full, lambda: len(lane) >= self.maxsize, block, timeout, Full)
+                elif block:
                     self._monitor.check_exception()
-                    if timeout is None:
-                        remaining = timeout_step
-                    else:
-                        remaining = endtime - time()
-                    try:
-                        return super(PythonKernel._MonitoredMessageQueue, self).put(item, block,
-                                                                                    timeout_step
-                                                                                    if remaining > timeout_step
-                                                                                    else remaining)
-                    except Full:
-                        continue
+                self.queue.append_to_lane(lane, item)
+                self.unfinished_tasks += 1
+                self.not_empty.notify()
 
         def get(self, block=True, timeout=None):
+            with self.not_empty:
+                self._wait_while(self.not_empty, self._is_empty, block, timeout, Empty)
+                enqueue_time, item = self.queue.popleft_entry()
+                # Waiting producers may wait for different lanes.
+                self.not_full.notify_all()
+            if self._statistics is not None and item is not self._monitor.poison_pill:
+                self._statistics.record_time(item, MessagingStatistics.QUEUE_WAIT_TIME, enqueue_time)
+            return item
+
+        def wake_up_waiters(self):
+            """
+            Wakes up all threads that are blocked in put or get such that they re-check the monitor for exceptions.
+            """
+            with self.mutex:
+                self.not_full.notify_all()
+                self.not_empty.notify_all()
+
+        def _init(self, maxsize):
+            self.queue = MessageLanes(timed=self._statistics is not None)
+
+        def _is_empty(self):
+            return not self._qsize()
+
+        def _wait_while(self, condition, is_blocked, block, timeout, timeout_exception_type):
+            # Must be called while holding the mutex. The monitor records its exception before acquiring the mutex to
+            # wake up waiters, so an exception cannot be reported unnoticed between the check and the wait.
             if not block:
-                return super(PythonKernel._MonitoredMessageQueue, self).get(block, timeout)
+                if is_blocked():
+                    raise timeout_exception_type
+                return
+            self._monitor.check_exception()
+            if timeout is None:
+                while is_blocked():
+                    condition.wait()
+                    self._monitor.check_exception()
+            elif timeout < 0:
+                raise ValueError("'timeout' must be a non-negative number")
             else:
-                timeout_step = PythonKernel._MonitoredMessageQueue._TIMEOUT_STEP_IN_SEC
-                endtime = (time() + timeout) if timeout is not None else None
-                while True:
+                endtime = time() + timeout
+                while is_blocked():
+                    remaining = endtime - time()
+                    if remaining <= 0.0:
+                        raise timeout_exception_type
+                    condition.wait(remaining)
                     self._monitor.check_exception()
-                    if timeout is None:
-                        remaining = timeout_step
-                    else:
-                        remaining = endtime - time()
-                    try:
-                        return super(PythonKernel._MonitoredMessageQueue, self).get(block,
-                                                                                    timeout_step
-                                                                                    if remaining > timeout_step
-                                                                                    else remaining)
-                    except Empty:
-                        continue
 
     class _MonitoredThreadPoolExecutor(ThreadPoolExecutor):
         def __init__(self, max_workers, monitor):
@@ -63,6 +63,8 @@ class AbstractMessageLoop(object):
         while True:
             with queue.mutex:
                 queue.queue.clear()
+                # Producers blocked on the full queue are not woken up by clearing it.
+                queue.not_full.notify_all()
             try:
                 queue.put_nowait(message)
             except Full:
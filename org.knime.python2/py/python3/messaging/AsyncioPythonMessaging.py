@@ -0,0 +1,304 @@
+# -*- coding: utf-8 -*-
+# ------------------------------------------------------------------------
+#  Copyright by KNIME AG, Zurich, Switzerland
+#  Website: http://www.knime.com; Email: contact@knime.com
+#
+#  This program is free software; you can redistribute it and/or modify
+#  it under the terms of the GNU General Public License, Version 3, as
+#  published by the Free Software Foundation.
+#
+#  This program is distributed in the hope that it will be useful, but
+#  WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with this program; if not, see <http://www.gnu.org/licenses>.
+#
+#  Additional permission under GNU GPL version 3 section 7:
+#
+#  KNIME interoperates with ECLIPSE solely via ECLIPSE's plug-in APIs.
+#  Hence, KNIME and ECLIPSE are both independent programs and are not
+#  derived from each other. Should, however, the interpretation of the
+#  GNU GPL Version 3 ("License") under any applicable laws result in
+#  KNIME and ECLIPSE being a combined program, KNIME AG herewith grants
+#  you the additional permission to use and propagate KNIME together with
+#  ECLIPSE with only the license terms in place for ECLIPSE applying to
+#  ECLIPSE and the GNU GPL Version 3 applying for KNIME, provided the
+#  license terms of ECLIPSE themselves allow for the respective use and
+#  propagation of ECLIPSE together with KNIME.
+#
+#  Additional permission relating to nodes for KNIME that extend the Node
+#  Extension (and in particular that are based on subclasses of NodeModel,
+#  NodeDialog, and NodeView) and that only interoperate with KNIME through
+#  standard APIs ("Nodes"):
+#  Nodes are deemed to be separate and independent programs and to not be
+#  covered works.  Notwithstanding anything to the contrary in the
+#  License, the License does not apply to Nodes, you are not required to
+#  license Nodes under the License, and you are granted a license to
+#  prepare and propagate Nodes, in each case even if such Nodes are
+#  propagated with or for interoperation with KNIME.  The owner of a Node
+#  may freely choose the license terms applicable to such Node, including
+#  when such Node is propagated with or for interoperation with KNIME.
+# ------------------------------------------------------------------------
+
+"""
+Messaging engine of the Python 3 kernel that runs on a single asyncio event loop.
+"""
+
+import asyncio
+import struct
+import threading
+
+from PythonUtils import invoke_safely
+from debug_util import debug_msg
+from messaging.MessageHeaderCodec import MessageHeaderCodec
+from messaging.MessageReceiver import MessageReceiver
+from messaging.MessagePriority import MessagePriority
+from messaging.MessageSender import MessageSender
+from messaging.MessagingStatistics import MessagingStatistics
+from messaging.PayloadCompression import PayloadCompression
+from messaging.PythonMessagingBase import PythonMessagingBase
+
+
+class AsyncioPythonMessaging(PythonMessagingBase):
+    """
+    Alternative to the thread-based Python 3 messaging system. Sending, receiving and distributing messages all run on
+    a single asyncio event loop that reads from and writes to the connection using asyncio streams. Received messages
+    are dispatched directly to their handlers on the event loop instead of passing through receive queues and a
+    distributor thread. Handlers must therefore return quickly; the task handlers of the kernel already hand off their
+    work to the kernel's executors. Messages that are sent while the event loop is busy are coalesced into one write.
+    If a data connection is given, bulk messages are written to and read from it via a second pair of streams.
+    """
+
+    # Maximum number of messages that other threads may have pending for sending. Further senders block.
+    _SEND_QUEUE_LENGTH = 10
+
+    # Task receive queues are unbounded: the event loop must not block on a full queue of a task that itself waits for
+    # the event loop to send a message.
+    _TASK_RECEIVE_QUEUE_LENGTH = 0
+
+    def __init__(self, connection, monitor, options=None, shared_memory=None, data_connection=None):
+        """
+        @param data_connection the connection via which bulk messages are sent and received, None if all messages are
+                               exchanged via the given connection
+        """
+        super(AsyncioPythonMessaging, self).__init__(options)
+        self._connection = connection
+        self._data_connection = data_connection
+        self._monitor = monitor
+        self._is_running_lock = threading.Lock()
+        self._message_id_lock = threading.Lock()
+        self._message_handlers_lock = threading.RLock()
+        self._message_handlers_closed = False
+
+        header_format = options.header_format if options is not None else None
+        self._compression = PayloadCompression.create(options)
+        self._sender = MessageSender(None, MessageHeaderCodec.create(header_format), shared_memory, self._compression,
+                                     self._statistics)
+        self._receiver = MessageReceiver(None, MessageHeaderCodec.create(header_format), self._compression,
+                                         self._statistics)
+
+        self._loop = asyncio.new_event_loop()
+        self._loop_thread = threading.Thread(target=self._run_loop, name="AsyncioPythonMessaging")
+        self._loop_thread.daemon = True
+        self._send_slots = threading.BoundedSemaphore(AsyncioPythonMessaging._SEND_QUEUE_LENGTH)
+        # Only accessed on the event loop:
+        self._writer = None
+        self._data_writer = None
+        self._receive_tasks = []
+        # (enqueue time, message) entries
+        self._pending_messages = []
+        self._is_flush_scheduled = False
+        self._num_unreleased_send_slots = 0
+        self._drain_task = None
+
+    @property
+    def is_running(self):
+        with self._is_running_lock:
+            return super(AsyncioPythonMessaging, self).is_running
+
+    def create_receive_queue(self):
+        return self._monitor.create_message_queue(AsyncioPythonMessaging._TASK_RECEIVE_QUEUE_LENGTH,
+                                                  self._statistics)
+
+    def create_next_message_id(self):
+        with self._message_id_lock:
+            return super(AsyncioPythonMessaging, self).create_next_message_id()
+
+    def register_message_handler(self, message_category, handler):
+        with self._message_handlers_lock:
+            registered = super(AsyncioPythonMessaging, self).register_message_handler(message_category, handler)
+            if self._message_handlers_closed:
+                self._close_message_handlers([handler])
+            return registered
+
+    def unregister_message_handler(self, message_category):
+        with self._message_handlers_lock:
+            return super(AsyncioPythonMessaging, self).unregister_message_handler(message_category)
+
+    def register_reply_handler(self, message_id, handler):
+        # No locking, see MessageDistributorLoop.register_reply_handler.
+        registered = super(AsyncioPythonMessaging, self).register_reply_handler(message_id, handler)
+        if self._message_handlers_closed:
+            self._close_message_handlers([handler])
+        return registered
+
+    def start(self):
+        with self._is_running_lock:
+            super(AsyncioPythonMessaging, self).start()
+
+    def send(self, message):
+        enqueue_time = self._statistics.now() if self._statistics is not None else None
+        if self._is_loop_thread():
+            self._enqueue(message, enqueue_time, False)
+        else:
+            self._send_slots.acquire()
+            try:
+                self._loop.call_soon_threadsafe(self._enqueue, message, enqueue_time, True)
+            except BaseException:
+                # Event loop is closed.
+                self._send_slots.release()
+                raise
+
+    def handle(self, message):
+        with self._message_handlers_lock:
+            can_handle = self._distributor.can_handle(message.category)
+        if can_handle:
+            self._loop.call_soon_threadsafe(self._distribute, message)
+        return can_handle
+
+    def close(self):
+        with self._is_running_lock:
+            super(AsyncioPythonMessaging, self).close()
+
+    def _start(self):
+        self._loop_thread.start()
+        asyncio.run_coroutine_threadsafe(self._open_connection(), self._loop).result()
+
+    def _close(self):
+        shutdown = asyncio.run_coroutine_threadsafe(self._shutdown(), self._loop)
+        shutdown.add_done_callback(lambda _: self._loop.call_soon_threadsafe(self._loop.stop))
+        if not self._is_loop_thread():
+            # Closing from a handler on the event loop cannot wait for the shutdown to complete.
+            invoke_safely(lambda msg, _: debug_msg(msg, exc_info=True), lambda s: s.result(), shutdown)
+            self._loop_thread.join()
+
+    def _is_loop_thread(self):
+        return threading.current_thread() is self._loop_thread
+
+    def _run_loop(self):
+        asyncio.set_event_loop(self._loop)
+        try:
+            self._loop.run_forever()
+        finally:
+            self._loop.close()
+
+    # Event loop:
+
+    async def _open_connection(self):
+        reader, self._writer = await asyncio.open_connection(sock=self._connection)
+        self._receive_tasks.append(self._loop.create_task(self._receive_all(reader)))
+        if self._data_connection is not None:
+            data_reader, self._data_writer = await asyncio.open_connection(sock=self._data_connection)
+            self._receive_tasks.append(self._loop.create_task(self._receive_all(data_reader)))
+
+    async def _receive_all(self, reader):
+        try:
+            while True:
+                sizes = await reader.readexactly(8)
+                header_size, payload_size = struct.unpack('>LL', sizes)
+                header = await reader.readexactly(header_size)
+                payload = await reader.readexactly(payload_size) if payload_size > 0 else None
+                self._distribute(self._receiver.decode_frame(header, payload))
+        except asyncio.CancelledError:
+            pass
+        except BaseException as ex:
+            if self.is_running:
+                self._monitor.report_exception(ex, message="Asyncio message receiving terminated.")
+
+    def _distribute(self, message):
+        try:
+            self._distributor.handle(message)
+        except BaseException as ex:
+            debug_msg("Failed to distribute message '" + str(message) + "' from Java. Cause: " + str(ex))
+            self._monitor.report_exception(ex, message="Asyncio message distribution terminated.")
+
+    def _enqueue(self, message, enqueue_time, holds_send_slot):
+        self._pending_messages.append((enqueue_time, message))
+        if holds_send_slot:
+            self._num_unreleased_send_slots += 1
+        if not self._is_flush_scheduled:
+            # Defer writing until the event loop has processed the other ready callbacks, which may send further
+            # messages that can be written along with this one.
+            self._is_flush_scheduled = True
+            self._loop.call_soon(self._flush)
+
+    def _flush(self):
+        self._is_flush_scheduled = False
+        pending_messages = self._pending_messages
+        self._pending_messages = []
+        # Control messages first, bulk messages last (the sort is stable).
+        pending_messages.sort(key=lambda entry: MessagePriority.of(entry[1]))
+        messages = [message for _, message in pending_messages]
+        statistics = self._statistics
+        if statistics is not None:
+            for enqueue_time, message in pending_messages:
+                statistics.record_time(message, MessagingStatistics.QUEUE_WAIT_TIME, enqueue_time)
+        if self._data_writer is not None:
+            data_messages = [message for message in messages if MessagePriority.of(message) == MessagePriority.BULK]
+            if data_messages:
+                messages = [message for message in messages if MessagePriority.of(message) != MessagePriority.BULK]
+        else:
+            data_messages = None
+        try:
+            if messages:
+                self._writer.writelines(self._sender.encode_frames(messages))
+            if data_messages:
+                self._data_writer.writelines(self._sender.encode_frames(data_messages))
+        except BaseException as ex:
+            self._release_send_slots()
+            self._monitor.report_exception(ex, message="Asyncio message sending terminated.")
+            return
+        if all(writer.transport.get_write_buffer_size() == 0 for writer in self._get_writers()):
+            self._release_send_slots()
+        elif self._drain_task is None:
+            # The connection could not take all data right away. Senders are held back until it drained.
+            self._drain_task = self._loop.create_task(self._drain())
+
+    async def _drain(self):
+        try:
+            for writer in self._get_writers():
+                await writer.drain()
+        except BaseException as ex:
+            self._monitor.report_exception(ex, message="Asyncio message sending terminated.")
+        finally:
+            self._drain_task = None
+            self._release_send_slots()
+
+    def _get_writers(self):
+        return [writer for writer in (self._writer, self._data_writer) if writer is not None]
+
+    def _release_send_slots(self):
+        for _ in range(self._num_unreleased_send_slots):
+            self._send_slots.release()
+        self._num_unreleased_send_slots = 0
+
+    async def _shutdown(self):
+        for receive_task in self._receive_tasks:
+            receive_task.cancel()
+        # Messages that were sent before closing are still written.
+        if self._pending_messages:
+            self._flush()
+        if self._drain_task is not None:
+            await self._drain_task
+        for writer in self._get_writers():
+            writer.close()
+        with self._message_handlers_lock:
+            self._message_handlers_closed = True
+            # Handlers may want to unregister upon closing. Copy to avoid concurrent modification.
+            handlers = self._distributor.get_all_handlers()
+            self._close_message_handlers(handlers)
+
+    def _close_message_handlers(self, handlers):
+        invoke_safely(None, lambda h: h.handle(self._monitor.poison_pill), handlers)
@@ -81,6 +81,17 @@ class MessageDistributorLoop(AbstractMessageLoop):
         with self._message_handlers_lock:
             return self._distributor.unregister_message_handler(message_category)
 
+    def register_reply_handler(self, message_id, handler):
+        # No locking: closing marks the handlers closed before collecting them, so a handler that is registered
+        # concurrently is either collected or closed here.
+        registered = self._distributor.register_reply_handler(message_id, handler)
+        if self._message_handlers_closed:
+            self._close_message_handlers([handler])
+        return registered
+
+    def unregister_reply_handler(self, message_id):
+        return self._distributor.unregister_reply_handler(message_id)
+
     def can_handle(self, message_category):
         with self._message_handlers_lock:
             return self._distributor.can_handle(message_category)
@@ -100,7 +111,7 @@ class MessageDistributorLoop(AbstractMessageLoop):
         with self._message_handlers_lock:
             self._message_handlers_closed = True
             # Handlers may want to unregister upon closing. Copy to avoid concurrent modification.
-            handlers = list(self._distributor._message_handlers.values())
+            handlers = self._distributor.get_all_handlers()
             self._close_message_handlers(handlers)
 
     def _close_message_handlers(self, handlers):
@@ -48,6 +48,7 @@
 """
 
 from debug_util import debug_msg
+from debug_util import is_debug_log_enabled
 from python3.messaging.AbstractMessageLoop import AbstractMessageLoop
 
 
@@ -60,7 +61,8 @@ class MessageReceiverLoop(AbstractMessageLoop):
     def receive(self):
         debug_msg("Python - Wait to receive message in loop.")
         message = self._receive_queue.get()
-        debug_msg("Python - Received message in loop: " + str(message))
+        if is_debug_log_enabled():
+            debug_msg("Python - Received message in loop: " + str(message))
         if message == self._monitor.poison_pill:
             raise RuntimeError("Message receive loop terminated.")
         return message
@@ -47,10 +47,28 @@
 @author Christian Dietz, KNIME GmbH, Konstanz, Germany
 """
 
+import time
+from queue import Empty
+
+from messaging.MessagePriority import MessagePriority
 from python3.messaging.AbstractMessageLoop import AbstractMessageLoop
 
 
 class MessageSenderLoop(AbstractMessageLoop):
+    """
+    Sends the messages of the send queue. All messages that are currently queued are sent using a single coalesced
+    write. If more than one message was queued (i.e. messages are sent in bursts), the loop additionally waits a few
+    microseconds for further messages of the burst before writing.
+    A batch ends after its first bulk message (see MessagePriority), so that control and normal messages that are
+    enqueued meanwhile are sent before the next bulk message.
+    """
+
+    # Upper bound of the number of messages written at once.
+    _MAX_BATCH_SIZE = 64
+
+    # Upper bound of the time to wait for further messages of a burst.
+    _MAX_BATCH_WAIT_IN_SEC = 20e-6
+
     def __init__(self, sender, send_queue, monitor):
         super(MessageSenderLoop, self).__init__(monitor)
         self._sender = sender
@@ -61,10 +79,34 @@ class MessageSenderLoop(AbstractMessageLoop):
 
     def _loop(self):
         while self.is_running:
-            message = self._send_queue.get()
-            if message == self._monitor.poison_pill:
+            batch = [self._send_queue.get()]
+            self._drain_queue(batch)
+            if len(batch) > 1:
+                self._await_burst(batch)
+            poison_pill = self._monitor.poison_pill
+            if poison_pill in batch:
+                # Messages that were queued before the poison pill are still sent.
+                self._sender.send_all(batch[:batch.index(poison_pill)])
                 break
-            self._sender.send(message)
+            self._sender.send_all(batch)
+
+    def _drain_queue(self, batch):
+        try:
+            while not MessageSenderLoop._is_batch_complete(batch):
+                batch.append(self._send_queue.get_nowait())
+        except Empty:
+            pass
+
+    @staticmethod
+    def _is_batch_complete(batch):
+        return len(batch) >= MessageSenderLoop._MAX_BATCH_SIZE or MessagePriority.of(batch[-1]) == MessagePriority.BULK
+
+    def _await_burst(self, batch):
+        deadline = time.perf_counter() + MessageSenderLoop._MAX_BATCH_WAIT_IN_SEC
+        while not MessageSenderLoop._is_batch_complete(batch) and time.perf_counter() < deadline:
+            # Release the GIL so that producers can enqueue further messages.
+            time.sleep(0)
+            self._drain_queue(batch)
 
     def _close(self):
         AbstractMessageLoop._clear_queue_and_put_message(self._send_queue, self._monitor.poison_pill)
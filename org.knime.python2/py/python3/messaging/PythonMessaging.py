@@ -51,8 +51,11 @@ import threading
 
 from PythonUtils import invoke_safely
 from debug_util import debug_msg
+from messaging.MessageHeaderCodec import MessageHeaderCodec
+from messaging.MessagePriority import MessagePriority
 from messaging.MessageReceiver import MessageReceiver
 from messaging.MessageSender import MessageSender
+from messaging.PayloadCompression import PayloadCompression
 from messaging.PythonMessagingBase import PythonMessagingBase
 from python3.messaging.MessageDistributorLoop import MessageDistributorLoop
 from python3.messaging.MessageReceiverLoop import MessageReceiverLoop
@@ -70,28 +73,54 @@ class PythonMessaging(PythonMessagingBase):
 
     _TASK_RECEIVE_QUEUE_LENGTH = 10
 
-    def __init__(self, connection, monitor):
-        super(PythonMessaging, self).__init__()
+    def __init__(self, connection, monitor, options=None, shared_memory=None, data_connection=None):
+        """
+        @param data_connection the connection via which bulk messages are sent and received, None if all messages are
+                               exchanged via the given connection
+        """
+        super(PythonMessaging, self).__init__(options)
         self._monitor = monitor
         self._is_running_lock = threading.Lock()
         self._message_id_lock = threading.Lock()
 
-        self._send_loop = MessageSenderLoop(MessageSender(connection),
-                                            monitor.create_message_queue(PythonMessaging._SEND_QUEUE_LENGTH), monitor)
+        self._header_format = options.header_format if options is not None else None
+        self._shared_memory = shared_memory
+        self._compression = PayloadCompression.create(options)
+        self._send_loop = self._create_send_loop(connection)
 
-        self._receive_queue = monitor.create_message_queue(PythonMessaging._RECEIVE_QUEUE_LENGTH)
-        self._receive_loop = MessageReceiverLoop(MessageReceiver(connection), self._receive_queue, monitor)
+        # Received messages of both connections end up in the same queue.
+        self._receive_queue = monitor.create_message_queue(PythonMessaging._RECEIVE_QUEUE_LENGTH, self._statistics)
+        self._receive_loop = self._create_receive_loop(connection)
+
+        if data_connection is not None:
+            self._data_send_loop = self._create_send_loop(data_connection)
+            self._data_receive_loop = self._create_receive_loop(data_connection)
+        else:
+            self._data_send_loop = None
+            self._data_receive_loop = None
 
         self._distribute_loop = MessageDistributorLoop(self._receive_loop, self._distributor,
                                                        monitor)
 
+    def _create_send_loop(self, connection):
+        return MessageSenderLoop(
+            MessageSender(connection, MessageHeaderCodec.create(self._header_format), self._shared_memory,
+                          self._compression, self._statistics),
+            self._monitor.create_message_queue(PythonMessaging._SEND_QUEUE_LENGTH, self._statistics), self._monitor)
+
+    def _create_receive_loop(self, connection):
+        return MessageReceiverLoop(
+            MessageReceiver(connection, MessageHeaderCodec.create(self._header_format), self._compression,
+                            self._statistics),
+            self._receive_queue, self._monitor)
+
     @property
     def is_running(self):
         with self._is_running_lock:
             return super(PythonMessaging, self).is_running
 
     def create_receive_queue(self):
-        return self._monitor.create_message_queue(PythonMessaging._TASK_RECEIVE_QUEUE_LENGTH)
+        return self._monitor.create_message_queue(PythonMessaging._TASK_RECEIVE_QUEUE_LENGTH, self._statistics)
 
     def create_next_message_id(self):
         with self._message_id_lock:
@@ -103,12 +132,21 @@ class PythonMessaging(PythonMessagingBase):
     def unregister_message_handler(self, message_category):
         return self._distribute_loop.unregister_message_handler(message_category)
 
+    def register_reply_handler(self, message_id, handler):
+        return self._distribute_loop.register_reply_handler(message_id, handler)
+
+    def unregister_reply_handler(self, message_id):
+        return self._distribute_loop.unregister_reply_handler(message_id)
+
     def start(self):
         with self._is_running_lock:
             super(PythonMessaging, self).start()
 
     def send(self, message):
-        self._send_loop.send(message)
+        if self._data_send_loop is not None and MessagePriority.of(message) == MessagePriority.BULK:
+            self._data_send_loop.send(message)
+        else:
+            self._send_loop.send(message)
 
     def handle(self, message):
         if self._distribute_loop.can_handle(message.category):
@@ -124,10 +162,16 @@ class PythonMessaging(PythonMessagingBase):
     def _start(self):
         # Order is intended (and differs from Java since we are the server).
         self._send_loop.start()
+        if self._data_send_loop is not None:
+            self._data_send_loop.start()
         self._distribute_loop.start()
         self._receive_loop.start()
+        if self._data_receive_loop is not None:
+            self._data_receive_loop.start()
 
     def _close(self):
         # Order is intended (and differs from Java since we are the server).
-        loops = [self._receive_loop, self._distribute_loop, self._send_loop]
+        loops = [self._receive_loop, self._data_receive_loop, self._distribute_loop, self._send_loop,
+                 self._data_send_loop]
+        loops = [loop for loop in loops if loop is not None]
         invoke_safely(lambda msg, _: debug_msg(msg, exc_info=True), lambda l: l.close(), loops)
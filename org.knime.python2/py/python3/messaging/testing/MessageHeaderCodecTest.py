@@ -0,0 +1,133 @@
+# -*- coding: utf-8 -*-
+# ------------------------------------------------------------------------
+#  Copyright by KNIME AG, Zurich, Switzerland
+#  Website: http://www.knime.com; Email: contact@knime.com
+#
+#  This program is free software; you can redistribute it and/or modify
+#  it under the terms of the GNU General Public License, Version 3, as
+#  published by the Free Software Foundation.
+#
+#  This program is distributed in the hope that it will be useful, but
+#  WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with this program; if not, see <http://www.gnu.org/licenses>.
+#
+#  Additional permission under GNU GPL version 3 section 7:
+#
+#  KNIME interoperates with ECLIPSE solely via ECLIPSE's plug-in APIs.
+#  Hence, KNIME and ECLIPSE are both independent programs and are not
+#  derived from each other. Should, however, the interpretation of the
+#  GNU GPL Version 3 ("License") under any applicable laws result in
+#  KNIME and ECLIPSE being a combined program, KNIME AG herewith grants
+#  you the additional permission to use and propagate KNIME together with
+#  ECLIPSE with only the license terms in place for ECLIPSE applying to
+#  ECLIPSE and the GNU GPL Version 3 applying for KNIME, provided the
+#  license terms of ECLIPSE themselves allow for the respective use and
+#  propagation of ECLIPSE together with KNIME.
+#
+#  Additional permission relating to nodes for KNIME that extend the Node
+#  Extension (and in particular that are based on subclasses of NodeModel,
+#  NodeDialog, and NodeView) and that only interoperate with KNIME through
+#  standard APIs ("Nodes"):
+#  Nodes are deemed to be separate and independent programs and to not be
+#  covered works.  Notwithstanding anything to the contrary in the
+#  License, the License does not apply to Nodes, you are not required to
+#  license Nodes under the License, and you are granted a license to
+#  prepare and propagate Nodes, in each case even if such Nodes are
+#  propagated with or for interoperation with KNIME.  The owner of a Node
+#  may freely choose the license terms applicable to such Node, including
+#  when such Node is propagated with or for interoperation with KNIME.
+# ------------------------------------------------------------------------
+
+"""
+Tests for the text and binary message header codecs, run by org.knime.python2.kernel.MessagingTest.
+"""
+
+from messaging.Message import Message
+from messaging.MessageHeaderCodec import MessageHeaderCodec
+from messaging.MessageHeaderCodec import _BinaryMessageHeaderCodec
+
+
+def _assert_round_trip(header_format, message):
+    codec = MessageHeaderCodec.create(header_format)
+    decoded = codec.decode(codec.encode(message), message.payload)
+    assert decoded.id == str(message.id)
+    assert decoded.category == message.category
+    assert decoded.additional_options == message.additional_options
+    assert decoded.payload is message.payload
+
+
+def _raises_value_error(function, *args):
+    try:
+        function(*args)
+    except ValueError:
+        return True
+    return False
+
+
+def test_binary_header_layout(workspace):
+    header = MessageHeaderCodec.create(MessageHeaderCodec.BINARY).encode(Message(5, "ab", None, {"k": "v"}))
+    # Must match the layout that the Java side expects.
+    assert header == b'\x01\x00\x00\x00\x05\x00\x02\x00\x00\x00\x03abk\x00v'
+
+
+def test_binary_round_trip(workspace):
+    fields = {"type": "success", "uncompressed_size": "42", "non-ascii": u"äöü"}
+    _assert_round_trip(MessageHeaderCodec.BINARY, Message(-7, u"réponse", b'\x01\x02\x03', fields))
+
+
+def test_binary_round_trip_without_fields(workspace):
+    _assert_round_trip(MessageHeaderCodec.BINARY, Message(2 ** 31 - 1, "execute"))
+
+
+def test_text_round_trip(workspace):
+    _assert_round_trip(MessageHeaderCodec.TEXT, Message(3, "execute", b'\x01', {"type": "success"}))
+
+
+def test_text_is_default_format(workspace):
+    assert not isinstance(MessageHeaderCodec.create(None), _BinaryMessageHeaderCodec)
+
+
+def test_unsupported_format_is_rejected(workspace):
+    assert _raises_value_error(MessageHeaderCodec.create, "xml")
+
+
+def test_unsupported_binary_version_is_rejected(workspace):
+    codec = MessageHeaderCodec.create(MessageHeaderCodec.BINARY)
+    header = bytearray(codec.encode(Message(1, "execute")))
+    header[0] = 2
+    assert _raises_value_error(codec.decode, header, None)
+
+
+def test_decoding_from_buffer_views(workspace):
+    codec = MessageHeaderCodec.create(MessageHeaderCodec.BINARY)
+    header = codec.encode(Message(1, "execute", None, {"type": "success"}))
+    decoded = codec.decode(memoryview(bytearray(header)), None)
+    assert decoded.category == "execute"
+    assert decoded.get_header_field("type") == "success"
+
+
+def test_repeated_headers_are_decoded_from_cache(workspace):
+    codec = MessageHeaderCodec.create(MessageHeaderCodec.BINARY)
+    header = codec.encode(Message(1, "execute", None, {"type": "success"}))
+    first = codec.decode(header, None)
+    second = codec.decode(header, None)
+    assert first.category is second.category
+    # Messages must not share the cached fields.
+    first.additional_options["type"] = "failure"
+    assert codec.decode(header, None).get_header_field("type") == "success"
+
+
+def test_caches_are_bounded(workspace):
+    codec = MessageHeaderCodec.create(MessageHeaderCodec.BINARY)
+    for i in range(3 * _BinaryMessageHeaderCodec._MAX_CACHE_SIZE):
+        # Replies carry unique categories and field values.
+        message = Message(i, str(i), None, {"type": str(i)})
+        decoded = codec.decode(codec.encode(message), None)
+        assert decoded.category == str(i)
+        assert decoded.get_header_field("type") == str(i)
+        for cache in (codec._encoded_categories, codec._decoded_categories, codec._decoded_fields):
+            assert len(cache) <= _BinaryMessageHeaderCodec._MAX_CACHE_SIZE
@@ -0,0 +1,165 @@
+# -*- coding: utf-8 -*-
+# ------------------------------------------------------------------------
+#  Copyright by KNIME AG, Zurich, Switzerland
+#  Website: http://www.knime.com; Email: contact@knime.com
+#
+#  This program is free software; you can redistribute it and/or modify
+#  it under the terms of the GNU General Public License, Version 3, as
+#  published by the Free Software Foundation.
+#
+#  This program is distributed in the hope that it will be useful, but
+#  WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with this program; if not, see <http://www.gnu.org/licenses>.
+#
+#  Additional permission under GNU GPL version 3 section 7:
+#
+#  KNIME interoperates with ECLIPSE solely via ECLIPSE's plug-in APIs.
+#  Hence, KNIME and ECLIPSE are both independent programs and are not
+#  derived from each other. Should, however, the interpretation of the
+#  GNU GPL Version 3 ("License") under any applicable laws result in
+#  KNIME and ECLIPSE being a combined program, KNIME AG herewith grants
+#  you the additional permission to use and propagate KNIME together with
+#  ECLIPSE with only the license terms in place for ECLIPSE applying to
+#  ECLIPSE and the GNU GPL Version 3 applying for KNIME, provided the
+#  license terms of ECLIPSE themselves allow for the respective use and
+#  propagation of ECLIPSE together with KNIME.
+#
+#  Additional permission relating to nodes for KNIME that extend the Node
+#  Extension (and in particular that are based on subclasses of NodeModel,
+#  NodeDialog, and NodeView) and that only interoperate with KNIME through
+#  standard APIs ("Nodes"):
+#  Nodes are deemed to be separate and independent programs and to not be
+#  covered works.  Notwithstanding anything to the contrary in the
+#  License, the License does not apply to Nodes, you are not required to
+#  license Nodes under the License, and you are granted a license to
+#  prepare and propagate Nodes, in each case even if such Nodes are
+#  propagated with or for interoperation with KNIME.  The owner of a Node
+#  may freely choose the license terms applicable to such Node, including
+#  when such Node is propagated with or for interoperation with KNIME.
+# ------------------------------------------------------------------------
+
+"""
+Tests for message priorities and the lanes of the kernel's message queues, run by
+org.knime.python2.kernel.MessagingTest.
+"""
+
+import threading
+from queue import Full
+
+from messaging.Message import Message
+from messaging.MessagePriority import MessageLanes
+from messaging.MessagePriority import MessagePriority
+from python3.PythonKernel import PythonKernel
+
+
+def _create_message(id, priority):
+    return Message(id, "test", None, {MessagePriority.HEADER_FIELD_KEY: priority})
+
+
+def _raises(error_type, function):
+    try:
+        function()
+    except error_type:
+        return True
+    return False
+
+
+def test_priority_header_field_takes_precedence(workspace):
+    assert MessagePriority.of(Message(1, "getpid", None, {"priority": "bulk"})) == MessagePriority.BULK
+    assert MessagePriority.of(Message(1, "putTable", None, {"priority": "control"})) == MessagePriority.CONTROL
+
+
+def test_unknown_priority_is_normal(workspace):
+    assert MessagePriority.of(Message(1, "getpid", None, {"priority": "urgent"})) == MessagePriority.NORMAL
+
+
+def test_priority_of_categories(workspace):
+    for category in MessagePriority.CONTROL_CATEGORIES:
+        assert MessagePriority.of(Message(1, category)) == MessagePriority.CONTROL
+    for category in MessagePriority.BULK_CATEGORIES:
+        assert MessagePriority.of(Message(1, category)) == MessagePriority.BULK
+    assert MessagePriority.of(Message(1, "execute")) == MessagePriority.NORMAL
+
+
+def test_large_payloads_are_bulk(workspace):
+    size = MessagePriority.BULK_PAYLOAD_SIZE
+    assert MessagePriority.of(Message(1, "execute", b'x' * (size - 1))) == MessagePriority.NORMAL
+    assert MessagePriority.of(Message(1, "execute", b'x' * size)) == MessagePriority.BULK
+
+
+def test_lanes_are_served_in_order_of_priority(workspace):
+    lanes = MessageLanes()
+    for id, priority in [(1, "bulk"), (2, "normal"), (3, "bulk"), (4, "control"), (5, "normal")]:
+        lanes.append(_create_message(id, priority))
+    assert len(lanes) == 5
+    # FIFO within each lane.
+    assert [str(lanes.popleft().id) for _ in range(5)] == ['4', '2', '5', '1', '3']
+    assert len(lanes) == 0
+    assert _raises(IndexError, lanes.popleft)
+
+
+def test_lane_of_holds_messages_of_same_priority(workspace):
+    lanes = MessageLanes()
+    lanes.append(_create_message(1, "bulk"))
+    lanes.append(_create_message(2, "control"))
+    assert len(lanes.lane_of(_create_message(3, "bulk"))) == 1
+    assert len(lanes.lane_of(_create_message(4, "normal"))) == 0
+
+
+def test_lanes_clear(workspace):
+    lanes = MessageLanes()
+    lanes.append(_create_message(1, "bulk"))
+    lanes.clear()
+    assert len(lanes) == 0
+
+
+def test_capacity_bounds_each_lane_separately(workspace):
+    queue = PythonKernel._ExecutionMonitor().create_message_queue(2)
+    queue.put(_create_message(1, "bulk"))
+    queue.put(_create_message(2, "bulk"))
+    assert _raises(Full, lambda: queue.put_nowait(_create_message(3, "bulk")))
+    # Control messages can still be enqueued while the bulk lane is full.
+    queue.put_nowait(_create_message(4, "control"))
+    assert [queue.get().id for _ in range(3)] == [4, 1, 2]
+
+
+def test_put_waits_for_space_in_its_lane(workspace):
+    queue = PythonKernel._ExecutionMonitor().create_message_queue(2)
+    queue.put(_create_message(1, "bulk"))
+    queue.put(_create_message(2, "bulk"))
+    enqueued = threading.Event()
+
+    def produce():
+        queue.put(_create_message(3, "bulk"))
+        enqueued.set()
+
+    producer = threading.Thread(target=produce)
+    producer.start()
+    assert not enqueued.wait(0.1)
+    assert queue.get().id == 1
+    assert enqueued.wait(5)
+    producer.join()
+    assert [queue.get().id for _ in range(2)] == [2, 3]
+
+
+def test_reported_exception_wakes_up_waiters(workspace):
+    monitor = PythonKernel._ExecutionMonitor()
+    queue = monitor.create_message_queue(2)
+    errors = []
+
+    def consume():
+        try:
+            queue.get()
+        except RuntimeError as error:
+            errors.append(error)
+
+    consumer = threading.Thread(target=consume)
+    consumer.start()
+    monitor.report_exception(RuntimeError("failure"))
+    consumer.join(5)
+    assert not consumer.is_alive()
+    assert len(errors) == 1
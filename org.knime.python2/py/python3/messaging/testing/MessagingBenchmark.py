@@ -0,0 +1,154 @@
+# -*- coding: utf-8 -*-
+# ------------------------------------------------------------------------
+#  Copyright by KNIME AG, Zurich, Switzerland
+#  Website: http://www.knime.com; Email: contact@knime.com
+#
+#  This program is free software; you can redistribute it and/or modify
+#  it under the terms of the GNU General Public License, Version 3, as
+#  published by the Free Software Foundation.
+#
+#  This program is distributed in the hope that it will be useful, but
+#  WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with this program; if not, see <http://www.gnu.org/licenses>.
+#
+#  Additional permission under GNU GPL version 3 section 7:
+#
+#  KNIME interoperates with ECLIPSE solely via ECLIPSE's plug-in APIs.
+#  Hence, KNIME and ECLIPSE are both independent programs and are not
+#  derived from each other. Should, however, the interpretation of the
+#  GNU GPL Version 3 ("License") under any applicable laws result in
+#  KNIME and ECLIPSE being a combined program, KNIME AG herewith grants
+#  you the additional permission to use and propagate KNIME together with
+#  ECLIPSE with only the license terms in place for ECLIPSE applying to
+#  ECLIPSE and the GNU GPL Version 3 applying for KNIME, provided the
+#  license terms of ECLIPSE themselves allow for the respective use and
+#  propagation of ECLIPSE together with KNIME.
+#
+#  Additional permission relating to nodes for KNIME that extend the Node
+#  Extension (and in particular that are based on subclasses of NodeModel,
+#  NodeDialog, and NodeView) and that only interoperate with KNIME through
+#  standard APIs ("Nodes"):
+#  Nodes are deemed to be separate and independent programs and to not be
+#  covered works.  Notwithstanding anything to the contrary in the
+#  License, the License does not apply to Nodes, you are not required to
+#  license Nodes under the License, and you are granted a license to
+#  prepare and propagate Nodes, in each case even if such Nodes are
+#  propagated with or for interoperation with KNIME.  The owner of a Node
+#  may freely choose the license terms applicable to such Node, including
+#  when such Node is propagated with or for interoperation with KNIME.
+# ------------------------------------------------------------------------
+
+"""
+Microbenchmark of the Python side of the messaging system. Requests are echoed by the messaging system of the Python
+kernel, the Java side is emulated on the other end of a local socket pair, so no running KNIME instance is required.
+Each combination of the given parameters is benchmarked, e.g.:
+PYTHONPATH=. python python3/messaging/testing/MessagingBenchmark.py --engine threads asyncio --in-flight 1 64
+(run from the 'py' directory of this plugin, see --help for all parameters).
+"""
+
+from __future__ import print_function
+
+import argparse
+import itertools
+import socket
+import threading
+import time
+
+from messaging.Message import Message
+from messaging.MessageHeaderCodec import MessageHeaderCodec
+from messaging.MessageReceiver import MessageReceiver
+from messaging.MessageSender import MessageSender
+from messaging.MessagingOptions import MessagingOptions
+from python3.PythonKernel import PythonKernel
+from python3.messaging.AsyncioPythonMessaging import AsyncioPythonMessaging
+from python3.messaging.PythonMessaging import PythonMessaging
+
+
+def benchmark_messaging(num_requests, payload_size, num_in_flight, options):
+    """
+    Streams num_requests requests with payloads of the given size (in bytes) to a messaging system configured by the
+    given MessagingOptions, which echoes each of them, and returns the achieved throughput in requests per second. At
+    most num_in_flight requests are sent without having received their responses, one request in flight measures the
+    round-trip time rather than the throughput.
+    """
+    python_socket, java_socket = socket.socketpair()
+    messaging = _create_messaging(python_socket, PythonKernel._ExecutionMonitor(), options)
+    in_flight = threading.Semaphore(num_in_flight)
+    try:
+        messaging.register_message_handler("echo", _EchoingMessageHandler(messaging))
+        payload = b'x' * payload_size if payload_size > 0 else None
+
+        def request_all():
+            sender = MessageSender(java_socket, MessageHeaderCodec.create(options.header_format))
+            for i in range(num_requests):
+                in_flight.acquire()
+                sender.send(Message(i, "echo", payload))
+
+        def receive_all():
+            receiver = MessageReceiver(java_socket, MessageHeaderCodec.create(options.header_format))
+            for _ in range(num_requests):
+                receiver.receive()
+                in_flight.release()
+
+        messaging.start()
+        requesting_thread = threading.Thread(target=request_all)
+        receiving_thread = threading.Thread(target=receive_all)
+        start = time.perf_counter()
+        receiving_thread.start()
+        requesting_thread.start()
+        requesting_thread.join()
+        receiving_thread.join()
+        elapsed = time.perf_counter() - start
+    finally:
+        messaging.close()
+        python_socket.close()
+        java_socket.close()
+    return num_requests / elapsed
+
+
+def _create_messaging(connection, monitor, options):
+    messaging_type = AsyncioPythonMessaging if options.engine == MessagingOptions.ENGINE_ASYNCIO else PythonMessaging
+    return messaging_type(connection, monitor, options)
+
+
+class _EchoingMessageHandler(object):
+    def __init__(self, messaging):
+        self._messaging = messaging
+
+    def handle(self, message):
+        if message is not PythonKernel._ExecutionMonitor._POISON_PILL:
+            self._messaging.send(Message(self._messaging.create_next_message_id(), "echo-response", message.payload))
+        return True
+
+
+def _parse_arguments():
+    parser = argparse.ArgumentParser(description="Benchmarks each combination of the given messaging parameters.")
+    parser.add_argument("--requests", type=int, default=20000, help="number of requests per benchmark")
+    parser.add_argument("--payload-size", type=int, nargs="+", default=[16], help="request payload sizes in bytes")
+    parser.add_argument("--in-flight", type=int, nargs="+", default=[64],
+                        help="numbers of requests sent ahead of their responses")
+    parser.add_argument("--engine", nargs="+", default=[MessagingOptions.ENGINE_THREADS],
+                        choices=[MessagingOptions.ENGINE_THREADS, MessagingOptions.ENGINE_ASYNCIO])
+    parser.add_argument("--header-format", nargs="+", default=[MessageHeaderCodec.TEXT],
+                        choices=[MessageHeaderCodec.TEXT, MessageHeaderCodec.BINARY])
+    parser.add_argument("--statistics", nargs="+", default=["off"], choices=["off", "on"],
+                        help="whether messaging statistics are recorded")
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    arguments = _parse_arguments()
+    for payload_size, num_in_flight, engine, header_format, statistics in itertools.product(
+            arguments.payload_size, arguments.in_flight, arguments.engine, arguments.header_format,
+            arguments.statistics):
+        messaging_options = MessagingOptions(header_format=header_format, engine=engine,
+                                             statistics=statistics == "on")
+        requests_per_sec = benchmark_messaging(arguments.requests, payload_size, num_in_flight, messaging_options)
+        print("payload {0:>8} bytes, {1:>3} in flight, {2:>7} engine, {3:>6} headers, statistics {4:>3}: "
+              "{5:>10.1f} requests/sec ({6:>8.1f} us per request)".format(
+                  payload_size, num_in_flight, engine, header_format, statistics, requests_per_sec,
+                  1e6 / requests_per_sec))
@@ -0,0 +1,121 @@
+# -*- coding: utf-8 -*-
+# ------------------------------------------------------------------------
+#  Copyright by KNIME AG, Zurich, Switzerland
+#  Website: http://www.knime.com; Email: contact@knime.com
+#
+#  This program is free software; you can redistribute it and/or modify
+#  it under the terms of the GNU General Public License, Version 3, as
+#  published by the Free Software Foundation.
+#
+#  This program is distributed in the hope that it will be useful, but
+#  WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with this program; if not, see <http://www.gnu.org/licenses>.
+#
+#  Additional permission under GNU GPL version 3 section 7:
+#
+#  KNIME interoperates with ECLIPSE solely via ECLIPSE's plug-in APIs.
+#  Hence, KNIME and ECLIPSE are both independent programs and are not
+#  derived from each other. Should, however, the interpretation of the
+#  GNU GPL Version 3 ("License") under any applicable laws result in
+#  KNIME and ECLIPSE being a combined program, KNIME AG herewith grants
+#  you the additional permission to use and propagate KNIME together with
+#  ECLIPSE with only the license terms in place for ECLIPSE applying to
+#  ECLIPSE and the GNU GPL Version 3 applying for KNIME, provided the
+#  license terms of ECLIPSE themselves allow for the respective use and
+#  propagation of ECLIPSE together with KNIME.
+#
+#  Additional permission relating to nodes for KNIME that extend the Node
+#  Extension (and in particular that are based on subclasses of NodeModel,
+#  NodeDialog, and NodeView) and that only interoperate with KNIME through
+#  standard APIs ("Nodes"):
+#  Nodes are deemed to be separate and independent programs and to not be
+#  covered works.  Notwithstanding anything to the contrary in the
+#  License, the License does not apply to Nodes, you are not required to
+#  license Nodes under the License, and you are granted a license to
+#  prepare and propagate Nodes, in each case even if such Nodes are
+#  propagated with or for interoperation with KNIME.  The owner of a Node
+#  may freely choose the license terms applicable to such Node, including
+#  when such Node is propagated with or for interoperation with KNIME.
+# ------------------------------------------------------------------------
+
+"""
+Tests for recording messaging statistics, in particular the time messages wait in the kernel's message queues, run by
+org.knime.python2.kernel.MessagingTest.
+"""
+
+from messaging.Message import Message
+from messaging.MessagingOptions import MessagingOptions
+from messaging.MessagingStatistics import MessagingStatistics
+from python3.PythonKernel import PythonKernel
+
+
+def _create_monitored_queue():
+    statistics = MessagingStatistics()
+    monitor = PythonKernel._ExecutionMonitor()
+    return statistics, monitor, monitor.create_message_queue(4, statistics)
+
+
+def _queue_wait_time_counts(statistics):
+    return {entry['category']: entry['count'] for entry in statistics.summarize()
+            if entry['statistic'] == MessagingStatistics.QUEUE_WAIT_TIME}
+
+
+def test_dequeued_messages_are_recorded_per_category(workspace):
+    statistics, _, queue = _create_monitored_queue()
+    queue.put(Message(1, "execute"))
+    queue.put(Message(2, "execute"))
+    queue.put(Message(3, "getpid"))
+    for _ in range(3):
+        queue.get()
+    assert _queue_wait_time_counts(statistics) == {"execute": 2, "getpid": 1}
+
+
+def test_queued_messages_are_not_recorded(workspace):
+    statistics, _, queue = _create_monitored_queue()
+    queue.put(Message(1, "execute"))
+    assert _queue_wait_time_counts(statistics) == {}
+
+
+def test_poison_pill_is_not_recorded(workspace):
+    statistics, monitor, queue = _create_monitored_queue()
+    queue.put(monitor.poison_pill)
+    assert queue.get() is monitor.poison_pill
+    assert _queue_wait_time_counts(statistics) == {}
+
+
+def test_enqueue_time_is_kept_with_the_message(workspace):
+    _, _, queue = _create_monitored_queue()
+    before = MessagingStatistics.now()
+    queue.put(Message(1, "execute"))
+    after = MessagingStatistics.now()
+    enqueue_time, message = queue.queue.popleft_entry()
+    assert before <= enqueue_time <= after
+    assert message.id == 1
+
+
+def test_queue_without_statistics_records_nothing(workspace):
+    statistics, monitor, _ = _create_monitored_queue()
+    queue = monitor.create_message_queue(4)
+    queue.put(Message(1, "execute"))
+    assert queue.get().id == 1
+    assert _queue_wait_time_counts(statistics) == {}
+
+
+def test_queue_without_statistics_keeps_no_enqueue_times(workspace):
+    queue = PythonKernel._ExecutionMonitor().create_message_queue(4)
+    queue.put(Message(1, "execute"))
+    enqueue_time, message = queue.queue.popleft_entry()
+    assert enqueue_time is None
+    assert message.id == 1
+
+
+def test_statistics_are_only_created_if_enabled(workspace):
+    assert MessagingStatistics.create(None) is None
+    assert MessagingStatistics.create(MessagingOptions()) is None
+    assert MessagingStatistics.create(MessagingOptions.from_arguments(['statistics=false'])) is None
+    assert isinstance(MessagingStatistics.create(MessagingOptions.from_arguments(['statistics=true'])),
+                      MessagingStatistics)
@@ -0,0 +1,173 @@
+# -*- coding: utf-8 -*-
+# ------------------------------------------------------------------------
+#  Copyright by KNIME AG, Zurich, Switzerland
+#  Website: http://www.knime.com; Email: contact@knime.com
+#
+#  This program is free software; you can redistribute it and/or modify
+#  it under the terms of the GNU General Public License, Version 3, as
+#  published by the Free Software Foundation.
+#
+#  This program is distributed in the hope that it will be useful, but
+#  WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with this program; if not, see <http://www.gnu.org/licenses>.
+#
+#  Additional permission under GNU GPL version 3 section 7:
+#
+#  KNIME interoperates with ECLIPSE solely via ECLIPSE's plug-in APIs.
+#  Hence, KNIME and ECLIPSE are both independent programs and are not
+#  derived from each other. Should, however, the interpretation of the
+#  GNU GPL Version 3 ("License") under any applicable laws result in
+#  KNIME and ECLIPSE being a combined program, KNIME AG herewith grants
+#  you the additional permission to use and propagate KNIME together with
+#  ECLIPSE with only the license terms in place for ECLIPSE applying to
+#  ECLIPSE and the GNU GPL Version 3 applying for KNIME, provided the
+#  license terms of ECLIPSE themselves allow for the respective use and
+#  propagation of ECLIPSE together with KNIME.
+#
+#  Additional permission relating to nodes for KNIME that extend the Node
+#  Extension (and in particular that are based on subclasses of NodeModel,
+#  NodeDialog, and NodeView) and that only interoperate with KNIME through
+#  standard APIs ("Nodes"):
+#  Nodes are deemed to be separate and independent programs and to not be
+#  covered works.  Notwithstanding anything to the contrary in the
+#  License, the License does not apply to Nodes, you are not required to
+#  license Nodes under the License, and you are granted a license to
+#  prepare and propagate Nodes, in each case even if such Nodes are
+#  propagated with or for interoperation with KNIME.  The owner of a Node
+#  may freely choose the license terms applicable to such Node, including
+#  when such Node is propagated with or for interoperation with KNIME.
+# ------------------------------------------------------------------------
+
+"""
+Tests for the compression of message payloads and its statistics, run by org.knime.python2.kernel.MessagingTest.
+"""
+
+import os
+import struct
+
+from messaging.Message import Message
+from messaging.MessageHeaderCodec import MessageHeaderCodec
+from messaging.MessageReceiver import MessageReceiver
+from messaging.MessageSender import MessageSender
+from messaging.MessagingStatistics import MessagingStatistics
+from messaging.PayloadCompression import PayloadCompression
+
+_COMPRESSIBLE_PAYLOAD = b'knime' * 20000
+
+# Random bytes do not shrink below the sample ratio.
+_INCOMPRESSIBLE_PAYLOAD = os.urandom(100000)
+
+
+def _create_compression():
+    return PayloadCompression(PayloadCompression.ZLIB, 1024)
+
+
+def _raises_value_error(function, *args):
+    try:
+        function(*args)
+    except ValueError:
+        return True
+    return False
+
+
+def _transfer(message, statistics):
+    """
+    Sends the message through a compressing sender and receiver that record into the given statistics.
+    """
+    compression = _create_compression()
+    sender = MessageSender(None, MessageHeaderCodec.create(None), compression=compression, statistics=statistics)
+    receiver = MessageReceiver(None, MessageHeaderCodec.create(None), compression=compression, statistics=statistics)
+    frame = b''.join(bytes(buffer) for buffer in sender.encode_frames([message]))
+    header_size, payload_size = struct.unpack('>LL', frame[:8])
+    header = frame[8:8 + header_size]
+    payload = frame[8 + header_size:] if payload_size else None
+    return receiver.decode_frame(header, payload)
+
+
+def _summary(statistics, category):
+    return {entry['statistic']: entry for entry in statistics.summarize() if entry['category'] == category}
+
+
+def test_compressible_payload_is_compressed(workspace):
+    compression = _create_compression()
+    compressed = compression.compress(_COMPRESSIBLE_PAYLOAD)
+    assert compressed is not None
+    assert len(compressed) < len(_COMPRESSIBLE_PAYLOAD)
+    assert compression.decompress(PayloadCompression.ZLIB, compressed,
+                                  len(_COMPRESSIBLE_PAYLOAD)) == _COMPRESSIBLE_PAYLOAD
+
+
+def test_incompressible_payload_is_skipped(workspace):
+    assert _create_compression().compress(_INCOMPRESSIBLE_PAYLOAD) is None
+
+
+def test_ratio_check_only_compresses_sample(workspace):
+    # An incompressible head decides for the entire payload, even if the rest would compress well.
+    payload = _INCOMPRESSIBLE_PAYLOAD[:PayloadCompression._SAMPLE_SIZE] + _COMPRESSIBLE_PAYLOAD
+    assert _create_compression().compress(payload) is None
+
+
+def test_payload_below_threshold_is_not_compressed(workspace):
+    compression = _create_compression()
+    assert not compression.should_compress(1023)
+    assert compression.compress(_COMPRESSIBLE_PAYLOAD[:1023]) is None
+
+
+def test_disabled_compression_does_not_compress(workspace):
+    compression = PayloadCompression()
+    assert not compression.should_compress(len(_COMPRESSIBLE_PAYLOAD))
+    assert compression.compress(_COMPRESSIBLE_PAYLOAD) is None
+
+
+def test_decompressing_reports_size_mismatch(workspace):
+    compression = _create_compression()
+    compressed = compression.compress(_COMPRESSIBLE_PAYLOAD)
+    assert _raises_value_error(compression.decompress, PayloadCompression.ZLIB, compressed,
+                               len(_COMPRESSIBLE_PAYLOAD) - 1)
+
+
+def test_unsupported_codec_is_rejected(workspace):
+    assert _raises_value_error(PayloadCompression, 'lz4')
+
+
+def test_compressed_and_uncompressed_sizes_are_recorded(workspace):
+    statistics = MessagingStatistics()
+    received = _transfer(Message(1, "putObject", _COMPRESSIBLE_PAYLOAD), statistics)
+    assert bytes(received.payload) == _COMPRESSIBLE_PAYLOAD
+    summary = _summary(statistics, "putObject")
+    for direction in ('in', 'out'):
+        uncompressed = summary['uncompressed_bytes_' + direction]
+        compressed = summary['compressed_bytes_' + direction]
+        assert uncompressed['count'] == 1
+        assert uncompressed['sum'] == len(_COMPRESSIBLE_PAYLOAD)
+        assert compressed['count'] == 1
+        assert compressed['sum'] < uncompressed['sum']
+    assert MessagingStatistics.COMPRESSION_SKIPPED_BYTES not in summary
+    # Compressing on the sending and decompressing on the receiving side.
+    assert summary[MessagingStatistics.COMPRESSION_TIME]['count'] == 2
+
+
+def test_skipped_payloads_are_recorded(workspace):
+    statistics = MessagingStatistics()
+    _transfer(Message(1, "putObject", _INCOMPRESSIBLE_PAYLOAD), statistics)
+    _transfer(Message(2, "putObject", _INCOMPRESSIBLE_PAYLOAD), statistics)
+    summary = _summary(statistics, "putObject")
+    skipped = summary[MessagingStatistics.COMPRESSION_SKIPPED_BYTES]
+    assert skipped['count'] == 2
+    assert skipped['sum'] == 2 * len(_INCOMPRESSIBLE_PAYLOAD)
+    assert MessagingStatistics.COMPRESSED_BYTES_OUT not in summary
+    # Compressing the sample of a skipped payload takes time as well.
+    assert summary[MessagingStatistics.COMPRESSION_TIME]['count'] == 2
+
+
+def test_payloads_below_threshold_are_not_recorded(workspace):
+    statistics = MessagingStatistics()
+    _transfer(Message(1, "putObject", b'x' * 100), statistics)
+    summary = _summary(statistics, "putObject")
+    assert MessagingStatistics.COMPRESSION_SKIPPED_BYTES not in summary
+    assert MessagingStatistics.COMPRESSED_BYTES_OUT not in summary
+    assert MessagingStatistics.COMPRESSION_TIME not in summary
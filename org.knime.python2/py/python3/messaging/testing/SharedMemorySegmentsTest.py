@@ -0,0 +1,145 @@
+# -*- coding: utf-8 -*-
+# ------------------------------------------------------------------------
+#  Copyright by KNIME AG, Zurich, Switzerland
+#  Website: http://www.knime.com; Email: contact@knime.com
+#
+#  This program is free software; you can redistribute it and/or modify
+#  it under the terms of the GNU General Public License, Version 3, as
+#  published by the Free Software Foundation.
+#
+#  This program is distributed in the hope that it will be useful, but
+#  WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with this program; if not, see <http://www.gnu.org/licenses>.
+#
+#  Additional permission under GNU GPL version 3 section 7:
+#
+#  KNIME interoperates with ECLIPSE solely via ECLIPSE's plug-in APIs.
+#  Hence, KNIME and ECLIPSE are both independent programs and are not
+#  derived from each other. Should, however, the interpretation of the
+#  GNU GPL Version 3 ("License") under any applicable laws result in
+#  KNIME and ECLIPSE being a combined program, KNIME AG herewith grants
+#  you the additional permission to use and propagate KNIME together with
+#  ECLIPSE with only the license terms in place for ECLIPSE applying to
+#  ECLIPSE and the GNU GPL Version 3 applying for KNIME, provided the
+#  license terms of ECLIPSE themselves allow for the respective use and
+#  propagation of ECLIPSE together with KNIME.
+#
+#  Additional permission relating to nodes for KNIME that extend the Node
+#  Extension (and in particular that are based on subclasses of NodeModel,
+#  NodeDialog, and NodeView) and that only interoperate with KNIME through
+#  standard APIs ("Nodes"):
+#  Nodes are deemed to be separate and independent programs and to not be
+#  covered works.  Notwithstanding anything to the contrary in the
+#  License, the License does not apply to Nodes, you are not required to
+#  license Nodes under the License, and you are granted a license to
+#  prepare and propagate Nodes, in each case even if such Nodes are
+#  propagated with or for interoperation with KNIME.  The owner of a Node
+#  may freely choose the license terms applicable to such Node, including
+#  when such Node is propagated with or for interoperation with KNIME.
+# ------------------------------------------------------------------------
+
+"""
+Tests for transferring large payloads via shared memory segments, run by org.knime.python2.kernel.MessagingTest.
+"""
+
+import os
+import shutil
+import struct
+import tempfile
+from contextlib import contextmanager
+
+from messaging.Message import Message
+from messaging.MessageHeaderCodec import MessageHeaderCodec
+from messaging.MessageReceiver import MessageReceiver
+from messaging.MessageSender import MessageSender
+from messaging.MessagingOptions import MessagingOptions
+from messaging.SharedMemorySegments import SharedMemorySegments
+
+
+@contextmanager
+def _temporary_segments():
+    base_directory = tempfile.mkdtemp()
+    segments = SharedMemorySegments(base_directory, 1024)
+    try:
+        yield base_directory, segments
+    finally:
+        segments.close()
+        shutil.rmtree(base_directory, ignore_errors=True)
+
+
+def _segment_files(base_directory):
+    return [os.path.join(directory, name) for directory, _, names in os.walk(base_directory) for name in names]
+
+
+def test_create_is_disabled_without_directory_or_threshold(workspace):
+    with _temporary_segments() as (base_directory, _):
+        assert SharedMemorySegments.create(MessagingOptions()) is None
+        assert SharedMemorySegments.create(MessagingOptions(shared_memory_directory=base_directory)) is None
+        assert SharedMemorySegments.create(MessagingOptions(shared_memory_threshold=1024)) is None
+        segments = SharedMemorySegments.create(MessagingOptions(shared_memory_directory=base_directory,
+                                                                shared_memory_threshold=1024))
+        assert segments is not None
+        segments.close()
+
+
+def test_should_offload_payloads_from_threshold(workspace):
+    with _temporary_segments() as (_, segments):
+        assert not segments.should_offload(1023)
+        assert segments.should_offload(1024)
+
+
+def test_written_segment_is_read_and_released(workspace):
+    with _temporary_segments() as (base_directory, segments):
+        payload = os.urandom(4096)
+        segment = segments.write(payload)
+        assert segment.startswith(base_directory)
+        assert _segment_files(base_directory) == [segment]
+        read = SharedMemorySegments.read_and_release(segment)
+        assert read[:] == payload
+        # Reading acknowledges the segment, the mapping stays valid.
+        assert _segment_files(base_directory) == []
+        assert read[:] == payload
+        read.close()
+
+
+def test_segments_have_distinct_paths(workspace):
+    with _temporary_segments() as (_, segments):
+        first = segments.write(b'first')
+        second = segments.write(b'second')
+        assert first != second
+        assert SharedMemorySegments.read_and_release(first)[:] == b'first'
+        assert SharedMemorySegments.read_and_release(second)[:] == b'second'
+
+
+def test_close_removes_unacknowledged_segments(workspace):
+    with _temporary_segments() as (base_directory, segments):
+        segments.write(b'x' * 2048)
+        segments.write(b'y' * 2048)
+        assert len(_segment_files(base_directory)) == 2
+        segments.close()
+        assert os.listdir(base_directory) == []
+
+
+def test_large_payloads_are_transferred_via_segments(workspace):
+    with _temporary_segments() as (base_directory, segments):
+        sender = MessageSender(None, MessageHeaderCodec.create(None), shared_memory=segments)
+        receiver = MessageReceiver(None, MessageHeaderCodec.create(None))
+        payload = os.urandom(2048)
+        frame = b''.join(bytes(buffer) for buffer in sender.encode_frames([Message(1, "putObject", payload),
+                                                                          Message(2, "putObject", b'small')]))
+        received = []
+        while frame:
+            header_size, payload_size = struct.unpack('>LL', frame[:8])
+            header = frame[8:8 + header_size]
+            frame_payload = frame[8 + header_size:8 + header_size + payload_size] if payload_size else None
+            received.append((payload_size, receiver.decode_frame(header, frame_payload)))
+            frame = frame[8 + header_size + payload_size:]
+        # The large payload is not part of the frame, the small one is.
+        assert [payload_size for payload_size, _ in received] == [0, 5]
+        assert received[0][1].payload[:] == payload
+        assert bytes(received[1][1].payload) == b'small'
+        assert _segment_files(base_directory) == []
@@ -0,0 +1,218 @@
+# -*- coding: utf-8 -*-
+# ------------------------------------------------------------------------
+#  Copyright by KNIME AG, Zurich, Switzerland
+#  Website: http://www.knime.com; Email: contact@knime.com
+#
+#  This program is free software; you can redistribute it and/or modify
+#  it under the terms of the GNU General Public License, Version 3, as
+#  published by the Free Software Foundation.
+#
+#  This program is distributed in the hope that it will be useful, but
+#  WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with this program; if not, see <http://www.gnu.org/licenses>.
+#
+#  Additional permission under GNU GPL version 3 section 7:
+#
+#  KNIME interoperates with ECLIPSE solely via ECLIPSE's plug-in APIs.
+#  Hence, KNIME and ECLIPSE are both independent programs and are not
+#  derived from each other. Should, however, the interpretation of the
+#  GNU GPL Version 3 ("License") under any applicable laws result in
+#  KNIME and ECLIPSE being a combined program, KNIME AG herewith grants
+#  you the additional permission to use and propagate KNIME together with
+#  ECLIPSE with only the license terms in place for ECLIPSE applying to
+#  ECLIPSE and the GNU GPL Version 3 applying for KNIME, provided the
+#  license terms of ECLIPSE themselves allow for the respective use and
+#  propagation of ECLIPSE together with KNIME.
+#
+#  Additional permission relating to nodes for KNIME that extend the Node
+#  Extension (and in particular that are based on subclasses of NodeModel,
+#  NodeDialog, and NodeView) and that only interoperate with KNIME through
+#  standard APIs ("Nodes"):
+#  Nodes are deemed to be separate and independent programs and to not be
+#  covered works.  Notwithstanding anything to the contrary in the
+#  License, the License does not apply to Nodes, you are not required to
+#  license Nodes under the License, and you are granted a license to
+#  prepare and propagate Nodes, in each case even if such Nodes are
+#  propagated with or for interoperation with KNIME.  The owner of a Node
+#  may freely choose the license terms applicable to such Node, including
+#  when such Node is propagated with or for interoperation with KNIME.
+# ------------------------------------------------------------------------
+
+"""
+Tests for the cancellation of tasks, run by org.knime.python2.kernel.MessagingTest. The test functions are executed
+as user code, so they run with the token of that execution applied.
+"""
+
+import threading
+import time
+
+from CancellationToken import CancellationToken
+from CancellationToken import CancellationTokens
+from CancellationToken import TaskCancelledError
+from CancellationToken import check_cancelled
+from CancellationToken import current_token
+
+
+def _busy_loop(started, seconds=5):
+    started.set()
+    deadline = time.time() + seconds
+    while time.time() < deadline:
+        pass
+    return 'not interrupted'
+
+
+def _raises_cancelled(function):
+    try:
+        function()
+    except TaskCancelledError:
+        return True
+    return False
+
+
+def _cancel_when(token, event):
+    def cancel():
+        event.wait()
+        token.cancel()
+
+    thread = threading.Thread(target=cancel)
+    thread.start()
+    return thread
+
+
+def test_check_raises_once_cancelled(workspace):
+    token = CancellationToken()
+    token.check()
+    token.cancel()
+    assert token.is_cancelled
+    assert _raises_cancelled(token.check)
+
+
+def test_cancelled_error_is_no_exception(workspace):
+    assert not issubclass(TaskCancelledError, Exception)
+
+
+def test_check_cancelled_checks_applied_token(workspace):
+    token = CancellationToken()
+    token.cancel()
+    outer = current_token()
+    check_cancelled()
+    with token.applied():
+        assert current_token() is token
+        assert _raises_cancelled(check_cancelled)
+    assert current_token() is outer
+    check_cancelled()
+
+
+def test_applied_restores_previous_token(workspace):
+    token = CancellationToken()
+    other = CancellationToken()
+    with other.applied():
+        with token.applied():
+            assert current_token() is token
+        assert current_token() is other
+
+
+def test_run_interruptibly_returns_result(workspace):
+    assert CancellationToken().run_interruptibly(lambda: 42) == 42
+
+
+def test_run_interruptibly_does_not_run_if_cancelled(workspace):
+    token = CancellationToken()
+    token.cancel()
+    called = []
+    assert _raises_cancelled(lambda: token.run_interruptibly(lambda: called.append(True)))
+    assert called == []
+
+
+def test_run_interruptibly_interrupts_running_code(workspace):
+    token = CancellationToken()
+    started = threading.Event()
+    canceller = _cancel_when(token, started)
+    start = time.time()
+    assert _raises_cancelled(lambda: token.run_interruptibly(lambda: _busy_loop(started)))
+    canceller.join()
+    assert time.time() - start < 4
+
+
+def test_error_is_raised_at_most_once(workspace):
+    token = CancellationToken()
+    started = threading.Event()
+    caught = []
+
+    def swallow_first_error():
+        try:
+            _busy_loop(started)
+        except TaskCancelledError:
+            caught.append(True)
+        # A repeated cancellation must not interrupt the code that handles the first one.
+        token.cancel()
+        return _busy_loop(threading.Event(), 0.2)
+
+    canceller = _cancel_when(token, started)
+    assert token.run_interruptibly(swallow_first_error) == 'not interrupted'
+    canceller.join()
+    assert caught == [True]
+
+
+def test_cancelling_after_run_does_not_interrupt(workspace):
+    token = CancellationToken()
+    token.run_interruptibly(lambda: None)
+    token.cancel()
+    assert _busy_loop(threading.Event(), 0.2) == 'not interrupted'
+
+
+def test_cancel_cancels_token_of_task(workspace):
+    tokens = CancellationTokens()
+    token = tokens.acquire(1)
+    other = tokens.acquire(2)
+    tokens.cancel('1')
+    assert token.is_cancelled
+    assert not other.is_cancelled
+
+
+def test_task_cancelled_before_acquiring_starts_cancelled(workspace):
+    tokens = CancellationTokens()
+    tokens.cancel(1)
+    assert tokens.acquire('1').is_cancelled
+    # The pending cancellation is consumed.
+    assert not tokens.acquire(1).is_cancelled
+
+
+def test_released_task_is_not_cancelled(workspace):
+    tokens = CancellationTokens()
+    token = tokens.acquire(1)
+    tokens.release(1)
+    tokens.cancel(1)
+    assert not token.is_cancelled
+
+
+def test_pending_cancellations_are_bounded(workspace):
+    tokens = CancellationTokens()
+    for task_id in range(CancellationTokens._MAX_PENDING_CANCELLATIONS + 1):
+        tokens.cancel(task_id)
+    # The oldest cancellation was dropped.
+    assert not tokens.acquire(0).is_cancelled
+    assert tokens.acquire(CancellationTokens._MAX_PENDING_CANCELLATIONS).is_cancelled
+
+
+def test_cancel_callbacks_are_called_once(workspace):
+    token = CancellationToken()
+    calls = []
+    token.add_cancel_callback(lambda: calls.append('first'))
+    token.add_cancel_callback(lambda: calls.append('second'))
+    assert calls == []
+    token.cancel()
+    token.cancel()
+    assert calls == ['first', 'second']
+
+
+def test_cancel_callback_of_cancelled_token_is_called_right_away(workspace):
+    token = CancellationToken()
+    token.cancel()
+    calls = []
+    token.add_cancel_callback(lambda: calls.append(True))
+    assert calls == [True]
@@ -0,0 +1,147 @@
+# -*- coding: utf-8 -*-
+# ------------------------------------------------------------------------
+#  Copyright by KNIME AG, Zurich, Switzerland
+#  Website: http://www.knime.com; Email: contact@knime.com
+#
+#  This program is free software; you can redistribute it and/or modify
+#  it under the terms of the GNU General Public License, Version 3, as
+#  published by the Free Software Foundation.
+#
+#  This program is distributed in the hope that it will be useful, but
+#  WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with this program; if not, see <http://www.gnu.org/licenses>.
+#
+#  Additional permission under GNU GPL version 3 section 7:
+#
+#  KNIME interoperates with ECLIPSE solely via ECLIPSE's plug-in APIs.
+#  Hence, KNIME and ECLIPSE are both independent programs and are not
+#  derived from each other. Should, however, the interpretation of the
+#  GNU GPL Version 3 ("License") under any applicable laws result in
+#  KNIME and ECLIPSE being a combined program, KNIME AG herewith grants
+#  you the additional permission to use and propagate KNIME together with
+#  ECLIPSE with only the license terms in place for ECLIPSE applying to
+#  ECLIPSE and the GNU GPL Version 3 applying for KNIME, provided the
+#  license terms of ECLIPSE themselves allow for the respective use and
+#  propagation of ECLIPSE together with KNIME.
+#
+#  Additional permission relating to nodes for KNIME that extend the Node
+#  Extension (and in particular that are based on subclasses of NodeModel,
+#  NodeDialog, and NodeView) and that only interoperate with KNIME through
+#  standard APIs ("Nodes"):
+#  Nodes are deemed to be separate and independent programs and to not be
+#  covered works.  Notwithstanding anything to the contrary in the
+#  License, the License does not apply to Nodes, you are not required to
+#  license Nodes under the License, and you are granted a license to
+#  prepare and propagate Nodes, in each case even if such Nodes are
+#  propagated with or for interoperation with KNIME.  The owner of a Node
+#  may freely choose the license terms applicable to such Node, including
+#  when such Node is propagated with or for interoperation with KNIME.
+# ------------------------------------------------------------------------
+
+"""
+Tests for the parallel conversion of extension-typed columns by Serializer and ParallelConversion, run by
+org.knime.python2.kernel.MessagingTest. The columns are converted on a thread pool of their own.
+"""
+
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pandas
+
+from ParallelConversion import ParallelConversion
+from Serializer import Serializer
+
+_NUM_WORKERS = 3
+
+
+class _SlicedTypeExtension(object):
+    """
+    Type extension that converts integers to their decimal bytes representation on threads and records the slices it
+    converts. The first slice is converted last, so its results are not the first to be ready.
+    """
+
+    parallel_execution = ParallelConversion.THREADS
+
+    def __init__(self, first_value):
+        self.slices = []
+        self._first_value = first_value
+        self._lock = threading.Lock()
+
+    def serialize_batch(self, values):
+        if values[0] == self._first_value:
+            time.sleep(0.1)
+        with self._lock:
+            self.slices.append(list(values))
+        return [str(value).encode('utf-8') for value in values]
+
+
+class _SlicedValueTypeExtension(_SlicedTypeExtension):
+    """
+    Type extension without a batch function, whose values are converted one by one within each slice.
+    """
+
+    def __init__(self, first_value):
+        _SlicedTypeExtension.__init__(self, first_value)
+        self.serialize_batch = None
+
+    def serialize(self, value):
+        return _SlicedTypeExtension.serialize_batch(self, [value])[0]
+
+
+class _TypeExtensionManager(object):
+    def __init__(self, extension):
+        self._extension = extension
+
+    def get_serializer_by_id(self, identifier):
+        return self._extension
+
+
+def _serialize_in_parallel(extension, cells, min_column_size=1):
+    executor = ThreadPoolExecutor(_NUM_WORKERS)
+    try:
+        parallel_conversion = ParallelConversion(_NUM_WORKERS, executor, None, min_column_size)
+        serializer = Serializer(None, _TypeExtensionManager(extension), parallel_conversion)
+        data_frame = pandas.DataFrame({'column': pandas.Series(cells, dtype=object)})
+        serializer.serialize_objects_to_bytes(data_frame, {'column': 'sliced'})
+        return list(data_frame['column'])
+    finally:
+        executor.shutdown()
+
+
+def _expected(cells):
+    return [None if cell is None else str(cell).encode('utf-8') for cell in cells]
+
+
+def test_slices_are_concatenated_in_order(workspace):
+    cells = list(range(10))
+    extension = _SlicedTypeExtension(cells[0])
+    assert _serialize_in_parallel(extension, cells) == _expected(cells)
+    assert sorted(extension.slices) == [[0, 1, 2, 3], [4, 5, 6, 7], [8, 9]]
+    # The first slice finished last.
+    assert extension.slices[-1] == [0, 1, 2, 3]
+
+
+def test_missing_values_are_kept_across_slices(workspace):
+    cells = [None, 1, 2, None, None, 5, 6, 7, None, 9, 10, None]
+    extension = _SlicedTypeExtension(1)
+    assert _serialize_in_parallel(extension, cells) == _expected(cells)
+    assert sorted(extension.slices) == [[1, 2, 5], [6, 7, 9], [10]]
+
+
+def test_extensions_without_batch_functions_are_converted_in_slices(workspace):
+    cells = [0, None, 2, 3, 4, None, 6]
+    extension = _SlicedValueTypeExtension(cells[0])
+    assert _serialize_in_parallel(extension, cells) == _expected(cells)
+    assert sorted(extension.slices) == [[0], [2], [3], [4], [6]]
+
+
+def test_small_columns_are_converted_sequentially(workspace):
+    cells = [0, None, 2, 3]
+    extension = _SlicedTypeExtension(cells[0])
+    assert _serialize_in_parallel(extension, cells, min_column_size=4) == _expected(cells)
+    assert extension.slices == [[0, 2, 3]]
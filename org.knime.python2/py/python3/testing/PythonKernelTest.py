@@ -0,0 +1,129 @@
+# -*- coding: utf-8 -*-
+# ------------------------------------------------------------------------
+#  Copyright by KNIME AG, Zurich, Switzerland
+#  Website: http://www.knime.com; Email: contact@knime.com
+#
+#  This program is free software; you can redistribute it and/or modify
+#  it under the terms of the GNU General Public License, Version 3, as
+#  published by the Free Software Foundation.
+#
+#  This program is distributed in the hope that it will be useful, but
+#  WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with this program; if not, see <http://www.gnu.org/licenses>.
+#
+#  Additional permission under GNU GPL version 3 section 7:
+#
+#  KNIME interoperates with ECLIPSE solely via ECLIPSE's plug-in APIs.
+#  Hence, KNIME and ECLIPSE are both independent programs and are not
+#  derived from each other. Should, however, the interpretation of the
+#  GNU GPL Version 3 ("License") under any applicable laws result in
+#  KNIME and ECLIPSE being a combined program, KNIME AG herewith grants
+#  you the additional permission to use and propagate KNIME together with
+#  ECLIPSE with only the license terms in place for ECLIPSE applying to
+#  ECLIPSE and the GNU GPL Version 3 applying for KNIME, provided the
+#  license terms of ECLIPSE themselves allow for the respective use and
+#  propagation of ECLIPSE together with KNIME.
+#
+#  Additional permission relating to nodes for KNIME that extend the Node
+#  Extension (and in particular that are based on subclasses of NodeModel,
+#  NodeDialog, and NodeView) and that only interoperate with KNIME through
+#  standard APIs ("Nodes"):
+#  Nodes are deemed to be separate and independent programs and to not be
+#  covered works.  Notwithstanding anything to the contrary in the
+#  License, the License does not apply to Nodes, you are not required to
+#  license Nodes under the License, and you are granted a license to
+#  prepare and propagate Nodes, in each case even if such Nodes are
+#  propagated with or for interoperation with KNIME.  The owner of a Node
+#  may freely choose the license terms applicable to such Node, including
+#  when such Node is propagated with or for interoperation with KNIME.
+# ------------------------------------------------------------------------
+
+"""
+Tests for appending table chunks to the workspace, run by org.knime.python2.kernel.MessagingTest.
+"""
+
+import threading
+import time
+import warnings
+from unittest import mock
+
+import pandas
+
+
+def _create_chunk(start, size):
+    return pandas.DataFrame({'value': range(start, start + size)}, index=range(start, start + size))
+
+
+def test_get_variable_returns_all_appended_rows_in_order(workspace):
+    workspace.put_variable('appended_table', _create_chunk(0, 10))
+    for start in range(10, 50, 10):
+        workspace.append_to_table('appended_table', _create_chunk(start, 10))
+    table = workspace.get_variable('appended_table')
+    assert list(table['value']) == list(range(50))
+    assert list(table.index) == list(range(50))
+
+
+def test_concatenation_does_not_warn(workspace):
+    workspace.put_variable('appended_table', _create_chunk(0, 5))
+    workspace.append_to_table('appended_table', _create_chunk(5, 5))
+    with warnings.catch_warnings():
+        warnings.simplefilter('error')
+        assert len(workspace.get_variable('appended_table')) == 10
+
+
+def test_appending_after_access_keeps_previous_rows(workspace):
+    workspace.put_variable('appended_table', _create_chunk(0, 5))
+    workspace.append_to_table('appended_table', _create_chunk(5, 5))
+    assert len(workspace.get_variable('appended_table')) == 10
+    workspace.append_to_table('appended_table', _create_chunk(10, 5))
+    workspace.append_to_table('appended_table', _create_chunk(15, 5))
+    assert list(workspace.get_variable('appended_table')['value']) == list(range(20))
+
+
+def test_putting_a_table_discards_appended_chunks(workspace):
+    workspace.put_variable('appended_table', _create_chunk(0, 5))
+    workspace.append_to_table('appended_table', _create_chunk(5, 5))
+    workspace.put_variable('appended_table', _create_chunk(100, 3))
+    assert list(workspace.get_variable('appended_table')['value']) == [100, 101, 102]
+
+
+def test_concurrent_reads_do_not_lose_appended_rows(workspace):
+    chunk_size = 10
+    num_chunks = 50
+    workspace.put_variable('appended_table', _create_chunk(0, chunk_size))
+    appended = threading.Event()
+    errors = []
+
+    def read_while_appending():
+        try:
+            while not appended.is_set():
+                table = workspace.get_variable('appended_table')
+                # Any state that a reader observes must be a prefix of the final table.
+                assert list(table['value']) == list(range(len(table)))
+        except BaseException as ex:
+            errors.append(ex)
+
+    def slow_concat(*args, **kwargs):
+        # Widen the window in which other threads could observe a partially concatenated table.
+        time.sleep(0.001)
+        return concat(*args, **kwargs)
+
+    concat = pandas.concat
+    readers = [threading.Thread(target=read_while_appending) for _ in range(3)]
+    with mock.patch('PythonKernelBase.pandas.concat', side_effect=slow_concat):
+        for reader in readers:
+            reader.start()
+        try:
+            for start in range(chunk_size, chunk_size * num_chunks, chunk_size):
+                workspace.append_to_table('appended_table', _create_chunk(start, chunk_size))
+                time.sleep(0.0005)
+        finally:
+            appended.set()
+            for reader in readers:
+                reader.join()
+    assert errors == []
+    assert list(workspace.get_variable('appended_table')['value']) == list(range(chunk_size * num_chunks))
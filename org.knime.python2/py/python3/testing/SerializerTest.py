@@ -0,0 +1,143 @@
+# -*- coding: utf-8 -*-
+# ------------------------------------------------------------------------
+#  Copyright by KNIME AG, Zurich, Switzerland
+#  Website: http://www.knime.com; Email: contact@knime.com
+#
+#  This program is free software; you can redistribute it and/or modify
+#  it under the terms of the GNU General Public License, Version 3, as
+#  published by the Free Software Foundation.
+#
+#  This program is distributed in the hope that it will be useful, but
+#  WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with this program; if not, see <http://www.gnu.org/licenses>.
+#
+#  Additional permission under GNU GPL version 3 section 7:
+#
+#  KNIME interoperates with ECLIPSE solely via ECLIPSE's plug-in APIs.
+#  Hence, KNIME and ECLIPSE are both independent programs and are not
+#  derived from each other. Should, however, the interpretation of the
+#  GNU GPL Version 3 ("License") under any applicable laws result in
+#  KNIME and ECLIPSE being a combined program, KNIME AG herewith grants
+#  you the additional permission to use and propagate KNIME together with
+#  ECLIPSE with only the license terms in place for ECLIPSE applying to
+#  ECLIPSE and the GNU GPL Version 3 applying for KNIME, provided the
+#  license terms of ECLIPSE themselves allow for the respective use and
+#  propagation of ECLIPSE together with KNIME.
+#
+#  Additional permission relating to nodes for KNIME that extend the Node
+#  Extension (and in particular that are based on subclasses of NodeModel,
+#  NodeDialog, and NodeView) and that only interoperate with KNIME through
+#  standard APIs ("Nodes"):
+#  Nodes are deemed to be separate and independent programs and to not be
+#  covered works.  Notwithstanding anything to the contrary in the
+#  License, the License does not apply to Nodes, you are not required to
+#  license Nodes under the License, and you are granted a license to
+#  prepare and propagate Nodes, in each case even if such Nodes are
+#  propagated with or for interoperation with KNIME.  The owner of a Node
+#  may freely choose the license terms applicable to such Node, including
+#  when such Node is propagated with or for interoperation with KNIME.
+# ------------------------------------------------------------------------
+
+"""
+Tests for the conversion of extension-typed columns by Serializer, run by org.knime.python2.kernel.MessagingTest. The
+columns are converted by the type extensions BatchConvertingTypeExtension and ValueConvertingTypeExtension next to
+this module.
+"""
+
+import os
+
+import numpy
+import pandas
+
+from Serializer import Serializer
+from TypeExtensionManager import TypeExtensionManager
+
+_BATCH = 'batch'
+_VALUE = 'value'
+
+
+class _TypeExtensionManager(object):
+    """
+    Provides the test type extensions by id without requesting them from Java. Each instance loads the extensions
+    anew, which resets the values they recorded.
+    """
+
+    def __init__(self):
+        directory = os.path.dirname(os.path.abspath(__file__))
+        self.extensions = {
+            _BATCH: TypeExtensionManager.load_extension(os.path.join(directory, 'BatchConvertingTypeExtension.py')),
+            _VALUE: TypeExtensionManager.load_extension(os.path.join(directory, 'ValueConvertingTypeExtension.py'))}
+
+    def get_serializer_by_id(self, identifier):
+        return self.extensions[identifier]
+
+    def get_deserializer_by_id(self, identifier):
+        return self.extensions[identifier]
+
+
+def _convert(extension_id, cells, deserialize=False):
+    manager = _TypeExtensionManager()
+    serializer = Serializer(None, manager)
+    data_frame = pandas.DataFrame({'column': pandas.Series(cells, dtype=object)})
+    if deserialize:
+        serializer.deserialize_from_bytes(data_frame, {'column': extension_id})
+    else:
+        serializer.serialize_objects_to_bytes(data_frame, {'column': extension_id})
+    return list(data_frame['column']), manager.extensions[extension_id]
+
+
+def test_serialize_batch_converts_all_values_of_a_column_at_once(workspace):
+    converted, extension = _convert(_BATCH, [1, None, 3])
+    assert converted == [b'1', None, b'3']
+    assert extension.batches == [[1, 3]]
+
+
+def test_deserialize_batch_converts_all_values_of_a_column_at_once(workspace):
+    converted, extension = _convert(_BATCH, [b'1', None, b'', numpy.float64('nan'), b'5'], deserialize=True)
+    assert converted == [1, None, None, None, 5]
+    assert extension.batches == [[b'1', b'5']]
+
+
+def test_extensions_without_batch_functions_convert_value_by_value(workspace):
+    converted, extension = _convert(_VALUE, [1, None, 3])
+    assert converted == [b'1', None, b'3']
+    assert extension.values == [1, 3]
+    converted, extension = _convert(_VALUE, [b'1', None, b'', numpy.float64('nan'), b'5'], deserialize=True)
+    assert converted == [1, None, None, None, 5]
+    assert extension.values == [b'1', b'5']
+
+
+def test_missing_elements_of_list_and_set_cells_are_kept(workspace):
+    for extension_id in (_BATCH, _VALUE):
+        converted = _convert(extension_id, [[1, None, 2], None, set([3, None]), [None], []])[0]
+        assert converted == [[b'1', None, b'2'], None, set([b'3', None]), [None], []]
+        converted = _convert(extension_id, [[b'1', None, b'2'], None, set([b'3', None]), [None]], deserialize=True)[0]
+        assert converted == [[1, None, 2], None, set([3, None]), [None]]
+
+
+def test_elements_of_all_list_and_set_cells_are_converted_in_one_batch(workspace):
+    converted, extension = _convert(_BATCH, [[1, None, 2], 3, set([4, None])])
+    assert converted == [[b'1', None, b'2'], b'3', set([b'4', None])]
+    assert extension.batches == [[1, 2, 3, 4]]
+
+
+def test_columns_without_values_are_not_converted(workspace):
+    converted, extension = _convert(_BATCH, [None, None])
+    assert converted == [None, None]
+    assert extension.batches == [[]]
+    converted, extension = _convert(_VALUE, [None, None])
+    assert converted == [None, None]
+    assert extension.values == []
+
+
+def test_batch_functions_must_convert_every_value(workspace):
+    try:
+        Serializer._convert_cells([1, None, 3], lambda values: values[:-1], Serializer._is_none)
+    except ValueError:
+        pass
+    else:
+        raise AssertionError('Expected a ValueError.')
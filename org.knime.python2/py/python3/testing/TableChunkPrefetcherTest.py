@@ -0,0 +1,236 @@
+# -*- coding: utf-8 -*-
+# ------------------------------------------------------------------------
+#  Copyright by KNIME AG, Zurich, Switzerland
+#  Website: http://www.knime.com; Email: contact@knime.com
+#
+#  This program is free software; you can redistribute it and/or modify
+#  it under the terms of the GNU General Public License, Version 3, as
+#  published by the Free Software Foundation.
+#
+#  This program is distributed in the hope that it will be useful, but
+#  WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with this program; if not, see <http://www.gnu.org/licenses>.
+#
+#  Additional permission under GNU GPL version 3 section 7:
+#
+#  KNIME interoperates with ECLIPSE solely via ECLIPSE's plug-in APIs.
+#  Hence, KNIME and ECLIPSE are both independent programs and are not
+#  derived from each other. Should, however, the interpretation of the
+#  GNU GPL Version 3 ("License") under any applicable laws result in
+#  KNIME and ECLIPSE being a combined program, KNIME AG herewith grants
+#  you the additional permission to use and propagate KNIME together with
+#  ECLIPSE with only the license terms in place for ECLIPSE applying to
+#  ECLIPSE and the GNU GPL Version 3 applying for KNIME, provided the
+#  license terms of ECLIPSE themselves allow for the respective use and
+#  propagation of ECLIPSE together with KNIME.
+#
+#  Additional permission relating to nodes for KNIME that extend the Node
+#  Extension (and in particular that are based on subclasses of NodeModel,
+#  NodeDialog, and NodeView) and that only interoperate with KNIME through
+#  standard APIs ("Nodes"):
+#  Nodes are deemed to be separate and independent programs and to not be
+#  covered works.  Notwithstanding anything to the contrary in the
+#  License, the License does not apply to Nodes, you are not required to
+#  license Nodes under the License, and you are granted a license to
+#  prepare and propagate Nodes, in each case even if such Nodes are
+#  propagated with or for interoperation with KNIME.  The owner of a Node
+#  may freely choose the license terms applicable to such Node, including
+#  when such Node is propagated with or for interoperation with KNIME.
+# ------------------------------------------------------------------------
+
+"""
+Tests for TableChunkPrefetcher, run by org.knime.python2.kernel.MessagingTest. They use their own prefetcher and
+executor and do not touch the workspace.
+"""
+
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import pandas
+
+from CancellationToken import CancellationTokens
+from messaging.Message import Message
+from messaging.Message import PayloadEncoder
+from messaging.RequestHandlers import GetTableChunkRequestHandler
+from TableChunkPrefetcher import TableChunkPrefetcher
+
+
+class _RecordingSerializer(object):
+    """
+    Serializes chunks into (start, end) tuples and records the serialized, inferred and discarded chunks. Prefetching
+    blocks between started and release.
+    """
+
+    def __init__(self):
+        self.serialized_chunks = []
+        self.discarded_chunks = []
+        self.inferred_schemas = 0
+        self.started = threading.Event()
+        self.release = threading.Event()
+        self.release.set()
+        self._calling_thread = threading.current_thread()
+        self._lock = threading.Lock()
+
+    def serialize_chunk(self, data_frame, start, end, schema):
+        if threading.current_thread() is not self._calling_thread:
+            self.started.set()
+            self.release.wait()
+        with self._lock:
+            self.serialized_chunks.append((start, end))
+        return start, end
+
+    def infer_schema(self, data_frame):
+        with self._lock:
+            self.inferred_schemas += 1
+        return 'schema'
+
+    def discard_chunk(self, chunk):
+        with self._lock:
+            self.discarded_chunks.append(chunk)
+
+
+class _Prefetching(object):
+    """
+    Context manager that provides a prefetcher with a single-threaded executor and a recording serializer.
+    """
+
+    def __enter__(self):
+        self.serializer = _RecordingSerializer()
+        self.executor = ThreadPoolExecutor(1)
+        self.prefetcher = TableChunkPrefetcher(self.serializer.serialize_chunk, self.executor,
+                                               infer_schema=self.serializer.infer_schema,
+                                               discard_chunk=self.serializer.discard_chunk)
+        self.table = pandas.DataFrame({'value': range(25)})
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.serializer.release.set()
+        self.executor.shutdown(wait=True)
+
+    def wait_for_prefetching(self):
+        # The executor is single-threaded, so all previously submitted chunks are done once this one is.
+        self.executor.submit(lambda: None).result()
+
+
+def test_consecutive_chunks_are_served_from_cache(workspace):
+    with _Prefetching() as p:
+        chunks = [p.prefetcher.get_chunk('table', p.table, start, min(start + 9, 24)) for start in range(0, 25, 10)]
+        assert chunks == [(0, 9), (10, 19), (20, 24)]
+        p.wait_for_prefetching()
+        assert p.serializer.serialized_chunks == [(0, 9), (10, 19), (20, 24)]
+        assert p.serializer.inferred_schemas == 1
+        assert p.serializer.discarded_chunks == []
+
+
+def test_out_of_order_request_discards_serialized_chunk(workspace):
+    with _Prefetching() as p:
+        p.prefetcher.get_chunk('table', p.table, 0, 9)
+        p.wait_for_prefetching()
+        assert p.prefetcher.get_chunk('table', p.table, 20, 24) == (20, 24)
+        assert p.serializer.discarded_chunks == [(10, 19)]
+
+
+def test_modified_table_discards_serialized_chunk(workspace):
+    with _Prefetching() as p:
+        p.prefetcher.get_chunk('table', p.table, 0, 9)
+        p.wait_for_prefetching()
+        modified_table = p.table.copy()
+        assert p.prefetcher.get_chunk('table', modified_table, 10, 19) == (10, 19)
+        assert p.serializer.discarded_chunks == [(10, 19)]
+        assert p.serializer.inferred_schemas == 2
+
+
+def test_chunk_is_discarded_once_its_serialization_completes(workspace):
+    with _Prefetching() as p:
+        p.serializer.release.clear()
+        p.prefetcher.get_chunk('table', p.table, 0, 9)
+        # (10, 19) is being serialized and cannot be cancelled anymore.
+        p.serializer.started.wait()
+        p.prefetcher.invalidate('table')
+        assert p.serializer.discarded_chunks == []
+        p.serializer.release.set()
+        p.wait_for_prefetching()
+        assert p.serializer.discarded_chunks == [(10, 19)]
+
+
+def test_pending_chunk_is_cancelled(workspace):
+    with _Prefetching() as p:
+        blocker = threading.Event()
+        p.executor.submit(blocker.wait)
+        p.prefetcher.get_chunk('table', p.table, 0, 9)
+        # (10, 19) waits for the blocker.
+        p.prefetcher.invalidate('table')
+        blocker.set()
+        p.wait_for_prefetching()
+        assert p.serializer.serialized_chunks == [(0, 9)]
+        assert p.serializer.discarded_chunks == []
+
+
+def test_invalidate_only_affects_the_named_table(workspace):
+    with _Prefetching() as p:
+        other_table = pandas.DataFrame({'value': range(25)})
+        p.prefetcher.get_chunk('table', p.table, 0, 9)
+        p.prefetcher.get_chunk('other', other_table, 0, 9)
+        p.wait_for_prefetching()
+        p.prefetcher.invalidate('other')
+        assert p.serializer.discarded_chunks == [(10, 19)]
+        p.prefetcher.get_chunk('table', p.table, 10, 19)
+        p.wait_for_prefetching()
+        assert p.serializer.inferred_schemas == 2
+        # (10, 19) of 'table' was served from the cache.
+        assert p.serializer.serialized_chunks.count((10, 19)) == 2
+
+
+def test_invalidate_without_name_affects_all_tables(workspace):
+    with _Prefetching() as p:
+        other_table = pandas.DataFrame({'value': range(25)})
+        p.prefetcher.get_chunk('table', p.table, 0, 9)
+        p.prefetcher.get_chunk('other', other_table, 0, 9)
+        p.wait_for_prefetching()
+        p.prefetcher.invalidate()
+        assert p.serializer.discarded_chunks == [(10, 19), (10, 19)]
+        p.prefetcher.get_chunk('table', p.table, 10, 19)
+        assert p.serializer.inferred_schemas == 3
+
+
+class _Workspace(object):
+    """
+    The part of the kernel that the table chunk request handlers use.
+    """
+
+    def __init__(self, prefetcher, tables):
+        self.table_chunk_prefetcher = prefetcher
+        self._tables = tables
+
+    def get_variable(self, name):
+        return self._tables[name]
+
+
+def test_cancelling_a_request_only_invalidates_its_tables(workspace):
+    discarded_chunks = []
+    executor = ThreadPoolExecutor(1)
+    try:
+        prefetcher = TableChunkPrefetcher(lambda data_frame, start, end, schema: b'%d-%d' % (start, end), executor,
+                                          discard_chunk=discarded_chunks.append)
+        stub = _Workspace(prefetcher, {'table': pandas.DataFrame({'value': range(25)}),
+                                       'other': pandas.DataFrame({'value': range(25)})})
+        tokens = CancellationTokens()
+        for request_id, name in [(1, 'table'), (2, 'other')]:
+            payload = PayloadEncoder().put_string(name).put_int(0).put_int(9).payload
+            request = Message(request_id, 'getTableChunk', payload)
+            with tokens.acquire(request_id).applied():
+                GetTableChunkRequestHandler()._respond(request, -request_id, stub)
+        executor.submit(lambda: None).result()
+        # Both requests are still in flight.
+        tokens.cancel(1)
+        assert discarded_chunks == [b'10-19']
+        tokens.release(1)
+        tokens.release(2)
+        tokens.cancel(2)
+        assert discarded_chunks == [b'10-19']
+    finally:
+        executor.shutdown(wait=True)
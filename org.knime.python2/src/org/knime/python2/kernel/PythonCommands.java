@@ -47,6 +47,8 @@
 
 import java.io.InputStream;
 import java.io.OutputStream;
+import java.util.ArrayList;
+import java.util.List;
 import java.util.concurrent.ExecutionException;
 import java.util.concurrent.ExecutorService;
 import java.util.concurrent.Executors;
@@ -63,6 +65,7 @@
 import org.knime.python2.kernel.messaging.Message;
 import org.knime.python2.kernel.messaging.MessageHandler;
 import org.knime.python2.kernel.messaging.MessageHandlerCollection;
+import org.knime.python2.kernel.messaging.MessagingOptions;
 import org.knime.python2.kernel.messaging.PythonMessaging;
 import org.knime.python2.kernel.messaging.TaskHandler;
 import org.knime.python2.util.PythonUtils;
@@ -95,7 +98,33 @@ public final class PythonCommands implements AutoCloseable {
      */
     public PythonCommands(final OutputStream outToPython, final InputStream inFromPython,
         final PythonExecutionMonitor monitor) {
-        m_messaging = new PythonMessaging(outToPython, inFromPython, monitor);
+        this(outToPython, inFromPython, monitor, null);
+    }
+
+    /**
+     * @param outToPython output stream used for communication with Python
+     * @param inFromPython input stream used for communication with Python
+     * @param options the options of the messaging system, may be <code>null</code>
+     */
+    public PythonCommands(final OutputStream outToPython, final InputStream inFromPython,
+        final PythonExecutionMonitor monitor, final MessagingOptions options) {
+        this(outToPython, inFromPython, null, null, monitor, options);
+    }
+
+    /**
+     * @param outToPython output stream used for communication with Python
+     * @param inFromPython input stream used for communication with Python
+     * @param dataOutToPython output stream used for sending table and object data to Python, may be <code>null</code>
+     *            in which case all data is sent via <code>outToPython</code>
+     * @param dataInFromPython input stream used for receiving table and object data from Python, may be
+     *            <code>null</code> in which case all data is received via <code>inFromPython</code>
+     * @param options the options of the messaging system, may be <code>null</code>
+     */
+    public PythonCommands(final OutputStream outToPython, final InputStream inFromPython,
+        final OutputStream dataOutToPython, final InputStream dataInFromPython, final PythonExecutionMonitor monitor,
+        final MessagingOptions options) {
+        m_messaging =
+            new PythonMessaging(outToPython, inFromPython, dataOutToPython, dataInFromPython, monitor, options);
         m_monitor = monitor;
         m_executor = ThreadUtils.executorServiceWithContext(
             Executors.newCachedThreadPool(new ThreadFactoryBuilder().setNameFormat("python-task-%d").build()));
@@ -189,6 +218,25 @@ public synchronized RunnableFuture<Void> appendToTable(final String name, final
             "appendToTable", payload, ImmutableMap.of(PAYLOAD_NAME, name)));
     }
 
+    /**
+     * Creates a runnable future that puts or appends chunks of several tables into the Python workspace using a single
+     * request. The table chunks should be serialized using the currently active serialization library.
+     *
+     * @param names the variable names of the tables in the Python workspace
+     * @param tables the serialized table chunks as byte arrays, one per name
+     * @param append whether the respective chunk is appended to its table or replaces it, one per name
+     * @return a runnable future that puts or appends the chunks of table rows
+     */
+    public synchronized RunnableFuture<Void> putTables(final String[] names, final byte[][] tables,
+        final boolean[] append) {
+        final PayloadEncoder encoder = new PayloadEncoder().putInt(names.length);
+        for (int i = 0; i < names.length; i++) {
+            encoder.putString(names[i]).putInt(append[i] ? 1 : 0).putBytes(tables[i]);
+        }
+        return createTask(new VoidReturningTaskHandler(),
+            new DefaultMessage(m_messaging.createNextMessageId(), "putTables", encoder.get(), null));
+    }
+
     /**
      * Creates a runnable future that gets the size in bytes of a serialized table from the Python workspace.
      *
@@ -227,6 +275,38 @@ public synchronized RunnableFuture<byte[]> getTableChunk(final String name, fina
             new DefaultMessage(m_messaging.createNextMessageId(), "getTableChunk", payload, null));
     }
 
+    /**
+     * Creates a runnable future that gets chunks of several serialized KNIME tables from the Python workspace using a
+     * single request. Along with each chunk, the size of its table is returned. Requesting the first chunk of each
+     * table therefore saves separate requests for the table sizes.
+     *
+     * @param names the variable names of the tables in the Python workspace
+     * @param starts the first row of the respective chunk
+     * @param ends the last row of the respective chunk, is limited to the size of the table
+     * @return a runnable future that returns the serialized table chunks in the order of the given names
+     */
+    public synchronized RunnableFuture<List<TableChunk>> getTables(final String[] names, final int[] starts,
+        final int[] ends) {
+        final PayloadEncoder encoder = new PayloadEncoder().putInt(names.length);
+        for (int i = 0; i < names.length; i++) {
+            encoder.putString(names[i]).putInt(starts[i]).putInt(ends[i]);
+        }
+        return createTask(new AbstractTaskHandler<List<TableChunk>>() {
+
+            @Override
+            protected List<TableChunk> handleSuccessMessage(final Message response) throws ExecutionException {
+                final PayloadDecoder decoder = new PayloadDecoder(response.getPayload());
+                final int numChunks = decoder.getNextInt();
+                final List<TableChunk> chunks = new ArrayList<>(numChunks);
+                for (int i = 0; i < numChunks; i++) {
+                    final int tableSize = decoder.getNextInt();
+                    chunks.add(new TableChunk(tableSize, decoder.getNextBytes()));
+                }
+                return chunks;
+            }
+        }, new DefaultMessage(m_messaging.createNextMessageId(), "getTables", encoder.get(), null));
+    }
+
     /**
      * Creates a runnable future that puts a Python object into the Python workspace. The object consists of a pickled
      * representation, a type and a string representation.
@@ -315,6 +395,17 @@ public synchronized RunnableFuture<byte[]> listVariables() {
             new DefaultMessage(m_messaging.createNextMessageId(), "listVariables", null, null));
     }
 
+    /**
+     * Creates a runnable future that gets the messaging statistics collected by Python, one row per message category
+     * and statistic.
+     *
+     * @return a runnable future that returns the serialized table of messaging statistics
+     */
+    public synchronized RunnableFuture<byte[]> getStats() {
+        return createTask(new ByteArrayReturningTaskHandler(),
+            new DefaultMessage(m_messaging.createNextMessageId(), "getStats", null, null));
+    }
+
     /**
      * Creates a runnable future that gets if Python supports auto-completion.
      *
@@ -406,6 +497,47 @@ protected String[] handleSuccessMessage(final Message response) throws Execution
         }, createExecuteCommand(sourceCode));
     }
 
+    /**
+     * Creates a runnable future that executes the given source code and then collects the given flow variables and the
+     * first chunk of each of the given tables in the same request.
+     *
+     * @param sourceCode the source code to execute
+     * @param flowVariablesName the variable name of the flow variables dict in the Python workspace
+     * @param chunkSize the maximum number of rows of the returned table chunks
+     * @param tableNames the variable names of the tables in the Python workspace
+     * @return a runnable future that returns the output of the execution and, if the execution succeeded, the
+     *         collected data
+     */
+    public synchronized RunnableFuture<ExecuteAndCollectResponse> executeAndCollect(final String sourceCode,
+        final String flowVariablesName, final int chunkSize, final String[] tableNames) {
+        final PayloadEncoder encoder = new PayloadEncoder().putString(sourceCode).putString(flowVariablesName)
+            .putInt(chunkSize).putInt(tableNames.length);
+        for (final String tableName : tableNames) {
+            encoder.putString(tableName);
+        }
+        return createTask(new AbstractTaskHandler<ExecuteAndCollectResponse>() {
+
+            @Override
+            protected ExecuteAndCollectResponse handleSuccessMessage(final Message response)
+                throws ExecutionException {
+                final PayloadDecoder decoder = new PayloadDecoder(response.getPayload());
+                final String[] output = new String[2];
+                output[0] = decoder.getNextString();
+                output[1] = decoder.getNextString();
+                if (!output[1].isEmpty()) {
+                    return new ExecuteAndCollectResponse(output, null, null);
+                }
+                final byte[] flowVariables = decoder.getNextBytes();
+                final List<TableChunk> chunks = new ArrayList<>(tableNames.length);
+                for (int i = 0; i < tableNames.length; i++) {
+                    final int tableSize = decoder.getNextInt();
+                    chunks.add(new TableChunk(tableSize, decoder.getNextBytes()));
+                }
+                return new ExecuteAndCollectResponse(output, flowVariables, chunks);
+            }
+        }, new DefaultMessage(m_messaging.createNextMessageId(), "executeAndCollect", encoder.get(), null));
+    }
+
     public synchronized RunnableFuture<String[]> executeAsync(final String sourceCode) {
         return createTask(new AbstractTaskHandler<String[]>() {
 
@@ -487,4 +619,74 @@ protected Void handleSuccessMessage(final Message response) throws ExecutionExce
             return null;
         }
     }
+
+    /**
+     * The response to an {@link PythonCommands#executeAndCollect(String, String, int, String[]) executeAndCollect}
+     * request.
+     */
+    public static final class ExecuteAndCollectResponse {
+
+        private final String[] m_output;
+
+        private final byte[] m_flowVariables;
+
+        private final List<TableChunk> m_tableChunks;
+
+        private ExecuteAndCollectResponse(final String[] output, final byte[] flowVariables,
+            final List<TableChunk> tableChunks) {
+            m_output = output;
+            m_flowVariables = flowVariables;
+            m_tableChunks = tableChunks;
+        }
+
+        /**
+         * @return the standard output and error output of the execution
+         */
+        public String[] getOutput() {
+            return m_output;
+        }
+
+        /**
+         * @return the serialized flow variables, <code>null</code> if the execution failed
+         */
+        public byte[] getFlowVariables() {
+            return m_flowVariables;
+        }
+
+        /**
+         * @return the first chunk of each requested table, <code>null</code> if the execution failed
+         */
+        public List<TableChunk> getTableChunks() {
+            return m_tableChunks;
+        }
+    }
+
+    /**
+     * A chunk of a serialized table along with the size of the entire table.
+     */
+    public static final class TableChunk {
+
+        private final int m_tableSize;
+
+        private final byte[] m_bytes;
+
+        private TableChunk(final int tableSize, final byte[] bytes) {
+            m_tableSize = tableSize;
+            m_bytes = bytes;
+        }
+
+        /**
+         * @return the number of rows of the table the chunk belongs to
+         */
+        public int getTableSize() {
+            return m_tableSize;
+        }
+
+        /**
+         * @return the serialized rows of the chunk
+         */
+        public byte[] getBytes() {
+            return m_bytes;
+        }
+    }
 }
@@ -55,12 +55,11 @@
 import java.io.InputStream;
 import java.io.InputStreamReader;
 import java.io.StringReader;
-import java.net.ServerSocket;
-import java.net.Socket;
 import java.net.SocketTimeoutException;
 import java.net.URI;
 import java.net.URISyntaxException;
 import java.util.ArrayList;
+import java.util.Arrays;
 import java.util.Collection;
 import java.util.Collections;
 import java.util.HashMap;
@@ -127,11 +126,14 @@
 import org.knime.python2.extensions.serializationlibrary.interfaces.impl.TemporaryTableCreator;
 import org.knime.python2.generic.ImageContainer;
 import org.knime.python2.generic.ScriptingNodeUtils;
+import org.knime.python2.kernel.PythonCommands.ExecuteAndCollectResponse;
+import org.knime.python2.kernel.PythonCommands.TableChunk;
 import org.knime.python2.kernel.messaging.AbstractRequestHandler;
 import org.knime.python2.kernel.messaging.DefaultMessage;
 import org.knime.python2.kernel.messaging.DefaultMessage.PayloadDecoder;
 import org.knime.python2.kernel.messaging.DefaultMessage.PayloadEncoder;
 import org.knime.python2.kernel.messaging.Message;
+import org.knime.python2.kernel.messaging.MessagingOptions;
 import org.knime.python2.kernel.messaging.TaskHandler;
 import org.knime.python2.port.PickledObject;
 import org.knime.python2.util.PythonUtils;
@@ -197,9 +199,11 @@ public static int getCleanupTimeoutInMillis() {
 
     private final Integer m_pid; // Nullable.
 
-    private final ServerSocket m_serverSocket;
+    private final PythonKernelServerSocket m_serverSocket;
 
-    private final Socket m_socket;
+    private final PythonKernelServerSocket.Connection m_socket;
+
+    private final PythonKernelServerSocket.Connection m_dataSocket; // Nullable.
 
     private final PythonCommands m_commands;
 
@@ -251,10 +255,11 @@ public PythonKernel(final PythonKernelOptions kernelOptions) throws IOException
             // Create serialization library instance.
             m_serializer = setupSerializationLibrary();
 
+            final MessagingOptions messagingOptions = m_kernelOptions.getMessagingOptions();
+
             // Start socket creation. The created socket is used to communicate with the Python process that is created below.
-            m_serverSocket = new ServerSocket(0);
-            m_serverSocket.setSoTimeout(getConnectionTimeoutInMillis());
-            final Future<Socket> socketBeingSetup = setupSocket();
+            m_serverSocket = PythonKernelServerSocket.create(getConnectionTimeoutInMillis());
+            final Future<PythonKernelServerSocket.Connection> socketBeingSetup = setupSocket();
 
             // Create Python process.
             m_process = setupPythonProcess();
@@ -299,6 +304,8 @@ public void messageReceived(final String message, final boolean isWarningMessage
             try {
                 // Wait for Python to connect.
                 m_socket = socketBeingSetup.get();
+                // Python opens the data connection right after the control connection.
+                m_dataSocket = messagingOptions.isDataChannelEnabled() ? setupSocket().get() : null;
             } catch (final ExecutionException e) {
                 if (e.getCause() instanceof SocketTimeoutException) {
                     // Under some circumstances, the Python process may crash while we're trying to establish a socket
@@ -322,8 +329,17 @@ public void messageReceived(final String message, final boolean isWarningMessage
             }
 
             // Setup command/message system.
-            m_commands = new PythonCommands(m_socket.getOutputStream(), m_socket.getInputStream(),
-                new PythonKernelExecutionMonitor());
+            if (m_dataSocket != null) {
+                if (messagingOptions.getDataChannelBufferSize() > 0) {
+                    m_dataSocket.setBufferSize(messagingOptions.getDataChannelBufferSize());
+                }
+                m_commands = new PythonCommands(m_socket.getOutputStream(), m_socket.getInputStream(),
+                    m_dataSocket.getOutputStream(), m_dataSocket.getInputStream(), new PythonKernelExecutionMonitor(),
+                    messagingOptions);
+            } else {
+                m_commands = new PythonCommands(m_socket.getOutputStream(), m_socket.getInputStream(),
+                    new PythonKernelExecutionMonitor(), messagingOptions);
+            }
 
             // Setup request handlers.
             setupRequestHandlers();
@@ -403,26 +419,30 @@ private String getSerializerId() {
         return PythonPreferencePage.getSerializerId();
     }
 
-    private Future<Socket> setupSocket() {
+    private Future<PythonKernelServerSocket.Connection> setupSocket() {
         return Executors.newSingleThreadExecutor().submit(m_serverSocket::accept);
     }
 
     private Process setupPythonProcess() throws IOException {
         final String kernelScriptPath = m_kernelOptions.getKernelScriptPath();
-        final String port = Integer.toString(m_serverSocket.getLocalPort());
+        // Either a port or the path of a Unix domain socket.
+        final String address = m_serverSocket.getAddress();
         final String serializationLibraryPath =
             SerializationLibraryExtensions.getSerializationLibraryPath(getSerializerId());
-        // Start Python kernel that listens to the given port.
+        // Start Python kernel that connects to the given address.
         // Use the -u options to force Python to not buffer stdout and stderror.
-        final ProcessBuilder pb;
+        final List<String> command = new ArrayList<>();
         if (!m_kernelOptions.getUsePython3()) {
             // Python2 start without site to set default encoding to utf-8.
-            pb = new ProcessBuilder(Activator.getPython2Command(), "-u", /*"-S",*/ kernelScriptPath, port,
-                serializationLibraryPath);
+            command.addAll(Arrays.asList(Activator.getPython2Command(), "-u", /*"-S",*/ kernelScriptPath, address,
+                serializationLibraryPath));
         } else {
-            pb = new ProcessBuilder(Activator.getPython3Command(), "-u", kernelScriptPath, port,
-                serializationLibraryPath);
+            command.addAll(
+                Arrays.asList(Activator.getPython3Command(), "-u", kernelScriptPath, address, serializationLibraryPath));
         }
+        // Messaging options are appended as "key=value" arguments.
+        command.addAll(m_kernelOptions.getMessagingOptions().getKernelArguments());
+        final ProcessBuilder pb = new ProcessBuilder(command);
         // Add all python modules to PYTHONPATH variable.
         String existingPath = pb.environment().get("PYTHONPATH");
         existingPath = existingPath == null ? "" : existingPath;
@@ -873,6 +893,91 @@ public void putDataTable(final String name, final BufferedDataTable table, final
         putDataTable(name, table, executionMonitor, (int)table.size());
     }
 
+    /**
+     * Put the given {@link BufferedDataTable tables} into the workspace while still checking whether the execution has
+     * been canceled. Unlike calling {@link #putDataTable(String, BufferedDataTable, ExecutionMonitor)} once per table,
+     * this sends one chunk of each table per request, which saves round trips for nodes with multiple input tables.
+     *
+     * The tables will be available as pandas.DataFrames.
+     *
+     * @param names The names of the tables
+     * @param tables The tables, one per name
+     * @param executionMonitor The monitor that will be updated about progress
+     * @throws IOException If an error occurred while communicating with the python kernel or while executing the task
+     * @throws CanceledExecutionException if canceled. This instance must not be used after a cancellation occurred and
+     *             must be {@link #close() closed}.
+     */
+    public void putDataTables(final String[] names, final BufferedDataTable[] tables,
+        final ExecutionMonitor executionMonitor) throws IOException, CanceledExecutionException {
+        final CloseableRowIterator[] iterators = new CloseableRowIterator[tables.length];
+        try {
+            final PythonCancelable cancelable = new PythonExecutionMonitorCancelable(executionMonitor);
+            final ExecutionMonitor serializationMonitor = executionMonitor.createSubProgress(0.5);
+            final ExecutionMonitor deserializationMonitor = executionMonitor.createSubProgress(0.5);
+            final int chunkSize = m_kernelOptions.getChunkSize();
+            final BufferedDataTableChunker[] tableChunkers = new BufferedDataTableChunker[tables.length];
+            final int[] numberRows = new int[tables.length];
+            final int[] rowsDone = new int[tables.length];
+            long totalRows = 0;
+            int numberRounds = 1;
+            for (int t = 0; t < tables.length; t++) {
+                if (tables[t] == null) {
+                    throw new IOException("Table " + names[t] + " is not available.");
+                }
+                if (tables[t].size() > Integer.MAX_VALUE) {
+                    throw new IOException(
+                        "Number of rows exceeds maximum of " + Integer.MAX_VALUE + " rows for input table!");
+                }
+                numberRows[t] = (int)tables[t].size();
+                iterators[t] = tables[t].iterator();
+                tableChunkers[t] =
+                    new BufferedDataTableChunker(tables[t].getDataTableSpec(), iterators[t], numberRows[t]);
+                totalRows += numberRows[t];
+                numberRounds = Math.max(numberRounds, (int)Math.ceil(numberRows[t] / (double)chunkSize));
+            }
+            totalRows = Math.max(totalRows, 1);
+            long totalRowsDone = 0;
+            RunnableFuture<Void> putChunksTask = null;
+            for (int i = 0; i < numberRounds; i++) {
+                // The first chunk of each table is sent even if the table is empty to create the variable in Python.
+                final List<String> chunkNames = new ArrayList<>(tables.length);
+                final List<byte[]> chunks = new ArrayList<>(tables.length);
+                for (int t = 0; t < tables.length; t++) {
+                    if (i == 0 || rowsDone[t] < numberRows[t]) {
+                        final int rowsInThisIteration = Math.min(numberRows[t] - rowsDone[t], chunkSize);
+                        final ExecutionMonitor chunkProgress =
+                            serializationMonitor.createSubProgress(rowsInThisIteration / (double)totalRows);
+                        final TableIterator tableIterator =
+                            tableChunkers[t].nextChunk(rowsInThisIteration, chunkProgress);
+                        chunks.add(m_serializer.tableToBytes(tableIterator,
+                            m_kernelOptions.getSerializationOptions(), cancelable));
+                        chunkProgress.setProgress(1);
+                        chunkNames.add(names[t]);
+                        rowsDone[t] += rowsInThisIteration;
+                        totalRowsDone += rowsInThisIteration;
+                    }
+                }
+                serializationMonitor.setProgress(totalRowsDone / (double)totalRows);
+                final boolean[] append = new boolean[chunkNames.size()];
+                Arrays.fill(append, i > 0);
+                if (putChunksTask != null) {
+                    waitForFutureCancelable(putChunksTask, cancelable);
+                }
+                putChunksTask = m_commands.putTables(chunkNames.toArray(new String[0]),
+                    chunks.toArray(new byte[0][]), append);
+                putChunksTask.run();
+                deserializationMonitor.setProgress(totalRowsDone / (double)totalRows);
+            }
+            waitForFutureCancelable(putChunksTask, cancelable);
+        } catch (final PythonCanceledExecutionException ex) {
+            throw new CanceledExecutionException(ex.getMessage());
+        } catch (final Exception ex) {
+            throw getMostSpecificPythonKernelException(ex);
+        } finally {
+            PythonUtils.Misc.closeSafely(LOGGER::debug, iterators);
+        }
+    }
+
     /**
      * Put the data underlying the given {@link TableChunker} into the workspace while still checking whether the
      * execution has been canceled.
@@ -977,6 +1082,113 @@ public BufferedDataTable getDataTable(final String name, final ExecutionContext
         }
     }
 
+    /**
+     * Get {@link BufferedDataTable tables} from the workspace while still checking whether the execution has been
+     * canceled. Unlike calling {@link #getDataTable(String, ExecutionContext, ExecutionMonitor)} once per table, this
+     * fetches one chunk of each table per request and does not need separate requests for the table sizes, which saves
+     * round trips for nodes with multiple output tables.
+     *
+     * @param names The names of the tables to get
+     * @param exec The calling node's execution context
+     * @param executionMonitor The monitor that will be updated about progress
+     * @return The tables in the order of the given names
+     * @throws IOException If an error occurred while communicating with the python kernel or while executing the task
+     * @throws CanceledExecutionException if canceled. This instance must not be used after a cancellation occurred and
+     *             must be {@link #close() closed}.
+     */
+    public BufferedDataTable[] getDataTables(final String[] names, final ExecutionContext exec,
+        final ExecutionMonitor executionMonitor) throws IOException, CanceledExecutionException {
+        return getDataTables(names, null, exec, executionMonitor);
+    }
+
+    /**
+     * @param firstChunks the already received first chunk of each table, <code>null</code> if they need to be fetched
+     */
+    private BufferedDataTable[] getDataTables(final String[] names, final List<TableChunk> firstChunks,
+        final ExecutionContext exec, final ExecutionMonitor executionMonitor)
+        throws IOException, CanceledExecutionException {
+        try {
+            final PythonCancelable cancelable = new PythonExecutionMonitorCancelable(executionMonitor);
+            final ExecutionMonitor serializationMonitor = executionMonitor.createSubProgress(0.5);
+            final ExecutionMonitor deserializationMonitor = executionMonitor.createSubProgress(0.5);
+            final ProcessEndAction pea = m_segfaultDuringSerializationAction;
+            m_defaultStderrListener.resetErrorLoggedFlag();
+            try {
+                addProcessEndAction(pea);
+                final int chunkSize = m_kernelOptions.getChunkSize();
+                final int[] tableSizes = new int[names.length];
+                final int[] rowsDone = new int[names.length];
+                final BufferedDataTableCreator[] tableCreators = new BufferedDataTableCreator[names.length];
+                long totalRows = 0;
+                long totalRowsDone = 0;
+                // Indices of the tables that have rows left. The sizes of the tables are only known after the first
+                // chunk of each table was received.
+                List<Integer> pendingTables = new ArrayList<>(names.length);
+                for (int t = 0; t < names.length; t++) {
+                    pendingTables.add(t);
+                }
+                boolean isFirstChunk = true;
+                while (!pendingTables.isEmpty()) {
+                    final String[] chunkNames = new String[pendingTables.size()];
+                    final int[] starts = new int[pendingTables.size()];
+                    final int[] ends = new int[pendingTables.size()];
+                    for (int k = 0; k < chunkNames.length; k++) {
+                        final int t = pendingTables.get(k);
+                        chunkNames[k] = names[t];
+                        starts[k] = rowsDone[t];
+                        // Python limits the end to the size of the table.
+                        ends[k] = rowsDone[t] + chunkSize - 1;
+                    }
+                    final List<TableChunk> chunks = isFirstChunk && firstChunks != null ? firstChunks
+                        : waitForFutureCancelable(m_commands.getTables(chunkNames, starts, ends), cancelable);
+                    if (isFirstChunk) {
+                        for (int t = 0; t < names.length; t++) {
+                            tableSizes[t] = chunks.get(t).getTableSize();
+                            totalRows += tableSizes[t];
+                        }
+                        totalRows = Math.max(totalRows, 1);
+                        isFirstChunk = false;
+                    }
+                    final List<Integer> nextPendingTables = new ArrayList<>(pendingTables.size());
+                    for (int k = 0; k < chunkNames.length; k++) {
+                        final int t = pendingTables.get(k);
+                        final byte[] bytes = chunks.get(k).getBytes();
+                        final int rowsInThisIteration = Math.max(0, Math.min(tableSizes[t] - starts[k], chunkSize));
+                        rowsDone[t] += chunkSize;
+                        totalRowsDone += rowsInThisIteration;
+                        serializationMonitor.setProgress(totalRowsDone / (double)totalRows);
+                        if (tableCreators[t] == null) {
+                            final TableSpec spec = m_serializer.tableSpecFromBytes(bytes, cancelable);
+                            final ExecutionMonitor tableMonitor =
+                                deserializationMonitor.createSubProgress(tableSizes[t] / (double)totalRows);
+                            tableCreators[t] = new BufferedDataTableCreator(spec, exec, tableMonitor, tableSizes[t]);
+                        }
+                        m_serializer.bytesIntoTable(tableCreators[t], bytes,
+                            m_kernelOptions.getSerializationOptions(), cancelable);
+                        if (rowsDone[t] < tableSizes[t]) {
+                            nextPendingTables.add(t);
+                        }
+                    }
+                    pendingTables = nextPendingTables;
+                }
+                final BufferedDataTable[] tables = new BufferedDataTable[names.length];
+                for (int t = 0; t < names.length; t++) {
+                    if (tableCreators[t] == null) {
+                        throw new PythonIOException("Invalid serialized table received.");
+                    }
+                    tables[t] = tableCreators[t].getTable();
+                }
+                return tables;
+            } finally {
+                removeProcessEndAction(pea);
+            }
+        } catch (final PythonCanceledExecutionException ex) {
+            throw new CanceledExecutionException(ex.getMessage());
+        } catch (final Exception ex) {
+            throw getMostSpecificPythonKernelException(ex);
+        }
+    }
+
     /**
      * Get an object from the workspace while still checking whether the execution has been canceled.
      *
@@ -1049,10 +1261,8 @@ public void putObject(final String name, final PickledObject object) throws IOEx
     public void putObject(final String name, final PickledObject object, final ExecutionMonitor executionMonitor)
         throws IOException, CanceledExecutionException {
         try {
-            PythonUtils.Misc.executeCancelable(() -> {
-                putObject(name, object);
-                return null;
-            }, m_executorService, new PythonExecutionMonitorCancelable(executionMonitor));
+            waitForFutureCancelable(m_commands.putObject(name, object.getPickledObject()),
+                new PythonExecutionMonitorCancelable(executionMonitor));
         } catch (final PythonCanceledExecutionException ex) {
             throw new CanceledExecutionException(ex.getMessage());
         } catch (final Exception ex) {
@@ -1076,8 +1286,7 @@ public PickledObject getObject(final String name, final ExecutionMonitor executi
         throws IOException, CanceledExecutionException {
         final PythonCancelable cancelable = new PythonExecutionMonitorCancelable(executionMonitor);
         try {
-            final byte[] bytes = PythonUtils.Misc.executeCancelable(() -> m_commands.getObject(name).get(),
-                m_executorService, cancelable);
+            final byte[] bytes = waitForFutureCancelable(m_commands.getObject(name), cancelable);
             final TableSpec spec = m_serializer.tableSpecFromBytes(bytes, cancelable);
             final KeyValueTableCreator tableCreator = new KeyValueTableCreator(spec);
             m_serializer.bytesIntoTable(tableCreator, bytes, m_kernelOptions.getSerializationOptions(), cancelable);
@@ -1251,6 +1460,62 @@ public List<Map<String, String>> listVariables() throws IOException {
         }
     }
 
+    /**
+     * Returns the messaging statistics collected by Python, one entry per message category and statistic. The list is
+     * empty if recording statistics is disabled (see {@link MessagingOptions#isStatisticsEnabled()}).
+     *
+     * Each entry contains the fields 'category' and 'statistic' (strings), 'count', 'sum', 'max', 'p50', 'p90' and
+     * 'p99' (longs) and 'mean' (double). Times are given in microseconds, sizes in bytes.
+     *
+     * @return the list of messaging statistics
+     * @throws IOException If an error occurred while communicating with the python kernel or while executing the task
+     */
+    public List<Map<String, Object>> getMessagingStatistics() throws IOException {
+        if (!m_kernelOptions.getMessagingOptions().isStatisticsEnabled()) {
+            return Collections.emptyList();
+        }
+        try {
+            final byte[] bytes = m_commands.getStats().get();
+            final TableSpec spec = m_serializer.tableSpecFromBytes(bytes, PythonCancelable.NOT_CANCELABLE);
+            final TemporaryTableCreator tableCreator = new TemporaryTableCreator(spec);
+            m_serializer.bytesIntoTable(tableCreator, bytes, m_kernelOptions.getSerializationOptions(),
+                PythonCancelable.NOT_CANCELABLE);
+            final String[] columnNames = spec.getColumnNames();
+            final List<Map<String, Object>> statistics = new ArrayList<>();
+            for (final Row row : tableCreator.getTable()) {
+                final Map<String, Object> map = new HashMap<>();
+                for (int i = 0; i < columnNames.length; i++) {
+                    map.put(columnNames[i], getStatisticsValue(row.getCell(i)));
+                }
+                statistics.add(map);
+            }
+            return statistics;
+        } catch (final PythonCanceledExecutionException ignore) {
+            // Does not happen.
+            throw new IllegalStateException("Implementation error.");
+        } catch (final Exception ex) {
+            throw getMostSpecificPythonKernelException(ex);
+        }
+    }
+
+    private static Object getStatisticsValue(final Cell cell) {
+        if (cell.isMissing()) {
+            return null;
+        }
+        switch (cell.getColumnType()) {
+            case STRING:
+                return cell.getStringValue();
+            case INTEGER:
+                return (long)cell.getIntegerValue();
+            case LONG:
+                return cell.getLongValue();
+            case DOUBLE:
+                return cell.getDoubleValue();
+            default:
+                return null;
+        }
+    }
+
     /**
      * Returns the list of possible auto completions to the given source at the given position.
      *
@@ -1342,20 +1607,59 @@ public String[] execute(final String sourceCode) throws IOException {
      */
     public String[] execute(final String sourceCode, final PythonCancelable cancelable)
         throws IOException, CanceledExecutionException {
+        return waitForExecution(m_commands.execute(sourceCode), cancelable);
+    }
+
+    /**
+     * Execute the given source code and collect the given flow variables and tables afterwards while still checking
+     * whether the execution has been canceled. Compared to calling {@link #execute(String, PythonCancelable)},
+     * {@link #getFlowVariables(String)} and {@link #getDataTable(String, ExecutionContext, ExecutionMonitor)} one after
+     * the other, this saves several round trips to Python: the flow variables and the first chunk of each table are
+     * sent along with the output of the execution. Tables that fit into a single chunk therefore do not require any
+     * further requests.
+     *
+     * @param sourceCode The source code to execute
+     * @param flowVariablesName Variable name of the flow variable dict in Python
+     * @param tableNames The names of the tables to get
+     * @param exec The calling node's execution context
+     * @param executionMonitor The monitor that will be updated about progress
+     * @return The output of the execution, the flow variables and the tables
+     * @throws IOException If an error occurred while communicating with the python kernel or while executing the task,
+     *             or if the executed source code raised an error
+     * @throws CanceledExecutionException if canceled. This instance must not be used after a cancellation occurred and
+     *             must be {@link #close() closed}.
+     */
+    public ExecuteAndCollectResult executeAndCollect(final String sourceCode, final String flowVariablesName,
+        final String[] tableNames, final ExecutionContext exec, final ExecutionMonitor executionMonitor)
+        throws IOException, CanceledExecutionException {
+        final ExecuteAndCollectResponse response;
         try {
-            return PythonUtils.Misc.executeCancelable(() -> {
-                final String[] out = execute(sourceCode);
-                // If the error log has content, throw it as exception.
-                if (!out[1].isEmpty()) {
-                    throw new PythonIOException(out[1]);
-                }
-                return out;
-            }, m_executorService, cancelable);
+            final PythonCancelable cancelable = new PythonExecutionMonitorCancelable(executionMonitor);
+            // In execution mode only the warnings are logged to stdout.
+            routeErrorMessagesToWarningLog(true);
+            try {
+                response = waitForFutureCancelable(m_commands.executeAndCollect(sourceCode, flowVariablesName,
+                    m_kernelOptions.getChunkSize(), tableNames), cancelable);
+            } finally {
+                routeErrorMessagesToWarningLog(false);
+            }
         } catch (final PythonCanceledExecutionException ex) {
             throw new CanceledExecutionException(ex.getMessage());
         } catch (final Exception ex) {
             throw getMostSpecificPythonKernelException(ex);
         }
+        final String[] output = response.getOutput();
+        if (output[0].length() > 0) {
+            LOGGER.debug(ScriptingNodeUtils.shortenString(output[0], 1000));
+        }
+        // If the error log has content, throw it as exception.
+        if (!output[1].isEmpty()) {
+            throw new PythonIOException(output[1]);
+        }
+        final Collection<FlowVariable> flowVariables = bytesToFlowVariables(response.getFlowVariables());
+        final BufferedDataTable[] tables =
+            getDataTables(tableNames, response.getTableChunks(), exec, executionMonitor);
+        return new ExecuteAndCollectResult(output, flowVariables, tables);
     }
 
     /**
@@ -1396,19 +1700,35 @@ public String[] executeAsync(final String sourceCode) throws IOException {
      */
     public String[] executeAsync(final String sourceCode, final PythonCancelable cancelable)
         throws IOException, CanceledExecutionException {
+        return waitForExecution(m_commands.executeAsync(sourceCode), cancelable);
+    }
+
+    /**
+     * Waits for the given execution task while checking whether the execution has been canceled. Cancelling the task
+     * also interrupts the execution on Python side.
+     */
+    private String[] waitForExecution(final RunnableFuture<String[]> executionTask,
+        final PythonCancelable cancelable) throws IOException, CanceledExecutionException {
+        // In execution mode only the warnings are logged to stdout.
+        routeErrorMessagesToWarningLog(true);
         try {
-            return PythonUtils.Misc.executeCancelable(() -> {
-                final String[] out = executeAsync(sourceCode);
-                // If the error log has content, throw it as exception.
-                if (!out[1].isEmpty()) {
-                    throw new PythonIOException(out[1]);
-                }
-                return out;
-            }, m_executorService, cancelable);
+            final String[] output = waitForFutureCancelable(executionTask, cancelable);
+            if (output[0].length() > 0) {
+                LOGGER.debug(ScriptingNodeUtils.shortenString(output[0], 1000));
+            }
+            // If the error log has content, throw it as exception.
+            if (!output[1].isEmpty()) {
+                throw new PythonIOException(output[1]);
+            }
+            return output;
         } catch (final PythonCanceledExecutionException ex) {
             throw new CanceledExecutionException(ex.getMessage());
+        } catch (final PythonIOException ex) {
+            throw ex;
         } catch (final Exception ex) {
             throw getMostSpecificPythonKernelException(ex);
+        } finally {
+            routeErrorMessagesToWarningLog(false);
         }
     }
 
@@ -1473,7 +1793,8 @@ public void close() throws PythonKernelCleanupException {
                         m_stdoutListeners.toArray(new PythonOutputListener[0]));
                 }
                 PythonUtils.Misc.invokeSafely(LOGGER::debug, ExecutorService::shutdownNow, m_executorService);
-                PythonUtils.Misc.closeSafely(LOGGER::debug, m_commands, m_serverSocket, m_socket, m_serializer);
+                PythonUtils.Misc.closeSafely(LOGGER::debug, m_commands, m_serverSocket, m_socket, m_dataSocket,
+                    m_serializer);
                 PythonUtils.Misc.invokeSafely(LOGGER::debug, List<PythonOutputListener>::clear, m_stdoutListeners,
                     m_stderrListeners);
                 // If the original process was a script, we have to kill the actual Python process by PID.
@@ -1672,6 +1993,47 @@ private <T> T waitForFutureCancelable(final Future<T> future, final PythonCancel
         }
     }
 
+    /**
+     * The result of
+     * {@link PythonKernel#executeAndCollect(String, String, String[], ExecutionContext, ExecutionMonitor)}.
+     */
+    public static final class ExecuteAndCollectResult {
+
+        private final String[] m_output;
+
+        private final Collection<FlowVariable> m_flowVariables;
+
+        private final BufferedDataTable[] m_tables;
+
+        private ExecuteAndCollectResult(final String[] output, final Collection<FlowVariable> flowVariables,
+            final BufferedDataTable[] tables) {
+            m_output = output;
+            m_flowVariables = flowVariables;
+            m_tables = tables;
+        }
+
+        /**
+         * @return the standard output and error output of the execution
+         */
+        public String[] getOutput() {
+            return m_output;
+        }
+
+        /**
+         * @return the collected flow variables
+         */
+        public Collection<FlowVariable> getFlowVariables() {
+            return m_flowVariables;
+        }
+
+        /**
+         * @return the collected tables in the order in which their names were given
+         */
+        public BufferedDataTable[] getTables() {
+            return m_tables;
+        }
+    }
+
     /**
      * An action to run as soon as the python process exits. Allows to examine custom exit codes.
      */
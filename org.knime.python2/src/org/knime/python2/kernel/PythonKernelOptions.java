@@ -54,6 +54,7 @@
 import org.knime.python2.PythonPreferencePage;
 import org.knime.python2.extensions.serializationlibrary.SentinelOption;
 import org.knime.python2.extensions.serializationlibrary.SerializationOptions;
+import org.knime.python2.kernel.messaging.MessagingOptions;
 
 /**
  * Options for the PythonKernel. Includes {@link SerializationOptions} and the python version that should be used.
@@ -70,6 +71,8 @@ public class PythonKernelOptions {
 
     private FlowVariableOptions m_flowVariableOptions = new FlowVariableOptions();
 
+    private MessagingOptions m_messagingOptions = new MessagingOptions();
+
     private List<String> m_additionalRequiredModules = new ArrayList<String>();
 
     private String m_kernelScriptPath;
@@ -121,6 +124,7 @@ public PythonKernelOptions(final PythonKernelOptions other) {
             other.getSentinelOption(), other.getSentinelValue(), other.getChunkSize());
         this.m_serializationOptions = new SerializationOptions(other.getSerializationOptions());
         this.m_flowVariableOptions = new FlowVariableOptions(other.getFlowVariableOptions());
+        this.m_messagingOptions = new MessagingOptions(other.getMessagingOptions());
         this.m_additionalRequiredModules = new ArrayList<String>(other.getAdditionalRequiredModules());
         this.m_kernelScriptPath = other.getKernelScriptPath();
     }
@@ -305,6 +309,24 @@ public void setFlowVariableOptions(final FlowVariableOptions options) {
         m_flowVariableOptions = options;
     }
 
+    /**
+     * Gets the messaging options.
+     *
+     * @return the messaging options
+     */
+    public MessagingOptions getMessagingOptions() {
+        return m_messagingOptions;
+    }
+
+    /**
+     * Sets the messaging options.
+     *
+     * @param options the new messaging options
+     */
+    public void setMessagingOptions(final MessagingOptions options) {
+        m_messagingOptions = checkNotNull(options);
+    }
+
     /**
      * Enum holding supported python versions.
      */
@@ -385,6 +407,7 @@ public int hashCode() {
         result = prime * result + ((m_additionalRequiredModules == null) ? 0 : m_additionalRequiredModules.hashCode());
         result = prime * result + m_chunkSize;
         result = prime * result + ((m_flowVariableOptions == null) ? 0 : m_flowVariableOptions.hashCode());
+        result = prime * result + ((m_messagingOptions == null) ? 0 : m_messagingOptions.hashCode());
         result = prime * result + ((m_serializationOptions == null) ? 0 : m_serializationOptions.hashCode());
         result = prime * result + ((m_usePython3 == null) ? 0 : m_usePython3.hashCode());
         return result;
@@ -419,6 +442,13 @@ public boolean equals(final Object obj) {
         } else if (!m_flowVariableOptions.equals(other.m_flowVariableOptions)) {
             return false;
         }
+        if (m_messagingOptions == null) {
+            if (other.m_messagingOptions != null) {
+                return false;
+            }
+        } else if (!m_messagingOptions.equals(other.m_messagingOptions)) {
+            return false;
+        }
         if (m_serializationOptions == null) {
             if (other.m_serializationOptions != null) {
                 return false;
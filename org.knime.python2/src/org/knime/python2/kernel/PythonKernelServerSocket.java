@@ -0,0 +1,387 @@
+/*
+ * ------------------------------------------------------------------------
+ *
+ *  Copyright by KNIME AG, Zurich, Switzerland
+ *  Website: http://www.knime.com; Email: contact@knime.com
+ *
+ *  This program is free software; you can redistribute it and/or modify
+ *  it under the terms of the GNU General Public License, Version 3, as
+ *  published by the Free Software Foundation.
+ *
+ *  This program is distributed in the hope that it will be useful, but
+ *  WITHOUT ANY WARRANTY; without even the implied warranty of
+ *  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+ *  GNU General Public License for more details.
+ *
+ *  You should have received a copy of the GNU General Public License
+ *  along with this program; if not, see <http://www.gnu.org/licenses>.
+ *
+ *  Additional permission under GNU GPL version 3 section 7:
+ *
+ *  KNIME interoperates with ECLIPSE solely via ECLIPSE's plug-in APIs.
+ *  Hence, KNIME and ECLIPSE are both independent programs and are not
+ *  derived from each other. Should, however, the interpretation of the
+ *  GNU GPL Version 3 ("License") under any applicable laws result in
+ *  KNIME and ECLIPSE being a combined program, KNIME AG herewith grants
+ *  you the additional permission to use and propagate KNIME together with
+ *  ECLIPSE with only the license terms in place for ECLIPSE applying to
+ *  ECLIPSE and the GNU GPL Version 3 applying for KNIME, provided the
+ *  license terms of ECLIPSE themselves allow for the respective use and
+ *  propagation of ECLIPSE together with KNIME.
+ *
+ *  Additional permission relating to nodes for KNIME that extend the Node
+ *  Extension (and in particular that are based on subclasses of NodeModel,
+ *  NodeDialog, and NodeView) and that only interoperate with KNIME through
+ *  standard APIs ("Nodes"):
+ *  Nodes are deemed to be separate and independent programs and to not be
+ *  covered works.  Notwithstanding anything to the contrary in the
+ *  License, the License does not apply to Nodes, you are not required to
+ *  license Nodes under the License, and you are granted a license to
+ *  prepare and propagate Nodes, in each case even if such Nodes are
+ *  propagated with or for interoperation with KNIME.  The owner of a Node
+ *  may freely choose the license terms applicable to such Node, including
+ *  when such Node is propagated with or for interoperation with KNIME.
+ * ---------------------------------------------------------------------
+ *
+ */
+package org.knime.python2.kernel;
+
+import java.io.IOException;
+import java.io.InputStream;
+import java.io.OutputStream;
+import java.lang.reflect.InvocationTargetException;
+import java.lang.reflect.Method;
+import java.net.ProtocolFamily;
+import java.net.ServerSocket;
+import java.net.Socket;
+import java.net.SocketAddress;
+import java.net.SocketTimeoutException;
+import java.net.StandardProtocolFamily;
+import java.net.StandardSocketOptions;
+import java.nio.ByteBuffer;
+import java.nio.channels.SelectionKey;
+import java.nio.channels.Selector;
+import java.nio.channels.ServerSocketChannel;
+import java.nio.channels.SocketChannel;
+import java.nio.file.Files;
+import java.nio.file.Path;
+import java.util.concurrent.TimeUnit;
+
+import org.apache.commons.io.FileUtils;
+import org.knime.core.node.NodeLogger;
+
+/**
+ * Server side of the connection between a {@link PythonKernel} and its Python process. The Python process connects to
+ * the {@link #getAddress() address} of this socket.
+ * <P>
+ * By default, a TCP socket on localhost is used. If requested via the VM option
+ * <code>-Dknime.python.unixsocket=true</code> and supported by the running JVM (Java 16 or later) and the operating
+ * system, a Unix domain socket is used instead. It bypasses the loopback TCP stack, which gives a higher throughput and
+ * lower latency for table transfers. The Python side falls back to TCP whenever it is passed a port instead of a path.
+ */
+abstract class PythonKernelServerSocket implements AutoCloseable {
+
+    private static final NodeLogger LOGGER = NodeLogger.getLogger(PythonKernelServerSocket.class);
+
+    private static final String UNIX_SOCKET_VM_OPT = "knime.python.unixsocket";
+
+    /**
+     * Creates and binds a new server socket. Uses a Unix domain socket if requested and available, a TCP socket
+     * otherwise.
+     *
+     * @param timeoutInMillis the duration to wait for the Python process to connect in {@link #accept()}
+     * @return the bound server socket
+     * @throws IOException if creating or binding the socket failed
+     */
+    static PythonKernelServerSocket create(final int timeoutInMillis) throws IOException {
+        if (Boolean.getBoolean(UNIX_SOCKET_VM_OPT)) {
+            if (UnixDomainServerSocket.isAvailable()) {
+                return new UnixDomainServerSocket(timeoutInMillis);
+            } else {
+                LOGGER.debug("Unix domain sockets are not supported by the running JVM or operating system. "
+                    + "Falling back to TCP.");
+            }
+        }
+        return new TcpServerSocket(timeoutInMillis);
+    }
+
+    /**
+     * @return the address the Python process needs to connect to, either a port or a file system path
+     */
+    abstract String getAddress();
+
+    /**
+     * Waits for the Python process to connect.
+     *
+     * @return the established connection
+     * @throws SocketTimeoutException if the Python process did not connect within the configured timeout
+     * @throws IOException if accepting the connection failed
+     */
+    abstract Connection accept() throws IOException;
+
+    /**
+     * A connection to the Python process.
+     */
+    interface Connection extends AutoCloseable {
+
+        /**
+         * @return the stream via which messages from Python are received
+         * @throws IOException if the stream could not be obtained
+         */
+        InputStream getInputStream() throws IOException;
+
+        /**
+         * @return the stream via which messages to Python are sent
+         * @throws IOException if the stream could not be obtained
+         */
+        OutputStream getOutputStream() throws IOException;
+
+        /**
+         * Sets the size of the send and receive buffers of the underlying socket.
+         *
+         * @param bufferSize the buffer size in bytes
+         * @throws IOException if setting the buffer size failed
+         */
+        void setBufferSize(int bufferSize) throws IOException;
+    }
+
+    private static final class TcpServerSocket extends PythonKernelServerSocket {
+
+        private final ServerSocket m_serverSocket;
+
+        private TcpServerSocket(final int timeoutInMillis) throws IOException {
+            m_serverSocket = new ServerSocket(0);
+            m_serverSocket.setSoTimeout(timeoutInMillis);
+        }
+
+        @Override
+        String getAddress() {
+            return Integer.toString(m_serverSocket.getLocalPort());
+        }
+
+        @Override
+        Connection accept() throws IOException {
+            final Socket socket = m_serverSocket.accept();
+            return new Connection() {
+
+                @Override
+                public InputStream getInputStream() throws IOException {
+                    return socket.getInputStream();
+                }
+
+                @Override
+                public OutputStream getOutputStream() throws IOException {
+                    return socket.getOutputStream();
+                }
+
+                @Override
+                public void setBufferSize(final int bufferSize) throws IOException {
+                    socket.setSendBufferSize(bufferSize);
+                    socket.setReceiveBufferSize(bufferSize);
+                }
+
+                @Override
+                public void close() throws IOException {
+                    socket.close();
+                }
+            };
+        }
+
+        @Override
+        public void close() throws IOException {
+            m_serverSocket.close();
+        }
+    }
+
+    /**
+     * Uses the Unix domain socket API of Java 16 and later via reflection since this bundle targets Java 8.
+     */
+    private static final class UnixDomainServerSocket extends PythonKernelServerSocket {
+
+        private static boolean isAvailable() {
+            if (System.getProperty("os.name").toLowerCase().contains("win")) {
+                // Python does not support Unix domain sockets on Windows.
+                return false;
+            }
+            try {
+                getUnixProtocolFamily();
+                Class.forName("java.net.UnixDomainSocketAddress");
+                return true;
+            } catch (final Exception ex) { // NOSONAR
+                return false;
+            }
+        }
+
+        private static ProtocolFamily getUnixProtocolFamily() {
+            return StandardProtocolFamily.valueOf("UNIX");
+        }
+
+        private final int m_timeoutInMillis;
+
+        private final Path m_directory;
+
+        private final Path m_path;
+
+        private final ServerSocketChannel m_serverChannel;
+
+        private UnixDomainServerSocket(final int timeoutInMillis) throws IOException {
+            m_timeoutInMillis = timeoutInMillis;
+            // Only the owner of the temporary directory is able to connect.
+            m_directory = Files.createTempDirectory("knime-python-");
+            m_path = m_directory.resolve("kernel.sock");
+            try {
+                final Method openChannel = ServerSocketChannel.class.getMethod("open", ProtocolFamily.class);
+                m_serverChannel = (ServerSocketChannel)openChannel.invoke(null, getUnixProtocolFamily());
+                final Method createAddress =
+                    Class.forName("java.net.UnixDomainSocketAddress").getMethod("of", Path.class);
+                m_serverChannel.bind((SocketAddress)createAddress.invoke(null, m_path));
+            } catch (final InvocationTargetException ex) {
+                FileUtils.deleteQuietly(m_directory.toFile());
+                throw new IOException(ex.getCause().getMessage(), ex.getCause());
+            } catch (final ReflectiveOperationException ex) {
+                FileUtils.deleteQuietly(m_directory.toFile());
+                throw new IOException("Unix domain sockets are not supported by the running JVM.", ex);
+            }
+        }
+
+        @Override
+        String getAddress() {
+            return m_path.toString();
+        }
+
+        @Override
+        Connection accept() throws IOException {
+            // Server socket channels do not support SO_TIMEOUT, wait for the connection using a selector instead.
+            // A timeout of zero waits indefinitely, as for TCP sockets.
+            m_serverChannel.configureBlocking(false);
+            final SocketChannel channel;
+            try (final Selector selector = Selector.open()) {
+                m_serverChannel.register(selector, SelectionKey.OP_ACCEPT);
+                channel = acceptUntil(selector, System.nanoTime() + TimeUnit.MILLISECONDS.toNanos(m_timeoutInMillis));
+            }
+            channel.configureBlocking(true);
+            return new Connection() {
+
+                @Override
+                public InputStream getInputStream() {
+                    return new ChannelInputStream(channel);
+                }
+
+                @Override
+                public OutputStream getOutputStream() {
+                    return new ChannelOutputStream(channel);
+                }
+
+                @Override
+                public void setBufferSize(final int bufferSize) throws IOException {
+                    channel.setOption(StandardSocketOptions.SO_SNDBUF, bufferSize);
+                    channel.setOption(StandardSocketOptions.SO_RCVBUF, bufferSize);
+                }
+
+                @Override
+                public void close() throws IOException {
+                    channel.close();
+                }
+            };
+        }
+
+        /**
+         * Selection only hints at a pending connection: the non-blocking accept returns null if the connection is gone
+         * by then (or the selector woke up spuriously). Keep waiting for another connection until the deadline.
+         */
+        private SocketChannel acceptUntil(final Selector selector, final long deadlineInNanos) throws IOException {
+            while (true) {
+                long remainingMillis = 0;
+                if (m_timeoutInMillis > 0) {
+                    remainingMillis = TimeUnit.NANOSECONDS.toMillis(deadlineInNanos - System.nanoTime());
+                    if (remainingMillis <= 0) {
+                        throw new SocketTimeoutException("Accept timed out");
+                    }
+                }
+                selector.select(remainingMillis);
+                if (Thread.currentThread().isInterrupted()) {
+                    // Selection returns right away on interrupted threads, give up instead of spinning.
+                    throw new SocketTimeoutException("Accept interrupted");
+                }
+                selector.selectedKeys().clear();
+                final SocketChannel channel = m_serverChannel.accept();
+                if (channel != null) {
+                    return channel;
+                }
+            }
+        }
+
+        @Override
+        public void close() throws IOException {
+            try {
+                m_serverChannel.close();
+            } finally {
+                FileUtils.deleteQuietly(m_directory.toFile());
+            }
+        }
+    }
+
+    /**
+     * Unlike the streams of {@link java.nio.channels.Channels}, does not synchronize with concurrent writes to the same
+     * channel.
+     */
+    private static final class ChannelInputStream extends InputStream {
+
+        private final SocketChannel m_channel;
+
+        private ChannelInputStream(final SocketChannel channel) {
+            m_channel = channel;
+        }
+
+        @Override
+        public int read() throws IOException {
+            final byte[] b = new byte[1];
+            final int read = read(b, 0, 1);
+            return read == -1 ? -1 : (b[0] & 0xFF);
+        }
+
+        @Override
+        public int read(final byte[] b, final int off, final int len) throws IOException {
+            if (len == 0) {
+                return 0;
+            }
+            return m_channel.read(ByteBuffer.wrap(b, off, len));
+        }
+
+        @Override
+        public void close() throws IOException {
+            m_channel.close();
+        }
+    }
+
+    /**
+     * Unlike the streams of {@link java.nio.channels.Channels}, does not synchronize with concurrent reads from the
+     * same channel.
+     */
+    private static final class ChannelOutputStream extends OutputStream {
+
+        private final SocketChannel m_channel;
+
+        private ChannelOutputStream(final SocketChannel channel) {
+            m_channel = channel;
+        }
+
+        @Override
+        public void write(final int b) throws IOException {
+            write(new byte[]{(byte)b}, 0, 1);
+        }
+
+        @Override
+        public void write(final byte[] b, final int off, final int len) throws IOException {
+            final ByteBuffer buffer = ByteBuffer.wrap(b, off, len);
+            while (buffer.hasRemaining()) {
+                m_channel.write(buffer);
+            }
+        }
+
+        @Override
+        public void close() throws IOException {
+            m_channel.close();
+        }
+    }
+}
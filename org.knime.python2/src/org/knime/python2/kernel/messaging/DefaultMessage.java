@@ -176,6 +176,16 @@ public byte[] getPayload() {
         return m_payload;
     }
 
+    /**
+     * @return a copy of the message's header fields, except for {@link #KEY_ID id} and {@link #KEY_CATEGORY category}
+     */
+    Map<String, String> getAdditionalHeaderFields() {
+        final LinkedHashMap<String, String> additionalHeaderFields = new LinkedHashMap<>(m_headerFields);
+        additionalHeaderFields.remove(KEY_ID);
+        additionalHeaderFields.remove(KEY_CATEGORY);
+        return additionalHeaderFields;
+    }
+
     @Override
     public String toString() {
         return getHeader();
@@ -50,12 +50,12 @@
 
 import static org.knime.python2.kernel.messaging.PythonMessagingUtils.readBytes;
 import static org.knime.python2.kernel.messaging.PythonMessagingUtils.readInt;
-import static org.knime.python2.kernel.messaging.PythonMessagingUtils.readUtf8String;
 
 import java.io.DataInputStream;
 import java.io.IOException;
 import java.io.InputStream;
 
+import org.knime.python2.kernel.messaging.MessagingOptions.HeaderFormat;
 import org.knime.python2.util.PythonNodeLogger;
 
 /**
@@ -68,21 +68,53 @@ final class DefaultMessageReceiver implements MessageReceiver {
 
     private final DataInputStream m_inFromPython;
 
+    private final MessageHeaderCodec m_headerCodec;
+
+    private final PayloadCompression m_compression;
+
     /**
      * @param inFromPython the input stream via which messages from Python are received
      */
     public DefaultMessageReceiver(final InputStream inFromPython) {
+        this(inFromPython, MessageHeaderCodec.create(HeaderFormat.TEXT),
+            new PayloadCompression(MessagingOptions.Compression.NONE, 0));
+    }
+
+    /**
+     * @param inFromPython the input stream via which messages from Python are received
+     * @param headerCodec the codec used to decode message headers
+     * @param compression used to decompress compressed payloads
+     */
+    public DefaultMessageReceiver(final InputStream inFromPython, final MessageHeaderCodec headerCodec,
+        final PayloadCompression compression) {
         m_inFromPython = new DataInputStream(inFromPython);
+        m_headerCodec = headerCodec;
+        m_compression = compression;
     }
 
     @Override
     public Message receive() throws IOException {
         final int headerSize = readInt(m_inFromPython);
         final int payloadSize = readInt(m_inFromPython);
-        final String header = readUtf8String(headerSize, m_inFromPython);
+        final byte[] header = readBytes(headerSize, m_inFromPython);
         final byte[] payload = payloadSize > 0 ? readBytes(payloadSize, m_inFromPython) : null;
-        Message message = new DefaultMessage(header, payload);
-        LOGGER.debug("Java - Received message: " + message);
+        DefaultMessage message = m_headerCodec.decode(header, payload);
+        final String segment = message.getHeaderField(SharedMemorySegments.HEADER_FIELD_KEY);
+        if (segment != null) {
+            message = new DefaultMessage(message.getId(), message.getCategory(),
+                SharedMemorySegments.readAndRelease(segment), message.getAdditionalHeaderFields());
+        }
+        final String codec = message.getHeaderField(PayloadCompression.HEADER_FIELD_KEY);
+        if (codec != null) {
+            final int uncompressedSize =
+                Integer.parseInt(message.getHeaderField(PayloadCompression.UNCOMPRESSED_SIZE_HEADER_FIELD_KEY));
+            message = new DefaultMessage(message.getId(), message.getCategory(),
+                m_compression.decompress(codec, message.getPayload(), uncompressedSize),
+                message.getAdditionalHeaderFields());
+        }
+        if (PythonNodeLogger.DEBUG_ENABLED) {
+            LOGGER.debug("Java - Received message: " + message);
+        }
         return message;
     }
 }
@@ -69,7 +69,12 @@ final class DefaultMessageReceiverLoop extends AbstractMessageLoop implements Me
 
     public DefaultMessageReceiverLoop(final MessageReceiver receiver, final BlockingQueue<Message> receiveQueue,
         final PythonExecutionMonitor monitor) {
-        super(monitor, "python-message-receive-loop");
+        this(receiver, receiveQueue, monitor, "python-message-receive-loop");
+    }
+
+    public DefaultMessageReceiverLoop(final MessageReceiver receiver, final BlockingQueue<Message> receiveQueue,
+        final PythonExecutionMonitor monitor, final String loopThreadName) {
+        super(monitor, loopThreadName);
         m_receiver = receiver;
         m_receiveQueue = receiveQueue;
         m_offerTimeout = PythonKernel.getConnectionTimeoutInMillis();
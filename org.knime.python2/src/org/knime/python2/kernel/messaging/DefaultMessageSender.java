@@ -51,8 +51,9 @@
 import java.io.DataOutputStream;
 import java.io.IOException;
 import java.io.OutputStream;
-import java.nio.charset.StandardCharsets;
+import java.util.Map;
 
+import org.knime.python2.kernel.messaging.MessagingOptions.HeaderFormat;
 import org.knime.python2.util.PythonNodeLogger;
 
 /**
@@ -65,18 +66,61 @@ final class DefaultMessageSender implements MessageSender {
 
     private final DataOutputStream m_outToPython;
 
+    private final MessageHeaderCodec m_headerCodec;
+
+    private final SharedMemorySegments m_sharedMemory;
+
+    private final PayloadCompression m_compression;
+
     /**
      * @param outToPython the output stream via which messages to Python are sent
      */
     public DefaultMessageSender(final OutputStream outToPython) {
+        this(outToPython, MessageHeaderCodec.create(HeaderFormat.TEXT), null, null);
+    }
+
+    /**
+     * @param outToPython the output stream via which messages to Python are sent
+     * @param headerCodec the codec used to encode message headers
+     * @param sharedMemory the shared memory segments via which large payloads are sent, may be <code>null</code> in
+     *            which case all payloads are sent via the output stream
+     * @param compression the compression applied to payloads before sending, may be <code>null</code> in which case
+     *            all payloads are sent uncompressed
+     */
+    public DefaultMessageSender(final OutputStream outToPython, final MessageHeaderCodec headerCodec,
+        final SharedMemorySegments sharedMemory, final PayloadCompression compression) {
         m_outToPython = new DataOutputStream(outToPython);
+        m_headerCodec = headerCodec;
+        m_sharedMemory = sharedMemory;
+        m_compression = compression;
     }
 
     @Override
     public void send(final Message message) throws IOException {
-        LOGGER.debug("Java - Send message: " + message);
-        final byte[] header = message.getHeader().getBytes(StandardCharsets.UTF_8);
-        final byte[] payload = message.getPayload();
+        if (PythonNodeLogger.DEBUG_ENABLED) {
+            LOGGER.debug("Java - Send message: " + message);
+        }
+        DefaultMessage defaultMessage = message instanceof DefaultMessage ? (DefaultMessage)message
+            : new DefaultMessage(message.getHeader(), message.getPayload());
+        byte[] payload = defaultMessage.getPayload();
+        if (m_compression != null && payload != null) {
+            final byte[] compressed = m_compression.compress(payload);
+            if (compressed != null) {
+                final Map<String, String> fields = defaultMessage.getAdditionalHeaderFields();
+                fields.put(PayloadCompression.HEADER_FIELD_KEY, m_compression.getCompression().getId());
+                fields.put(PayloadCompression.UNCOMPRESSED_SIZE_HEADER_FIELD_KEY, Integer.toString(payload.length));
+                defaultMessage =
+                    new DefaultMessage(defaultMessage.getId(), defaultMessage.getCategory(), compressed, fields);
+                payload = compressed;
+            }
+        }
+        if (m_sharedMemory != null && payload != null && m_sharedMemory.shouldOffload(payload.length)) {
+            final Map<String, String> fields = defaultMessage.getAdditionalHeaderFields();
+            fields.put(SharedMemorySegments.HEADER_FIELD_KEY, m_sharedMemory.write(payload));
+            defaultMessage = new DefaultMessage(defaultMessage.getId(), defaultMessage.getCategory(), null, fields);
+            payload = null;
+        }
+        final byte[] header = m_headerCodec.encode(defaultMessage);
         m_outToPython.writeInt(header.length);
         m_outToPython.writeInt(payload != null ? payload.length : 0);
         m_outToPython.write(header);
@@ -65,7 +65,12 @@ final class DefaultMessageSenderLoop extends AbstractMessageLoop implements Mess
 
     public DefaultMessageSenderLoop(final MessageSender sender, final BlockingQueue<Message> sendQueue,
         final PythonExecutionMonitor monitor) {
-        super(monitor, "python-message-send-loop");
+        this(sender, sendQueue, monitor, "python-message-send-loop");
+    }
+
+    public DefaultMessageSenderLoop(final MessageSender sender, final BlockingQueue<Message> sendQueue,
+        final PythonExecutionMonitor monitor, final String loopThreadName) {
+        super(monitor, loopThreadName);
         m_sender = sender;
         m_sendQueue = sendQueue;
     }
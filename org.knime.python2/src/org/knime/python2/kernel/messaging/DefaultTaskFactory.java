@@ -63,6 +63,7 @@
 import java.util.function.IntSupplier;
 
 import org.knime.python2.kernel.PythonExecutionMonitor;
+import org.knime.python2.kernel.messaging.DefaultMessage.PayloadEncoder;
 import org.knime.python2.util.PythonNodeLogger;
 
 public final class DefaultTaskFactory<T> implements MessageHandler {
@@ -118,8 +119,21 @@ public boolean handle(final Message message) throws Exception {
 
         private static final int RECEIVE_QUEUE_LENGTH = 10;
 
+        /**
+         * Category of the message that requests Python to cancel the handling of a message. Its payload is the id of
+         * that message.
+         */
+        private static final String CANCEL_CATEGORY = "cancel";
+
         private Message m_initiatingMessage;
 
+        /**
+         * The id of {@link #m_initiatingMessage}, <code>null</code> if the task is initiated by an external trigger.
+         */
+        private final Integer m_initiatingMessageId;
+
+        private volatile boolean m_isInitiatingMessageSent = false;
+
         private final FutureTask<T> m_delegateTask = new FutureTask<>(this::runInternal);
 
         private final TaskHandler<T> m_delegateTaskHandler;
@@ -160,6 +174,7 @@ public DefaultTask(final Message message, final TaskHandler<T> taskHandler, fina
             final MessageHandlerCollection messageHandlers, final IntSupplier messageIdSupplier,
             final ExecutorService executor, final PythonExecutionMonitor monitor) {
             m_initiatingMessage = message;
+            m_initiatingMessageId = message != null ? message.getId() : null;
             m_delegateTaskHandler = taskHandler;
             m_messageSender = sender;
             m_messageHandlers = messageHandlers;
@@ -185,9 +200,18 @@ public void run() {
             }
         }
 
+        /**
+         * {@inheritDoc}
+         * <P>
+         * If the initiating message of this task was already sent, Python is requested to stop handling it as well.
+         */
         @Override
         public boolean cancel(final boolean mayInterruptIfRunning) {
-            return m_delegateTask.cancel(mayInterruptIfRunning);
+            final boolean cancelled = m_delegateTask.cancel(mayInterruptIfRunning);
+            if (cancelled && m_initiatingMessageId != null && m_isInitiatingMessageSent) {
+                requestCancellationInPython();
+            }
+            return cancelled;
         }
 
         @Override
@@ -242,6 +266,7 @@ private T runInternal() throws Exception {
                         m_registeredMessageCategories.add(messageCategory);
                     }
                     m_messageSender.send(toSend);
+                    m_isInitiatingMessageSent = true;
                 }
                 LOGGER.debug("Java - Wait for message in task, initiating message: " + m_initiatingMessage);
                 final Message received = m_receivedMessages.take();
@@ -279,5 +304,20 @@ private void setResult(final T result) {
             m_result = result;
             m_isDone = true;
         }
+
+        private void requestCancellationInPython() {
+            final byte[] payload = new PayloadEncoder().putInt(m_initiatingMessageId).get();
+            try {
+                m_messageSender
+                    .send(new DefaultMessage(m_messageIdSupplier.getAsInt(), CANCEL_CATEGORY, payload, null));
+            } catch (final Exception ex) {
+                if (ex instanceof InterruptedException) {
+                    Thread.currentThread().interrupt();
+                }
+                // Python keeps handling the message but its response will be ignored.
+                LOGGER.debug("Java - Failed to request cancellation of task in Python, initiating message id: "
+                    + m_initiatingMessageId, ex);
+            }
+        }
     }
 }
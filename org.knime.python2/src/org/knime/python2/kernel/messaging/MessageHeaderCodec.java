@@ -0,0 +1,208 @@
+/*
+ * ------------------------------------------------------------------------
+ *
+ *  Copyright by KNIME AG, Zurich, Switzerland
+ *  Website: http://www.knime.com; Email: contact@knime.com
+ *
+ *  This program is free software; you can redistribute it and/or modify
+ *  it under the terms of the GNU General Public License, Version 3, as
+ *  published by the Free Software Foundation.
+ *
+ *  This program is distributed in the hope that it will be useful, but
+ *  WITHOUT ANY WARRANTY; without even the implied warranty of
+ *  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+ *  GNU General Public License for more details.
+ *
+ *  You should have received a copy of the GNU General Public License
+ *  along with this program; if not, see <http://www.gnu.org/licenses>.
+ *
+ *  Additional permission under GNU GPL version 3 section 7:
+ *
+ *  KNIME interoperates with ECLIPSE solely via ECLIPSE's plug-in APIs.
+ *  Hence, KNIME and ECLIPSE are both independent programs and are not
+ *  derived from each other. Should, however, the interpretation of the
+ *  GNU GPL Version 3 ("License") under any applicable laws result in
+ *  KNIME and ECLIPSE being a combined program, KNIME AG herewith grants
+ *  you the additional permission to use and propagate KNIME together with
+ *  ECLIPSE with only the license terms in place for ECLIPSE applying to
+ *  ECLIPSE and the GNU GPL Version 3 applying for KNIME, provided the
+ *  license terms of ECLIPSE themselves allow for the respective use and
+ *  propagation of ECLIPSE together with KNIME.
+ *
+ *  Additional permission relating to nodes for KNIME that extend the Node
+ *  Extension (and in particular that are based on subclasses of NodeModel,
+ *  NodeDialog, and NodeView) and that only interoperate with KNIME through
+ *  standard APIs ("Nodes"):
+ *  Nodes are deemed to be separate and independent programs and to not be
+ *  covered works.  Notwithstanding anything to the contrary in the
+ *  License, the License does not apply to Nodes, you are not required to
+ *  license Nodes under the License, and you are granted a license to
+ *  prepare and propagate Nodes, in each case even if such Nodes are
+ *  propagated with or for interoperation with KNIME.  The owner of a Node
+ *  may freely choose the license terms applicable to such Node, including
+ *  when such Node is propagated with or for interoperation with KNIME.
+ * ---------------------------------------------------------------------
+ *
+ */
+package org.knime.python2.kernel.messaging;
+
+import java.nio.ByteBuffer;
+import java.nio.charset.StandardCharsets;
+import java.util.HashMap;
+import java.util.LinkedHashMap;
+import java.util.Map;
+import java.util.Map.Entry;
+
+import org.knime.python2.kernel.messaging.MessagingOptions.HeaderFormat;
+
+/**
+ * Encodes message headers for sending and decodes received headers into messages. Must be kept in sync with
+ * <code>messaging/MessageHeaderCodec.py</code> on Python side.
+ * <P>
+ * Instances are not thread-safe. Sender and receiver each use their own instance.
+ */
+abstract class MessageHeaderCodec {
+
+    /**
+     * @param format the header format
+     * @return a new codec for the given format
+     */
+    static MessageHeaderCodec create(final HeaderFormat format) {
+        return format == HeaderFormat.BINARY ? new BinaryMessageHeaderCodec() : new TextMessageHeaderCodec();
+    }
+
+    /**
+     * @param message the message whose header to encode
+     * @return the encoded header
+     */
+    abstract byte[] encode(DefaultMessage message);
+
+    /**
+     * @param header the encoded header
+     * @param payload the message's payload, may be <code>null</code>
+     * @return the decoded message
+     */
+    abstract DefaultMessage decode(byte[] header, byte[] payload);
+
+    private static final class TextMessageHeaderCodec extends MessageHeaderCodec {
+
+        @Override
+        byte[] encode(final DefaultMessage message) {
+            return PythonMessagingUtils.utf8StringToBytes(message.getHeader());
+        }
+
+        @Override
+        DefaultMessage decode(final byte[] header, final byte[] payload) {
+            return new DefaultMessage(PythonMessagingUtils.utf8StringFromBytes(header), payload);
+        }
+    }
+
+    /**
+     * Binary header format, version 1:<br>
+     * (version: uint8)(id: int32)(category size: uint16)(fields size: uint32)(category)(fields)<br>
+     * All numbers are big-endian. Category and fields are UTF-8 encoded. The fields are the message's additional header
+     * fields in the form <code>key NUL value NUL key NUL value...</code>.
+     */
+    static final class BinaryMessageHeaderCodec extends MessageHeaderCodec {
+
+        private static final byte VERSION = 1;
+
+        private static final int PREFIX_SIZE = 1 + 4 + 2 + 4;
+
+        private static final char FIELD_SEPARATOR = '\0';
+
+        /**
+         * Categories and field blocks repeat across messages. Their cached forms are reused until the caches exceed
+         * this size since some of them (e.g. reply categories) are unique.
+         */
+        static final int MAX_CACHE_SIZE = 1024;
+
+        private final Map<String, byte[]> m_encodedCategories = new HashMap<>();
+
+        private final Map<ByteBuffer, String> m_decodedCategories = new HashMap<>();
+
+        private final Map<ByteBuffer, Map<String, String>> m_decodedFields = new HashMap<>();
+
+        @Override
+        byte[] encode(final DefaultMessage message) {
+            byte[] category = m_encodedCategories.get(message.getCategory());
+            if (category == null) {
+                category = PythonMessagingUtils.utf8StringToBytes(message.getCategory());
+                putBounded(m_encodedCategories, message.getCategory(), category);
+            }
+            final byte[] fields = encodeFields(message.getAdditionalHeaderFields());
+            return ByteBuffer.allocate(PREFIX_SIZE + category.length + fields.length) //
+                .put(VERSION) //
+                .putInt(message.getId()) //
+                .putShort((short)category.length) //
+                .putInt(fields.length) //
+                .put(category) //
+                .put(fields) //
+                .array();
+        }
+
+        private static byte[] encodeFields(final Map<String, String> fields) {
+            if (fields.isEmpty()) {
+                return new byte[0];
+            }
+            final StringBuilder builder = new StringBuilder();
+            for (final Entry<String, String> field : fields.entrySet()) {
+                if (builder.length() > 0) {
+                    builder.append(FIELD_SEPARATOR);
+                }
+                builder.append(field.getKey()).append(FIELD_SEPARATOR).append(field.getValue());
+            }
+            return PythonMessagingUtils.utf8StringToBytes(builder.toString());
+        }
+
+        @Override
+        DefaultMessage decode(final byte[] header, final byte[] payload) {
+            final ByteBuffer buffer = ByteBuffer.wrap(header);
+            final int version = buffer.get() & 0xFF;
+            if (version != VERSION) {
+                throw new IllegalArgumentException("Unsupported message header version: " + version + ".");
+            }
+            final int id = buffer.getInt();
+            final int categorySize = buffer.getShort() & 0xFFFF;
+            final int fieldsSize = buffer.getInt();
+            // Header arrays are not reused, so views of them can serve as cache keys.
+            final ByteBuffer category = ByteBuffer.wrap(header, PREFIX_SIZE, categorySize).slice();
+            String decodedCategory = m_decodedCategories.get(category);
+            if (decodedCategory == null) {
+                decodedCategory = new String(header, PREFIX_SIZE, categorySize, StandardCharsets.UTF_8);
+                putBounded(m_decodedCategories, category, decodedCategory);
+            }
+            Map<String, String> decodedFields = null;
+            if (fieldsSize > 0) {
+                final int fieldsOffset = PREFIX_SIZE + categorySize;
+                final ByteBuffer fields = ByteBuffer.wrap(header, fieldsOffset, fieldsSize).slice();
+                decodedFields = m_decodedFields.get(fields);
+                if (decodedFields == null) {
+                    decodedFields = new LinkedHashMap<>();
+                    final String[] items = new String(header, fieldsOffset, fieldsSize, StandardCharsets.UTF_8)
+                        .split(String.valueOf(FIELD_SEPARATOR), -1);
+                    for (int i = 0; i + 1 < items.length; i += 2) {
+                        decodedFields.put(items[i], items[i + 1]);
+                    }
+                    putBounded(m_decodedFields, fields, decodedFields);
+                }
+            }
+            // DefaultMessage copies the (cached) fields.
+            return new DefaultMessage(id, decodedCategory, payload, decodedFields);
+        }
+
+        /**
+         * @return the number of entries of the largest cache
+         */
+        int getLargestCacheSize() {
+            return Math.max(m_encodedCategories.size(), Math.max(m_decodedCategories.size(), m_decodedFields.size()));
+        }
+
+        private static <K, V> void putBounded(final Map<K, V> cache, final K key, final V value) {
+            if (cache.size() >= MAX_CACHE_SIZE) {
+                cache.clear();
+            }
+            cache.put(key, value);
+        }
+    }
+}
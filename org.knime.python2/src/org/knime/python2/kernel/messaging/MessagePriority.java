@@ -0,0 +1,143 @@
+/*
+ * ------------------------------------------------------------------------
+ *
+ *  Copyright by KNIME AG, Zurich, Switzerland
+ *  Website: http://www.knime.com; Email: contact@knime.com
+ *
+ *  This program is free software; you can redistribute it and/or modify
+ *  it under the terms of the GNU General Public License, Version 3, as
+ *  published by the Free Software Foundation.
+ *
+ *  This program is distributed in the hope that it will be useful, but
+ *  WITHOUT ANY WARRANTY; without even the implied warranty of
+ *  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+ *  GNU General Public License for more details.
+ *
+ *  You should have received a copy of the GNU General Public License
+ *  along with this program; if not, see <http://www.gnu.org/licenses>.
+ *
+ *  Additional permission under GNU GPL version 3 section 7:
+ *
+ *  KNIME interoperates with ECLIPSE solely via ECLIPSE's plug-in APIs.
+ *  Hence, KNIME and ECLIPSE are both independent programs and are not
+ *  derived from each other. Should, however, the interpretation of the
+ *  GNU GPL Version 3 ("License") under any applicable laws result in
+ *  KNIME and ECLIPSE being a combined program, KNIME AG herewith grants
+ *  you the additional permission to use and propagate KNIME together with
+ *  ECLIPSE with only the license terms in place for ECLIPSE applying to
+ *  ECLIPSE and the GNU GPL Version 3 applying for KNIME, provided the
+ *  license terms of ECLIPSE themselves allow for the respective use and
+ *  propagation of ECLIPSE together with KNIME.
+ *
+ *  Additional permission relating to nodes for KNIME that extend the Node
+ *  Extension (and in particular that are based on subclasses of NodeModel,
+ *  NodeDialog, and NodeView) and that only interoperate with KNIME through
+ *  standard APIs ("Nodes"):
+ *  Nodes are deemed to be separate and independent programs and to not be
+ *  covered works.  Notwithstanding anything to the contrary in the
+ *  License, the License does not apply to Nodes, you are not required to
+ *  license Nodes under the License, and you are granted a license to
+ *  prepare and propagate Nodes, in each case even if such Nodes are
+ *  propagated with or for interoperation with KNIME.  The owner of a Node
+ *  may freely choose the license terms applicable to such Node, including
+ *  when such Node is propagated with or for interoperation with KNIME.
+ * ---------------------------------------------------------------------
+ *
+ */
+package org.knime.python2.kernel.messaging;
+
+import java.util.Arrays;
+import java.util.Collections;
+import java.util.HashSet;
+import java.util.Set;
+
+/**
+ * Priority classes of messages. Queues of the messaging system serve {@link #CONTROL control} messages before
+ * {@link #NORMAL normal} messages and normal messages before {@link #BULK bulk} messages, so that short interactive
+ * requests (e.g. auto completion in the node dialog) do not wait behind large table transfers.
+ * <P>
+ * The priority of a message is determined by, in this order: its header field {@link #HEADER_FIELD_KEY}, its category
+ * (see {@link #CONTROL_CATEGORIES} and {@link #BULK_CATEGORIES}) and the size of its payload (see
+ * {@link #BULK_PAYLOAD_SIZE}). Must be kept in sync with <code>messaging/MessagePriority.py</code> on Python side.
+ * <P>
+ * If the data channel is enabled (see {@link MessagingOptions#isDataChannelEnabled()}), bulk messages are sent via the
+ * data connection.
+ */
+public enum MessagePriority {
+
+    /**
+     * Requests that control the kernel or serve interactive actions.
+     */
+    CONTROL("control"),
+    /**
+     * All messages that are neither control nor bulk messages.
+     */
+    NORMAL("normal"),
+    /**
+     * Messages that carry large amounts of data.
+     */
+    BULK("bulk");
+
+    /**
+     * The header field that can be used to explicitly set the priority of a message. Its value is the
+     * {@link #getId() identifier} of a priority.
+     */
+    public static final String HEADER_FIELD_KEY = "priority";
+
+    /**
+     * Categories of requests that are control messages.
+     */
+    public static final Set<String> CONTROL_CATEGORIES = Collections.unmodifiableSet(
+        new HashSet<>(Arrays.asList("shutdown", "getpid", "hasAutoComplete", "autoComplete", "listVariables",
+            "getStats", "cancel")));
+
+    /**
+     * Categories of requests that transfer tables or objects and are bulk messages regardless of their payload size.
+     */
+    public static final Set<String> BULK_CATEGORIES = Collections.unmodifiableSet(
+        new HashSet<>(Arrays.asList("putTable", "appendToTable", "getTableChunk", "putTables", "getTables",
+            "putObject", "getObject")));
+
+    /**
+     * Messages whose payload is at least this large (in bytes) are bulk messages.
+     */
+    public static final int BULK_PAYLOAD_SIZE = 64 * 1024;
+
+    private final String m_id;
+
+    MessagePriority(final String id) {
+        m_id = id;
+    }
+
+    /**
+     * @return the identifier of the priority as used in the {@link #HEADER_FIELD_KEY} header field
+     */
+    public String getId() {
+        return m_id;
+    }
+
+    /**
+     * @param message the message
+     * @return the priority of the given message
+     */
+    static MessagePriority of(final Message message) {
+        final String priority = message.getHeaderField(HEADER_FIELD_KEY);
+        if (priority != null) {
+            for (final MessagePriority candidate : values()) {
+                if (candidate.m_id.equals(priority)) {
+                    return candidate;
+                }
+            }
+            return NORMAL;
+        }
+        final String category = message.getCategory();
+        if (CONTROL_CATEGORIES.contains(category)) {
+            return CONTROL;
+        }
+        if (BULK_CATEGORIES.contains(category)) {
+            return BULK;
+        }
+        final byte[] payload = message.getPayload();
+        return payload != null && payload.length >= BULK_PAYLOAD_SIZE ? BULK : NORMAL;
+    }
+}
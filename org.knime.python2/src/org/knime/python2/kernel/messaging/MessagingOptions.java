@@ -0,0 +1,460 @@
+/*
+ * ------------------------------------------------------------------------
+ *
+ *  Copyright by KNIME AG, Zurich, Switzerland
+ *  Website: http://www.knime.com; Email: contact@knime.com
+ *
+ *  This program is free software; you can redistribute it and/or modify
+ *  it under the terms of the GNU General Public License, Version 3, as
+ *  published by the Free Software Foundation.
+ *
+ *  This program is distributed in the hope that it will be useful, but
+ *  WITHOUT ANY WARRANTY; without even the implied warranty of
+ *  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+ *  GNU General Public License for more details.
+ *
+ *  You should have received a copy of the GNU General Public License
+ *  along with this program; if not, see <http://www.gnu.org/licenses>.
+ *
+ *  Additional permission under GNU GPL version 3 section 7:
+ *
+ *  KNIME interoperates with ECLIPSE solely via ECLIPSE's plug-in APIs.
+ *  Hence, KNIME and ECLIPSE are both independent programs and are not
+ *  derived from each other. Should, however, the interpretation of the
+ *  GNU GPL Version 3 ("License") under any applicable laws result in
+ *  KNIME and ECLIPSE being a combined program, KNIME AG herewith grants
+ *  you the additional permission to use and propagate KNIME together with
+ *  ECLIPSE with only the license terms in place for ECLIPSE applying to
+ *  ECLIPSE and the GNU GPL Version 3 applying for KNIME, provided the
+ *  license terms of ECLIPSE themselves allow for the respective use and
+ *  propagation of ECLIPSE together with KNIME.
+ *
+ *  Additional permission relating to nodes for KNIME that extend the Node
+ *  Extension (and in particular that are based on subclasses of NodeModel,
+ *  NodeDialog, and NodeView) and that only interoperate with KNIME through
+ *  standard APIs ("Nodes"):
+ *  Nodes are deemed to be separate and independent programs and to not be
+ *  covered works.  Notwithstanding anything to the contrary in the
+ *  License, the License does not apply to Nodes, you are not required to
+ *  license Nodes under the License, and you are granted a license to
+ *  prepare and propagate Nodes, in each case even if such Nodes are
+ *  propagated with or for interoperation with KNIME.  The owner of a Node
+ *  may freely choose the license terms applicable to such Node, including
+ *  when such Node is propagated with or for interoperation with KNIME.
+ * ---------------------------------------------------------------------
+ *
+ */
+package org.knime.python2.kernel.messaging;
+
+import static com.google.common.base.Preconditions.checkNotNull;
+
+import java.nio.file.Path;
+import java.util.ArrayList;
+import java.util.List;
+
+/**
+ * Options of the messaging system between Java and Python. They are passed to the Python process on startup in the
+ * form of <code>key=value</code> command line arguments (see {@link #getKernelArguments()}).
+ */
+public class MessagingOptions {
+
+    /**
+     * The default minimum payload size in bytes above which payloads are transferred via shared memory.
+     */
+    public static final int DEFAULT_SHARED_MEMORY_THRESHOLD = 1024 * 1024;
+
+    /**
+     * The default format of message headers.
+     */
+    public static final HeaderFormat DEFAULT_HEADER_FORMAT = HeaderFormat.BINARY;
+
+    /**
+     * The default minimum payload size in bytes above which payloads are compressed if compression is enabled.
+     */
+    public static final int DEFAULT_COMPRESSION_THRESHOLD = 64 * 1024;
+
+    private static final String HEADER_FORMAT_KEY = "header_format";
+
+    private static final String SHARED_MEMORY_DIRECTORY_KEY = "shm_dir";
+
+    private static final String SHARED_MEMORY_THRESHOLD_KEY = "shm_threshold";
+
+    private static final String COMPRESSION_KEY = "compression";
+
+    private static final String COMPRESSION_THRESHOLD_KEY = "compression_threshold";
+
+    private static final String ENGINE_KEY = "engine";
+
+    private static final String DATA_CHANNEL_KEY = "data_channel";
+
+    private static final String DATA_CHANNEL_BUFFER_SIZE_KEY = "data_channel_buffer_size";
+
+    private static final String STATISTICS_KEY = "statistics";
+
+    private HeaderFormat m_headerFormat = DEFAULT_HEADER_FORMAT;
+
+    private int m_sharedMemoryThreshold = DEFAULT_SHARED_MEMORY_THRESHOLD;
+
+    private Compression m_compression = Compression.NONE;
+
+    private int m_compressionThreshold = DEFAULT_COMPRESSION_THRESHOLD;
+
+    private Engine m_engine = Engine.THREADS;
+
+    private boolean m_dataChannelEnabled = false;
+
+    private int m_dataChannelBufferSize = 0;
+
+    private boolean m_statisticsEnabled = false;
+
+    /**
+     * Default constructor.
+     */
+    public MessagingOptions() {
+
+    }
+
+    /**
+     * Copy constructor.
+     *
+     * @param other the options to copy
+     */
+    public MessagingOptions(final MessagingOptions other) {
+        m_headerFormat = other.getHeaderFormat();
+        m_sharedMemoryThreshold = other.getSharedMemoryThreshold();
+        m_compression = other.getCompression();
+        m_compressionThreshold = other.getCompressionThreshold();
+        m_engine = other.getEngine();
+        m_dataChannelEnabled = other.isDataChannelEnabled();
+        m_dataChannelBufferSize = other.getDataChannelBufferSize();
+        m_statisticsEnabled = other.isStatisticsEnabled();
+    }
+
+    /**
+     * Gets the format of message headers. The Python kernel is told which format to use on startup.
+     *
+     * @return the header format
+     */
+    public HeaderFormat getHeaderFormat() {
+        return m_headerFormat;
+    }
+
+    /**
+     * Sets the format of message headers.
+     *
+     * @param headerFormat the new header format
+     */
+    public void setHeaderFormat(final HeaderFormat headerFormat) {
+        m_headerFormat = checkNotNull(headerFormat);
+    }
+
+    /**
+     * Gets the minimum payload size in bytes above which payloads are transferred via shared memory instead of the
+     * socket. A value less than or equal to zero disables the shared memory side channel.
+     *
+     * @return the shared memory threshold
+     */
+    public int getSharedMemoryThreshold() {
+        return m_sharedMemoryThreshold;
+    }
+
+    /**
+     * Sets the minimum payload size in bytes above which payloads are transferred via shared memory instead of the
+     * socket. A value less than or equal to zero disables the shared memory side channel.
+     *
+     * @param sharedMemoryThreshold the new shared memory threshold
+     */
+    public void setSharedMemoryThreshold(final int sharedMemoryThreshold) {
+        m_sharedMemoryThreshold = sharedMemoryThreshold;
+    }
+
+    /**
+     * Gets the codec used to compress payloads. Payloads are only compressed if they exceed the
+     * {@link #getCompressionThreshold() compression threshold} and if a sample of them turns out to be compressible.
+     *
+     * @return the compression codec
+     */
+    public Compression getCompression() {
+        return m_compression;
+    }
+
+    /**
+     * Sets the codec used to compress payloads.
+     *
+     * @param compression the new compression codec, {@link Compression#NONE} disables compression
+     */
+    public void setCompression(final Compression compression) {
+        m_compression = checkNotNull(compression);
+    }
+
+    /**
+     * Gets the minimum payload size in bytes above which payloads are compressed.
+     *
+     * @return the compression threshold
+     */
+    public int getCompressionThreshold() {
+        return m_compressionThreshold;
+    }
+
+    /**
+     * Sets the minimum payload size in bytes above which payloads are compressed.
+     *
+     * @param compressionThreshold the new compression threshold
+     */
+    public void setCompressionThreshold(final int compressionThreshold) {
+        m_compressionThreshold = compressionThreshold;
+    }
+
+    /**
+     * Gets the messaging engine of the Python kernel. Only the Python 3 kernel supports engines other than
+     * {@link Engine#THREADS}, the Python 2 kernel ignores this option.
+     *
+     * @return the messaging engine
+     */
+    public Engine getEngine() {
+        return m_engine;
+    }
+
+    /**
+     * Sets the messaging engine of the Python kernel.
+     *
+     * @param engine the new messaging engine
+     */
+    public void setEngine(final Engine engine) {
+        m_engine = checkNotNull(engine);
+    }
+
+    /**
+     * Gets whether bulk messages (table and object transfers, see {@link MessagePriority#BULK}) are exchanged via a
+     * second connection to the Python kernel. Long transfers then do not delay control messages such as execution or
+     * cancellation requests.
+     *
+     * @return <code>true</code> if a separate data connection is used
+     */
+    public boolean isDataChannelEnabled() {
+        return m_dataChannelEnabled;
+    }
+
+    /**
+     * Sets whether bulk messages are exchanged via a second connection to the Python kernel.
+     *
+     * @param dataChannelEnabled <code>true</code> to use a separate data connection
+     */
+    public void setDataChannelEnabled(final boolean dataChannelEnabled) {
+        m_dataChannelEnabled = dataChannelEnabled;
+    }
+
+    /**
+     * Gets the size in bytes of the socket send and receive buffers of the data connection. Only takes effect if the
+     * data connection is enabled.
+     *
+     * @return the buffer size, zero or less to keep the system's default
+     */
+    public int getDataChannelBufferSize() {
+        return m_dataChannelBufferSize;
+    }
+
+    /**
+     * Sets the size in bytes of the socket send and receive buffers of the data connection.
+     *
+     * @param dataChannelBufferSize the new buffer size, zero or less to keep the system's default
+     */
+    public void setDataChannelBufferSize(final int dataChannelBufferSize) {
+        m_dataChannelBufferSize = dataChannelBufferSize;
+    }
+
+    /**
+     * Gets whether the Python kernel records statistics about the messages it sends and receives (see
+     * {@link org.knime.python2.kernel.PythonKernel#getMessagingStatistics()}). Recording them costs some of the
+     * message throughput, so it is disabled by default.
+     *
+     * @return <code>true</code> if messaging statistics are recorded
+     */
+    public boolean isStatisticsEnabled() {
+        return m_statisticsEnabled;
+    }
+
+    /**
+     * Sets whether the Python kernel records statistics about the messages it sends and receives.
+     *
+     * @param statisticsEnabled <code>true</code> to record messaging statistics
+     */
+    public void setStatisticsEnabled(final boolean statisticsEnabled) {
+        m_statisticsEnabled = statisticsEnabled;
+    }
+
+    /**
+     * @return the directory in which shared memory segments are created, <code>null</code> if shared memory is
+     *         disabled or not available on this system
+     */
+    Path getSharedMemoryDirectory() {
+        return m_sharedMemoryThreshold > 0 ? SharedMemorySegments.getDefaultBaseDirectory() : null;
+    }
+
+    /**
+     * @return the command line arguments that pass these options to the Python kernel
+     */
+    public List<String> getKernelArguments() {
+        final List<String> arguments = new ArrayList<>();
+        arguments.add(HEADER_FORMAT_KEY + "=" + m_headerFormat.getId());
+        final Path sharedMemoryDirectory = getSharedMemoryDirectory();
+        if (sharedMemoryDirectory != null) {
+            arguments.add(SHARED_MEMORY_DIRECTORY_KEY + "=" + sharedMemoryDirectory);
+            arguments.add(SHARED_MEMORY_THRESHOLD_KEY + "=" + m_sharedMemoryThreshold);
+        }
+        if (m_compression != Compression.NONE) {
+            arguments.add(COMPRESSION_KEY + "=" + m_compression.getId());
+            arguments.add(COMPRESSION_THRESHOLD_KEY + "=" + m_compressionThreshold);
+        }
+        if (m_engine != Engine.THREADS) {
+            arguments.add(ENGINE_KEY + "=" + m_engine.getId());
+        }
+        if (m_dataChannelEnabled) {
+            arguments.add(DATA_CHANNEL_KEY + "=true");
+            if (m_dataChannelBufferSize > 0) {
+                arguments.add(DATA_CHANNEL_BUFFER_SIZE_KEY + "=" + m_dataChannelBufferSize);
+            }
+        }
+        if (m_statisticsEnabled) {
+            arguments.add(STATISTICS_KEY + "=true");
+        }
+        return arguments;
+    }
+
+    @Override
+    public int hashCode() {
+        final int prime = 31;
+        int result = 1;
+        result = prime * result + ((m_headerFormat == null) ? 0 : m_headerFormat.hashCode());
+        result = prime * result + m_sharedMemoryThreshold;
+        result = prime * result + ((m_compression == null) ? 0 : m_compression.hashCode());
+        result = prime * result + m_compressionThreshold;
+        result = prime * result + ((m_engine == null) ? 0 : m_engine.hashCode());
+        result = prime * result + (m_dataChannelEnabled ? 1231 : 1237);
+        result = prime * result + m_dataChannelBufferSize;
+        result = prime * result + (m_statisticsEnabled ? 1231 : 1237);
+        return result;
+    }
+
+    @Override
+    public boolean equals(final Object obj) {
+        if (this == obj) {
+            return true;
+        }
+        if (obj == null) {
+            return false;
+        }
+        if (getClass() != obj.getClass()) {
+            return false;
+        }
+        final MessagingOptions other = (MessagingOptions)obj;
+        if (m_headerFormat != other.m_headerFormat) {
+            return false;
+        }
+        if (m_sharedMemoryThreshold != other.m_sharedMemoryThreshold) {
+            return false;
+        }
+        if (m_compression != other.m_compression) {
+            return false;
+        }
+        if (m_compressionThreshold != other.m_compressionThreshold) {
+            return false;
+        }
+        if (m_engine != other.m_engine) {
+            return false;
+        }
+        if (m_dataChannelEnabled != other.m_dataChannelEnabled) {
+            return false;
+        }
+        if (m_dataChannelBufferSize != other.m_dataChannelBufferSize) {
+            return false;
+        }
+        if (m_statisticsEnabled != other.m_statisticsEnabled) {
+            return false;
+        }
+        return true;
+    }
+
+    /**
+     * Formats of message headers.
+     */
+    public enum HeaderFormat {
+        /**
+         * Textual header of the form <code>@key=value@key=value...</code>.
+         */
+        TEXT("text"),
+        /**
+         * Versioned binary header with fixed id and category fields. Cheaper to encode and decode than {@link #TEXT}.
+         */
+        BINARY("binary");
+
+        private final String m_id;
+
+        HeaderFormat(final String id) {
+            m_id = id;
+        }
+
+        /**
+         * @return the identifier of the format that is passed to the Python kernel
+         */
+        public String getId() {
+            return m_id;
+        }
+    }
+
+    /**
+     * Codecs for the compression of message payloads.
+     */
+    public enum Compression {
+        /**
+         * Payloads are not compressed.
+         */
+        NONE(null),
+        /**
+         * Payloads are compressed using zlib (deflate). Fast and available on Java and Python side without additional
+         * dependencies.
+         */
+        ZLIB("zlib");
+
+        private final String m_id;
+
+        Compression(final String id) {
+            m_id = id;
+        }
+
+        /**
+         * @return the identifier of the codec that is passed to the Python kernel and sent in message headers,
+         *         <code>null</code> for {@link #NONE}
+         */
+        public String getId() {
+            return m_id;
+        }
+    }
+
+    /**
+     * Messaging engines of the Python kernel.
+     */
+    public enum Engine {
+        /**
+         * Sending, receiving and distributing messages each run on a dedicated thread.
+         */
+        THREADS("threads"),
+        /**
+         * Sending, receiving and distributing messages run on a single asyncio event loop. Python 3 only.
+         */
+        ASYNCIO("asyncio");
+
+        private final String m_id;
+
+        Engine(final String id) {
+            m_id = id;
+        }
+
+        /**
+         * @return the identifier of the engine that is passed to the Python kernel
+         */
+        public String getId() {
+            return m_id;
+        }
+    }
+}
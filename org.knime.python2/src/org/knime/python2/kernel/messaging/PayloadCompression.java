@@ -0,0 +1,277 @@
+/*
+ * ------------------------------------------------------------------------
+ *
+ *  Copyright by KNIME AG, Zurich, Switzerland
+ *  Website: http://www.knime.com; Email: contact@knime.com
+ *
+ *  This program is free software; you can redistribute it and/or modify
+ *  it under the terms of the GNU General Public License, Version 3, as
+ *  published by the Free Software Foundation.
+ *
+ *  This program is distributed in the hope that it will be useful, but
+ *  WITHOUT ANY WARRANTY; without even the implied warranty of
+ *  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+ *  GNU General Public License for more details.
+ *
+ *  You should have received a copy of the GNU General Public License
+ *  along with this program; if not, see <http://www.gnu.org/licenses>.
+ *
+ *  Additional permission under GNU GPL version 3 section 7:
+ *
+ *  KNIME interoperates with ECLIPSE solely via ECLIPSE's plug-in APIs.
+ *  Hence, KNIME and ECLIPSE are both independent programs and are not
+ *  derived from each other. Should, however, the interpretation of the
+ *  GNU GPL Version 3 ("License") under any applicable laws result in
+ *  KNIME and ECLIPSE being a combined program, KNIME AG herewith grants
+ *  you the additional permission to use and propagate KNIME together with
+ *  ECLIPSE with only the license terms in place for ECLIPSE applying to
+ *  ECLIPSE and the GNU GPL Version 3 applying for KNIME, provided the
+ *  license terms of ECLIPSE themselves allow for the respective use and
+ *  propagation of ECLIPSE together with KNIME.
+ *
+ *  Additional permission relating to nodes for KNIME that extend the Node
+ *  Extension (and in particular that are based on subclasses of NodeModel,
+ *  NodeDialog, and NodeView) and that only interoperate with KNIME through
+ *  standard APIs ("Nodes"):
+ *  Nodes are deemed to be separate and independent programs and to not be
+ *  covered works.  Notwithstanding anything to the contrary in the
+ *  License, the License does not apply to Nodes, you are not required to
+ *  license Nodes under the License, and you are granted a license to
+ *  prepare and propagate Nodes, in each case even if such Nodes are
+ *  propagated with or for interoperation with KNIME.  The owner of a Node
+ *  may freely choose the license terms applicable to such Node, including
+ *  when such Node is propagated with or for interoperation with KNIME.
+ * ---------------------------------------------------------------------
+ *
+ */
+package org.knime.python2.kernel.messaging;
+
+import java.io.IOException;
+import java.util.Arrays;
+import java.util.concurrent.atomic.AtomicLong;
+import java.util.zip.DataFormatException;
+import java.util.zip.Deflater;
+import java.util.zip.Inflater;
+
+import org.knime.python2.kernel.messaging.MessagingOptions.Compression;
+
+/**
+ * Optional compression of message payloads. A compressed message carries the name of the codec and the size of the
+ * uncompressed payload in its header (see {@link #HEADER_FIELD_KEY} and {@link #UNCOMPRESSED_SIZE_HEADER_FIELD_KEY}).
+ * Payloads are only compressed if they exceed a size threshold and if compressing a sample of them indicates that the
+ * data is compressible. Received payloads are decompressed regardless of whether compression is enabled for sending.
+ * Must be kept in sync with <code>messaging/PayloadCompression.py</code> on Python side.
+ * <P>
+ * Instances are shared by sender and receiver and keep statistics about the compression ratio and the time spent.
+ */
+public final class PayloadCompression {
+
+    /**
+     * The header field that holds the codec of a compressed payload.
+     */
+    static final String HEADER_FIELD_KEY = "compression";
+
+    /**
+     * The header field that holds the size of a compressed payload before compression.
+     */
+    static final String UNCOMPRESSED_SIZE_HEADER_FIELD_KEY = "uncompressed_size";
+
+    /**
+     * Fastest zlib level, the transfer is meant to get faster, not smaller at any cost.
+     */
+    private static final int ZLIB_LEVEL = Deflater.BEST_SPEED;
+
+    private static final int SAMPLE_SIZE = 16 * 1024;
+
+    /**
+     * Payloads whose sample does not shrink below this ratio are sent uncompressed.
+     */
+    private static final double MAX_SAMPLE_RATIO = 0.9;
+
+    private final Compression m_compression;
+
+    private final int m_threshold;
+
+    private final AtomicLong m_numCompressed = new AtomicLong();
+
+    private final AtomicLong m_numSkipped = new AtomicLong();
+
+    private final AtomicLong m_uncompressedBytes = new AtomicLong();
+
+    private final AtomicLong m_compressedBytes = new AtomicLong();
+
+    private final AtomicLong m_compressionTimeInNanos = new AtomicLong();
+
+    private final AtomicLong m_numDecompressed = new AtomicLong();
+
+    private final AtomicLong m_decompressionTimeInNanos = new AtomicLong();
+
+    /**
+     * @param compression the codec used to compress payloads that are sent
+     * @param threshold the minimum payload size in bytes above which payloads are compressed
+     */
+    PayloadCompression(final Compression compression, final int threshold) {
+        m_compression = compression;
+        m_threshold = threshold;
+    }
+
+    /**
+     * @return the codec used to compress payloads that are sent
+     */
+    Compression getCompression() {
+        return m_compression;
+    }
+
+    /**
+     * @param payload the payload to compress
+     * @return the compressed payload or <code>null</code> if the payload should be sent uncompressed
+     */
+    byte[] compress(final byte[] payload) {
+        if (m_compression == Compression.NONE || payload.length == 0 || payload.length < m_threshold) {
+            return null;
+        }
+        final long start = System.nanoTime();
+        final int sampleSize = Math.min(payload.length, SAMPLE_SIZE);
+        byte[] compressed = null;
+        if (deflate(payload, sampleSize).length <= sampleSize * MAX_SAMPLE_RATIO) {
+            compressed = deflate(payload, payload.length);
+            if (compressed.length >= payload.length) {
+                compressed = null;
+            }
+        }
+        m_compressionTimeInNanos.addAndGet(System.nanoTime() - start);
+        if (compressed != null) {
+            m_numCompressed.incrementAndGet();
+            m_uncompressedBytes.addAndGet(payload.length);
+            m_compressedBytes.addAndGet(compressed.length);
+        } else {
+            m_numSkipped.incrementAndGet();
+        }
+        return compressed;
+    }
+
+    private static byte[] deflate(final byte[] data, final int length) {
+        final Deflater deflater = new Deflater(ZLIB_LEVEL);
+        try {
+            deflater.setInput(data, 0, length);
+            deflater.finish();
+            // Incompressible data grows slightly.
+            byte[] output = new byte[length + length / 1000 + 64];
+            int outputLength = 0;
+            while (!deflater.finished()) {
+                if (outputLength == output.length) {
+                    output = Arrays.copyOf(output, output.length * 2);
+                }
+                outputLength += deflater.deflate(output, outputLength, output.length - outputLength);
+            }
+            return Arrays.copyOf(output, outputLength);
+        } finally {
+            deflater.end();
+        }
+    }
+
+    /**
+     * @param codec the codec as sent in the message header
+     * @param payload the compressed payload
+     * @param uncompressedSize the size of the payload before compression as sent in the message header
+     * @return the decompressed payload
+     * @throws IOException if the codec is not supported or the payload is corrupt
+     */
+    byte[] decompress(final String codec, final byte[] payload, final int uncompressedSize) throws IOException {
+        if (!Compression.ZLIB.getId().equals(codec)) {
+            throw new IOException("Unsupported compression codec: '" + codec + "'.");
+        }
+        final long start = System.nanoTime();
+        final Inflater inflater = new Inflater();
+        final byte[] decompressed = new byte[uncompressedSize];
+        try {
+            inflater.setInput(payload);
+            int decompressedSize = 0;
+            while (decompressedSize < uncompressedSize && !inflater.finished()) {
+                final int inflated =
+                    inflater.inflate(decompressed, decompressedSize, uncompressedSize - decompressedSize);
+                if (inflated == 0 && (inflater.needsInput() || inflater.needsDictionary())) {
+                    break;
+                }
+                decompressedSize += inflated;
+            }
+            if (decompressedSize != uncompressedSize || !inflater.finished()) {
+                throw new IOException("Decompressed payload does not have the announced size of " + uncompressedSize
+                    + " bytes.");
+            }
+        } catch (final DataFormatException ex) {
+            throw new IOException("Compressed payload is corrupt.", ex);
+        } finally {
+            inflater.end();
+        }
+        m_decompressionTimeInNanos.addAndGet(System.nanoTime() - start);
+        m_numDecompressed.incrementAndGet();
+        return decompressed;
+    }
+
+    /**
+     * @return the number of payloads that were compressed before sending
+     */
+    public long getNumCompressedPayloads() {
+        return m_numCompressed.get();
+    }
+
+    /**
+     * @return the number of payloads above the threshold that were sent uncompressed because they did not compress well
+     */
+    public long getNumUncompressedPayloads() {
+        return m_numSkipped.get();
+    }
+
+    /**
+     * @return the total size in bytes of the compressed payloads before compression
+     */
+    public long getUncompressedBytes() {
+        return m_uncompressedBytes.get();
+    }
+
+    /**
+     * @return the total size in bytes of the compressed payloads after compression
+     */
+    public long getCompressedBytes() {
+        return m_compressedBytes.get();
+    }
+
+    /**
+     * @return the ratio of {@link #getUncompressedBytes()} to {@link #getCompressedBytes()}, <code>NaN</code> if no
+     *         payload was compressed
+     */
+    public double getCompressionRatio() {
+        final long compressedBytes = getCompressedBytes();
+        return compressedBytes > 0 ? getUncompressedBytes() / (double)compressedBytes : Double.NaN;
+    }
+
+    /**
+     * @return the total time in milliseconds spent compressing payloads (including discarded attempts)
+     */
+    public double getCompressionTimeInMillis() {
+        return m_compressionTimeInNanos.get() / 1e6;
+    }
+
+    /**
+     * @return the number of received payloads that were decompressed
+     */
+    public long getNumDecompressedPayloads() {
+        return m_numDecompressed.get();
+    }
+
+    /**
+     * @return the total time in milliseconds spent decompressing payloads
+     */
+    public double getDecompressionTimeInMillis() {
+        return m_decompressionTimeInNanos.get() / 1e6;
+    }
+
+    @Override
+    public String toString() {
+        return "compressed payloads: " + getNumCompressedPayloads() + ", uncompressed payloads: "
+            + getNumUncompressedPayloads() + ", compression ratio: " + getCompressionRatio() + ", compression time: "
+            + getCompressionTimeInMillis() + " ms, decompressed payloads: " + getNumDecompressedPayloads()
+            + ", decompression time: " + getDecompressionTimeInMillis() + " ms";
+    }
+}
@@ -0,0 +1,293 @@
+/*
+ * ------------------------------------------------------------------------
+ *
+ *  Copyright by KNIME AG, Zurich, Switzerland
+ *  Website: http://www.knime.com; Email: contact@knime.com
+ *
+ *  This program is free software; you can redistribute it and/or modify
+ *  it under the terms of the GNU General Public License, Version 3, as
+ *  published by the Free Software Foundation.
+ *
+ *  This program is distributed in the hope that it will be useful, but
+ *  WITHOUT ANY WARRANTY; without even the implied warranty of
+ *  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+ *  GNU General Public License for more details.
+ *
+ *  You should have received a copy of the GNU General Public License
+ *  along with this program; if not, see <http://www.gnu.org/licenses>.
+ *
+ *  Additional permission under GNU GPL version 3 section 7:
+ *
+ *  KNIME interoperates with ECLIPSE solely via ECLIPSE's plug-in APIs.
+ *  Hence, KNIME and ECLIPSE are both independent programs and are not
+ *  derived from each other. Should, however, the interpretation of the
+ *  GNU GPL Version 3 ("License") under any applicable laws result in
+ *  KNIME and ECLIPSE being a combined program, KNIME AG herewith grants
+ *  you the additional permission to use and propagate KNIME together with
+ *  ECLIPSE with only the license terms in place for ECLIPSE applying to
+ *  ECLIPSE and the GNU GPL Version 3 applying for KNIME, provided the
+ *  license terms of ECLIPSE themselves allow for the respective use and
+ *  propagation of ECLIPSE together with KNIME.
+ *
+ *  Additional permission relating to nodes for KNIME that extend the Node
+ *  Extension (and in particular that are based on subclasses of NodeModel,
+ *  NodeDialog, and NodeView) and that only interoperate with KNIME through
+ *  standard APIs ("Nodes"):
+ *  Nodes are deemed to be separate and independent programs and to not be
+ *  covered works.  Notwithstanding anything to the contrary in the
+ *  License, the License does not apply to Nodes, you are not required to
+ *  license Nodes under the License, and you are granted a license to
+ *  prepare and propagate Nodes, in each case even if such Nodes are
+ *  propagated with or for interoperation with KNIME.  The owner of a Node
+ *  may freely choose the license terms applicable to such Node, including
+ *  when such Node is propagated with or for interoperation with KNIME.
+ * ---------------------------------------------------------------------
+ *
+ */
+package org.knime.python2.kernel.messaging;
+
+import static com.google.common.base.Preconditions.checkNotNull;
+
+import java.util.AbstractQueue;
+import java.util.ArrayDeque;
+import java.util.ArrayList;
+import java.util.Collection;
+import java.util.Collections;
+import java.util.Iterator;
+import java.util.List;
+import java.util.concurrent.BlockingQueue;
+import java.util.concurrent.TimeUnit;
+import java.util.concurrent.locks.Condition;
+import java.util.concurrent.locks.ReentrantLock;
+
+/**
+ * A bounded blocking queue of messages that keeps one FIFO lane per {@link MessagePriority priority} and serves the
+ * lanes in order of priority. The capacity bounds each lane separately, so control messages can still be enqueued
+ * while the queue is full of bulk messages. The iterator returns a snapshot and does not support removal. Must be kept
+ * in sync with <code>MessageLanes</code> in <code>messaging/MessagePriority.py</code> on Python side.
+ */
+final class PrioritizedMessageQueue extends AbstractQueue<Message> implements BlockingQueue<Message> {
+
+    private final int m_laneCapacity;
+
+    private final ArrayDeque<Message>[] m_lanes;
+
+    private int m_size = 0;
+
+    private final ReentrantLock m_lock = new ReentrantLock();
+
+    private final Condition m_notEmpty = m_lock.newCondition();
+
+    /**
+     * Waiting producers may wait for different lanes, so this condition is always signaled to all waiters.
+     */
+    private final Condition m_notFull = m_lock.newCondition();
+
+    /**
+     * @param laneCapacity the maximum number of messages per priority lane
+     */
+    @SuppressWarnings("unchecked")
+    PrioritizedMessageQueue(final int laneCapacity) {
+        m_laneCapacity = laneCapacity;
+        m_lanes = new ArrayDeque[MessagePriority.values().length];
+        for (int i = 0; i < m_lanes.length; i++) {
+            m_lanes[i] = new ArrayDeque<>(laneCapacity);
+        }
+    }
+
+    @Override
+    public boolean offer(final Message message) {
+        final ArrayDeque<Message> lane = laneOf(message);
+        m_lock.lock();
+        try {
+            if (lane.size() >= m_laneCapacity) {
+                return false;
+            }
+            enqueue(lane, message);
+            return true;
+        } finally {
+            m_lock.unlock();
+        }
+    }
+
+    @Override
+    public void put(final Message message) throws InterruptedException {
+        final ArrayDeque<Message> lane = laneOf(message);
+        m_lock.lockInterruptibly();
+        try {
+            while (lane.size() >= m_laneCapacity) {
+                m_notFull.await();
+            }
+            enqueue(lane, message);
+        } finally {
+            m_lock.unlock();
+        }
+    }
+
+    @Override
+    public boolean offer(final Message message, final long timeout, final TimeUnit unit) throws InterruptedException {
+        final ArrayDeque<Message> lane = laneOf(message);
+        long nanos = unit.toNanos(timeout);
+        m_lock.lockInterruptibly();
+        try {
+            while (lane.size() >= m_laneCapacity) {
+                if (nanos <= 0) {
+                    return false;
+                }
+                nanos = m_notFull.awaitNanos(nanos);
+            }
+            enqueue(lane, message);
+            return true;
+        } finally {
+            m_lock.unlock();
+        }
+    }
+
+    @Override
+    public Message take() throws InterruptedException {
+        m_lock.lockInterruptibly();
+        try {
+            while (m_size == 0) {
+                m_notEmpty.await();
+            }
+            return dequeue();
+        } finally {
+            m_lock.unlock();
+        }
+    }
+
+    @Override
+    public Message poll() {
+        m_lock.lock();
+        try {
+            return m_size > 0 ? dequeue() : null;
+        } finally {
+            m_lock.unlock();
+        }
+    }
+
+    @Override
+    public Message poll(final long timeout, final TimeUnit unit) throws InterruptedException {
+        long nanos = unit.toNanos(timeout);
+        m_lock.lockInterruptibly();
+        try {
+            while (m_size == 0) {
+                if (nanos <= 0) {
+                    return null;
+                }
+                nanos = m_notEmpty.awaitNanos(nanos);
+            }
+            return dequeue();
+        } finally {
+            m_lock.unlock();
+        }
+    }
+
+    @Override
+    public Message peek() {
+        m_lock.lock();
+        try {
+            for (final ArrayDeque<Message> lane : m_lanes) {
+                if (!lane.isEmpty()) {
+                    return lane.peekFirst();
+                }
+            }
+            return null;
+        } finally {
+            m_lock.unlock();
+        }
+    }
+
+    @Override
+    public int size() {
+        m_lock.lock();
+        try {
+            return m_size;
+        } finally {
+            m_lock.unlock();
+        }
+    }
+
+    @Override
+    public int remainingCapacity() {
+        m_lock.lock();
+        try {
+            return m_laneCapacity * m_lanes.length - m_size;
+        } finally {
+            m_lock.unlock();
+        }
+    }
+
+    @Override
+    public int drainTo(final Collection<? super Message> c) {
+        return drainTo(c, Integer.MAX_VALUE);
+    }
+
+    @Override
+    public int drainTo(final Collection<? super Message> c, final int maxElements) {
+        checkNotNull(c);
+        if (c == this) {
+            throw new IllegalArgumentException("Cannot drain a queue into itself.");
+        }
+        m_lock.lock();
+        try {
+            int drained = 0;
+            while (drained < maxElements && m_size > 0) {
+                c.add(dequeue());
+                drained++;
+            }
+            return drained;
+        } finally {
+            m_lock.unlock();
+        }
+    }
+
+    @Override
+    public void clear() {
+        m_lock.lock();
+        try {
+            for (final ArrayDeque<Message> lane : m_lanes) {
+                lane.clear();
+            }
+            m_size = 0;
+            m_notFull.signalAll();
+        } finally {
+            m_lock.unlock();
+        }
+    }
+
+    @Override
+    public Iterator<Message> iterator() {
+        m_lock.lock();
+        try {
+            final List<Message> snapshot = new ArrayList<>(m_size);
+            for (final ArrayDeque<Message> lane : m_lanes) {
+                snapshot.addAll(lane);
+            }
+            return Collections.unmodifiableList(snapshot).iterator();
+        } finally {
+            m_lock.unlock();
+        }
+    }
+
+    private ArrayDeque<Message> laneOf(final Message message) {
+        return m_lanes[MessagePriority.of(checkNotNull(message)).ordinal()];
+    }
+
+    private void enqueue(final ArrayDeque<Message> lane, final Message message) {
+        lane.addLast(message);
+        m_size++;
+        m_notEmpty.signal();
+    }
+
+    private Message dequeue() {
+        for (final ArrayDeque<Message> lane : m_lanes) {
+            if (!lane.isEmpty()) {
+                m_size--;
+                m_notFull.signalAll();
+                return lane.pollFirst();
+            }
+        }
+        throw new IllegalStateException("Queue size and lanes are out of sync.");
+    }
+}
@@ -51,13 +51,15 @@
 import java.io.IOException;
 import java.io.InputStream;
 import java.io.OutputStream;
-import java.util.concurrent.ArrayBlockingQueue;
+import java.nio.file.Path;
 import java.util.concurrent.BlockingQueue;
 import java.util.concurrent.atomic.AtomicBoolean;
 import java.util.concurrent.atomic.AtomicInteger;
 
 import org.knime.core.node.NodeLogger;
 import org.knime.python2.kernel.PythonExecutionMonitor;
+import org.knime.python2.kernel.messaging.MessagingOptions.Compression;
+import org.knime.python2.kernel.messaging.MessagingOptions.HeaderFormat;
 import org.knime.python2.util.PythonUtils;
 
 /**
@@ -78,35 +80,115 @@ public final class PythonMessaging implements MessageSender, MessageHandlerColle
 
     private final AtomicInteger m_messageIdCounter = new AtomicInteger(0);
 
+    private final SharedMemorySegments m_sharedMemory;
+
+    private final PayloadCompression m_compression;
+
     // Send:
 
     private final OutputStream m_outToPython;
 
     private final DefaultMessageSenderLoop m_sendLoop;
 
+    private final DefaultMessageSenderLoop m_dataSendLoop; // Nullable.
+
     // Receive:
 
     private final BlockingQueue<Message> m_receiveQueue;
 
     private final DefaultMessageReceiverLoop m_receiveLoop;
 
+    private final DefaultMessageReceiverLoop m_dataReceiveLoop; // Nullable.
+
     // Distribute:
 
     private final MessageDistributorLoop m_distributeLoop;
 
     public PythonMessaging(final OutputStream outToPython, final InputStream inFromPython,
         final PythonExecutionMonitor monitor) {
+        this(outToPython, inFromPython, monitor, null);
+    }
+
+    /**
+     * @param outToPython the output stream via which messages to Python are sent
+     * @param inFromPython the input stream via which messages from Python are received
+     * @param monitor the monitor that is notified about failures of the messaging system
+     * @param options the messaging options, may be <code>null</code> in which case textual message headers are used and
+     *            no payloads are sent via shared memory or compressed. This matches a Python kernel that was started without
+     *            messaging options.
+     */
+    public PythonMessaging(final OutputStream outToPython, final InputStream inFromPython,
+        final PythonExecutionMonitor monitor, final MessagingOptions options) {
+        this(outToPython, inFromPython, null, null, monitor, options);
+    }
+
+    /**
+     * @param outToPython the output stream via which messages to Python are sent
+     * @param inFromPython the input stream via which messages from Python are received
+     * @param dataOutToPython the output stream via which {@link MessagePriority#BULK bulk} messages to Python are sent,
+     *            may be <code>null</code> in which case all messages are sent via <code>outToPython</code>
+     * @param dataInFromPython the input stream via which bulk messages from Python are received, must be
+     *            <code>null</code> if and only if <code>dataOutToPython</code> is <code>null</code>
+     * @param monitor the monitor that is notified about failures of the messaging system
+     * @param options the messaging options, may be <code>null</code>, see
+     *            {@link #PythonMessaging(OutputStream, InputStream, PythonExecutionMonitor, MessagingOptions)}
+     */
+    public PythonMessaging(final OutputStream outToPython, final InputStream inFromPython,
+        final OutputStream dataOutToPython, final InputStream dataInFromPython, final PythonExecutionMonitor monitor,
+        final MessagingOptions options) {
+        m_sharedMemory = options != null ? createSharedMemorySegments(options) : null;
+        m_compression = options != null
+            ? new PayloadCompression(options.getCompression(), options.getCompressionThreshold())
+            : new PayloadCompression(Compression.NONE, 0);
         m_outToPython = outToPython;
-        m_sendLoop = new DefaultMessageSenderLoop(new DefaultMessageSender(outToPython),
-            new ArrayBlockingQueue<>(SEND_QUEUE_LENGTH), monitor);
+        final HeaderFormat headerFormat = options != null ? options.getHeaderFormat() : HeaderFormat.TEXT;
+        m_sendLoop = new DefaultMessageSenderLoop(
+            new DefaultMessageSender(outToPython, MessageHeaderCodec.create(headerFormat), m_sharedMemory,
+                m_compression),
+            new PrioritizedMessageQueue(SEND_QUEUE_LENGTH), monitor);
 
-        m_receiveQueue = new ArrayBlockingQueue<>(RECEIVE_QUEUE_LENGTH);
-        m_receiveLoop =
-            new DefaultMessageReceiverLoop(new DefaultMessageReceiver(inFromPython), m_receiveQueue, monitor);
+        m_receiveQueue = new PrioritizedMessageQueue(RECEIVE_QUEUE_LENGTH);
+        m_receiveLoop = new DefaultMessageReceiverLoop(
+            new DefaultMessageReceiver(inFromPython, MessageHeaderCodec.create(headerFormat), m_compression),
+            m_receiveQueue, monitor);
+
+        if (dataOutToPython != null) {
+            m_dataSendLoop = new DefaultMessageSenderLoop(
+                new DefaultMessageSender(dataOutToPython, MessageHeaderCodec.create(headerFormat), m_sharedMemory,
+                    m_compression),
+                new PrioritizedMessageQueue(SEND_QUEUE_LENGTH), monitor, "python-message-data-send-loop");
+            // Messages received via the data connection are distributed along with all others.
+            m_dataReceiveLoop = new DefaultMessageReceiverLoop(
+                new DefaultMessageReceiver(dataInFromPython, MessageHeaderCodec.create(headerFormat), m_compression),
+                m_receiveQueue, monitor, "python-message-data-receive-loop");
+        } else {
+            m_dataSendLoop = null;
+            m_dataReceiveLoop = null;
+        }
 
         m_distributeLoop = new MessageDistributorLoop(m_receiveLoop, monitor);
     }
 
+    private static SharedMemorySegments createSharedMemorySegments(final MessagingOptions options) {
+        final Path directory = options.getSharedMemoryDirectory();
+        if (directory != null) {
+            try {
+                return new SharedMemorySegments(directory, options.getSharedMemoryThreshold());
+            } catch (final IOException ex) {
+                LOGGER.debug("Shared memory could not be set up. All payloads will be sent via the socket. Cause: "
+                    + ex.getMessage(), ex);
+            }
+        }
+        return null;
+    }
+
+    /**
+     * @return the statistics of the compression of the payloads sent and received by this instance
+     */
+    public PayloadCompression getCompressionStatistics() {
+        return m_compression;
+    }
+
     public boolean isRunning() {
         return m_isRunning.get();
     }
@@ -130,13 +212,23 @@ public void start() {
             // Order is intended.
             m_distributeLoop.start();
             m_receiveLoop.start();
+            if (m_dataReceiveLoop != null) {
+                m_dataReceiveLoop.start();
+            }
             m_sendLoop.start();
+            if (m_dataSendLoop != null) {
+                m_dataSendLoop.start();
+            }
         }
     }
 
     @Override
     public void send(final Message message) throws IOException, InterruptedException {
-        m_sendLoop.send(message);
+        if (m_dataSendLoop != null && MessagePriority.of(message) == MessagePriority.BULK) {
+            m_dataSendLoop.send(message);
+        } else {
+            m_sendLoop.send(message);
+        }
     }
 
     @Override
@@ -154,11 +246,17 @@ public void close() {
         if (m_isRunning.compareAndSet(true, false)) {
             sendShutdownMessage();
             // Order is intended.
-            final Error error =
-                PythonUtils.Misc.closeSafely(LOGGER::debug, m_sendLoop, m_receiveLoop, m_distributeLoop);
+            final Error error = PythonUtils.Misc.closeSafely(LOGGER::debug, m_sendLoop, m_dataSendLoop, m_receiveLoop,
+                m_dataReceiveLoop, m_distributeLoop);
             if (!isClosed()) {
                 LOGGER.debug("Python messaging system could not be shut down gracefully. Process will be killed.");
             }
+            if (m_sharedMemory != null) {
+                m_sharedMemory.close();
+            }
+            if (LOGGER.isDebugEnabled()) {
+                LOGGER.debug("Payload compression statistics: " + m_compression);
+            }
             if (error != null) {
                 throw error;
             }
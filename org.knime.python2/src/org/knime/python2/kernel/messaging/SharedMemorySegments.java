@@ -0,0 +1,139 @@
+/*
+ * ------------------------------------------------------------------------
+ *
+ *  Copyright by KNIME AG, Zurich, Switzerland
+ *  Website: http://www.knime.com; Email: contact@knime.com
+ *
+ *  This program is free software; you can redistribute it and/or modify
+ *  it under the terms of the GNU General Public License, Version 3, as
+ *  published by the Free Software Foundation.
+ *
+ *  This program is distributed in the hope that it will be useful, but
+ *  WITHOUT ANY WARRANTY; without even the implied warranty of
+ *  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+ *  GNU General Public License for more details.
+ *
+ *  You should have received a copy of the GNU General Public License
+ *  along with this program; if not, see <http://www.gnu.org/licenses>.
+ *
+ *  Additional permission under GNU GPL version 3 section 7:
+ *
+ *  KNIME interoperates with ECLIPSE solely via ECLIPSE's plug-in APIs.
+ *  Hence, KNIME and ECLIPSE are both independent programs and are not
+ *  derived from each other. Should, however, the interpretation of the
+ *  GNU GPL Version 3 ("License") under any applicable laws result in
+ *  KNIME and ECLIPSE being a combined program, KNIME AG herewith grants
+ *  you the additional permission to use and propagate KNIME together with
+ *  ECLIPSE with only the license terms in place for ECLIPSE applying to
+ *  ECLIPSE and the GNU GPL Version 3 applying for KNIME, provided the
+ *  license terms of ECLIPSE themselves allow for the respective use and
+ *  propagation of ECLIPSE together with KNIME.
+ *
+ *  Additional permission relating to nodes for KNIME that extend the Node
+ *  Extension (and in particular that are based on subclasses of NodeModel,
+ *  NodeDialog, and NodeView) and that only interoperate with KNIME through
+ *  standard APIs ("Nodes"):
+ *  Nodes are deemed to be separate and independent programs and to not be
+ *  covered works.  Notwithstanding anything to the contrary in the
+ *  License, the License does not apply to Nodes, you are not required to
+ *  license Nodes under the License, and you are granted a license to
+ *  prepare and propagate Nodes, in each case even if such Nodes are
+ *  propagated with or for interoperation with KNIME.  The owner of a Node
+ *  may freely choose the license terms applicable to such Node, including
+ *  when such Node is propagated with or for interoperation with KNIME.
+ * ---------------------------------------------------------------------
+ *
+ */
+package org.knime.python2.kernel.messaging;
+
+import java.io.IOException;
+import java.nio.file.Files;
+import java.nio.file.Path;
+import java.nio.file.Paths;
+import java.util.concurrent.atomic.AtomicInteger;
+
+import org.apache.commons.io.FileUtils;
+
+/**
+ * Side channel for large message payloads. Instead of writing a payload to the socket, the sender writes it into a file
+ * in a memory-backed file system (<code>/dev/shm</code>) and only sends the file's path in the
+ * {@link #HEADER_FIELD_KEY message header}. The receiver reads and deletes the file. Deleting the file acknowledges the
+ * message and releases the segment. Segments that were never acknowledged are removed when the messaging system is
+ * closed.
+ */
+final class SharedMemorySegments implements AutoCloseable {
+
+    /**
+     * The header field that holds the path of a message's shared memory segment.
+     */
+    static final String HEADER_FIELD_KEY = "shm";
+
+    private static final Path DEFAULT_BASE_DIRECTORY = Paths.get("/dev/shm");
+
+    private final Path m_directory;
+
+    private final int m_threshold;
+
+    private final AtomicInteger m_segmentCounter = new AtomicInteger(0);
+
+    /**
+     * @return the memory-backed directory in which shared memory segments can be created, <code>null</code> if the
+     *         system does not provide one
+     */
+    static Path getDefaultBaseDirectory() {
+        return Files.isDirectory(DEFAULT_BASE_DIRECTORY) && Files.isWritable(DEFAULT_BASE_DIRECTORY)
+            ? DEFAULT_BASE_DIRECTORY : null;
+    }
+
+    /**
+     * Reads the payload stored in the shared memory segment at the given path and releases the segment.
+     *
+     * @param segment the path of the segment as sent in the message header
+     * @return the payload
+     * @throws IOException if reading the segment failed
+     */
+    static byte[] readAndRelease(final String segment) throws IOException {
+        final Path path = Paths.get(segment);
+        try {
+            return Files.readAllBytes(path);
+        } finally {
+            Files.deleteIfExists(path);
+        }
+    }
+
+    /**
+     * @param baseDirectory the memory-backed directory in which a private directory for the segments is created
+     * @param threshold the minimum payload size in bytes above which payloads are written to shared memory
+     * @throws IOException if creating the private directory failed
+     */
+    SharedMemorySegments(final Path baseDirectory, final int threshold) throws IOException {
+        m_directory = Files.createTempDirectory(baseDirectory, "knime-python-");
+        m_threshold = threshold;
+    }
+
+    /**
+     * @param payloadSize the size of the payload in bytes
+     * @return <code>true</code> if a payload of the given size should be transferred via shared memory
+     */
+    boolean shouldOffload(final int payloadSize) {
+        return payloadSize >= m_threshold;
+    }
+
+    /**
+     * Writes the given payload into a new segment.
+     *
+     * @param payload the payload
+     * @return the path of the segment that needs to be sent in the message header
+     * @throws IOException if writing the segment failed
+     */
+    String write(final byte[] payload) throws IOException {
+        final Path path = m_directory.resolve(Integer.toString(m_segmentCounter.getAndIncrement()));
+        Files.write(path, payload);
+        return path.toString();
+    }
+
+    @Override
+    public void close() {
+        FileUtils.deleteQuietly(m_directory.toFile());
+    }
+}